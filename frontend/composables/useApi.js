@@ -859,6 +859,15 @@ export const useApi = () => {
     return await request(url)
   }
 
+  // WeChat Wrapped（年度总结）- 卡片流式推送（SSE，按完成顺序到达）
+  const getWrappedAnnualStreamUrl = (params = {}) => {
+    const query = new URLSearchParams()
+    if (params && params.year != null) query.set('year', String(params.year))
+    if (params && params.account) query.set('account', String(params.account))
+    if (params && params.refresh != null) query.set('refresh', String(!!params.refresh))
+    return `${baseURL}/wrapped/annual/stream` + (query.toString() ? `?${query.toString()}` : '')
+  }
+
   // 获取微信进程状态
   const getWxStatus = async (params = {}) => {
     return await request('/wechat/status', params?.signal ? { signal: params.signal } : {})
@@ -914,6 +923,8 @@ export const useApi = () => {
     if (params && params.limit != null) query.set('limit', String(params.limit))
     if (params && params.offset != null) query.set('offset', String(params.offset))
     if (params && params.source) query.set('source', params.source)
+    if (params && params.before_time != null) query.set('before_time', String(params.before_time))
+    if (params && params.before_local_id != null) query.set('before_local_id', String(params.before_local_id))
     const url = '/biz/messages' + (query.toString() ? `?${query.toString()}` : '')
     return await request(url)
   }
@@ -925,6 +936,8 @@ export const useApi = () => {
     if (params && params.limit != null) query.set('limit', String(params.limit))
     if (params && params.offset != null) query.set('offset', String(params.offset))
     if (params && params.source) query.set('source', params.source)
+    if (params && params.before_time != null) query.set('before_time', String(params.before_time))
+    if (params && params.before_local_id != null) query.set('before_local_id', String(params.before_local_id))
     const url = '/biz/pay_records' + (query.toString() ? `?${query.toString()}` : '')
     return await request(url)
   }
@@ -984,8 +997,9 @@ export const useApi = () => {
     return await request('/favorites' + (query.toString() ? `?${query.toString()}` : ''))
   }
 
-  const exportRecords = async (payload = {}) => {
-    return await request('/records/export', {
+  // 收藏与通用记录导出（后台任务：创建后轮询进度，可取消）
+  const createRecordExport = async (payload = {}) => {
+    return await request('/records/exports', {
       method: 'POST',
       body: {
         account: payload.account || null,
@@ -1001,6 +1015,16 @@ export const useApi = () => {
     })
   }
 
+  const getRecordExport = async (exportId) => {
+    if (!exportId) throw new Error('Missing exportId')
+    return await request(`/records/exports/${encodeURIComponent(String(exportId))}`)
+  }
+
+  const cancelRecordExport = async (exportId) => {
+    if (!exportId) throw new Error('Missing exportId')
+    return await request(`/records/exports/${encodeURIComponent(String(exportId))}`, { method: 'DELETE' })
+  }
+
   const getBizProxyImageUrl = (url) => {
     if (!url) return ''
     if (url.startsWith('data:')) return url // 如果已经是 base64，不处理
@@ -1117,6 +1141,7 @@ export const useApi = () => {
     getWrappedAnnual,
     getWrappedAnnualMeta,
     getWrappedAnnualCard,
+    getWrappedAnnualStreamUrl,
     getKeys,
     getImageKey,
     getImageKeyMemory,
@@ -1132,7 +1157,9 @@ export const useApi = () => {
     listRevokeRecords,
     listGeneralSearchRecords,
     listFavorites,
-    exportRecords,
+    createRecordExport,
+    getRecordExport,
+    cancelRecordExport,
     getBizProxyImageUrl,
   }
 }
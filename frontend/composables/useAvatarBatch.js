@@ -0,0 +1,38 @@
+import { reactive } from 'vue'
+import { createAvatarBatcher } from '~/lib/avatar-batch'
+
+// 会话列表 / 联系人 / 成员面板共用一个批量头像加载器：同一帧内出现的头像合并成一次请求。
+let shared = null
+
+export function useAvatarBatch() {
+  if (shared) return shared
+
+  const sources = reactive({})
+  const batcher = process.client
+    ? createAvatarBatcher({
+        fetchImpl: (...args) => fetch(...args),
+        createObjectURL: (blob) => URL.createObjectURL(blob),
+        revokeObjectURL: (url) => URL.revokeObjectURL(url),
+        onSettled: (url, src) => {
+          if (src === undefined) delete sources[url]
+          else sources[url] = src
+        },
+      })
+    : null
+
+  // 模板里替代原头像 URL：就绪前返回 ''，组件走首字母占位。
+  const avatarSrc = (value) => {
+    const url = String(value || '').trim()
+    if (!url || !batcher) return url
+    if (url in sources) return sources[url]
+    return batcher.resolve(url)
+  }
+
+  const prefetchAvatars = (values) => {
+    if (!batcher) return
+    for (const value of Array.isArray(values) ? values : []) batcher.request(value)
+  }
+
+  shared = { avatarSrc, prefetchAvatars }
+  return shared
+}
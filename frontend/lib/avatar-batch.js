@@ -0,0 +1,217 @@
+// 批量头像加载：把同一账号下的 /chat/avatar 单图请求合并成一次 POST /chat/avatars/batch（multipart），
+// 每张头像转成 object URL；清单标记 missing、批量请求失败或非头像 URL 时回退到原单图 URL。
+const AVATAR_PATH = '/chat/avatar'
+const BATCH_PATH = '/chat/avatars/batch'
+const URL_PLACEHOLDER_ORIGIN = 'http://avatar-batch.invalid'
+const CRLF_CRLF = new Uint8Array([13, 10, 13, 10])
+
+// 后端单次上限为 1000，这里取更小的块，让首屏头像更早返回。
+export const AVATAR_BATCH_SIZE = 200
+export const AVATAR_BATCH_MAX_ENTRIES = 4000
+
+const clean = (value) => String(value || '').trim()
+
+
+export const parseAvatarUrl = (value) => {
+  const raw = clean(value)
+  if (!raw || raw.startsWith('blob:') || raw.startsWith('data:')) return null
+
+  let url
+  try {
+    url = new URL(raw, URL_PLACEHOLDER_ORIGIN)
+  } catch {
+    return null
+  }
+  if (!url.pathname.endsWith(AVATAR_PATH)) return null
+
+  const account = clean(url.searchParams.get('account'))
+  const username = clean(url.searchParams.get('username'))
+  if (!account || !username) return null
+
+  const origin = url.origin === URL_PLACEHOLDER_ORIGIN ? '' : url.origin
+  const prefix = url.pathname.slice(0, -AVATAR_PATH.length)
+  return { account, username, batchUrl: `${origin}${prefix}${BATCH_PATH}` }
+}
+
+
+const indexOfBytes = (haystack, needle, from = 0) => {
+  const last = haystack.length - needle.length
+  outer: for (let i = Math.max(0, from); i <= last; i += 1) {
+    for (let j = 0; j < needle.length; j += 1) {
+      if (haystack[i + j] !== needle[j]) continue outer
+    }
+    return i
+  }
+  return -1
+}
+
+
+export const parseMultipartBoundary = (contentType) => {
+  const match = String(contentType || '').match(/boundary=(?:"([^"]+)"|([^;\s]+))/i)
+  return match ? (match[1] || match[2]) : ''
+}
+
+
+export const parseMultipartMixed = (buffer, boundary) => {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer)
+  const delimiter = new TextEncoder().encode(`--${boundary}`)
+  const closing = new TextEncoder().encode(`\r\n--${boundary}`)
+  const decoder = new TextDecoder()
+  const parts = []
+
+  let pos = indexOfBytes(bytes, delimiter)
+  while (pos >= 0) {
+    const headerStart = pos + delimiter.length
+    // `--boundary--` 结束整个 body。
+    if (bytes[headerStart] === 45 && bytes[headerStart + 1] === 45) break
+    const headerEnd = indexOfBytes(bytes, CRLF_CRLF, headerStart)
+    if (headerEnd < 0) break
+
+    const headers = {}
+    for (const line of decoder.decode(bytes.subarray(headerStart, headerEnd)).split('\r\n')) {
+      const idx = line.indexOf(':')
+      if (idx > 0) headers[line.slice(0, idx).trim().toLowerCase()] = line.slice(idx + 1).trim()
+    }
+
+    const bodyStart = headerEnd + CRLF_CRLF.length
+    const length = Number.parseInt(headers['content-length'], 10)
+    const bodyEnd = Number.isFinite(length) && length >= 0
+      ? bodyStart + length
+      : indexOfBytes(bytes, closing, bodyStart)
+    if (bodyEnd < 0 || bodyEnd > bytes.length) break
+
+    parts.push({ headers, body: bytes.subarray(bodyStart, bodyEnd) })
+    pos = indexOfBytes(bytes, delimiter, bodyEnd)
+  }
+  return parts
+}
+
+
+const partName = (headers) => {
+  const match = String(headers?.['content-disposition'] || '').match(/name="([^"]*)"/)
+  if (!match) return ''
+  try {
+    return decodeURIComponent(match[1])
+  } catch {
+    return match[1]
+  }
+}
+
+
+export const createAvatarBatcher = ({
+  fetchImpl = globalThis.fetch,
+  createObjectURL = null,
+  revokeObjectURL = null,
+  onSettled = null,
+  batchSize = AVATAR_BATCH_SIZE,
+  maxEntries = AVATAR_BATCH_MAX_ENTRIES,
+  concurrency = 2,
+  delayMs = 16,
+} = {}) => {
+  // url -> 最终可直接放进 <img src> 的地址（object URL 或原 URL）。
+  const settled = new Map()
+  // `${batchUrl}\n${account}` -> { batchUrl, account, users: Map<username, Set<url>> }
+  const queued = new Map()
+  const inflight = new Set()
+  let timer = null
+
+  const settle = (url, src) => {
+    settled.set(url, src)
+    inflight.delete(url)
+    onSettled?.(url, src)
+  }
+
+  const evict = () => {
+    for (const [url, src] of settled) {
+      if (settled.size <= maxEntries) break
+      settled.delete(url)
+      if (src !== url && src.startsWith('blob:')) revokeObjectURL?.(src)
+      onSettled?.(url, undefined)
+    }
+  }
+
+  const fetchChunk = async (batchUrl, account, usernames, users) => {
+    const sources = new Map()
+    try {
+      const resp = await fetchImpl(batchUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ account, usernames, format: 'multipart' }),
+      })
+      if (!resp?.ok) throw new Error(`avatar batch failed: ${resp?.status}`)
+      const boundary = parseMultipartBoundary(resp.headers.get('content-type'))
+      if (!boundary) throw new Error('avatar batch response has no boundary')
+
+      const [manifestPart, ...imageParts] = parseMultipartMixed(await resp.arrayBuffer(), boundary)
+      const manifest = manifestPart ? JSON.parse(new TextDecoder().decode(manifestPart.body)) : {}
+      const items = manifest?.items || {}
+      for (const part of imageParts) {
+        const username = partName(part.headers)
+        if (items[username]?.status !== 'ok' || !createObjectURL) continue
+        const type = part.headers['content-type'] || items[username].mediaType || 'application/octet-stream'
+        sources.set(username, createObjectURL(new Blob([part.body], { type })))
+      }
+    } catch {
+      // 批量失败时整块回退到单图 URL，由浏览器逐张请求。
+    }
+
+    for (const username of usernames) {
+      for (const url of users.get(username) || []) settle(url, sources.get(username) || url)
+    }
+  }
+
+  const flush = () => {
+    if (timer) {
+      clearTimeout(timer)
+      timer = null
+    }
+    const groups = [...queued.values()]
+    queued.clear()
+
+    const chunks = []
+    for (const { batchUrl, account, users } of groups) {
+      const usernames = [...users.keys()]
+      for (let i = 0; i < usernames.length; i += batchSize) {
+        chunks.push([batchUrl, account, usernames.slice(i, i + batchSize), users])
+      }
+    }
+    // 长列表按块顺序拉取，限制并发，避免占满浏览器的同源连接。
+    let next = 0
+    const worker = async () => {
+      while (next < chunks.length) await fetchChunk(...chunks[next++])
+    }
+    const workers = Array.from({ length: Math.min(Math.max(1, concurrency), chunks.length) }, worker)
+    return Promise.all(workers).then(evict)
+  }
+
+  const request = (value) => {
+    const url = clean(value)
+    if (!url || settled.has(url) || inflight.has(url)) return
+    const parsed = parseAvatarUrl(url)
+    if (!parsed) return
+
+    const key = `${parsed.batchUrl}\n${parsed.account}`
+    let group = queued.get(key)
+    if (!group) {
+      group = { batchUrl: parsed.batchUrl, account: parsed.account, users: new Map() }
+      queued.set(key, group)
+    }
+    if (!group.users.has(parsed.username)) group.users.set(parsed.username, new Set())
+    group.users.get(parsed.username).add(url)
+    inflight.add(url)
+
+    if (!timer) timer = setTimeout(flush, delayMs)
+  }
+
+  // 返回可直接渲染的地址：已就绪返回结果；排队中返回 ''（调用方显示占位）；无法批量的 URL 原样返回。
+  const resolve = (value) => {
+    const url = clean(value)
+    if (!url) return ''
+    if (settled.has(url)) return settled.get(url)
+    if (!parseAvatarUrl(url)) return url
+    request(url)
+    return ''
+  }
+
+  return { request, resolve, flush }
+}
@@ -196,9 +196,24 @@ export const useChatAccountsStore = defineStore('chatAccounts', () => {
     return account ? (sourceStatusByAccount.value[account] || null) : null
   })
 
+  // 账号加载或切换后预热该账号的头像缓存，每个账号每次会话只触发一次；
+  // 后端关闭头像缓存时返回 409，直接忽略。
+  const prewarmedAvatarAccounts = new Set()
+  const prewarmAvatars = (value) => {
+    const account = normalizeAccountName(value)
+    if (!account || prewarmedAvatarAccounts.has(account)) return
+    prewarmedAvatarAccounts.add(account)
+    $fetch('/chat/avatars/prewarm', {
+      baseURL: _apiBase,
+      method: 'POST',
+      body: { account },
+    }).catch(() => {})
+  }
+
   if (process.client) {
     watch(selectedAccount, (next) => {
       writeSelectedAccount(next)
+      prewarmAvatars(next)
     })
   }
 
@@ -0,0 +1,128 @@
+import assert from 'node:assert/strict'
+import { readFileSync } from 'node:fs'
+import test from 'node:test'
+import { resolve } from 'node:path'
+
+import {
+  createAvatarBatcher,
+  parseAvatarUrl,
+  parseMultipartMixed,
+} from '../lib/avatar-batch.js'
+
+const readSource = (path) => readFileSync(resolve(process.cwd(), path), 'utf8')
+
+const BOUNDARY = 'wcda-avatars-test'
+
+// 与后端 _build_avatar_multipart 相同的布局：首段为 JSON 清单，之后每个 ok 头像一段。
+const buildMultipart = (manifest, images) => {
+  const encoder = new TextEncoder()
+  const chunks = []
+  const push = (headers, body) => {
+    const head = Object.entries(headers).map(([k, v]) => `${k}: ${v}\r\n`).join('')
+    chunks.push(encoder.encode(`--${BOUNDARY}\r\n${head}Content-Length: ${body.length}\r\n\r\n`), body, encoder.encode('\r\n'))
+  }
+  push({ 'Content-Type': 'application/json; charset=utf-8', 'Content-Disposition': 'inline; name="manifest"' }, encoder.encode(JSON.stringify(manifest)))
+  for (const [username, body] of Object.entries(images)) {
+    push({ 'Content-Type': 'image/png', 'Content-Disposition': `inline; name="${encodeURIComponent(username)}"` }, body)
+  }
+  chunks.push(encoder.encode(`--${BOUNDARY}--\r\n`))
+  return Buffer.concat(chunks.map((c) => Buffer.from(c)))
+}
+
+const avatarUrl = (username, account = 'wxid_me') => (
+  `http://127.0.0.1:10392/api/chat/avatar?account=${encodeURIComponent(account)}&username=${encodeURIComponent(username)}`
+)
+
+
+test('maps single avatar urls onto the batch endpoint of the same api base', () => {
+  assert.deepEqual(parseAvatarUrl('/api/chat/avatar?account=wxid_me&username=room%4012%40chatroom'), {
+    account: 'wxid_me',
+    username: 'room@12@chatroom',
+    batchUrl: '/api/chat/avatars/batch',
+  })
+  assert.equal(parseAvatarUrl(avatarUrl('a')).batchUrl, 'http://127.0.0.1:10392/api/chat/avatars/batch')
+  assert.equal(parseAvatarUrl('https://wx.qlogo.cn/mmhead/abc/0'), null)
+  assert.equal(parseAvatarUrl('/api/chat/avatar?account=wxid_me'), null)
+})
+
+
+test('splits a multipart body even when an image contains the boundary text', () => {
+  const tricky = new TextEncoder().encode(`\r\n--${BOUNDARY}\r\n`)
+  const parts = parseMultipartMixed(buildMultipart({ items: {} }, { a: tricky }), BOUNDARY)
+
+  assert.equal(parts.length, 2)
+  assert.equal(parts[0].headers['content-disposition'], 'inline; name="manifest"')
+  assert.deepEqual([...parts[1].body], [...tricky])
+})
+
+
+test('coalesces queued avatars into one batch request and falls back for missing ones', async () => {
+  const calls = []
+  const settled = new Map()
+  const fetchImpl = async (url, init) => {
+    calls.push({ url, body: JSON.parse(init.body) })
+    const manifest = {
+      items: {
+        'alice': { status: 'ok', mediaType: 'image/png' },
+        'room@1@chatroom': { status: 'ok', mediaType: 'image/png' },
+        'bob': { status: 'missing' },
+      },
+    }
+    const body = buildMultipart(manifest, { 'alice': new Uint8Array([1]), 'room@1@chatroom': new Uint8Array([2]) })
+    return {
+      ok: true,
+      headers: new Headers({ 'content-type': `multipart/mixed; boundary=${BOUNDARY}` }),
+      arrayBuffer: async () => body.buffer.slice(body.byteOffset, body.byteOffset + body.byteLength),
+    }
+  }
+  let blobs = 0
+  const batcher = createAvatarBatcher({
+    fetchImpl,
+    createObjectURL: () => `blob:avatar-${++blobs}`,
+    onSettled: (url, src) => settled.set(url, src),
+    delayMs: 60_000,
+  })
+
+  assert.equal(batcher.resolve(avatarUrl('alice')), '')
+  assert.equal(batcher.resolve(avatarUrl('room@1@chatroom')), '')
+  assert.equal(batcher.resolve(avatarUrl('bob')), '')
+  assert.equal(batcher.resolve('https://wx.qlogo.cn/mmhead/abc/0'), 'https://wx.qlogo.cn/mmhead/abc/0')
+  await batcher.flush()
+
+  assert.equal(calls.length, 1)
+  assert.equal(calls[0].url, 'http://127.0.0.1:10392/api/chat/avatars/batch')
+  assert.deepEqual(calls[0].body, {
+    account: 'wxid_me',
+    usernames: ['alice', 'room@1@chatroom', 'bob'],
+    format: 'multipart',
+  })
+  assert.match(batcher.resolve(avatarUrl('alice')), /^blob:avatar-/)
+  assert.match(settled.get(avatarUrl('room@1@chatroom')), /^blob:avatar-/)
+  assert.equal(batcher.resolve(avatarUrl('bob')), avatarUrl('bob'))
+})
+
+
+test('falls back to single avatar urls when the batch request fails', async () => {
+  const batcher = createAvatarBatcher({
+    fetchImpl: async () => ({ ok: false, status: 404 }),
+    createObjectURL: () => 'blob:never',
+    delayMs: 60_000,
+  })
+
+  batcher.request(avatarUrl('alice'))
+  await batcher.flush()
+  assert.equal(batcher.resolve(avatarUrl('alice')), avatarUrl('alice'))
+})
+
+
+test('session, contact and member panels render avatars through the batch loader', () => {
+  for (const path of [
+    'components/chat/SessionListPanel.vue',
+    'pages/contacts.vue',
+    'components/chat/ChatOverlays.vue',
+    'components/chat/ContactProfileCard.vue',
+  ]) {
+    assert.match(readSource(path), /avatarSrc\(/, path)
+  }
+  assert.match(readSource('stores/chatAccounts.js'), /\/chat\/avatars\/prewarm/)
+})
@@ -42,7 +42,7 @@ from .routers.general import router as _general_router
 from .routers.favorites import router as _favorites_router
 from .routers.record_export import router as _record_export_router
 from .request_logging import log_server_errors_middleware
-from .perf_trace import ChatRequestPerfMiddleware
+from .perf_trace import ChatRequestPerfMiddleware, RequestMetricsMiddleware
 from .native_core_telemetry import (
     record_product_event,
     shutdown_product_telemetry,
@@ -124,6 +124,8 @@ async def _record_content_free_product_events(request: Request, call_next):
 
 
 app.add_middleware(ChatRequestPerfMiddleware, logger=request_logger)
+# Outermost, so route latency includes every other middleware.
+app.add_middleware(RequestMetricsMiddleware)
 
 
 app.include_router(_health_router)
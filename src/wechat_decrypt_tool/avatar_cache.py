@@ -155,6 +155,46 @@ def get_avatar_cache_user_entry(account: str, username: str) -> Optional[dict[st
     return get_avatar_cache_entry(account, cache_key_for_avatar_user(username))
 
 
+def get_avatar_cache_user_entries(account: str, usernames: list[str]) -> dict[str, dict[str, Any]]:
+    """Batch variant of `get_avatar_cache_user_entry`: one connection, chunked IN lookups."""
+    if not is_avatar_cache_enabled():
+        return {}
+    key_to_user: dict[str, str] = {}
+    for username in usernames:
+        u = str(username or "").strip()
+        if u:
+            key_to_user.setdefault(cache_key_for_avatar_user(u), u)
+    if not key_to_user:
+        return {}
+    try:
+        conn = _connect(account)
+    except Exception:
+        return {}
+    out: dict[str, dict[str, Any]] = {}
+    keys = list(key_to_user)
+    try:
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            rows = conn.execute(
+                f"SELECT * FROM avatar_cache_entries WHERE account = ? AND cache_key IN ({placeholders})",
+                (str(account or ""), *chunk),
+            ).fetchall()
+            for row in rows:
+                entry = _row_to_dict(row)
+                user = key_to_user.get(str((entry or {}).get("cache_key") or ""))
+                if entry and user:
+                    out[user] = entry
+        return out
+    except Exception:
+        return out
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 def get_avatar_cache_url_entry(account: str, source_url: str) -> Optional[dict[str, Any]]:
     if not source_url:
         return None
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import json
 import re
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Optional
 
@@ -11,7 +12,13 @@ from fastapi import HTTPException
 from .account_identity import canonical_account_name, is_internal_account_directory_name
 from .account_source_policy import source_metadata_prefers_decrypted_snapshot
 from .app_paths import get_output_databases_dir
-from .key_store import get_account_keys_from_store, load_account_keys_store, normalize_key_store_path
+from .key_store import (
+    get_account_keys_from_store,
+    key_store_file_signature,
+    load_account_keys_store,
+    normalize_key_store_path,
+)
+from .metrics import record_cache_lookup
 from .sqlite_diagnostics import is_usable_sqlite_db
 
 
@@ -19,6 +26,10 @@ from .sqlite_diagnostics import is_usable_sqlite_db
 # themselves may contain underscores, so the account part must be greedy.
 _WXID_SOURCE_SUFFIX_RE = re.compile(r"^(wxid_[^\s]+)_([0-9a-f]{4})$", re.IGNORECASE)
 
+# Files whose content feeds a ChatAccountContext; their stat is part of the
+# registry signature, so editing any of them rebuilds the cached account list.
+_ACCOUNT_SIGNATURE_FILES = ("session.db", "contact.db", "_source.json", "_media_keys.json")
+
 
 @dataclass(frozen=True)
 class ChatAccountContext:
@@ -94,8 +105,15 @@ def _load_source_json(account_dir: Path) -> dict[str, Any]:
         return {}
 
 
-def _source_info_from_key_store(account: str) -> tuple[dict[str, Any], bool]:
-    keys = get_account_keys_from_store(account)
+def _keys_for_account(account: str, store: Optional[dict[str, Any]]) -> dict[str, Any]:
+    if store is None:
+        return get_account_keys_from_store(account)
+    keys = store.get(account, {})
+    return keys if isinstance(keys, dict) else {}
+
+
+def _source_info_from_key_store(account: str, store: Optional[dict[str, Any]] = None) -> tuple[dict[str, Any], bool]:
+    keys = _keys_for_account(account, store)
     if not isinstance(keys, dict):
         return {}, False
 
@@ -109,8 +127,8 @@ def _source_info_from_key_store(account: str) -> tuple[dict[str, Any], bool]:
     return source, len(str(keys.get("db_key") or "").strip()) == 64
 
 
-def _key_state_from_key_store(account: str) -> dict[str, Any]:
-    keys = get_account_keys_from_store(account)
+def _key_state_from_key_store(account: str, store: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    keys = _keys_for_account(account, store)
     if not isinstance(keys, dict):
         keys = {}
 
@@ -189,7 +207,7 @@ def _maybe_write_source_info(account_dir: Path, source_info: dict[str, Any]) ->
         pass
 
 
-def _context_for_name(account: str) -> Optional[ChatAccountContext]:
+def _context_for_name(account: str, store: Optional[dict[str, Any]] = None) -> Optional[ChatAccountContext]:
     account_name = _safe_account_name(account)
     if not account_name:
         return None
@@ -204,8 +222,8 @@ def _context_for_name(account: str) -> Optional[ChatAccountContext]:
         has_dbs = False
         source_from_dir = {}
 
-    source_from_keys, key_present = _source_info_from_key_store(account_name)
-    key_state = _key_state_from_key_store(account_name)
+    source_from_keys, key_present = _source_info_from_key_store(account_name, store)
+    key_state = _key_state_from_key_store(account_name, store)
     media_key_state = _key_state_from_media_keys_file(account_dir)
     # A manually imported archive is an immutable decrypted snapshot. Do not
     # silently graft a key-store path from this computer onto it; that would
@@ -271,19 +289,22 @@ def _dedupe_source_alias_contexts(
     return output
 
 
-def list_chat_account_contexts() -> list[ChatAccountContext]:
-    names: set[str] = set()
-    output_databases_dir = get_output_databases_dir()
+def _list_output_account_names(output_databases_dir: Path) -> list[str]:
+    names: list[str] = []
     if output_databases_dir.exists():
         try:
             for p in output_databases_dir.iterdir():
                 if p.is_dir():
                     n = _safe_account_name(p.name)
                     if n:
-                        names.add(n)
+                        names.append(n)
         except Exception:
             pass
+    return sorted(names)
+
 
+def _discover_chat_account_contexts(dir_names: list[str]) -> list[ChatAccountContext]:
+    names: set[str] = set(dir_names)
     store = load_account_keys_store()
     if isinstance(store, dict):
         for name, item in store.items():
@@ -298,10 +319,12 @@ def list_chat_account_contexts() -> list[ChatAccountContext]:
             )
             if has_key or has_source or has_image_key:
                 names.add(n)
+    else:
+        store = {}
 
     contexts: list[ChatAccountContext] = []
     for name in sorted(names):
-        ctx = _context_for_name(name)
+        ctx = _context_for_name(name, store)
         if ctx is not None:
             contexts.append(ctx)
     contexts = _dedupe_source_alias_contexts(contexts)
@@ -309,6 +332,81 @@ def list_chat_account_contexts() -> list[ChatAccountContext]:
     return contexts
 
 
+@dataclass(frozen=True)
+class _AccountRegistry:
+    signature: tuple[Any, ...]
+    contexts: tuple[ChatAccountContext, ...]
+
+
+_REGISTRY_LOCK = threading.Lock()
+_REGISTRY: Optional[_AccountRegistry] = None
+# Directory listing of the output dir, reused while the directory's own stat is unchanged.
+_DIR_NAMES_CACHE: Optional[tuple[tuple[Any, ...], list[str]]] = None
+
+
+def _stat_signature(path: Path) -> tuple[int, ...]:
+    try:
+        st = path.stat()
+    except OSError:
+        return ()
+    return (int(st.st_mtime_ns), int(st.st_size), int(st.st_ino))
+
+
+def _registry_signature() -> tuple[tuple[Any, ...], list[str]]:
+    """Stat-only fingerprint of every input of `_discover_chat_account_contexts`."""
+    global _DIR_NAMES_CACHE
+    output_databases_dir = get_output_databases_dir()
+    dir_key = (str(output_databases_dir), _stat_signature(output_databases_dir))
+    with _REGISTRY_LOCK:
+        cached = _DIR_NAMES_CACHE
+    if cached is not None and cached[0] == dir_key:
+        dir_names = cached[1]
+    else:
+        dir_names = _list_output_account_names(output_databases_dir)
+        with _REGISTRY_LOCK:
+            _DIR_NAMES_CACHE = (dir_key, dir_names)
+
+    accounts = tuple(
+        (
+            name,
+            _stat_signature(output_databases_dir / name),
+            tuple(_stat_signature(output_databases_dir / name / f) for f in _ACCOUNT_SIGNATURE_FILES),
+        )
+        for name in dir_names
+    )
+    return (dir_key, key_store_file_signature(), accounts), dir_names
+
+
+def invalidate_chat_account_registry() -> None:
+    global _REGISTRY, _DIR_NAMES_CACHE
+    with _REGISTRY_LOCK:
+        _REGISTRY = None
+        _DIR_NAMES_CACHE = None
+
+
+def list_chat_account_contexts() -> list[ChatAccountContext]:
+    """Return all chat accounts from the in-memory registry.
+
+    The registry is rebuilt only when the output databases directory, an
+    account's key files, or the key store change on disk (mtime/size/inode),
+    so a request normally pays a handful of `stat` calls instead of reading
+    `_source.json`, the key store and probing SQLite files per account.
+    """
+    global _REGISTRY
+    signature, dir_names = _registry_signature()
+    with _REGISTRY_LOCK:
+        registry = _REGISTRY
+    if registry is not None and registry.signature == signature:
+        record_cache_lookup("chat_accounts", True)
+    else:
+        record_cache_lookup("chat_accounts", False)
+        registry = _AccountRegistry(signature=signature, contexts=tuple(_discover_chat_account_contexts(dir_names)))
+        with _REGISTRY_LOCK:
+            _REGISTRY = registry
+    # Contexts are frozen, but source_info is a dict; hand out copies so callers cannot edit the cache.
+    return [replace(ctx, source_info=dict(ctx.source_info)) for ctx in registry.contexts]
+
+
 def list_chat_account_names() -> list[str]:
     return [ctx.name for ctx in list_chat_account_contexts()]
 
@@ -17,6 +17,7 @@ import threading
 import time
 import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -65,6 +66,7 @@ from .media_helpers import (
     MediaPathIndex,
     _convert_silk_to_browser_audio,
     _detect_image_media_type,
+    _ensure_decrypted_resource_for_md5,
     _fallback_search_media_by_file_id,
     _read_and_maybe_decrypt_media,
     _resolve_account_db_storage_dir,
@@ -72,7 +74,9 @@ from .media_helpers import (
     _resolve_media_path_for_kind,
     _try_find_decrypted_resource,
 )
+from .metrics import record_throughput
 from .perf_trace import create_perf_trace
+from .voice_audio import lookup_cached_voice_audio, store_voice_audio
 from .source_fallback import build_source_fallback_meta
 from .export_integrity import export_css as _native_export_css
 from .export_integrity import load_wce_integrity_native
@@ -1023,6 +1027,26 @@ def _zip_arcname(value: Any) -> str:
     return s
 
 
+# 已压缩格式再 deflate 几乎不省空间，只白白消耗 CPU，直接 STORED 写入。
+_PRECOMPRESSED_ZIP_EXTS = frozenset(
+    {
+        "jpg", "jpeg", "png", "gif", "webp", "heic",
+        "mp4", "mov", "m4v", "mp3", "m4a", "aac", "ogg", "silk", "amr",
+        "zip", "7z", "rar", "gz", "xz", "bz2",
+        "docx", "xlsx", "pptx", "apk",
+    }
+)
+
+
+def _zip_compress_kwargs(arcname: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+    if isinstance(arcname, zipfile.ZipInfo) or "compress_type" in kwargs:
+        return kwargs
+    suffix = _zip_arcname(arcname).rsplit("/", 1)[-1].rpartition(".")[2].lower()
+    if suffix in _PRECOMPRESSED_ZIP_EXTS:
+        return {**kwargs, "compress_type": zipfile.ZIP_STORED}
+    return kwargs
+
+
 class _ZipIntegrityWriter:
     """Small ZipFile proxy that records hashes for the exported integrity bundle."""
 
@@ -1077,12 +1101,16 @@ class _ZipIntegrityWriter:
         self._entries[arc] = entry
 
     def writestr(self, zinfo_or_arcname: Any, data: Any, *args: Any, **kwargs: Any) -> Any:
+        if not args:
+            kwargs = _zip_compress_kwargs(zinfo_or_arcname, kwargs)
         result = self._zf.writestr(zinfo_or_arcname, data, *args, **kwargs)
         arc = getattr(zinfo_or_arcname, "filename", zinfo_or_arcname)
         self._record_bytes(arc, data)
         return result
 
     def write(self, filename: Any, arcname: Any = None, *args: Any, **kwargs: Any) -> Any:
+        if not args:
+            kwargs = _zip_compress_kwargs(arcname if arcname is not None else filename, kwargs)
         if arcname is None:
             result = self._zf.write(filename, *args, **kwargs)
         else:
@@ -1520,6 +1548,7 @@ class ChatExportManager:
         message_types: list[str],
         encrypt: bool = False,
         content_key: bytearray | None = None,
+        on_job: Optional[Callable[[ExportJob], None]] = None,
     ) -> ExportJob:
         if bool(encrypt) != (content_key is not None):
             raise ValueError("encrypted chat export requires one validated content key")
@@ -1555,6 +1584,9 @@ class ChatExportManager:
             },
             content_key=content_key,
         )
+        if on_job is not None:
+            # 调用方（如记录导出任务）借此转发取消请求、读取进度。
+            on_job(job)
         self._run_job_safe(job, Path(account_dir), report_outcome=False)
         return job
 
@@ -1893,6 +1925,22 @@ class ChatExportManager:
                 hardlinkRows=int(media_index.stats.get("hardlinkRows") or 0),
             )
             _raise_if_job_cancelled(job, "media_index_built", trace)
+            if has_prepared_conversations:
+                phase_started = time.perf_counter()
+                prefetched = _prefetch_prepared_media(
+                    job,
+                    account_dir=account_dir,
+                    conversations=prepared_conversations,
+                    media_kinds=media_kinds,
+                    media_index=media_index,
+                )
+                _safe_trace(
+                    trace,
+                    "prepared_media_prefetched",
+                    durationMs=_elapsed_ms(phase_started),
+                    decrypted=prefetched,
+                )
+                _raise_if_job_cancelled(job, "prepared_media_prefetched", trace)
 
         media_written: dict[str, str] = {}
         avatar_written: dict[str, str] = {}
@@ -2593,6 +2641,14 @@ class ChatExportManager:
                 job.status = "done"
                 job.zip_path = final_out
                 job.finished_at = time.time()
+            try:
+                record_throughput(
+                    "chat_export",
+                    bytes_count=int(final_out.stat().st_size),
+                    seconds=(job.finished_at or time.time()) - (job.started_at or job.created_at),
+                )
+            except OSError:
+                pass
             _safe_trace(
                 trace,
                 "job_done",
@@ -6877,6 +6933,19 @@ def _materialize_voice(
     if existing:
         return existing, False
 
+    cached = lookup_cached_voice_audio(Path(account_dir), int(server_id), preferred_format="mp3")
+    if cached is not None:
+        cached_path, cached_ext, _media_type = cached
+        arc = f"media/voices/voice_{int(server_id)}.{cached_ext}"
+        try:
+            zf.write(str(cached_path), arc)
+        except OSError:
+            pass
+        else:
+            media_written[key] = arc
+            _log_export_slow_step("materialize_voice", started_at, serverId=server_id, arc=arc, cached=True)
+            return arc, True
+
     def coerce_blob(value: Any) -> bytes:
         if value is None:
             return b""
@@ -6953,6 +7022,7 @@ def _materialize_voice(
         payload, ext = b"", "silk"
     if not payload:
         payload, ext = data, "silk"
+    store_voice_audio(Path(account_dir), int(server_id), ext, payload)
 
     arc = f"media/voices/voice_{int(server_id)}.{ext}"
     zf.writestr(arc, payload)
@@ -6967,6 +7037,87 @@ def _materialize_voice(
     return arc, True
 
 
+def _media_prefetch_workers() -> int:
+    raw = str(os.environ.get("WECHAT_TOOL_EXPORT_MEDIA_WORKERS", "") or "").strip()
+    try:
+        value = int(raw) if raw else min(8, os.cpu_count() or 4)
+    except ValueError:
+        value = min(8, os.cpu_count() or 4)
+    return max(1, min(32, value))
+
+
+def _prefetch_prepared_media(
+    job: Any,
+    *,
+    account_dir: Path,
+    conversations: list[dict[str, Any]],
+    media_kinds: list[MediaKind],
+    media_index: MediaPathIndex,
+    workers: Optional[int] = None,
+) -> int:
+    """Decrypt prepared-archive images into the resource cache on a thread pool.
+
+    Prepared archives (favorites) reference media that usually still sits in
+    WeChat's encrypted .dat form. ``_materialize_media`` prefers an already
+    decrypted resource and then simply streams the file into the zip, so doing
+    the decryption up front in parallel leaves only the zip writes serial.
+    Paths are resolved on the calling thread because the index is not
+    thread-safe. Returns how many resources were decrypted.
+    """
+    fields_by_kind = {
+        "image": ("imageMd5Candidates", "imageMd5"),
+        "emoji": ("emojiMd5",),
+        "video_thumb": ("videoThumbMd5",),
+    }
+    wanted = [kind for kind in fields_by_kind if kind in set(media_kinds or [])]
+    if not wanted:
+        return 0
+
+    sources: dict[str, Path] = {}
+    for conversation in conversations:
+        for message in conversation.get("messages") or []:
+            if not isinstance(message, dict):
+                continue
+            username = str(message.get("_mediaUsername") or conversation.get("username") or "").strip()
+            for kind in wanted:
+                md5s: list[str] = []
+                for field_name in fields_by_kind[kind]:
+                    value = message.get(field_name)
+                    md5s.extend(value if isinstance(value, list) else [value])
+                for raw_md5 in md5s:
+                    md5 = str(raw_md5 or "").strip().lower()
+                    if not _is_md5(md5) or md5 in sources:
+                        continue
+                    try:
+                        src = media_index.resolve(kind=kind, md5=md5, username=username)
+                    except Exception:
+                        src = None
+                    if src is not None:
+                        sources[md5] = src
+                        break
+    if not sources:
+        return 0
+
+    weixin_root = _resolve_account_wxid_dir(account_dir)
+
+    def decrypt_one(item: tuple[str, Path]) -> bool:
+        md5, src = item
+        if bool(getattr(job, "cancel_requested", False)):
+            return False
+        if _try_find_decrypted_resource(account_dir, md5) is not None:
+            return False
+        try:
+            return _ensure_decrypted_resource_for_md5(
+                account_dir, md5=md5, source_path=src, weixin_root=weixin_root
+            ) is not None
+        except Exception:
+            return False
+
+    worker_count = max(1, min(int(workers or _media_prefetch_workers()), len(sources)))
+    with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="export-media") as pool:
+        return sum(1 for ok in pool.map(decrypt_one, sources.items()) if ok)
+
+
 def _materialize_media(
     *,
     zf: zipfile.ZipFile,
@@ -7336,6 +7487,7 @@ def export_prepared_chat_archive(
     message_types: list[str],
     encrypt: bool = False,
     content_key: bytearray | None = None,
+    on_job: Optional[Callable[[ExportJob], None]] = None,
 ) -> ExportJob:
     """Export pre-parsed messages through the standard chat archive pipeline."""
     resolved_account_dir = Path(account_dir) if account_dir is not None else _resolve_account_dir(account)
@@ -7351,4 +7503,5 @@ def export_prepared_chat_archive(
         message_types=message_types,
         encrypt=encrypt,
         content_key=content_key,
+        on_job=on_job,
     )
@@ -6,9 +6,9 @@ Why:
 - This service is kept as an opt-in compatibility bridge for workflows that still require the decrypted
   sqlite snapshot to be incrementally updated.
 
-This module runs a lightweight background poller that watches db_storage mtime changes and triggers an incremental
-sync_all into decrypted sqlite. It is intentionally conservative (debounced + rate-limited) to avoid hammering the
-backend or the sqlite files.
+This module subscribes to the shared db_storage watcher (`db_storage_watch`) and triggers an incremental sync_all into
+decrypted sqlite when WeChat writes. It is intentionally conservative (debounced + rate-limited) to avoid hammering the
+backend or the sqlite files. Accounts whose watcher is unavailable fall back to the periodic mtime scan.
 """
 
 from __future__ import annotations
@@ -23,6 +23,7 @@ from typing import Any, Optional
 from fastapi import HTTPException
 
 from .chat_helpers import _list_decrypted_accounts, _resolve_account_dir
+from .db_storage_watch import DB_STORAGE_WATCH, DbStorageChange, DbStorageSubscription, change_in_scope
 from .logging_config import get_logger
 from .wcdb_realtime import WCDB_REALTIME
 
@@ -101,6 +102,11 @@ class _AccountState:
     due_at: float = 0.0
     last_sync_end_at: float = 0.0
     thread: Optional[threading.Thread] = None
+    subscription: Optional[DbStorageSubscription] = None
+    # True while the watcher is unavailable for this account and `_tick` must scan db_storage itself.
+    scan_fallback: bool = False
+    # Set when changes arrive while the account is paused, so they are synced after resume.
+    changed_while_paused: bool = False
 
 
 class ChatRealtimeAutoSyncService:
@@ -112,6 +118,10 @@ class ChatRealtimeAutoSyncService:
             "WECHAT_TOOL_REALTIME_AUTOSYNC_MIN_SYNC_INTERVAL_MS", 800, min_v=0, max_v=60_000
         )
         self._workers = _env_int("WECHAT_TOOL_REALTIME_AUTOSYNC_WORKERS", 1, min_v=1, max_v=4)
+        # With the watcher active, account discovery / status checks only need to run occasionally.
+        self._discovery_ms = _env_int(
+            "WECHAT_TOOL_REALTIME_AUTOSYNC_DISCOVERY_MS", 10_000, min_v=1000, max_v=600_000
+        )
 
         # Sync strategy defaults: cheap incremental write into decrypted sqlite.
         self._sync_max_scan = _env_int("WECHAT_TOOL_REALTIME_AUTOSYNC_MAX_SCAN", 200, min_v=20, max_v=5000)
@@ -125,7 +135,10 @@ class ChatRealtimeAutoSyncService:
         self._states: dict[str, _AccountState] = {}
         self._paused_accounts: dict[str, int] = {}
         self._stop = threading.Event()
+        self._wake = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._accounts: list[str] = []
+        self._last_discovery_at = 0.0
 
     def _is_account_paused_locked(self, account: str) -> bool:
         key = str(account or "").strip()
@@ -210,11 +223,21 @@ class ChatRealtimeAutoSyncService:
             return
 
         self._stop.set()
+        self._wake.set()
         try:
             th.join(timeout=5.0)
         except Exception:
             pass
 
+        with self._mu:
+            subs = [st.subscription for st in self._states.values() if st.subscription is not None]
+            for st in self._states.values():
+                st.subscription = None
+            self._accounts = []
+            self._last_discovery_at = 0.0
+        for sub in subs:
+            sub.close()
+
         logger.info("[realtime-autosync] stopped")
 
     def _run(self) -> None:
@@ -227,12 +250,70 @@ class ChatRealtimeAutoSyncService:
 
             # Avoid busy looping on exceptions; keep a minimum sleep.
             elapsed_ms = (time.perf_counter() - tick_t0) * 1000.0
-            sleep_ms = max(100.0, float(self._interval_ms) - elapsed_ms)
-            self._stop.wait(timeout=sleep_ms / 1000.0)
+            sleep_ms = max(100.0, float(self._next_tick_ms()) - elapsed_ms)
+            self._wake.wait(timeout=sleep_ms / 1000.0)
+            self._wake.clear()
+
+    def _next_tick_ms(self) -> float:
+        """Poll at `interval_ms` only while something needs it; otherwise idle until the watcher wakes us."""
+
+        now = time.time()
+        wait_ms = float(self._discovery_ms)
+        with self._mu:
+            for st in self._states.values():
+                if st.scan_fallback or (st.subscription is not None and not st.subscription.available):
+                    return float(self._interval_ms)
+                if st.thread is not None:
+                    wait_ms = min(wait_ms, float(self._interval_ms))
+                if st.due_at > 0:
+                    wait_ms = min(wait_ms, max(0.0, (st.due_at - now) * 1000.0))
+        return wait_ms
+
+    def _on_db_storage_changes(self, account: str, changes: list[DbStorageChange]) -> None:
+        # Runs on the watcher thread: only record the change and wake the scheduler.
+        # Import lazily to avoid any startup import ordering issues.
+        from .routers.chat_contacts import _invalidate_contact_snapshots_for_changes
+
+        _invalidate_contact_snapshots_for_changes(account, changes)
+        relevant = [c for c in changes if change_in_scope(c, "sync")]
+        if not relevant:
+            return
+        now = time.time()
+        with self._mu:
+            st = self._states.get(account)
+            if st is None:
+                return
+            st.last_mtime_ns = max([int(st.last_mtime_ns)] + [int(c.mtime_ns) for c in relevant])
+            if self._is_account_paused_locked(account):
+                st.changed_while_paused = True
+                return
+            st.due_at = now + (float(self._debounce_ms) / 1000.0)
+        self._wake.set()
+
+    def _ensure_subscription(self, account: str, db_storage_dir: Path) -> Optional[DbStorageSubscription]:
+        with self._mu:
+            st = self._states.setdefault(account, _AccountState())
+            sub = st.subscription
+        if sub is not None:
+            # An unavailable watcher is kept as-is: the account stays on the scan fallback.
+            if sub.watches(db_storage_dir):
+                return sub
+            sub.close()
+        sub = DB_STORAGE_WATCH.subscribe(
+            db_storage_dir, lambda changes, acc=account: self._on_db_storage_changes(acc, changes)
+        )
+        with self._mu:
+            st = self._states.setdefault(account, _AccountState())
+            st.subscription = sub
+        return sub
 
     def _tick(self) -> None:
-        accounts = _list_decrypted_accounts()
         now = time.time()
+        discover = (not self._accounts) or (now - self._last_discovery_at) * 1000.0 >= float(self._discovery_ms)
+        if discover:
+            self._accounts = list(_list_decrypted_accounts())
+            self._last_discovery_at = now
+        accounts = list(self._accounts)
 
         if not accounts:
             return
@@ -244,9 +325,20 @@ class ChatRealtimeAutoSyncService:
             if self.is_account_paused(acc):
                 with self._mu:
                     st = self._states.setdefault(acc, _AccountState())
+                    if st.due_at > 0:
+                        st.changed_while_paused = True
                     st.due_at = 0.0
                 continue
 
+            with self._mu:
+                st = self._states.setdefault(acc, _AccountState())
+                if st.changed_while_paused:
+                    st.changed_while_paused = False
+                    st.due_at = now + (float(self._debounce_ms) / 1000.0)
+                scan_fallback = st.scan_fallback or (st.subscription is not None and not st.subscription.available)
+            if not (discover or scan_fallback):
+                continue
+
             try:
                 account_dir = _resolve_account_dir(acc)
             except HTTPException:
@@ -263,6 +355,13 @@ class ChatRealtimeAutoSyncService:
             if not db_storage_dir.exists() or not db_storage_dir.is_dir():
                 continue
 
+            sub = self._ensure_subscription(acc, db_storage_dir)
+            with self._mu:
+                st = self._states.setdefault(acc, _AccountState())
+                st.scan_fallback = sub is None or not sub.available
+                if not st.scan_fallback:
+                    continue
+
             scan_t0 = time.perf_counter()
             mtime_ns = _scan_db_storage_mtime_ns(db_storage_dir)
             scan_ms = (time.perf_counter() - scan_t0) * 1000.0
@@ -278,12 +377,15 @@ class ChatRealtimeAutoSyncService:
         # Schedule daemon threads. (Important: do NOT use ThreadPoolExecutor here; its threads are non-daemon on
         # Windows/Python 3.12 and can prevent Ctrl+C from stopping the process.)
         to_start: list[threading.Thread] = []
+        dropped: list[DbStorageSubscription] = []
         with self._mu:
             # Drop state for removed accounts to keep memory bounded.
             keep = set(accounts)
             for acc in list(self._states.keys()):
                 if acc not in keep:
-                    self._states.pop(acc, None)
+                    st = self._states.pop(acc, None)
+                    if st is not None and st.subscription is not None:
+                        dropped.append(st.subscription)
 
             # Clean up finished threads and compute current concurrency.
             running = 0
@@ -322,6 +424,9 @@ class ChatRealtimeAutoSyncService:
                 to_start.append(th)
                 running += 1
 
+        for sub in dropped:
+            sub.close()
+
         for th in to_start:
             if self._stop.is_set():
                 break
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import functools
 import hashlib
 import heapq
 import os
 import re
+import sys
 import threading
 import time
 from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from .metrics import record_cache_lookup
 
 
 ExecQuery = Callable[..., list[dict[str, Any]]]
@@ -19,6 +24,7 @@ FetchCursorBatch = Callable[[int, int], tuple[list[dict[str, Any]], bool]]
 CloseCursor = Callable[[int, int], None]
 GetMessages = Callable[..., list[dict[str, Any]]]
 Checkpoint = Callable[[], None]
+_F = TypeVar("_F", bound=Callable[..., Any])
 
 
 class RealtimeMessageReadError(RuntimeError):
@@ -39,6 +45,14 @@ class RealtimeMessageBatch:
     diagnostics: tuple[str, ...] = ()
 
 
+@dataclass(frozen=True)
+class RealtimeTableProbe:
+    db_path: Path
+    table_name: str
+    # Only rows with local_id above this watermark are returned.
+    since_local_id: int = 0
+
+
 @dataclass(frozen=True)
 class _MessageTableResolutionCacheEntry:
     candidate_signature: tuple[str, ...]
@@ -50,6 +64,8 @@ _MESSAGE_TABLE_CACHE_LIMIT = 2048
 _MESSAGE_TABLE_CACHE_TTL_SECONDS = 30.0
 _MESSAGE_TABLE_NEGATIVE_CACHE_TTL_SECONDS = 2.0
 _QUERY_CAPABILITY_CACHE_LIMIT = 2048
+# SQLite caps compound SELECTs at 500 terms by default; stay well below it.
+_BATCH_TABLES_PER_STATEMENT = 64
 _reader_cache_lock = threading.RLock()
 _message_table_cache: OrderedDict[
     tuple[str, str, str], _MessageTableResolutionCacheEntry
@@ -62,6 +78,8 @@ def _normalized_path_key(path: Path | str) -> str:
 
 
 def _connection_cache_id(rt_conn: Any) -> str:
+    if isinstance(rt_conn, _LeasedReadConnection):
+        rt_conn = rt_conn.primary
     handle = getattr(rt_conn, "handle", None)
     return str(handle) if handle is not None else f"object:{id(rt_conn)}"
 
@@ -88,6 +106,7 @@ def _get_cached_message_tables(
     with _reader_cache_lock:
         entry = _message_table_cache.pop(key, None)
         if entry is None:
+            record_cache_lookup("realtime_message_tables", False)
             return None
         ttl = (
             _MESSAGE_TABLE_CACHE_TTL_SECONDS
@@ -95,8 +114,10 @@ def _get_cached_message_tables(
             else _MESSAGE_TABLE_NEGATIVE_CACHE_TTL_SECONDS
         )
         if entry.candidate_signature != signature or now - entry.cached_at > ttl:
+            record_cache_lookup("realtime_message_tables", False)
             return None
         _message_table_cache[key] = entry
+    record_cache_lookup("realtime_message_tables", True)
     return [(Path(path), table) for path, table in entry.resolved]
 
 
@@ -197,6 +218,79 @@ def _locked_call(rt_conn: Any, func: Callable[..., Any], *args: Any, **kwargs: A
         return func(*args, **kwargs)
 
 
+class _LeasedReadConnection:
+    """A realtime connection viewed through an exclusively leased read handle.
+
+    ``handle`` is the leased handle and ``lock`` is None, so ``_locked_call`` runs
+    without contending for the connection's sync-lane lock. Everything else is
+    read from the underlying connection.
+    """
+
+    __slots__ = ("primary", "handle")
+    lock = None
+
+    def __init__(self, primary: Any, handle: int) -> None:
+        self.primary = primary
+        self.handle = handle
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.primary, name)
+
+
+_bulk_read_state = threading.local()
+
+
+@contextmanager
+def realtime_bulk_reads() -> Iterator[None]:
+    """Keep reads on this thread in the connection's sync lane.
+
+    Bulk work (full-conversation reads, exports, syncs) should not occupy the
+    pooled read handles that interactive views depend on.
+    """
+
+    depth = int(getattr(_bulk_read_state, "depth", 0) or 0)
+    _bulk_read_state.depth = depth + 1
+    try:
+        yield
+    finally:
+        _bulk_read_state.depth = depth
+
+
+def _read_handle_pool(rt_conn: Any) -> Any:
+    # Only a real pool can hand out native handles; test doubles and plain
+    # namespaces keep using the connection's own handle. A pool can only exist
+    # once wcdb_realtime is loaded, so avoid importing it here.
+    module = sys.modules.get(f"{__package__}.wcdb_realtime")
+    pool_type = getattr(module, "WCDBReadHandlePool", None)
+    readers = getattr(rt_conn, "readers", None)
+    if pool_type is None or not isinstance(readers, pool_type):
+        return None
+    return readers
+
+
+@contextmanager
+def _interactive_read_lane(rt_conn: Any) -> Iterator[Any]:
+    readers = None
+    if not isinstance(rt_conn, _LeasedReadConnection) and not getattr(_bulk_read_state, "depth", 0):
+        readers = _read_handle_pool(rt_conn)
+    if readers is None:
+        yield rt_conn
+        return
+    with readers.lease() as handle:
+        yield rt_conn if handle is None else _LeasedReadConnection(rt_conn, handle)
+
+
+def _interactive_read(func: _F) -> _F:
+    """Run ``func`` on a pooled read handle instead of the shared sync lane when possible."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, rt_conn: Any, **kwargs: Any) -> Any:
+        with _interactive_read_lane(rt_conn) as lane_conn:
+            return func(*args, rt_conn=lane_conn, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
 def _message_db_paths(db_storage_dir: Optional[Path], username: str) -> list[Path]:
     if db_storage_dir is None:
         return []
@@ -416,8 +510,10 @@ def _query_first_supported(
     db_path: Path,
     statements: tuple[str, ...],
     exec_query: ExecQuery,
+    capability_key: Optional[tuple[str, str, str]] = None,
 ) -> list[dict[str, Any]]:
-    capability_key = _query_capability_key(rt_conn, db_path, statements)
+    if capability_key is None:
+        capability_key = _query_capability_key(rt_conn, db_path, statements)
     with _reader_cache_lock:
         preferred = _query_capability_cache.pop(capability_key, None)
         if preferred is not None:
@@ -457,6 +553,7 @@ def _query_first_supported(
     raise RealtimeMessageReadError(f"Cannot query realtime table {db_path.name}: {last_error or 'unknown error'}")
 
 
+@_interactive_read
 def count_realtime_message_rows_via_exec(
     *,
     rt_conn: Any,
@@ -507,6 +604,7 @@ def count_realtime_message_rows_via_exec(
     return total
 
 
+@_interactive_read
 def fetch_anchor_via_exec(
     *,
     rt_conn: Any,
@@ -607,6 +705,7 @@ def fetch_anchor_via_exec(
     )
 
 
+@_interactive_read
 def fetch_context_via_exec(
     *,
     rt_conn: Any,
@@ -836,6 +935,7 @@ def fetch_context_via_exec(
     )
 
 
+@_interactive_read
 def fetch_rows_via_exec(
     *,
     rt_conn: Any,
@@ -954,6 +1054,101 @@ def fetch_rows_via_exec(
     )
 
 
+def _select_since_arm(table_name: str, since_local_id: int, limit: int, *, packed: bool, source: bool) -> str:
+    table = _quote_ident(table_name)
+    return (
+        "SELECT * FROM (SELECT "
+        + _sql_literal(table_name)
+        + " AS __table, m.local_id, m.server_id, m.local_type, m.sort_seq, m.real_sender_id, "
+        "m.create_time, m.message_content, m.compress_content, "
+        + ("m.packed_info_data" if packed else "NULL")
+        + " AS packed_info_data, "
+        + ("m.source" if source else "NULL")
+        + " AS msg_source, n.user_name AS sender_username "
+        f"FROM {table} m LEFT JOIN Name2Id n ON m.real_sender_id = n.rowid "
+        f"WHERE m.local_id > {int(since_local_id)} ORDER BY m.local_id DESC LIMIT {int(limit)})"
+    )
+
+
+def _select_since_union_candidates(probes: list[RealtimeTableProbe], limit: int) -> tuple[str, ...]:
+    return tuple(
+        " UNION ALL ".join(
+            _select_since_arm(probe.table_name, probe.since_local_id, limit, packed=packed, source=source)
+            for probe in probes
+        )
+        for packed, source in ((True, True), (True, False), (False, True), (False, False))
+    )
+
+
+def fetch_new_rows_batched_via_exec(
+    *,
+    rt_conn: Any,
+    probes: list[RealtimeTableProbe],
+    limit: int,
+    exec_query: ExecQuery,
+    normalize_item: NormalizeItem,
+    tables_per_statement: int = _BATCH_TABLES_PER_STATEMENT,
+) -> dict[tuple[str, str], list[dict[str, Any]]]:
+    """Fetch the newest rows above each probe's watermark with one native call per shard.
+
+    Probes are grouped by database and sent as UNION ALL statements of up to
+    `tables_per_statement` tables; rows are split back per `(str(db_path), table_name)`,
+    newest `local_id` first and at most `limit` per table. A statement that fails is
+    retried table by table, and tables that still fail are left out of the result so
+    callers can fall back to their per-table path.
+    """
+
+    limit = int(limit)
+    out: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    if limit <= 0 or not probes:
+        return out
+
+    by_db: dict[str, list[RealtimeTableProbe]] = {}
+    for probe in probes:
+        by_db.setdefault(_normalized_path_key(probe.db_path), []).append(probe)
+
+    step = max(1, int(tables_per_statement))
+    for db_key, db_probes in by_db.items():
+        db_path = db_probes[0].db_path
+        pending = [db_probes[i : i + step] for i in range(0, len(db_probes), step)]
+        while pending:
+            chunk = pending.pop(0)
+            try:
+                raw_rows = _query_first_supported(
+                    rt_conn=rt_conn,
+                    db_path=db_path,
+                    statements=_select_since_union_candidates(chunk, limit),
+                    exec_query=exec_query,
+                    capability_key=(_connection_cache_id(rt_conn), db_key, "*batch*"),
+                )
+            except RealtimeMessageReadError:
+                if len(chunk) > 1:
+                    # One missing table or column fails the whole UNION; isolate it.
+                    pending[:0] = [[probe] for probe in chunk]
+                continue
+
+            tables = {probe.table_name.lower(): probe.table_name for probe in chunk}
+            for table_name in tables.values():
+                out[(str(db_path), table_name)] = []
+            for raw in raw_rows:
+                if not isinstance(raw, dict):
+                    continue
+                table_name = tables.get(str(_pick(raw, "__table") or "").lower())
+                if table_name is None:
+                    continue
+                item = normalize_item(raw)
+                if not isinstance(item, dict):
+                    continue
+                item["_db_path"] = str(db_path)
+                item["db_name"] = db_path.name
+                item["table_name"] = table_name
+                out[(str(db_path), table_name)].append(item)
+
+    for rows in out.values():
+        rows.sort(key=lambda row: _to_int(_pick(row, "local_id", "localId")), reverse=True)
+    return out
+
+
 def _run_checkpoint(checkpoint: Optional[Checkpoint]) -> None:
     if checkpoint is not None:
         checkpoint()
@@ -1175,6 +1370,7 @@ def fetch_all_rows_via_exec_paged(
     )
 
 
+@_interactive_read
 def fetch_rows_via_cursor(
     *,
     rt_conn: Any,
@@ -1422,6 +1618,42 @@ def read_all_realtime_message_rows(
     end_time: Optional[int] = None,
     local_types: Optional[set[int]] = None,
     initial_take: int = 1000,
+) -> RealtimeMessageBatch:
+    with realtime_bulk_reads():
+        return _read_all_realtime_message_rows(
+            rt_conn=rt_conn,
+            account_dir=account_dir,
+            username=username,
+            db_storage_dir=db_storage_dir,
+            exec_query=exec_query,
+            open_cursor=open_cursor,
+            fetch_batch=fetch_batch,
+            close_cursor=close_cursor,
+            get_messages=get_messages,
+            normalize_item=normalize_item,
+            start_time=start_time,
+            end_time=end_time,
+            local_types=local_types,
+            initial_take=initial_take,
+        )
+
+
+def _read_all_realtime_message_rows(
+    *,
+    rt_conn: Any,
+    account_dir: Path,
+    username: str,
+    db_storage_dir: Optional[Path],
+    exec_query: ExecQuery,
+    open_cursor: OpenCursor,
+    fetch_batch: FetchCursorBatch,
+    close_cursor: CloseCursor,
+    get_messages: GetMessages,
+    normalize_item: NormalizeItem,
+    start_time: Optional[int],
+    end_time: Optional[int],
+    local_types: Optional[set[int]],
+    initial_take: int,
 ) -> RealtimeMessageBatch:
     diagnostics: list[str] = []
     exec_empty: Optional[RealtimeMessageBatch] = None
@@ -8,6 +8,8 @@ _INDEX_DATABASE_NAMES = frozenset(
     {
         "chat_search_index.db",
         "chat_search_index.tmp.db",
+        "favorite_index.db",
+        "general_records_index.db",
     }
 )
 _INDEX_DATABASE_SUFFIXES = ("_fts.db",)
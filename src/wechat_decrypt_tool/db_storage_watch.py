@@ -0,0 +1,322 @@
+"""Shared, event-driven change feed for WeChat `db_storage` directories.
+
+Several features need to know when WeChat writes to its databases: the realtime
+SSE stream, the decrypted-snapshot autosync and friends. Walking the whole
+`db_storage` tree every few hundred milliseconds costs CPU and disk wakeups that
+grow with the number of files, so instead one watcher per directory turns OS file
+notifications (inotify / FSEvents / ReadDirectoryChangesW via `watchfiles`) into
+per-file change events and fans them out to every in-process subscriber.
+
+When native notifications are unavailable the watcher falls back to polling, and
+if that also fails the subscription reports `available == False` so callers can
+keep their own mtime scan as a last resort.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from watchfiles import watch
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Top-level db_storage buckets that hold databases we care about.
+WATCH_BUCKETS = frozenset({"message", "session", "contact", "head_image", "bizchat", "sns", "general", "favorite"})
+CHAT_BUCKETS = frozenset({"message", "session"})
+_SCOPE_NAME_TOKENS = {
+    "all": ("message", "session", "contact", "name2id", "head_image", "general", "favorite", "sns"),
+    # Databases the decrypted-snapshot autosync copies from.
+    "sync": ("message", "session", "contact", "name2id", "head_image"),
+}
+_DB_SUFFIXES = (".db", ".db-wal", ".db-shm")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = str(os.environ.get(name, "") or "").strip().lower()
+    if not raw:
+        return default
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _env_int(name: str, default: int, *, min_v: int, max_v: int) -> int:
+    raw = str(os.environ.get(name, "") or "").strip()
+    try:
+        value = int(raw)
+    except Exception:
+        value = int(default)
+    return max(int(min_v), min(int(max_v), value))
+
+
+def _normalize_root_key(path: Path) -> str:
+    try:
+        value = str(Path(path).resolve())
+    except Exception:
+        value = str(Path(path))
+    return os.path.normcase(value)
+
+
+@dataclass(frozen=True)
+class DbStorageChange:
+    path: str
+    # First directory below db_storage, lower-cased ("" for files directly in it).
+    bucket: str
+    # Lower-cased file name.
+    name: str
+    # "added" | "modified" | "deleted"
+    kind: str
+    # File mtime when the event was observed; 0 when deleted or unreadable.
+    mtime_ns: int
+
+    @property
+    def is_shm(self) -> bool:
+        return self.name.endswith(".db-shm")
+
+
+def change_in_scope(change: DbStorageChange, scope: str = "all") -> bool:
+    """Match the file selection of the realtime change scans for `scope` ("chat", "sync" or "all").
+
+    SHM files are never included: WeChat (and this app) touch them on plain reads,
+    so they would turn every refresh into another change event.
+    """
+
+    if change.is_shm or not change.name.endswith(_DB_SUFFIXES):
+        return False
+    scope_norm = str(scope or "").strip().lower()
+    if scope_norm == "chat":
+        return change.bucket in CHAT_BUCKETS
+    if change.bucket and change.bucket not in WATCH_BUCKETS:
+        return False
+    tokens = _SCOPE_NAME_TOKENS.get(scope_norm, _SCOPE_NAME_TOKENS["all"])
+    return any(token in change.name for token in tokens)
+
+
+def _relative_bucket(root: str, path: str) -> str:
+    try:
+        rel = os.path.relpath(path, root)
+    except ValueError:
+        return ""
+    parts = Path(rel).parts
+    if len(parts) <= 1 or parts[0] == os.pardir:
+        return ""
+    return str(parts[0]).lower()
+
+
+def _is_watched_path(root: str, path: str) -> bool:
+    name = os.path.basename(path).lower()
+    if not name.endswith(_DB_SUFFIXES):
+        return False
+    bucket = _relative_bucket(root, path)
+    return bucket == "" or bucket in WATCH_BUCKETS
+
+
+def _change_kind(change: Any) -> str:
+    name = str(getattr(change, "name", "") or change or "").strip().lower()
+    return name if name in {"added", "modified", "deleted"} else "modified"
+
+
+def _to_changes(root: str, raw_changes: Any) -> list[DbStorageChange]:
+    out: list[DbStorageChange] = []
+    for change, path in raw_changes or ():
+        path = str(path)
+        if not _is_watched_path(root, path):
+            continue
+        kind = _change_kind(change)
+        mtime_ns = 0
+        if kind != "deleted":
+            try:
+                mtime_ns = int(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtime_ns = 0
+        out.append(
+            DbStorageChange(
+                path=path,
+                bucket=_relative_bucket(root, path),
+                name=os.path.basename(path).lower(),
+                kind=kind,
+                mtime_ns=mtime_ns,
+            )
+        )
+    return out
+
+
+ChangeCallback = Callable[[list[DbStorageChange]], None]
+
+
+@dataclass
+class _RootWatch:
+    key: str
+    path: Path
+    subscribers: dict[int, ChangeCallback] = field(default_factory=dict)
+    stop: threading.Event = field(default_factory=threading.Event)
+    thread: Optional[threading.Thread] = None
+    mode: str = "starting"
+    error: str = ""
+    events: int = 0
+
+
+class DbStorageSubscription:
+    """Handle returned by `DbStorageWatchBus.subscribe`; close it to stop receiving events."""
+
+    def __init__(self, bus: "DbStorageWatchBus", root: _RootWatch, token: int) -> None:
+        self._bus = bus
+        self._root = root
+        self._token = token
+        self._closed = False
+
+    @property
+    def mode(self) -> str:
+        return self._root.mode
+
+    @property
+    def available(self) -> bool:
+        return not self._closed and self._root.mode != "unavailable"
+
+    def watches(self, db_storage_dir: Path) -> bool:
+        return self._root.key == _normalize_root_key(Path(db_storage_dir))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._bus._unsubscribe(self._root, self._token)
+
+
+class DbStorageWatchBus:
+    """One watcher thread per watched directory, shared by all in-process subscribers."""
+
+    def __init__(self) -> None:
+        self._mu = threading.Lock()
+        self._roots: dict[str, _RootWatch] = {}
+        self._tokens = itertools.count(1)
+        self._native = _env_bool("WECHAT_TOOL_DB_STORAGE_WATCH_NATIVE", True)
+        self._debounce_ms = _env_int("WECHAT_TOOL_DB_STORAGE_WATCH_DEBOUNCE_MS", 150, min_v=10, max_v=5000)
+        self._poll_ms = _env_int("WECHAT_TOOL_DB_STORAGE_WATCH_POLL_MS", 500, min_v=100, max_v=10_000)
+
+    def subscribe(self, db_storage_dir: Path, callback: ChangeCallback) -> DbStorageSubscription:
+        path = Path(db_storage_dir)
+        key = _normalize_root_key(path)
+        start: Optional[threading.Thread] = None
+        with self._mu:
+            root = self._roots.get(key)
+            if root is None:
+                root = _RootWatch(key=key, path=path)
+                self._roots[key] = root
+            token = next(self._tokens)
+            root.subscribers[token] = callback
+            if root.thread is None:
+                start = threading.Thread(
+                    target=self._watch_root,
+                    args=(root,),
+                    name=f"db-storage-watch-{len(self._roots)}",
+                    daemon=True,
+                )
+                root.thread = start
+        if start is not None:
+            try:
+                start.start()
+            except Exception as exc:
+                with self._mu:
+                    root.thread = None
+                    root.mode = "unavailable"
+                    root.error = str(exc) or exc.__class__.__name__
+        return DbStorageSubscription(self, root, token)
+
+    def _unsubscribe(self, root: _RootWatch, token: int) -> None:
+        with self._mu:
+            root.subscribers.pop(token, None)
+            if root.subscribers:
+                return
+            if self._roots.get(root.key) is root:
+                self._roots.pop(root.key, None)
+            root.stop.set()
+
+    def status(self) -> list[dict[str, Any]]:
+        with self._mu:
+            return [
+                {
+                    "path": str(root.path),
+                    "mode": root.mode,
+                    "error": root.error,
+                    "subscribers": len(root.subscribers),
+                    "events": int(root.events),
+                }
+                for root in self._roots.values()
+            ]
+
+    def stop_all(self, *, timeout: float = 5.0) -> None:
+        with self._mu:
+            roots = list(self._roots.values())
+            self._roots.clear()
+        for root in roots:
+            root.stop.set()
+        for root in roots:
+            thread = root.thread
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=max(0.0, float(timeout)))
+
+    def _publish(self, root: _RootWatch, changes: list[DbStorageChange]) -> None:
+        with self._mu:
+            root.events += len(changes)
+            callbacks = list(root.subscribers.values())
+        for callback in callbacks:
+            try:
+                callback(list(changes))
+            except Exception:
+                logger.exception("[db-storage-watch] subscriber failed path=%s", root.path)
+
+    def _watch_root(self, root: _RootWatch) -> None:
+        base = str(root.path)
+        modes = (False, True) if self._native else (True,)
+        for force_polling in modes:
+            if root.stop.is_set():
+                return
+            root.mode = "polling" if force_polling else "native"
+            started = time.monotonic()
+            try:
+                for raw in watch(
+                    base,
+                    watch_filter=lambda _change, path: _is_watched_path(base, path),
+                    debounce=int(self._debounce_ms),
+                    step=min(50, int(self._debounce_ms)),
+                    stop_event=root.stop,
+                    recursive=True,
+                    force_polling=force_polling,
+                    poll_delay_ms=int(self._poll_ms),
+                    yield_on_timeout=False,
+                    raise_interrupt=False,
+                ):
+                    if root.stop.is_set():
+                        return
+                    changes = _to_changes(base, raw)
+                    if changes:
+                        self._publish(root, changes)
+                if root.stop.is_set():
+                    return
+                root.error = "watcher ended unexpectedly"
+            except Exception as exc:
+                if root.stop.is_set():
+                    return
+                root.error = str(exc) or exc.__class__.__name__
+            logger.warning(
+                "[db-storage-watch] %s watcher stopped path=%s after=%.1fs error=%s",
+                root.mode,
+                base,
+                time.monotonic() - started,
+                root.error,
+            )
+        root.mode = "unavailable"
+        with self._mu:
+            if root.thread is threading.current_thread():
+                root.thread = None
+
+
+DB_STORAGE_WATCH = DbStorageWatchBus()
@@ -16,8 +16,12 @@ import stat
 import subprocess
 import sys
 import time
+from collections import deque
 from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
 from typing import Protocol
 
@@ -49,6 +53,9 @@ MEMORY_CHUNK_SIZE = 4 * 1024 * 1024
 # 68 bytes retain both boundaries around a 32-character UTF-16LE run.
 MEMORY_CHUNK_OVERLAP = 68
 MAX_USER_ADDRESS = 0x7FFF_FFFF_FFFF
+# Below this much writable memory a process pool costs more than it saves.
+_PARALLEL_MIN_SCAN_BYTES = 64 * 1024 * 1024
+_VERIFY_BATCH_SIZE = 64
 
 _WRITABLE_PROTECTIONS = frozenset(
     (
@@ -79,6 +86,13 @@ class ProcessMemoryKeyMatch:
     encoding: str
 
 
+@dataclass(frozen=True, slots=True)
+class _MemoryChunk:
+    data: bytes
+    allow_start_boundary: bool
+    allow_end_boundary: bool
+
+
 @dataclass(frozen=True, slots=True)
 class MemoryImageKeyResolution:
     pid: int
@@ -366,6 +380,242 @@ def find_verified_aes_key_in_chunk(
     return None
 
 
+def _iter_region_chunks(
+    api: _MemoryApi,
+    handle: object,
+    regions: tuple[MemoryRegion, ...],
+    *,
+    pid: int,
+    progress: ProgressCallback | None,
+    deadline: float | None,
+    clock: Callable[[], float],
+) -> Iterator[_MemoryChunk]:
+    """Read regions sequentially as overlapping chunks; stop silently at the deadline."""
+    for region_index, region in enumerate(regions):
+        if _deadline_reached(deadline, clock):
+            return
+        if region_index % 20 == 0:
+            _notify(progress, f"PID {pid}: region {region_index}/{len(regions)}")
+
+        offset = 0
+        trailing = b""
+        while offset < region.size:
+            if _deadline_reached(deadline, clock):
+                return
+            request_size = min(MEMORY_CHUNK_SIZE, region.size - offset)
+            try:
+                chunk = api.read_memory(
+                    handle,
+                    region.base_address + offset,
+                    request_size,
+                )
+            except Exception:
+                chunk = b""
+
+            if not chunk:
+                trailing = b""
+                offset += request_size
+                continue
+
+            chunk = bytes(chunk[:request_size])
+            if _deadline_reached(deadline, clock):
+                return
+            data = trailing + chunk
+            full_read = len(chunk) == request_size
+            yield _MemoryChunk(
+                data=data,
+                allow_start_boundary=(offset == 0),
+                allow_end_boundary=(full_read and offset + request_size >= region.size),
+            )
+
+            if full_read:
+                trailing = data[-MEMORY_CHUNK_OVERLAP:]
+            else:
+                # A partial read leaves an unknown gap before the next chunk.
+                trailing = b""
+            offset += request_size
+
+
+def _scan_workers(workers: int | None, total_size: int) -> int:
+    if workers is None:
+        raw = str(os.environ.get("WECHAT_TOOL_IMAGE_KEY_WORKERS", "") or "").strip()
+        try:
+            workers = int(raw) if raw else min(8, os.cpu_count() or 1)
+        except ValueError:
+            workers = min(8, os.cpu_count() or 1)
+        if total_size < _PARALLEL_MIN_SCAN_BYTES:
+            workers = 1
+    chunks = max(1, -(-int(total_size) // MEMORY_CHUNK_SIZE))
+    return max(1, min(int(workers), chunks))
+
+
+def _scan_chunks_serial(
+    chunks: Iterable[_MemoryChunk],
+    template_scan: TemplateScanResult,
+    seen: set[str],
+) -> ProcessMemoryKeyMatch | None:
+    template = current_v2_template(template_scan)
+    if template is None:
+        return None
+    for chunk in chunks:
+        for aes_key, encoding in iter_memory_aes_candidates(
+            chunk.data,
+            allow_start_boundary=chunk.allow_start_boundary,
+            allow_end_boundary=chunk.allow_end_boundary,
+        ):
+            if aes_key in seen:
+                continue
+            seen.add(aes_key)
+            if trusted_xor_for_verified_aes_key(aes_key, template_scan) is not None:
+                return ProcessMemoryKeyMatch(aes_key=aes_key, template_path=template.path, encoding=encoding)
+    return None
+
+
+_WORKER_TEMPLATE_SCAN: TemplateScanResult | None = None
+
+
+def _init_scan_worker(template_scan: TemplateScanResult) -> None:
+    # Process pool initializer: ship the templates once instead of with every batch.
+    global _WORKER_TEMPLATE_SCAN
+    _WORKER_TEMPLATE_SCAN = template_scan
+
+
+def _extract_chunk_candidates(chunk: _MemoryChunk) -> tuple[tuple[str, str], ...]:
+    # Top-level so ProcessPoolExecutor workers can pickle it.
+    return tuple(
+        iter_memory_aes_candidates(
+            chunk.data,
+            allow_start_boundary=chunk.allow_start_boundary,
+            allow_end_boundary=chunk.allow_end_boundary,
+        )
+    )
+
+
+def _first_verified_candidate(batch: tuple[tuple[str, str], ...]) -> tuple[str, str] | None:
+    # Top-level so ProcessPoolExecutor workers can pickle it.
+    template_scan = _WORKER_TEMPLATE_SCAN
+    if template_scan is None:
+        return None
+    for aes_key, encoding in batch:
+        if trusted_xor_for_verified_aes_key(aes_key, template_scan) is not None:
+            return aes_key, encoding
+    return None
+
+
+class _ParallelChunkScanner:
+    """Extract candidates from chunks and verify unseen ones on one process pool.
+
+    Both stages keep at most ``2 * workers`` futures in flight, so memory stays
+    bounded while the reader runs ahead. Results are consumed in submission
+    order, which makes the returned key identical to a serial scan.
+    """
+
+    def __init__(self, executor: ProcessPoolExecutor, seen: set[str], worker_count: int) -> None:
+        self._executor = executor
+        self._seen = seen
+        self._max_pending = max(2, int(worker_count) * 2)
+        self._extracting: deque[tuple[_MemoryChunk, Future]] = deque()
+        self._verifying: deque[tuple[tuple[tuple[str, str], ...], Future]] = deque()
+        self._batch: list[tuple[str, str]] = []
+
+    def submit(self, chunk: _MemoryChunk) -> tuple[str, str] | None:
+        self._extracting.append((chunk, self._executor.submit(_extract_chunk_candidates, chunk)))
+        return self._drain(final=False)
+
+    def finish(self) -> tuple[str, str] | None:
+        return self._drain(final=True)
+
+    def leftover(self) -> tuple[list[_MemoryChunk], list[tuple[str, str]]]:
+        """Return work that has not produced a result yet, for an inline fallback."""
+        chunks = [chunk for chunk, _future in self._extracting]
+        candidates = [candidate for batch, _future in self._verifying for candidate in batch]
+        candidates.extend(self._batch)
+        return chunks, candidates
+
+    def _flush_batch(self) -> tuple[str, str] | None:
+        found = self._collect_verified(limit=self._max_pending - 1)
+        if found is not None:
+            return found
+        batch = tuple(self._batch)
+        self._verifying.append((batch, self._executor.submit(_first_verified_candidate, batch)))
+        self._batch = []
+        return None
+
+    def _collect_verified(self, *, limit: int) -> tuple[str, str] | None:
+        while self._verifying and (len(self._verifying) > limit or self._verifying[0][1].done()):
+            found = self._verifying[0][1].result()
+            self._verifying.popleft()
+            if found is not None:
+                return found
+        return None
+
+    def _drain(self, *, final: bool) -> tuple[str, str] | None:
+        while self._extracting and (
+            final or len(self._extracting) >= self._max_pending or self._extracting[0][1].done()
+        ):
+            candidates = self._extracting[0][1].result()
+            self._extracting.popleft()
+            for candidate in candidates:
+                # 同一密钥常在多个区域/分块中重复出现，只验证一次。
+                if candidate[0] in self._seen:
+                    continue
+                self._seen.add(candidate[0])
+                self._batch.append(candidate)
+                if len(self._batch) >= _VERIFY_BATCH_SIZE:
+                    found = self._flush_batch()
+                    if found is not None:
+                        return found
+        if final and self._batch:
+            found = self._flush_batch()
+            if found is not None:
+                return found
+        return self._collect_verified(limit=0 if final else self._max_pending - 1)
+
+
+def _scan_chunks_parallel(
+    chunks: Iterator[_MemoryChunk],
+    template_scan: TemplateScanResult,
+    seen: set[str],
+    worker_count: int,
+    *,
+    deadline: float | None,
+    clock: Callable[[], float],
+) -> ProcessMemoryKeyMatch | None:
+    template = current_v2_template(template_scan)
+    if template is None:
+        return None
+
+    def _match(found: tuple[str, str] | None) -> ProcessMemoryKeyMatch | None:
+        if found is None:
+            return None
+        return ProcessMemoryKeyMatch(aes_key=found[0], template_path=template.path, encoding=found[1])
+
+    executor = ProcessPoolExecutor(
+        max_workers=worker_count,
+        initializer=_init_scan_worker,
+        initargs=(template_scan,),
+    )
+    scanner = _ParallelChunkScanner(executor, seen, worker_count)
+    try:
+        try:
+            for chunk in chunks:
+                found = scanner.submit(chunk)
+                if found is not None:
+                    return _match(found)
+            if _deadline_reached(deadline, clock):
+                return None
+            return _match(scanner.finish())
+        except (BrokenProcessPool, OSError):
+            # A dead or unavailable pool must not lose the scan: finish inline.
+            pending_chunks, pending_candidates = scanner.leftover()
+            for aes_key, encoding in pending_candidates:
+                if trusted_xor_for_verified_aes_key(aes_key, template_scan) is not None:
+                    return _match((aes_key, encoding))
+            return _scan_chunks_serial(chain(pending_chunks, chunks), template_scan, seen)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def scan_process_for_image_key(
     pid: int,
     template_scan: TemplateScanResult,
@@ -374,8 +624,15 @@ def scan_process_for_image_key(
     memory_api: _MemoryApi | None = None,
     deadline: float | None = None,
     clock: Callable[[], float] | None = None,
+    workers: int | None = None,
 ) -> ProcessMemoryKeyMatch | None:
-    """Scan one process's committed writable regions for a verified AES key."""
+    """Scan one process's committed writable regions for a verified AES key.
+
+    Regions are read in overlapping chunks. Large processes fan candidate
+    extraction and verification out to a process pool
+    (``WECHAT_TOOL_IMAGE_KEY_WORKERS``); keys seen in an earlier chunk or region
+    are never verified twice.
+    """
     if not template_scan.templates:
         return None
     current_template = current_v2_template(template_scan)
@@ -411,61 +668,34 @@ def scan_process_for_image_key(
             clock=clock_fn,
         )
         total_size = sum(region.size for region in regions)
+        worker_count = _scan_workers(workers, total_size)
         _notify(
             progress,
             f"PID {pid}: scanning {len(regions)} writable regions "
-            f"({total_size / 1024 / 1024:.0f} MiB)",
+            f"({total_size / 1024 / 1024:.0f} MiB)"
+            + (f" with {worker_count} workers" if worker_count > 1 else ""),
         )
 
-        for region_index, region in enumerate(regions):
-            if _deadline_reached(deadline, clock_fn):
-                return None
-            if region_index % 20 == 0:
-                _notify(progress, f"PID {pid}: region {region_index}/{len(regions)}")
-
-            offset = 0
-            trailing = b""
-            while offset < region.size:
-                if _deadline_reached(deadline, clock_fn):
-                    return None
-                request_size = min(MEMORY_CHUNK_SIZE, region.size - offset)
-                try:
-                    chunk = api.read_memory(
-                        handle,
-                        region.base_address + offset,
-                        request_size,
-                    )
-                except Exception:
-                    chunk = b""
-
-                if not chunk:
-                    trailing = b""
-                    offset += request_size
-                    continue
-
-                chunk = bytes(chunk[:request_size])
-                if _deadline_reached(deadline, clock_fn):
-                    return None
-                data = trailing + chunk
-                full_read = len(chunk) == request_size
-                match = find_verified_aes_key_in_chunk(
-                    data,
-                    template_scan,
-                    allow_start_boundary=(offset == 0),
-                    allow_end_boundary=(
-                        full_read and offset + request_size >= region.size
-                    ),
-                )
-                if match is not None:
-                    return match
-
-                if full_read:
-                    trailing = data[-MEMORY_CHUNK_OVERLAP:]
-                else:
-                    # A partial read leaves an unknown gap before the next chunk.
-                    trailing = b""
-                offset += request_size
-        return None
+        seen: set[str] = set()
+        chunks = _iter_region_chunks(
+            api,
+            handle,
+            regions,
+            pid=pid,
+            progress=progress,
+            deadline=deadline,
+            clock=clock_fn,
+        )
+        if worker_count > 1:
+            return _scan_chunks_parallel(
+                chunks,
+                template_scan,
+                seen,
+                worker_count,
+                deadline=deadline,
+                clock=clock_fn,
+            )
+        return _scan_chunks_serial(chunks, template_scan, seen)
     finally:
         try:
             api.close_handle(handle)
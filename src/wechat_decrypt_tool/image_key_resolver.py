@@ -11,7 +11,9 @@ import hashlib
 import heapq
 import os
 import re
+import threading
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Sequence
@@ -29,6 +31,14 @@ _SUFFIXED_WXID_RE = re.compile(r"^(wxid_[^_]+)(?:_.+)$", re.IGNORECASE)
 _MAX_CODE = 0xFFFFFFFF
 _MAX_PREFERRED_DIRS = 2_000
 _SKIPPED_FALLBACK_DIR_PARTS = ("thumb", "emoticon")
+# Below this many code/wxid pairs serial verification beats process start-up.
+_PARALLEL_MIN_CANDIDATES = 4_096
+_VERIFY_CHUNK_SIZE = 1_024
+
+_VERIFIED_PAIRS_LOCK = threading.Lock()
+_VERIFIED_PAIRS: dict[str, tuple[int, str]] = {}
+
+
 @dataclass(frozen=True, slots=True)
 class DerivedImageKeys:
     xor_key: int
@@ -444,6 +454,107 @@ def verify_key_pair(
     return verify_aes_key(aes_key, current_template.ciphertext)
 
 
+def _account_cache_key(account_dir: str | os.PathLike[str]) -> str:
+    return os.path.normcase(os.path.abspath(str(account_dir)))
+
+
+def clear_verified_image_key_cache(account_dir: str | os.PathLike[str] | None = None) -> None:
+    """Forget cached verified code/wxid pairs (all accounts when ``account_dir`` is None)."""
+    with _VERIFIED_PAIRS_LOCK:
+        if account_dir is None:
+            _VERIFIED_PAIRS.clear()
+        else:
+            _VERIFIED_PAIRS.pop(_account_cache_key(account_dir), None)
+
+
+def order_image_key_candidates(
+    codes: Iterable[int],
+    wxids: Sequence[str],
+    current_xor_key: int | None = None,
+) -> list[tuple[int, str]]:
+    """Order code/wxid pairs by likelihood.
+
+    Codes whose low byte matches the XOR key of the most recent template come
+    first for every wxid, before any non-matching code is tried; within a tier
+    wxids keep their priority order and codes ascend.
+    """
+    ordered_codes = sorted(set(codes))
+    if current_xor_key is None:
+        tiers = [ordered_codes]
+    else:
+        tiers = [
+            [code for code in ordered_codes if code & 0xFF == current_xor_key],
+            [code for code in ordered_codes if code & 0xFF != current_xor_key],
+        ]
+    cleaned: list[str] = []
+    for wxid in wxids:
+        value = clean_wxid(wxid)
+        if value and value not in cleaned:
+            cleaned.append(value)
+    return [(code, wxid) for tier in tiers for wxid in cleaned for code in tier]
+
+
+def _first_verified_in_chunk(task: tuple[int, tuple[tuple[int, str], ...], bytes]) -> int:
+    start, pairs, ciphertext = task
+    for offset, (code, wxid) in enumerate(pairs):
+        if verify_aes_key(derive_image_keys(code, wxid).aes_key, ciphertext):
+            return start + offset
+    return -1
+
+
+def _verify_workers(workers: int | None, candidate_count: int) -> int:
+    if workers is None:
+        raw = str(os.environ.get("WECHAT_TOOL_IMAGE_KEY_WORKERS", "") or "").strip()
+        try:
+            workers = int(raw) if raw else min(8, os.cpu_count() or 1)
+        except ValueError:
+            workers = min(8, os.cpu_count() or 1)
+        if candidate_count < _PARALLEL_MIN_CANDIDATES:
+            workers = 1
+    chunks = max(1, -(-candidate_count // _VERIFY_CHUNK_SIZE))
+    return max(1, min(int(workers), chunks))
+
+
+def find_first_verified_candidate(
+    candidates: Sequence[tuple[int, str]],
+    ciphertext: bytes,
+    *,
+    workers: int | None = None,
+) -> int:
+    """Return the index of the first pair whose derived AES key decrypts ``ciphertext``, or -1.
+
+    Candidates are split into ordered chunks. With more than one worker the
+    chunks run on a process pool; results are consumed in submission order so
+    the answer is the same as a serial scan, and pending chunks are cancelled as
+    soon as a match is known.
+    """
+    pairs = tuple((int(code), str(wxid)) for code, wxid in candidates)
+    if not pairs:
+        return -1
+    tasks = [
+        (start, pairs[start : start + _VERIFY_CHUNK_SIZE], bytes(ciphertext))
+        for start in range(0, len(pairs), _VERIFY_CHUNK_SIZE)
+    ]
+    worker_count = _verify_workers(workers, len(pairs))
+    if worker_count == 1:
+        for task in tasks:
+            index = _first_verified_in_chunk(task)
+            if index >= 0:
+                return index
+        return -1
+
+    executor = ProcessPoolExecutor(max_workers=worker_count)
+    try:
+        futures = [executor.submit(_first_verified_in_chunk, task) for task in tasks]
+        for future in futures:
+            index = future.result()
+            if index >= 0:
+                return index
+        return -1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def resolve_local_image_key(
     *,
     kvcomm_dir: str | os.PathLike[str],
@@ -454,8 +565,14 @@ def resolve_local_image_key(
     template_scan: TemplateScanResult | None = None,
     template_limit: int = 32,
     max_fallback_dirs: int = 500,
+    workers: int | None = None,
 ) -> ImageKeyResolution | None:
-    """Resolve the first code/wxid pair that passes real V2 AES validation."""
+    """Resolve the first code/wxid pair that passes real V2 AES validation.
+
+    The last verified pair for ``account_dir`` is checked inline first; only on a
+    miss are the remaining candidates verified in likelihood order, fanned out
+    over a process pool when there are enough of them.
+    """
     codes = enumerate_kvcomm_codes(kvcomm_dir)
     if not codes:
         return None
@@ -489,25 +606,39 @@ def resolve_local_image_key(
         if template_data.inferred_xor_key is not None and template_data.xor_support >= 2
         else current_template.tail_xor_key
     )
-    ordered_codes = list(codes)
-    if current_xor_key is not None:
-        ordered_codes.sort(key=lambda code: (code & 0xFF != current_xor_key, code))
-
-    for wxid in wxids:
-        for code in ordered_codes:
-            keys = derive_image_keys(code, wxid)
-            if not verify_aes_key(keys.aes_key, current_template.ciphertext):
-                continue
-            return ImageKeyResolution(
-                code=code,
-                wxid=clean_wxid(wxid),
-                xor_key=keys.xor_key,
-                aes_key=keys.aes_key,
-                verified=True,
-                template_path=current_template.path,
-                inferred_xor_key=current_xor_key,
-            )
-    return None
+    cache_key = _account_cache_key(account_dir)
+    with _VERIFIED_PAIRS_LOCK:
+        cached_pair = _VERIFIED_PAIRS.get(cache_key)
+    if cached_pair is not None and (cached_pair[0] not in codes or cached_pair[1] not in wxids):
+        cached_pair = None
+
+    # 上次验证通过的组合直接在当前进程里校验，命中时不必启动进程池。
+    if cached_pair is not None and verify_aes_key(
+        derive_image_keys(*cached_pair).aes_key, current_template.ciphertext
+    ):
+        code, wxid = cached_pair
+    else:
+        candidates = [
+            pair
+            for pair in order_image_key_candidates(codes, wxids, current_xor_key)
+            if pair != cached_pair
+        ]
+        index = find_first_verified_candidate(candidates, current_template.ciphertext, workers=workers)
+        if index < 0:
+            return None
+        code, wxid = candidates[index]
+    keys = derive_image_keys(code, wxid)
+    with _VERIFIED_PAIRS_LOCK:
+        _VERIFIED_PAIRS[cache_key] = (code, clean_wxid(wxid))
+    return ImageKeyResolution(
+        code=code,
+        wxid=clean_wxid(wxid),
+        xor_key=keys.xor_key,
+        aes_key=keys.aes_key,
+        verified=True,
+        template_path=current_template.path,
+        inferred_xor_key=current_xor_key,
+    )
 
 
 __all__ = [
@@ -518,11 +649,14 @@ __all__ = [
     "V2_MAGIC",
     "V2Template",
     "clean_wxid",
+    "clear_verified_image_key_cache",
     "collect_wxid_candidates",
     "current_v2_template",
     "derive_image_keys",
     "enumerate_kvcomm_codes",
+    "find_first_verified_candidate",
     "infer_xor_key_from_v2_tails",
+    "order_image_key_candidates",
     "resolve_local_image_key",
     "scan_v2_templates",
     "trusted_xor_for_verified_aes_key",
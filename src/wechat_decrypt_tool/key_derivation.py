@@ -0,0 +1,289 @@
+"""SQLCipher 4 page-1 key derivation shared by decryption and key recovery.
+
+Every WeChat 4.x database authenticates page 1 with keys derived from the
+account passphrase and that database's salt: 256000 rounds of
+PBKDF2-HMAC-SHA512 for the AES key, then two rounds for the HMAC key. The
+expensive half is cached per (passphrase, salt) once a page-1 HMAC has
+verified it, in memory and optionally in the encrypted native-core raw-key
+cache next to the key store, so repeated decrypts and key checks skip it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from .metrics import record_cache_lookup
+
+PAGE_SIZE = 4096
+KEY_SIZE = 32
+SALT_SIZE = 16
+IV_SIZE = 16
+HMAC_SIZE = 64
+RESERVE_SIZE = IV_SIZE + HMAC_SIZE
+KDF_ITERATIONS = 256_000
+
+_CACHE_METRIC = "sqlcipher_kdf"
+
+
+def derive_mac_key(enc_key: bytes, salt: bytes) -> bytes:
+    """Derive SQLCipher/WCDB page HMAC key."""
+    mac_salt = bytes(b ^ 0x3A for b in salt)
+    return hashlib.pbkdf2_hmac("sha512", enc_key, mac_salt, 2, dklen=KEY_SIZE)
+
+
+def derive_enc_key(key_material: bytes, salt: bytes) -> bytes:
+    """Derive AES enc_key from SQLCipher passphrase/base key (uncached)."""
+    return hashlib.pbkdf2_hmac("sha512", key_material, salt, KDF_ITERATIONS, dklen=KEY_SIZE)
+
+
+def compute_page_hmac(mac_key: bytes, page: bytes, page_num: int) -> bytes:
+    offset = SALT_SIZE if page_num == 1 else 0
+    data_end = PAGE_SIZE - RESERVE_SIZE + IV_SIZE
+    mac = hmac.new(mac_key, digestmod=hashlib.sha512)
+    mac.update(page[offset:data_end])
+    mac.update(page_num.to_bytes(4, "little"))
+    return mac.digest()
+
+
+def page1_mac_key(enc_key: bytes, page1: bytes) -> bytes | None:
+    """Return the HMAC key when ``enc_key`` authenticates page 1, else None."""
+    if len(page1) < PAGE_SIZE:
+        return None
+    mac_key = derive_mac_key(enc_key, page1[:SALT_SIZE])
+    stored = page1[PAGE_SIZE - HMAC_SIZE : PAGE_SIZE]
+    if hmac.compare_digest(stored, compute_page_hmac(mac_key, page1, 1)):
+        return mac_key
+    return None
+
+
+def _env_int(name: str, default: int, *, minimum: int, maximum: int) -> int:
+    raw = str(os.environ.get(name, "") or "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        value = default
+    return max(minimum, min(maximum, value))
+
+
+class DerivedKeyCache:
+    """Bounded LRU of verified (passphrase, salt) -> enc_key derivations.
+
+    Passphrases are keyed by their SHA-256 so the cache never holds them. Only
+    derivations that authenticated a real page 1 are stored, so a burst of
+    wrong candidates cannot evict the useful entries.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[tuple[bytes, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key_material: bytes, salt: bytes) -> tuple[bytes, bytes]:
+        return hashlib.sha256(bytes(key_material)).digest(), bytes(salt)
+
+    def get(self, key_material: bytes, salt: bytes) -> bytes | None:
+        key = self._key(key_material, salt)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        record_cache_lookup(_CACHE_METRIC, value is not None)
+        return value
+
+    def put(self, key_material: bytes, salt: bytes, enc_key: bytes) -> None:
+        if self._max_entries <= 0:
+            return
+        key = self._key(key_material, salt)
+        with self._lock:
+            self._entries[key] = bytes(enc_key)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+DERIVED_KEY_CACHE = DerivedKeyCache(
+    _env_int("WECHAT_TOOL_KDF_CACHE_ENTRIES", 256, minimum=0, maximum=4096)
+)
+
+
+def _load_persisted_enc_key(
+    database_root: Path,
+    key_material: bytes,
+    database_path: Path,
+    salt: bytes,
+) -> bytes | None:
+    try:
+        from .native_core_raw_key_cache import database_cache_key, load_cached_raw_keys
+
+        entries = load_cached_raw_keys(database_root, key_material, [database_path])
+    except Exception:
+        return None
+    found: bytes | None = None
+    for cache_key, entry in entries.items():
+        if found is None and cache_key == database_cache_key(database_path) and entry.salt == salt:
+            found = bytes(entry.key)
+        entry.key[:] = b"\0" * len(entry.key)
+    return found
+
+
+def _persist_enc_key(
+    database_root: Path,
+    key_material: bytes,
+    database_path: Path,
+    salt: bytes,
+    enc_key: bytes,
+) -> None:
+    try:
+        from .native_core_raw_key_cache import merge_cached_raw_keys
+
+        merge_cached_raw_keys(database_root, key_material, {Path(database_path): (salt, enc_key)})
+    except Exception:
+        # 缓存写入失败只影响下次的速度，不影响本次解密。
+        pass
+
+
+def resolve_page1_key_material(
+    key_material: bytes,
+    page1: bytes,
+    *,
+    database_root: str | os.PathLike[str] | None = None,
+    database_path: str | os.PathLike[str] | None = None,
+) -> tuple[bytes, bytes, str] | None:
+    """Detect whether input key is raw enc_key or SQLCipher passphrase by page-1 HMAC.
+
+    Returns ``(enc_key, mac_key, mode)``. Passphrase derivations come from the
+    in-memory cache, then from the persisted raw-key cache when
+    ``database_root``/``database_path`` are given, and are derived last.
+    """
+    if len(page1) < PAGE_SIZE:
+        return None
+    key_material = bytes(key_material)
+    salt = bytes(page1[:SALT_SIZE])
+
+    mac_key = page1_mac_key(key_material, page1)
+    if mac_key is not None:
+        return key_material, mac_key, "raw_enc_key"
+
+    root = Path(database_root) if database_root else None
+    path = Path(database_path) if database_path else None
+    persisted = False
+    enc_key = DERIVED_KEY_CACHE.get(key_material, salt)
+    if enc_key is None and root is not None and path is not None:
+        enc_key = _load_persisted_enc_key(root, key_material, path, salt)
+        persisted = enc_key is not None
+    if enc_key is not None:
+        mac_key = page1_mac_key(enc_key, page1)
+        if mac_key is not None:
+            DERIVED_KEY_CACHE.put(key_material, salt, enc_key)
+            return enc_key, mac_key, "sqlcipher_passphrase"
+
+    enc_key = derive_enc_key(key_material, salt)
+    mac_key = page1_mac_key(enc_key, page1)
+    if mac_key is None:
+        return None
+    DERIVED_KEY_CACHE.put(key_material, salt, enc_key)
+    if root is not None and path is not None and not persisted:
+        _persist_enc_key(root, key_material, path, salt, enc_key)
+    return enc_key, mac_key, "sqlcipher_passphrase"
+
+
+def _verify_workers(workers: int | None, candidate_count: int) -> int:
+    if workers is None:
+        workers = _env_int("WECHAT_TOOL_KDF_WORKERS", min(8, os.cpu_count() or 1), minimum=1, maximum=64)
+    return max(1, min(int(workers), int(candidate_count)))
+
+
+def find_page1_passphrase(
+    candidates: Sequence[bytes],
+    page1: bytes,
+    *,
+    transform: Callable[[bytes], bytes] | None = None,
+    workers: int | None = None,
+) -> int:
+    """Return the index of the first candidate passphrase that authenticates page 1, or -1.
+
+    ``transform`` maps a raw candidate to the passphrase actually fed to
+    PBKDF2 (key_v4 XORs in the DLL's internal key). ``hashlib.pbkdf2_hmac``
+    releases the GIL, so candidates run on a thread pool
+    (``WECHAT_TOOL_KDF_WORKERS``) with at most ``workers`` derivations in
+    flight; results are read in candidate order and nothing new is started
+    once a match is known.
+    """
+    if len(page1) < PAGE_SIZE or not candidates:
+        return -1
+    salt = bytes(page1[:SALT_SIZE])
+    found = threading.Event()
+
+    def check(candidate: bytes) -> bool:
+        if found.is_set():
+            return False
+        passphrase = bytes(transform(candidate) if transform is not None else candidate)
+        cached = DERIVED_KEY_CACHE.get(passphrase, salt)
+        if cached is not None and page1_mac_key(cached, page1) is not None:
+            return True
+        enc_key = derive_enc_key(passphrase, salt)
+        if page1_mac_key(enc_key, page1) is None:
+            return False
+        DERIVED_KEY_CACHE.put(passphrase, salt, enc_key)
+        return True
+
+    worker_count = _verify_workers(workers, len(candidates))
+    if worker_count == 1:
+        for index, candidate in enumerate(candidates):
+            if check(candidate):
+                return index
+        return -1
+
+    executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="wechatdb-kdf")
+    try:
+        pending: list[tuple[int, Future]] = []
+        next_index = 0
+        while pending or next_index < len(candidates):
+            while next_index < len(candidates) and len(pending) < worker_count * 2 and not found.is_set():
+                pending.append((next_index, executor.submit(check, candidates[next_index])))
+                next_index += 1
+            if not pending:
+                break
+            index, future = pending.pop(0)
+            if future.result():
+                found.set()
+                return index
+        return -1
+    finally:
+        found.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+__all__ = [
+    "DERIVED_KEY_CACHE",
+    "DerivedKeyCache",
+    "HMAC_SIZE",
+    "IV_SIZE",
+    "KDF_ITERATIONS",
+    "KEY_SIZE",
+    "PAGE_SIZE",
+    "RESERVE_SIZE",
+    "SALT_SIZE",
+    "compute_page_hmac",
+    "derive_enc_key",
+    "derive_mac_key",
+    "find_page1_passphrase",
+    "page1_mac_key",
+    "resolve_page1_key_material",
+]
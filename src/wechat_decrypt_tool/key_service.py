@@ -493,11 +493,6 @@ def _get_db_key_with_v4(
     used_internal_db_key_source = ""
 
     def _try_recover(candidate_internal_db_key: bytes, source: str) -> str:
-        if hasattr(key_v4_module, "finish_flag"):
-            try:
-                key_v4_module.finish_flag = False
-            except Exception:
-                pass
         if candidate_internal_db_key:
             current_raw_key = key_v4_module.recover_key(pid, str(probe_db_path), candidate_internal_db_key)
         else:
@@ -137,6 +137,15 @@ def load_account_keys_store() -> dict[str, Any]:
             return {}
 
 
+def key_store_file_signature() -> tuple[int, ...]:
+    """(mtime_ns, size, inode) of the key store; writes go through os.replace, so every save changes it."""
+    try:
+        st = _KEY_STORE_PATH.stat()
+    except OSError:
+        return ()
+    return (int(st.st_mtime_ns), int(st.st_size), int(st.st_ino))
+
+
 def get_account_keys_from_store(account: str) -> dict[str, Any]:
     store = load_account_keys_store()
     v = store.get(account, {})
@@ -1,14 +1,12 @@
 import ctypes
 import multiprocessing
 import struct
-import hmac
 import os
 from ctypes import wintypes
 from multiprocessing import freeze_support
 import sys
 
-from Crypto.Protocol.KDF import PBKDF2
-from Crypto.Hash import SHA512
+from .key_derivation import find_page1_passphrase
 
 try:
     import pymem
@@ -29,10 +27,7 @@ MEM_PRIVATE = 0x20000
 # Stream cipher constants
 IV_SIZE = 16
 HMAC_SHA256_SIZE = 64
-HMAC_SHA512_SIZE = 64
 KEY_SIZE = 32
-AES_BLOCK_SIZE = 16
-ROUND_COUNT = 256000
 PAGE_SIZE = 4096
 SALT_SIZE = 16
 
@@ -40,8 +35,6 @@ SALT_SIZE = 16
 PROCESS_VM_READ = 0x0010
 PROCESS_QUERY_INFORMATION = 0x0400
 
-finish_flag = False
-
 
 def xor_raw_key(raw_key: bytes, internal_db_key: bytes | None) -> bytes:
     """在派生前对原始 32 字节候选 key 执行 XOR 变换。"""
@@ -54,10 +47,6 @@ def xor_raw_key(raw_key: bytes, internal_db_key: bytes | None) -> bytes:
     return bytes(a ^ b for a, b in zip(raw_key, internal_db_key))
 
 
-def verify_worker(task):
-    """Pool worker wrapper for imap_unordered."""
-    return check_chunk(*task)
-
 if os.name == 'nt':
     kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
 
@@ -172,49 +161,6 @@ def read_bytes_from_pid(pid: int, addr: int, size: int):
     return bytes(buffer)
 
 
-def is_ok(passphrase, buf, internal_db_key=None):
-    """验证密钥是否正确"""
-    global finish_flag
-    if finish_flag:
-        return False
-    # 获取文件开头的 salt
-    salt = buf[:SALT_SIZE]
-    # salt 异或 0x3a 得到 mac_salt，用于计算 HMAC
-    mac_salt = bytes(x ^ 0x3a for x in salt)
-    # 使用 PBKDF2 生成新的密钥
-    passphrase = xor_raw_key(passphrase, internal_db_key)
-    new_key = PBKDF2(passphrase, salt, dkLen=KEY_SIZE, count=ROUND_COUNT, hmac_hash_module=SHA512)
-    # 使用新的密钥和 mac_salt 计算 mac_key
-    mac_key = PBKDF2(new_key, mac_salt, dkLen=KEY_SIZE, count=2, hmac_hash_module=SHA512)
-    # 计算 hash 校验码的保留空间
-    reserve = IV_SIZE + HMAC_SHA512_SIZE
-    reserve = ((reserve + AES_BLOCK_SIZE - 1) // AES_BLOCK_SIZE) * AES_BLOCK_SIZE
-    # 校验 HMAC
-    start = SALT_SIZE
-    end = PAGE_SIZE
-    mac = hmac.new(mac_key, buf[start:end - reserve + IV_SIZE], SHA512)
-    mac.update(struct.pack('<I', 1))  # page number as 1
-    hash_mac = mac.digest()
-    # 校验 HMAC 是否一致
-    hash_mac_start_offset = end - reserve + IV_SIZE
-    hash_mac_end_offset = hash_mac_start_offset + len(hash_mac)
-    if hash_mac == buf[hash_mac_start_offset:hash_mac_end_offset]:
-        print(f"[+] Found valid key!")
-        finish_flag = True
-        return True
-    return False
-
-
-def check_chunk(chunk, buf, internal_db_key=None):
-    """检查单个密钥候选"""
-    global finish_flag
-    if finish_flag:
-        return False
-    if is_ok(chunk, buf, internal_db_key):
-        return chunk
-    return False
-
-
 def is_potential_key(key: bytes) -> bool:
     """
     通过熵分析与字符分布快速过滤非密钥的普通文本。
@@ -317,24 +263,15 @@ def verify_keys(keys, buf, internal_db_key=None):
         print("[-] No key candidates found")
         return None
 
-    worker_count = max(1, multiprocessing.cpu_count() // 2)
-    print(f"[*] Testing {total} filtered key candidates with {worker_count} workers...")
-
-    completed = 0
-    last_percent = -1
-    with multiprocessing.Pool(processes=worker_count) as pool:
-        task_iter = ((key, buf, internal_db_key) for key in keys)
-        for r in pool.imap_unordered(verify_worker, task_iter, chunksize=16):
-            completed += 1
-            percent = int((completed / total) * 100)
-            if percent != last_percent:
-                print(f"[*] Verify progress: {completed}/{total} ({percent}%)")
-                last_percent = percent
-
-            if r:
-                print(f"[+] Key found (length={len(r)} bytes; value redacted)")
-                pool.terminate()
-                return bytes.hex(r)
+    print(f"[*] Testing {total} filtered key candidates...")
+    index = find_page1_passphrase(
+        keys,
+        buf[:PAGE_SIZE],
+        transform=lambda key: xor_raw_key(key, internal_db_key),
+    )
+    if index >= 0:
+        print(f"[+] Key found (length={len(keys[index])} bytes; value redacted)")
+        return bytes.hex(keys[index])
 
     print("[-] Verification completed, no valid key")
     return None
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+from ..metrics import record_cache_lookup
+
+
+_CACHE_METRIC = "mcp_tool_result"
+
+
+def _env_number(name: str, default: float, *, minimum: float, maximum: float) -> float:
+    raw = str(os.environ.get(name, "") or "").strip()
+    try:
+        value = float(raw) if raw else float(default)
+    except Exception:
+        value = float(default)
+    return max(minimum, min(maximum, value))
+
+
+class McpResultCache:
+    """Bounded TTL cache for read-only MCP tool results with per-key singleflight.
+
+    Concurrent calls for the same key share one computation: the first caller
+    computes, later callers wait on its future. Only successful results are
+    stored; exceptions are propagated to every waiter and nothing is cached.
+    Keys must already include the data-source generation, so a changed
+    database simply produces a new key and stale entries age out of the LRU.
+    """
+
+    def __init__(self, *, max_entries: int = 256, ttl_seconds: float = 60.0) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._ttl = max(0.0, float(ttl_seconds))
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "McpResultCache":
+        return cls(
+            max_entries=int(_env_number("WECHAT_TOOL_MCP_CACHE_ENTRIES", 256, minimum=0, maximum=10_000)),
+            ttl_seconds=_env_number("WECHAT_TOOL_MCP_CACHE_TTL_SECONDS", 60.0, minimum=0.0, maximum=3600.0),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        store: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        if not self.enabled:
+            return await compute()
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] > now:
+                self._entries.move_to_end(key)
+                hit, value, waiter = True, cached[1], None
+            else:
+                if cached is not None:
+                    self._entries.pop(key, None)
+                hit, value = False, None
+                waiter = self._inflight.get(key)
+                owner = waiter is None
+                if owner:
+                    waiter = Future()
+                    self._inflight[key] = waiter
+        record_cache_lookup(_CACHE_METRIC, hit)
+        if hit:
+            return value
+        if not owner:
+            # 同一 key 的并发调用复用正在进行的计算（可能在其他线程/事件循环中）。
+            return await asyncio.wrap_future(waiter)
+
+        try:
+            value = await compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            waiter.set_exception(exc)
+            # 标记异常已被取回，避免无人等待时的 "exception was never retrieved" 日志。
+            waiter.exception()
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if store is None or store(value):
+                self._entries[key] = (time.monotonic() + self._ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        waiter.set_result(value)
+        return value
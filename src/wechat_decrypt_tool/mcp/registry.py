@@ -7,10 +7,14 @@ from typing import Any, Awaitable, Callable
 
 from fastapi.encoders import jsonable_encoder
 
+from .cache import McpResultCache
 from .errors import JSONRPC_METHOD_NOT_FOUND, McpError
 
 
 ToolHandler = Callable[[dict[str, Any], "McpToolContext"], Any | Awaitable[Any]]
+# Returns a data-source generation token for the call's arguments, or None when the
+# call must not be cached (e.g. the account cannot be resolved).
+GenerationResolver = Callable[[dict[str, Any]], str | None]
 
 
 @dataclass(frozen=True)
@@ -33,6 +37,7 @@ class McpTool:
     handler: ToolHandler
     package: str = "wechat"
     annotations: dict[str, Any] | None = None
+    cacheable: bool = False
 
     def to_public_dict(self) -> dict[str, Any]:
         payload: dict[str, Any] = {
@@ -46,8 +51,15 @@ class McpTool:
 
 
 class McpToolRegistry:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        result_cache: McpResultCache | None = None,
+        generation: GenerationResolver | None = None,
+    ) -> None:
         self._tools: dict[str, McpTool] = {}
+        self._result_cache = result_cache
+        self._generation = generation
 
     def register(self, tool: McpTool) -> None:
         if not tool.name:
@@ -91,6 +103,30 @@ class McpToolRegistry:
     def has_tool(self, name: str) -> bool:
         return name in self._tools
 
+    def get_tool(self, name: str) -> McpTool | None:
+        return self._tools.get(str(name or "").strip())
+
+    @property
+    def result_cache(self) -> McpResultCache | None:
+        return self._result_cache
+
+    def _cache_key(self, tool: McpTool, args: dict[str, Any], context: McpToolContext) -> tuple[str, ...] | None:
+        try:
+            normalized = json.dumps(
+                {k: v for k, v in args.items() if v is not None},
+                ensure_ascii=False,
+                sort_keys=True,
+                separators=(",", ":"),
+                default=str,
+            )
+            generation = self._generation(args) if self._generation is not None else ""
+        except Exception:
+            return None
+        if generation is None:
+            return None
+        # base_url 会被拼进结果里的资源链接，不同来源的请求不能共用结果。
+        return (tool.name, context.base_url, normalized, str(generation))
+
     async def call_tool(self, name: str, arguments: Any, context: McpToolContext) -> dict[str, Any]:
         tool = self._tools.get(str(name or "").strip())
         if tool is None:
@@ -102,17 +138,25 @@ class McpToolRegistry:
         else:
             raise ValueError("Tool arguments must be an object.")
 
-        result = tool.handler(args, context)
-        if inspect.isawaitable(result):
-            result = await result
-        encoded = jsonable_encoder(result)
-        text = json.dumps(encoded, ensure_ascii=False, indent=2)
-        is_error = isinstance(encoded, dict) and str(encoded.get("status") or "").lower() == "error"
-        return {
-            "content": [{"type": "text", "text": text}],
-            "structuredContent": encoded,
-            "isError": is_error,
-        }
+        async def invoke() -> dict[str, Any]:
+            result = tool.handler(args, context)
+            if inspect.isawaitable(result):
+                result = await result
+            encoded = jsonable_encoder(result)
+            text = json.dumps(encoded, ensure_ascii=False, indent=2)
+            is_error = isinstance(encoded, dict) and str(encoded.get("status") or "").lower() == "error"
+            return {
+                "content": [{"type": "text", "text": text}],
+                "structuredContent": encoded,
+                "isError": is_error,
+            }
+
+        cache = self._result_cache
+        if tool.cacheable and cache is not None and cache.enabled:
+            key = self._cache_key(tool, args, context)
+            if key is not None:
+                return await cache.get_or_compute(key, invoke, store=lambda payload: not payload["isError"])
+        return await invoke()
 
 
 def object_schema(
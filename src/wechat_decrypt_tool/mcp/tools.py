@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import os
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any, Callable, Optional
 from urllib.parse import urlencode
 
@@ -17,7 +22,9 @@ from ..chat_helpers import (
 )
 from ..chat_accounts import resolve_chat_account_context
 from ..database_filters import list_countable_database_names
+from ..db_storage_watch import WATCH_BUCKETS
 from ..wcdb_realtime import WCDB_REALTIME
+from .cache import McpResultCache
 from .registry import (
     McpTool,
     McpToolContext,
@@ -30,7 +37,46 @@ from .registry import (
 )
 
 
-MCP_REGISTRY = McpToolRegistry()
+def _data_generation(args: dict[str, Any]) -> str | None:
+    """Fingerprint the databases a tool call can read, so cached results expire on any write.
+
+    Covers the account output dir (decrypted snapshot plus derived indexes such as the
+    chat search index), the wrapped cache dir, and the live `db_storage` buckets that
+    realtime reads come from. Returns None when the account cannot be resolved.
+    """
+    try:
+        ctx = resolve_chat_account_context(_account_arg(args))
+    except Exception:
+        return None
+    account_dir = Path(ctx.account_dir)
+    dirs = [account_dir, account_dir / "_wrapped" / "cache"]
+    if ctx.db_storage_path:
+        storage = Path(ctx.db_storage_path)
+        dirs.extend(storage / bucket for bucket in sorted(WATCH_BUCKETS))
+    digest = hashlib.sha1(str(account_dir).encode("utf-8", "ignore"))
+    for directory in dirs:
+        try:
+            st = directory.stat()
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            continue
+        digest.update(f"|{directory.name}:{st.st_mtime_ns}".encode("utf-8", "ignore"))
+        for entry in entries:
+            if not entry.name.endswith((".db", ".db-wal", ".json")):
+                continue
+            try:
+                est = entry.stat()
+            except OSError:
+                continue
+            digest.update(f"|{entry.name}:{est.st_mtime_ns}:{est.st_size}".encode("utf-8", "ignore"))
+    return digest.hexdigest()
+
+
+MCP_REGISTRY = McpToolRegistry(result_cache=McpResultCache.from_env(), generation=_data_generation)
+# Status/catalog tools must stay live, and URL builders are cheaper than a generation check.
+_UNCACHED_PACKAGES = frozenset({"wechat.core", "wechat.media"})
+BATCH_MAX_CALLS = 16
+BATCH_MAX_WORKERS = 4
 DEFAULT_CHAT_SOURCE = "auto"
 CHAT_SOURCE_VALUES = ["auto", "realtime", "decrypted"]
 SNAPSHOT_SEARCH_FRESHNESS = {
@@ -93,6 +139,7 @@ def _register(
             input_schema=input_schema,
             handler=handler,
             package=package,
+            cacheable=bool(read_only) and package not in _UNCACHED_PACKAGES,
             annotations={
                 "package": package,
                 "readOnlyHint": bool(read_only),
@@ -1391,6 +1438,58 @@ def _tools_catalog(args: dict[str, Any], _: McpToolContext) -> dict[str, Any]:
     return payload
 
 
+def _run_batch_call(name: str, arguments: dict[str, Any], ctx: McpToolContext) -> dict[str, Any]:
+    # 每个工作线程使用独立事件循环，异步 handler 内部的阻塞读库也能真正并行。
+    return asyncio.run(MCP_REGISTRY.call_tool(name, arguments, ctx))
+
+
+async def _batch_call(args: dict[str, Any], ctx: McpToolContext) -> dict[str, Any]:
+    calls = args.get("calls")
+    if not isinstance(calls, list) or not calls:
+        raise ValueError("calls must be a non-empty array.")
+    if len(calls) > BATCH_MAX_CALLS:
+        raise ValueError(f"At most {BATCH_MAX_CALLS} calls are allowed per batch.")
+    default_account = _account_arg(args)
+
+    results: list[dict[str, Any]] = []
+    runnable: list[tuple[int, str, dict[str, Any]]] = []
+    for index, call in enumerate(calls):
+        name = str((call or {}).get("name") or "").strip() if isinstance(call, dict) else ""
+        arguments = call.get("arguments") if isinstance(call, dict) else None
+        results.append({"index": index, "name": name})
+        tool = MCP_REGISTRY.get_tool(name)
+        if tool is None:
+            results[index].update(ok=False, error=f"Unknown tool: {name}" if name else "Tool name is required.")
+            continue
+        if tool.handler is _batch_call or not bool((tool.annotations or {}).get("readOnlyHint")):
+            results[index].update(ok=False, error=f"Tool is not allowed in a batch: {name}")
+            continue
+        if arguments is not None and not isinstance(arguments, dict):
+            results[index].update(ok=False, error="Tool arguments must be an object.")
+            continue
+        call_args = dict(arguments or {})
+        if default_account and not call_args.get("account"):
+            call_args["account"] = default_account
+        runnable.append((index, name, call_args))
+
+    if runnable:
+        loop = asyncio.get_running_loop()
+        workers = min(BATCH_MAX_WORKERS, len(runnable))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-batch") as pool:
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(pool, _run_batch_call, name, call_args, ctx) for _, name, call_args in runnable),
+                return_exceptions=True,
+            )
+        for (index, _, _), outcome in zip(runnable, outcomes):
+            if isinstance(outcome, BaseException):
+                results[index].update(ok=False, error=str(outcome) or outcome.__class__.__name__)
+            else:
+                results[index].update(ok=not outcome.get("isError"), result=outcome.get("structuredContent"))
+
+    failed = sum(1 for item in results if not item.get("ok"))
+    return {"status": "success", "count": len(results), "failed": failed, "results": results}
+
+
 COMMON_ACCOUNT = {"account": string_schema("Optional chat account name.")}
 CHAT_SOURCE = {
     "source": string_schema(
@@ -1409,6 +1508,7 @@ def _install_tools() -> None:
     _register("wechat.core.get_status", "Return MCP service readiness, account availability, and package list.", object_schema(), _status, package="wechat.core")
     _register("wechat.core.list_tools", "List WeChat MCP tools, optionally filtered by package.", object_schema({"package": string_schema("Optional package name."), "cursor": string_schema("Optional numeric cursor."), "limit": int_schema("Maximum tools to return.", minimum=1, maximum=100)}), _tools_catalog, package="wechat.core")
     _register("wechat.core.list_accounts", "List WeChat chat accounts available to WeChatDataAnalysis.", object_schema(), _list_accounts, package="wechat.core")
+    _register("wechat.core.batch", f"Run up to {BATCH_MAX_CALLS} read-only tool calls concurrently and return their results in order.", object_schema({**COMMON_ACCOUNT, "calls": array_schema("Tool calls to run.", object_schema({"name": string_schema("Tool name."), "arguments": object_schema(additional_properties=True)}, required=["name"]))}, required=["calls"]), _batch_call, package="wechat.core")
     _register("wechat.core.get_account_info", "Return database and account metadata for one chat account.", object_schema(COMMON_ACCOUNT), _get_account_info, package="wechat.core")
 
     _register("wechat.contacts.list_contacts", "List contacts, groups, and official accounts with optional fuzzy keyword filtering. Defaults to direct realtime WCDB.", object_schema({**COMMON_ACCOUNT, **PAGING, **CHAT_SOURCE, "keyword": string_schema("Optional fuzzy keyword."), "include_friends": bool_schema("Include friends.", default=True), "include_groups": bool_schema("Include groups.", default=True), "include_officials": bool_schema("Include official accounts.", default=True)}), _list_contacts, package="wechat.contacts")
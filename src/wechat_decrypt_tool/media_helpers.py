@@ -24,6 +24,15 @@ from .chat_accounts import list_chat_account_names, resolve_chat_account_context
 from .chat_helpers import _decode_message_content
 from .logging_config import get_logger
 from .sqlite_diagnostics import is_usable_sqlite_db
+from .voice_audio import (
+    convert_silk_to_browser_audio,
+    decode_silk_to_pcm,
+    encode_pcm_to_mp3,
+    find_ffmpeg_executable,
+    looks_like_mp3,
+    pcm_to_wav,
+    wav_to_pcm,
+)
 
 logger = get_logger(__name__)
 
@@ -3691,118 +3700,28 @@ def _decrypt_and_save_resource(
 
 def _convert_silk_to_wav(silk_data: bytes) -> bytes:
     """Convert SILK audio data to WAV format for browser playback."""
-    import tempfile
 
-    try:
-        import pilk
-    except ImportError:
-        # If pilk not installed, return original data
-        return silk_data
-
-    try:
-        # pilk.silk_to_wav works with file paths, so use temp files
-        with tempfile.NamedTemporaryFile(suffix=".silk", delete=False) as silk_file:
-            silk_file.write(silk_data)
-            silk_path = silk_file.name
-
-        wav_path = silk_path.replace(".silk", ".wav")
-
-        try:
-            pilk.silk_to_wav(silk_path, wav_path, rate=24000)
-            with open(wav_path, "rb") as wav_file:
-                wav_data = wav_file.read()
-            return wav_data
-        finally:
-            # Clean up temp files
-            import os
-
-            try:
-                os.unlink(silk_path)
-            except Exception:
-                pass
-            try:
-                os.unlink(wav_path)
-            except Exception:
-                pass
-    except Exception as e:
-        logger.warning(f"SILK to WAV conversion failed: {e}")
+    pcm = decode_silk_to_pcm(silk_data)
+    if not pcm:
         return silk_data
+    return pcm_to_wav(pcm)
 
 
 def _looks_like_mp3(data: bytes) -> bool:
-    if not data:
-        return False
-    if data.startswith(b"ID3"):
-        return True
-    return len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0
+    return looks_like_mp3(data)
 
 
-@lru_cache(maxsize=1)
 def _find_ffmpeg_executable() -> str:
-    import shutil
-
-    env_value = str(os.environ.get("WECHAT_TOOL_FFMPEG") or "").strip()
-    if env_value:
-        resolved = shutil.which(env_value)
-        if resolved:
-            return resolved
-        candidate = Path(env_value).expanduser()
-        if candidate.is_file():
-            return str(candidate)
-
-    return shutil.which("ffmpeg") or ""
+    return find_ffmpeg_executable()
 
 
 def _convert_wav_to_mp3(wav_data: bytes) -> bytes:
-    import subprocess
-    import tempfile
-
     if not wav_data or not wav_data.startswith(b"RIFF"):
         return b""
-
-    ffmpeg_exe = _find_ffmpeg_executable()
-    if not ffmpeg_exe:
+    pcm, rate = wav_to_pcm(wav_data)
+    if not pcm:
         return b""
-
-    try:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            wav_path = tmp_path / "voice.wav"
-            mp3_path = tmp_path / "voice.mp3"
-            wav_path.write_bytes(wav_data)
-
-            proc = subprocess.run(
-                [
-                    ffmpeg_exe,
-                    "-y",
-                    "-hide_banner",
-                    "-loglevel",
-                    "error",
-                    "-i",
-                    str(wav_path),
-                    "-vn",
-                    "-codec:a",
-                    "libmp3lame",
-                    "-q:a",
-                    "4",
-                    str(mp3_path),
-                ],
-                check=False,
-                capture_output=True,
-            )
-            if proc.returncode != 0 or not mp3_path.exists():
-                err = proc.stderr.decode("utf-8", errors="ignore").strip()
-                if err:
-                    logger.warning(f"WAV to MP3 conversion failed: {err}")
-                return b""
-
-            mp3_data = mp3_path.read_bytes()
-            if _looks_like_mp3(mp3_data):
-                return mp3_data
-    except Exception as e:
-        logger.warning(f"WAV to MP3 conversion failed: {e}")
-
-    return b""
+    return encode_pcm_to_mp3(pcm, rate=rate)
 
 
 def _convert_silk_to_browser_audio(
@@ -3810,31 +3729,9 @@ def _convert_silk_to_browser_audio(
     *,
     preferred_format: str = "mp3",
 ) -> tuple[bytes, str, str]:
-    """Convert SILK audio to a browser-friendly format.
-
-    Returns `(payload, ext, media_type)`.
-    Preference order:
-      1) MP3 if ffmpeg is available
-      2) WAV if SILK decoding succeeds
-      3) original SILK bytes as a last-resort fallback
-    """
-
-    data = bytes(silk_data or b"")
-    if not data:
-        return b"", "silk", "audio/silk"
-
-    if _looks_like_mp3(data):
-        return data, "mp3", "audio/mpeg"
-
-    wav_data = data if data.startswith(b"RIFF") else _convert_silk_to_wav(data)
-    if wav_data.startswith(b"RIFF"):
-        if str(preferred_format or "").strip().lower() == "mp3":
-            mp3_data = _convert_wav_to_mp3(wav_data)
-            if mp3_data:
-                return mp3_data, "mp3", "audio/mpeg"
-        return wav_data, "wav", "audio/wav"
+    """Convert SILK audio to a browser-friendly format; see ``voice_audio``."""
 
-    return data, "silk", "audio/silk"
+    return convert_silk_to_browser_audio(silk_data, preferred_format=preferred_format)
 
 
 def _resolve_media_path_for_kind(
@@ -0,0 +1,260 @@
+"""In-process counters, gauges and latency histograms exposed on /metrics.
+
+Labels are route templates, perf-trace phases and fixed names only, never
+account names, usernames or query strings.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+# Seconds. Covers a cached page (~1 ms) up to a full export phase (~2 min).
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    120.0,
+)
+OVERFLOW_LABEL_VALUE = "_other"
+
+_HELP = {
+    "wcda_http_requests_total": "HTTP requests by route template, method and status class.",
+    "wcda_http_request_duration_seconds": "HTTP request latency by route template and method.",
+    "wcda_http_requests_in_flight": "HTTP requests currently being served.",
+    "wcda_perf_phase_duration_seconds": "Time between consecutive create_perf_trace phases.",
+    "wcda_db_opens_total": "Database handles opened, by database group and source.",
+    "wcda_cache_requests_total": "Cache lookups by cache name and result (hit/miss).",
+    "wcda_throughput_bytes_total": "Bytes processed by long-running operations (decrypt, export).",
+    "wcda_throughput_seconds_total": "Wall time spent in long-running operations.",
+    "wcda_throughput_bytes_per_second": "Throughput of the most recent run of an operation.",
+}
+
+
+def _env_int(name: str, default: int, *, min_value: int, max_value: int) -> int:
+    raw = os.environ.get(name)
+    try:
+        value = int(str(raw).strip()) if raw is not None and str(raw).strip() else int(default)
+    except Exception:
+        value = int(default)
+    return max(min_value, min(max_value, value))
+
+
+_MAX_SERIES_PER_METRIC = _env_int("WECHAT_TOOL_METRICS_MAX_SERIES", 2000, min_value=16, max_value=100_000)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        idx = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        if self.count <= 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            in_bucket = self.counts[i]
+            if seen + in_bucket >= rank and in_bucket > 0:
+                return lower + (bound - lower) * ((rank - seen) / in_bucket)
+            seen += in_bucket
+            lower = bound
+        # Overflow bucket has no upper bound; report its lower edge.
+        return self.buckets[-1] if self.buckets else None
+
+
+class MetricsRegistry:
+    def __init__(self, *, max_series_per_metric: int = _MAX_SERIES_PER_METRIC) -> None:
+        self._lock = threading.Lock()
+        self._max_series = int(max_series_per_metric)
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._started_at = time.time()
+
+    def _series_key(self, family: dict[LabelKey, Any], labels: dict[str, Any]) -> LabelKey:
+        key = _label_key(labels)
+        if key in family or len(family) < self._max_series:
+            return key
+        # Cardinality guard: fold anything past the cap into one overflow series.
+        return tuple((k, OVERFLOW_LABEL_VALUE) for k, _v in key)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            key = self._series_key(family, labels)
+            family[key] = family.get(key, 0.0) + float(value)
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            family = self._gauges.setdefault(name, {})
+            family[self._series_key(family, labels)] = float(value)
+
+    def add_gauge(self, name: str, delta: float, **labels: Any) -> None:
+        with self._lock:
+            family = self._gauges.setdefault(name, {})
+            key = self._series_key(family, labels)
+            family[key] = family.get(key, 0.0) + float(delta)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        *,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        **labels: Any,
+    ) -> None:
+        if not math.isfinite(value):
+            return
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            key = self._series_key(family, labels)
+            hist = family.get(key)
+            if hist is None:
+                hist = _Histogram(buckets)
+                family[key] = hist
+            hist.observe(max(0.0, float(value)))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self._started_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, family in sorted(self._counters.items())
+                for key, value in sorted(family.items())
+            ]
+            gauges = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, family in sorted(self._gauges.items())
+                for key, value in sorted(family.items())
+            ]
+            histograms = []
+            for name, family in sorted(self._histograms.items()):
+                for key, hist in sorted(family.items()):
+                    p50, p95, p99 = (hist.quantile(q) for q in (0.5, 0.95, 0.99))
+                    histograms.append(
+                        {
+                            "name": name,
+                            "labels": dict(key),
+                            "count": hist.count,
+                            "sumSeconds": round(hist.total, 6),
+                            "p50Ms": round(p50 * 1000.0, 1) if p50 is not None else None,
+                            "p95Ms": round(p95 * 1000.0, 1) if p95 is not None else None,
+                            "p99Ms": round(p99 * 1000.0, 1) if p99 is not None else None,
+                        }
+                    )
+            return {
+                "startedAt": self._started_at,
+                "counters": counters,
+                "gauges": gauges,
+                "histograms": histograms,
+            }
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            help_text = _HELP.get(name)
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, family in sorted(self._counters.items()):
+                header(name, "counter")
+                for key, value in sorted(family.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, family in sorted(self._gauges.items()):
+                header(name, "gauge")
+                for key, value in sorted(family.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, family in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for key, hist in sorted(family.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        le = _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: Iterable[tuple[str, str]], *extra: tuple[str, str]) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+METRICS = MetricsRegistry()
+
+
+def record_db_open(db: str, source: str) -> None:
+    METRICS.inc("wcda_db_opens_total", db=db, source=source)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    METRICS.inc("wcda_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def record_throughput(operation: str, *, bytes_count: int, seconds: float, success: bool = True) -> None:
+    outcome = "success" if success else "error"
+    METRICS.inc("wcda_throughput_bytes_total", max(0, int(bytes_count)), operation=operation, outcome=outcome)
+    METRICS.inc("wcda_throughput_seconds_total", max(0.0, float(seconds)), operation=operation, outcome=outcome)
+    if success and seconds > 0 and bytes_count > 0:
+        METRICS.set_gauge("wcda_throughput_bytes_per_second", bytes_count / seconds, operation=operation)
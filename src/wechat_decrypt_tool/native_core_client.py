@@ -18,7 +18,7 @@ import uuid
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum, IntFlag
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
 
 
 WCE_CLIENT_ABI_VERSION = 1
@@ -646,86 +646,273 @@ def parse_native_encrypted_export_header(
     )
 
 
-class _RowsetReader:
-    def __init__(self, payload: bytes) -> None:
-        self._payload = memoryview(payload)
-        self._offset = 0
+_WQR1_HEADER = struct.Struct("<4sHHII")
+_WQR1_U32 = struct.Struct("<I")
+_WQR1_I64 = struct.Struct("<q")
+_WQR1_F64 = struct.Struct("<d")
+_WQR1_MAX_PAGE_BYTES = 768 * 1024
+_WQR1_CELL_NULL = 0
+_WQR1_CELL_INT = 1
+_WQR1_CELL_REAL = 2
+_WQR1_CELL_TEXT = 3
+_WQR1_CELL_BLOB = 4
+
+
+class NativeCoreColumnarPage:
+    """A WQR1 page indexed into per-column cell tables over the original buffer.
+
+    Integers are stored as decoded; REAL, TEXT and BLOB cells keep only their
+    offset into the buffer and are decoded the first time their column is read.
+    Invalid UTF-8 in a TEXT cell is therefore reported when its column is
+    materialized rather than when the page is parsed.
+    """
+
+    __slots__ = ("columns", "row_count", "has_more", "_buffer", "_kinds", "_slots", "_values")
+
+    def __init__(
+        self,
+        columns: tuple[str, ...],
+        row_count: int,
+        has_more: bool,
+        buffer: memoryview,
+        kinds: list[bytearray],
+        slots: list[list[int]],
+    ) -> None:
+        self.columns = columns
+        self.row_count = int(row_count)
+        self.has_more = bool(has_more)
+        self._buffer = buffer
+        self._kinds = kinds
+        self._slots = slots
+        self._values: list[list[NativeCoreCell] | None] = [None] * len(columns)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def _column_index(self, column: int | str) -> int:
+        if isinstance(column, int):
+            if not 0 <= column < len(self.columns):
+                raise IndexError(column)
+            return column
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(column) from None
+
+    def column(self, column: int | str) -> list[NativeCoreCell]:
+        index = self._column_index(column)
+        values = self._values[index]
+        if values is None:
+            values = self._decode_column(index)
+            self._values[index] = values
+        return values
+
+    def _decode_cell(self, column: int, row: int) -> NativeCoreCell:
+        values = self._values[column]
+        if values is not None:
+            return values[row]
+        kind = self._kinds[column][row]
+        slot = self._slots[column][row]
+        if kind == _WQR1_CELL_INT:
+            return slot
+        if kind == _WQR1_CELL_NULL:
+            return None
+        if kind == _WQR1_CELL_REAL:
+            return _WQR1_F64.unpack_from(self._buffer, slot)[0]
+        start = slot + 4
+        end = start + _WQR1_U32.unpack_from(self._buffer, slot)[0]
+        if kind == _WQR1_CELL_BLOB:
+            return bytes(self._buffer[start:end])
+        try:
+            return str(self._buffer[start:end], "utf-8")
+        except UnicodeDecodeError as exc:
+            raise NativeCoreProtocolError("wechatdb query text cell is not UTF-8.") from exc
+
+    def _decode_column(self, index: int) -> list[NativeCoreCell]:
+        buffer = self._buffer
+        unpack_u32 = _WQR1_U32.unpack_from
+        unpack_f64 = _WQR1_F64.unpack_from
+        out: list[NativeCoreCell] = []
+        append = out.append
+        for kind, slot in zip(self._kinds[index], self._slots[index]):
+            if kind == _WQR1_CELL_INT:
+                append(slot)
+            elif kind == _WQR1_CELL_NULL:
+                append(None)
+            elif kind == _WQR1_CELL_REAL:
+                append(unpack_f64(buffer, slot)[0])
+            else:
+                start = slot + 4
+                end = start + unpack_u32(buffer, slot)[0]
+                if kind == _WQR1_CELL_BLOB:
+                    append(bytes(buffer[start:end]))
+                else:
+                    try:
+                        append(str(buffer[start:end], "utf-8"))
+                    except UnicodeDecodeError as exc:
+                        raise NativeCoreProtocolError("wechatdb query text cell is not UTF-8.") from exc
+        return out
+
+    def named_columns(self) -> dict[str, list[NativeCoreCell]]:
+        self._require_unique_columns()
+        return {name: self.column(index) for index, name in enumerate(self.columns)}
+
+    def iter_rows(self) -> Iterator[tuple[NativeCoreCell, ...]]:
+        if not self.row_count:
+            return iter(())
+        return zip(*(self.column(index) for index in range(len(self.columns))))
+
+    def row(self, index: int) -> tuple[NativeCoreCell, ...]:
+        if not -self.row_count <= index < self.row_count:
+            raise IndexError(index)
+        return tuple(self.column(column)[index] for column in range(len(self.columns)))
 
     @property
-    def remaining(self) -> int:
-        return len(self._payload) - self._offset
+    def rows(self) -> tuple[tuple[NativeCoreCell, ...], ...]:
+        return tuple(self.iter_rows())
 
-    def take(self, size: int) -> memoryview:
-        if size < 0 or size > self.remaining:
-            raise NativeCoreProtocolError("wechatdb query page is truncated.")
-        start = self._offset
-        self._offset += size
-        return self._payload[start : start + size]
+    def record(self, index: int) -> dict[str, NativeCoreCell]:
+        """Decode one row as a dict, touching only that row's cells."""
 
-    def u8(self) -> int:
-        return int(self.take(1)[0])
+        self._require_unique_columns()
+        if not -self.row_count <= index < self.row_count:
+            raise IndexError(index)
+        row = index % self.row_count
+        return {name: self._decode_cell(column, row) for column, name in enumerate(self.columns)}
 
-    def u16(self) -> int:
-        return int.from_bytes(self.take(2), "little")
+    def records(self) -> tuple[dict[str, NativeCoreCell], ...]:
+        self._require_unique_columns()
+        columns = self.columns
+        return tuple(dict(zip(columns, row)) for row in self.iter_rows())
 
-    def u32(self) -> int:
-        return int.from_bytes(self.take(4), "little")
+    def to_page(self) -> NativeCoreQueryPage:
+        return NativeCoreQueryPage(self.columns, self.rows, self.has_more)
 
-    def sized(self) -> bytes:
-        return bytes(self.take(self.u32()))
+    def _require_unique_columns(self) -> None:
+        if len(set(self.columns)) != len(self.columns):
+            raise NativeCoreProtocolError(
+                "wechatdb query contains duplicate column names; use rows and columns directly."
+            )
 
 
-def parse_native_query_page(payload: bytes, *, has_more: bool) -> NativeCoreQueryPage:
-    raw = bytes(payload)
-    if len(raw) < 16 or len(raw) > 768 * 1024:
+def parse_native_query_page_columnar(payload: bytes | bytearray | memoryview, *, has_more: bool) -> NativeCoreColumnarPage:
+    """Index a WQR1 page without copying it or building per-row objects.
+
+    The buffer is walked once to validate framing and record where each cell
+    lives; see `NativeCoreColumnarPage` for how values are materialized.
+    """
+
+    buffer = memoryview(payload).cast("B") if not isinstance(payload, (bytes, bytearray)) else memoryview(payload)
+    # Indexing bytes is cheaper than indexing a memoryview in the hot loop below.
+    data = payload if isinstance(payload, (bytes, bytearray)) else buffer
+    size = len(buffer)
+    if size < 16 or size > _WQR1_MAX_PAGE_BYTES:
         raise NativeCoreProtocolError("wechatdb query page has an invalid size.")
-    reader = _RowsetReader(raw)
-    if bytes(reader.take(4)) != b"WQR1" or reader.u16() != 1 or reader.u16() != 0:
+    magic, version, flags, column_count, row_count = _WQR1_HEADER.unpack_from(buffer, 0)
+    if magic != b"WQR1" or version != 1 or flags != 0:
         raise NativeCoreProtocolError("wechatdb query page has an invalid WQR1 header.")
-    column_count = reader.u32()
-    row_count = reader.u32()
     if not 1 <= column_count <= 256 or row_count > 4096:
         raise NativeCoreProtocolError("wechatdb query page exceeds row or column limits.")
 
+    unpack_u32 = _WQR1_U32.unpack_from
+    unpack_i64 = _WQR1_I64.unpack_from
+    offset = _WQR1_HEADER.size
     columns: list[str] = []
     for _ in range(column_count):
-        encoded = reader.sized()
-        if len(encoded) > 4096:
+        if offset + 4 > size:
+            raise NativeCoreProtocolError("wechatdb query page is truncated.")
+        length = unpack_u32(buffer, offset)[0]
+        offset += 4
+        if offset + length > size:
+            raise NativeCoreProtocolError("wechatdb query page is truncated.")
+        if length > 4096:
             raise NativeCoreProtocolError("wechatdb query column name is too large.")
         try:
-            columns.append(encoded.decode("utf-8"))
+            columns.append(str(buffer[offset : offset + length], "utf-8"))
         except UnicodeDecodeError as exc:
             raise NativeCoreProtocolError("wechatdb query column name is not UTF-8.") from exc
+        offset += length
 
-    rows: list[tuple[NativeCoreCell, ...]] = []
+    kinds = [bytearray() for _ in range(column_count)]
+    slots: list[list[int]] = [[] for _ in range(column_count)]
+    cells = list(zip([k.append for k in kinds], [v.append for v in slots]))
     for _ in range(row_count):
-        row: list[NativeCoreCell] = []
-        for _ in range(column_count):
-            cell_type = reader.u8()
-            if cell_type == 0:
-                value: NativeCoreCell = None
-            elif cell_type == 1:
-                value = int.from_bytes(reader.take(8), "little", signed=True)
-            elif cell_type == 2:
-                value = struct.unpack("<d", reader.take(8))[0]
-            elif cell_type in {3, 4}:
-                encoded = reader.sized()
-                if cell_type == 4:
-                    value = encoded
-                else:
-                    try:
-                        value = encoded.decode("utf-8")
-                    except UnicodeDecodeError as exc:
-                        raise NativeCoreProtocolError("wechatdb query text cell is not UTF-8.") from exc
+        for add_kind, add_slot in cells:
+            if offset >= size:
+                raise NativeCoreProtocolError("wechatdb query page is truncated.")
+            kind = data[offset]
+            offset += 1
+            if kind == _WQR1_CELL_INT:
+                if offset + 8 > size:
+                    raise NativeCoreProtocolError("wechatdb query page is truncated.")
+                add_slot(unpack_i64(buffer, offset)[0])
+                offset += 8
+            elif kind == _WQR1_CELL_NULL:
+                add_slot(0)
+            elif kind == _WQR1_CELL_REAL:
+                if offset + 8 > size:
+                    raise NativeCoreProtocolError("wechatdb query page is truncated.")
+                add_slot(offset)
+                offset += 8
+            elif kind == _WQR1_CELL_TEXT or kind == _WQR1_CELL_BLOB:
+                if offset + 4 > size:
+                    raise NativeCoreProtocolError("wechatdb query page is truncated.")
+                add_slot(offset)
+                offset += 4 + unpack_u32(buffer, offset)[0]
+                if offset > size:
+                    raise NativeCoreProtocolError("wechatdb query page is truncated.")
             else:
                 raise NativeCoreProtocolError(
-                    f"wechatdb query page contains unknown cell type {cell_type}."
+                    f"wechatdb query page contains unknown cell type {kind}."
                 )
-            row.append(value)
-        rows.append(tuple(row))
-    if reader.remaining:
+            add_kind(kind)
+    if offset != size:
         raise NativeCoreProtocolError("wechatdb query page contains trailing data.")
-    return NativeCoreQueryPage(tuple(columns), tuple(rows), bool(has_more))
+    return NativeCoreColumnarPage(tuple(columns), row_count, bool(has_more), buffer, kinds, slots)
+
+
+def parse_native_query_page(payload: bytes, *, has_more: bool) -> NativeCoreQueryPage:
+    # Materializing every column keeps this entry point strict: bad UTF-8 fails here.
+    return parse_native_query_page_columnar(payload, has_more=has_more).to_page()
+
+
+def encode_native_query_page(
+    columns: tuple[str, ...] | list[str],
+    rows: Iterable[tuple[NativeCoreCell, ...] | list[NativeCoreCell]],
+) -> bytes:
+    """Build a WQR1 page the way native-core does; used by tests and benchmarks."""
+
+    names = [str(name).encode("utf-8") for name in columns]
+    body = bytearray()
+    row_count = 0
+    for row in rows:
+        if len(row) != len(names):
+            raise ValueError("row width does not match the column count")
+        row_count += 1
+        for value in row:
+            if value is None:
+                body.append(_WQR1_CELL_NULL)
+            elif isinstance(value, bool) or isinstance(value, int):
+                body.append(_WQR1_CELL_INT)
+                body += _WQR1_I64.pack(int(value))
+            elif isinstance(value, float):
+                body.append(_WQR1_CELL_REAL)
+                body += _WQR1_F64.pack(value)
+            elif isinstance(value, str):
+                encoded = value.encode("utf-8")
+                body.append(_WQR1_CELL_TEXT)
+                body += _WQR1_U32.pack(len(encoded)) + encoded
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                raw = bytes(value)
+                body.append(_WQR1_CELL_BLOB)
+                body += _WQR1_U32.pack(len(raw)) + raw
+            else:
+                raise TypeError(f"unsupported WQR1 cell value: {type(value).__name__}")
+    out = bytearray(_WQR1_HEADER.pack(b"WQR1", 1, 0, len(names), row_count))
+    for encoded in names:
+        out += _WQR1_U32.pack(len(encoded)) + encoded
+    out += body
+    return bytes(out)
 
 
 _POLICY_STATUSES = {
@@ -2765,7 +2952,14 @@ class NativeCoreClient:
             self._query_handles[query_handle] = database_handle
         return NativeCoreQuery(self, query_handle)
 
-    def _fetch_query(self, query_handle: int, *, max_rows: int, max_bytes: int) -> NativeCoreQueryPage:
+    def _fetch_query(
+        self,
+        query_handle: int,
+        *,
+        max_rows: int,
+        max_bytes: int,
+        columnar: bool = False,
+    ) -> NativeCoreQueryPage | NativeCoreColumnarPage:
         rows = int(max_rows)
         size = int(max_bytes)
         if not 1 <= rows <= 4096:
@@ -2802,6 +2996,8 @@ class NativeCoreClient:
                 payload = ctypes.string_at(output.data, output.size) if output.size else b""
             finally:
                 self._library.wce_buffer_release(ctypes.byref(output))
+        if columnar:
+            return parse_native_query_page_columnar(payload, has_more=bool(has_more.value))
         return parse_native_query_page(payload, has_more=bool(has_more.value))
 
     def _close_query(self, query_handle: int) -> None:
@@ -3411,6 +3607,19 @@ class NativeCoreQuery:
         self._exhausted = not page.has_more
         return page
 
+    def fetch_columns(self, *, max_rows: int = 256, max_bytes: int = 512 * 1024) -> NativeCoreColumnarPage:
+        """Like `fetch`, but returns the page as lazily decoded columns."""
+
+        if not self._handle:
+            raise NativeCoreUnavailableError("wechatdb native query is closed.")
+        if self._exhausted:
+            raise NativeCoreProtocolError("wechatdb native query is already exhausted.")
+        page = self._client._fetch_query(
+            self._handle, max_rows=max_rows, max_bytes=max_bytes, columnar=True
+        )
+        self._exhausted = not page.has_more
+        return page
+
 
 class NativeCoreExportSession:
     def __init__(self, client: NativeCoreClient, handle: int, expected_size: int) -> None:
@@ -3681,6 +3890,7 @@ __all__ = [
     "NativeCorePolicyError",
     "NativeCoreProtocolError",
     "NativeCoreQuery",
+    "NativeCoreColumnarPage",
     "NativeCoreQueryPage",
     "NativeCoreRuntimeStatus",
     "NativeCoreStatus",
@@ -3691,7 +3901,9 @@ __all__ = [
     "configure_native_core_entrypoint",
     "get_native_core_client",
     "native_core_mode",
+    "encode_native_query_page",
     "parse_native_query_page",
+    "parse_native_query_page_columnar",
     "parse_native_encrypted_export_header",
     "resolve_native_core_library",
 ]
@@ -15,9 +15,11 @@ from typing import Any, Callable, Iterator
 
 from . import native_core_raw_key_cache
 from .logging_config import get_logger
+from .metrics import record_cache_lookup, record_db_open
 from .native_core_broker import managed_native_core_operation
 from .native_core_client import (
     NativeCoreClient,
+    NativeCoreColumnarPage,
     NativeCoreDatabase,
     NativeCoreDatabaseAccess,
     NativeCoreDatabaseKeyMode,
@@ -246,6 +248,7 @@ def _acquire_cached_read_database(
                 ):
                     cached.borrowers += 1
                     _read_database_cache[key] = cached
+                    record_cache_lookup("native_read_database", True)
                     return cached
                 database = _retire_read_database_entry_locked(cached)
                 if database is not None:
@@ -281,6 +284,7 @@ def _acquire_cached_read_database(
         if not reserved:
             continue
 
+        record_cache_lookup("native_read_database", False)
         try:
             database = _open_database(client, context, database_path)
         except BaseException:
@@ -645,6 +649,7 @@ def _open_database(
     *,
     access: NativeCoreDatabaseAccess = NativeCoreDatabaseAccess.READ_ONLY,
 ) -> NativeCoreDatabase:
+    record_db_open("native", "realtime")
     _prime_database_raw_keys(context, [database_path])
     raw_key = _cached_database_raw_key(context, database_path)
     if raw_key is not None:
@@ -673,7 +678,9 @@ def _query_once(
     context: _AccountContext,
     database_path: Path,
     sql: str,
-) -> list[dict[str, Any]]:
+    *,
+    columnar: bool = False,
+) -> Any:
     def read_all(database: NativeCoreDatabase) -> list[dict[str, Any]]:
         rows: list[dict[str, Any]] = []
         with database.open_query(sql) as query:
@@ -689,12 +696,30 @@ def _query_once(
                     return rows
         raise NativeCoreRealtimeError("Native-core query exceeded the application page limit.")
 
+    def read_pages(database: NativeCoreDatabase) -> list[NativeCoreColumnarPage]:
+        pages: list[NativeCoreColumnarPage] = []
+        total = 0
+        with database.open_query(sql) as query:
+            for _ in range(_MAX_QUERY_PAGES):
+                page = query.fetch_columns(max_rows=_PAGE_ROWS, max_bytes=_PAGE_BYTES)
+                total += len(page)
+                if total > _MAX_QUERY_ROWS:
+                    raise NativeCoreRealtimeError(
+                        "Native-core query exceeded the application row limit."
+                    )
+                pages.append(page)
+                if not page.has_more:
+                    return pages
+        raise NativeCoreRealtimeError("Native-core query exceeded the application page limit.")
+
+    read = read_pages if columnar else read_all
+
     with managed_native_core_operation(database_root=context.db_storage_dir):
         for attempt in range(2):
             client = get_native_core_client()
             try:
                 with _borrow_cached_read_database(client, context, database_path) as database:
-                    return read_all(database)
+                    return read(database)
             except NativeCoreError as exc:
                 stale_handle = isinstance(exc, NativeCoreUnavailableError) or int(
                     getattr(exc, "status", 0) or 0
@@ -705,12 +730,12 @@ def _query_once(
     raise NativeCoreRealtimeError("Native-core query retry loop ended unexpectedly.")
 
 
-def _query(context: _AccountContext, database_path: Path, sql: str) -> list[dict[str, Any]]:
+def _run_query(context: _AccountContext, database_path: Path, sql: str, *, columnar: bool) -> Any:
     with context.lock:
         if context.closed:
             raise NativeCoreRealtimeError("Native-core account handle is closed.")
         try:
-            return _query_once(context, database_path, sql)
+            return _query_once(context, database_path, sql, columnar=columnar)
         except NativeCorePolicyError as policy_error:
             if policy_error.status not in _REFRESHABLE_POLICY_STATUSES:
                 raise
@@ -718,7 +743,17 @@ def _query(context: _AccountContext, database_path: Path, sql: str) -> list[dict
                 client = get_native_core_client()
                 _close_cached_read_databases(client=client)
                 refresh_native_core_lease(client, NativeCoreFeature.DATABASE_READ)
-            return _query_once(context, database_path, sql)
+            return _query_once(context, database_path, sql, columnar=columnar)
+
+
+def _query(context: _AccountContext, database_path: Path, sql: str) -> list[dict[str, Any]]:
+    return _run_query(context, database_path, sql, columnar=False)
+
+
+def _query_columns(context: _AccountContext, database_path: Path, sql: str) -> list[NativeCoreColumnarPage]:
+    """Like `_query`, but keeps each page columnar so callers decode only the rows they keep."""
+
+    return _run_query(context, database_path, sql, columnar=True)
 
 
 def _initial_raw_key_database_paths(context: _AccountContext) -> tuple[Path, ...]:
@@ -963,24 +998,19 @@ def _message_select_sql(
     )
 
 
-def _message_rows_for_table(
+def _message_pages_for_table(
     context: _AccountContext,
     path: Path,
     table: str,
     **options: Any,
-) -> list[dict[str, Any]]:
+) -> list[NativeCoreColumnarPage]:
     statements = [_message_select_sql(table, **options)]
     statements.append(statements[0].replace("m.source AS msg_source", "NULL AS msg_source"))
     statements.append(statements[-1].replace("m.packed_info_data AS packed_info_data", "NULL AS packed_info_data"))
     last_error: Exception | None = None
     for statement in statements:
         try:
-            rows = _query(context, path, statement)
-            for row in rows:
-                row["_db_path"] = str(path)
-                row["db_name"] = path.name
-                row["table_name"] = table
-            return rows
+            return _query_columns(context, path, statement)
         except Exception as exc:
             last_error = exc
     raise NativeCoreRealtimeError(
@@ -1025,11 +1055,14 @@ def fetch_message_batch(handle: int, cursor: int) -> tuple[list[dict[str, Any]],
     if state is None or state.account_handle != context.handle or state.exhausted:
         return [], False
 
-    candidates: list[dict[str, Any]] = []
+    # Every shard table contributes up to batch_size + 1 candidates, but only batch_size rows
+    # survive the merge. Sort on the integer key columns and decode message bodies only for the
+    # rows that are returned.
+    candidates: list[tuple[tuple[int, int, int, str], NativeCoreColumnarPage, int, Path, str]] = []
     probe = state.batch_size + 1
     for path, table in state.tables:
         key = os.path.normcase(os.fspath(path))
-        rows = _message_rows_for_table(
+        pages = _message_pages_for_table(
             context,
             path,
             table,
@@ -1039,26 +1072,31 @@ def fetch_message_batch(handle: int, cursor: int) -> tuple[list[dict[str, Any]],
             end_timestamp=state.end_timestamp,
             last=state.last_by_path.get(key),
         )
-        candidates.extend(rows)
-
-    candidates.sort(
-        key=lambda row: (
-            int(row.get("create_time") or 0),
-            int(row.get("sort_seq") or 0),
-            int(row.get("local_id") or 0),
-            os.path.normcase(str(row.get("_db_path") or "")),
-        ),
-        reverse=not state.ascending,
-    )
+        for page in pages:
+            if not len(page):
+                continue
+            create_times = page.column("create_time")
+            sort_seqs = page.column("sort_seq")
+            local_ids = page.column("local_id")
+            for index in range(len(page)):
+                sort_key = (
+                    int(create_times[index] or 0),
+                    int(sort_seqs[index] or 0),
+                    int(local_ids[index] or 0),
+                    key,
+                )
+                candidates.append((sort_key, page, index, path, table))
+
+    candidates.sort(key=lambda candidate: candidate[0], reverse=not state.ascending)
     has_more = len(candidates) > state.batch_size
-    selected = candidates[: state.batch_size]
-    for row in selected:
-        path_key = os.path.normcase(str(row.get("_db_path") or ""))
-        state.last_by_path[path_key] = (
-            int(row.get("create_time") or 0),
-            int(row.get("sort_seq") or 0),
-            int(row.get("local_id") or 0),
-        )
+    selected: list[dict[str, Any]] = []
+    for sort_key, page, index, path, table in candidates[: state.batch_size]:
+        row = page.record(index)
+        row["_db_path"] = str(path)
+        row["db_name"] = path.name
+        row["table_name"] = table
+        selected.append(row)
+        state.last_by_path[sort_key[3]] = sort_key[:3]
     if not has_more:
         state.exhausted = True
     return selected, has_more
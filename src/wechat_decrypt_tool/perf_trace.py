@@ -6,6 +6,8 @@ import threading
 import time
 from typing import Any, Callable
 
+from .metrics import METRICS
+
 
 CHAT_REQUEST_PERF_PREFIX = "[perf.chat.request-boundary]"
 _CHAT_MESSAGES_PATH = "/api/chat/messages"
@@ -27,6 +29,7 @@ def create_perf_trace(
     def log(phase: str, **fields: Any) -> None:
         nonlocal last_at
         now = time.perf_counter()
+        METRICS.observe("wcda_perf_phase_duration_seconds", now - last_at, category=category, phase=phase)
         payload = {
             **base_fields,
             **fields,
@@ -105,3 +108,54 @@ class ChatRequestPerfMiddleware:
                 )
 
         await self.app(scope, receive, send)
+
+
+class RequestMetricsMiddleware:
+    """ASGI latency/status metrics for every HTTP route, labelled by route template."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = str(scope.get("method") or "").upper()
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message.get("type") == "http.response.start":
+                status_code = int(message.get("status") or 0)
+            await send(message)
+
+        METRICS.add_gauge("wcda_http_requests_in_flight", 1)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            METRICS.add_gauge("wcda_http_requests_in_flight", -1)
+            route = _route_label(scope)
+            METRICS.observe(
+                "wcda_http_request_duration_seconds",
+                time.perf_counter() - started,
+                route=route,
+                method=method,
+            )
+            METRICS.inc(
+                "wcda_http_requests_total",
+                route=route,
+                method=method,
+                status=f"{status_code // 100}xx",
+            )
+
+
+def _route_label(scope: dict[str, Any]) -> str:
+    # Raw paths carry usernames and file names; only ever label with the template.
+    route = scope.get("route")
+    template = getattr(route, "path", None) if route is not None else None
+    if template:
+        return str(template)
+    path = str(scope.get("path") or "")
+    return "unmatched" if path.startswith("/api/") else "static"
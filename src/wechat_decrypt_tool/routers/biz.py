@@ -1,7 +1,11 @@
+import copy
 import hashlib
+import os
 import sqlite3
+import threading
 import time
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Any, Dict, List
 import urllib
@@ -13,6 +17,7 @@ from ..chat_helpers import _quote_ident, _resolve_account_dir
 from ..media_helpers import _resolve_account_db_storage_dir
 from ..path_fix import PathFixRoute
 from ..logging_config import get_logger
+from ..metrics import record_cache_lookup
 from ..source_fallback import build_source_fallback_meta
 from ..wcdb_realtime import (
     WCDB_REALTIME,
@@ -335,6 +340,118 @@ def parse_pay_xml(xml_str: str, local_id: int) -> Optional[Dict[str, Any]]:
         logger.error(error_msg)
         return None
 
+# 解析结果缓存：同一条服务号消息（库 + 表 + local_id + 内容哈希）只做一次 zstd 解压和 XML 解析，
+# 往回翻页、后台刷新、导出都直接复用。内容变化时哈希不同，自然失效。
+_PARSED_CACHE_MAX_ENTRIES = max(0, int(os.environ.get("WECHAT_TOOL_BIZ_PARSED_CACHE_ENTRIES", "50000") or 0))
+_PARSED_CACHE_MISS = object()
+_parsed_cache_lock = threading.Lock()
+_parsed_cache: "OrderedDict[tuple[str, str, str, str, int, str], Optional[Dict[str, Any]]]" = OrderedDict()
+
+
+def _biz_content_digest(content: Any) -> str:
+    if isinstance(content, memoryview):
+        raw = content.tobytes()
+    elif isinstance(content, (bytes, bytearray)):
+        raw = bytes(content)
+    else:
+        raw = str(content or "").encode("utf-8", errors="surrogatepass")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _parse_biz_rows_cached(
+    *,
+    account_dir: Path,
+    kind: str,
+    db_path: Path,
+    table_name: str,
+    username: str,
+    rows: list[tuple[int, int, Any]],
+    parse: Any,
+) -> list[tuple[int, int, Dict[str, Any]]]:
+    """Parse (local_id, create_time, content) rows, reusing earlier results for unchanged content."""
+    out: list[tuple[int, int, Dict[str, Any]]] = []
+    for local_id, c_time, content in rows:
+        key = (str(account_dir), kind, Path(db_path).stem, table_name, int(local_id), _biz_content_digest(content))
+        with _parsed_cache_lock:
+            parsed = _parsed_cache.get(key, _PARSED_CACHE_MISS)
+            if parsed is not _PARSED_CACHE_MISS:
+                _parsed_cache.move_to_end(key)
+        record_cache_lookup("biz_parsed", parsed is not _PARSED_CACHE_MISS)
+        if parsed is _PARSED_CACHE_MISS:
+            raw_xml = extract_xml_from_db_content(content, username, local_id)
+            parsed = parse(raw_xml, local_id) if raw_xml else None
+            if _PARSED_CACHE_MAX_ENTRIES:
+                with _parsed_cache_lock:
+                    _parsed_cache[key] = parsed
+                    while len(_parsed_cache) > _PARSED_CACHE_MAX_ENTRIES:
+                        _parsed_cache.popitem(last=False)
+        if parsed:
+            # Callers decorate the record; never hand out the cached dict itself.
+            out.append((local_id, c_time, copy.deepcopy(parsed)))
+    return out
+
+
+def _clear_biz_parsed_cache() -> None:
+    with _parsed_cache_lock:
+        _parsed_cache.clear()
+
+
+def _fetch_biz_rows(
+    *,
+    source_norm: str,
+    rt_conn: Any,
+    db_path: Path,
+    table_name: str,
+    type_filter: str,
+    limit: int,
+    offset: int,
+    before_time: Optional[int],
+    before_local_id: Optional[int],
+) -> list[tuple[int, int, Any]]:
+    """Read one page newest-first; a (create_time, local_id) cursor replaces OFFSET when given."""
+    where = f"({type_filter})"
+    if before_time is not None:
+        if before_local_id is not None:
+            where += (
+                f" AND (create_time < {int(before_time)}"
+                f" OR (create_time = {int(before_time)} AND local_id < {int(before_local_id)}))"
+            )
+        else:
+            where += f" AND create_time < {int(before_time)}"
+        page_sql = f"LIMIT {int(limit)}"
+    else:
+        page_sql = f"LIMIT {int(limit)} OFFSET {int(offset)}"
+    query = (
+        "SELECT local_id, create_time, message_content "
+        f"FROM {_quote_ident(table_name)} "
+        f"WHERE {where} "
+        f"ORDER BY create_time DESC, local_id DESC {page_sql}"
+    )
+
+    if source_norm == "realtime" and rt_conn is not None:
+        return [
+            (
+                int((r or {}).get("local_id") or 0),
+                int((r or {}).get("create_time") or 0),
+                (r or {}).get("message_content"),
+            )
+            for r in _exec_realtime_query(rt_conn, db_path, query)
+        ]
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return [(int(r[0] or 0), int(r[1] or 0), r[2]) for r in conn.execute(query).fetchall()]
+    finally:
+        conn.close()
+
+
+def _biz_next_cursor(rows: list[tuple[int, int, Any]], limit: int) -> Optional[Dict[str, int]]:
+    if len(rows) < limit or not rows:
+        return None
+    local_id, c_time, _content = rows[-1]
+    return {"beforeTime": int(c_time), "beforeLocalId": int(local_id)}
+
+
 @router.get("/api/biz/proxy_image", summary="代理请求微信服务号图片")
 def proxy_biz_image(url: str):
     if not url:
@@ -546,6 +663,8 @@ def get_biz_messages(
     limit: int = 50,
     offset: int = 0,
     source: Optional[str] = None,
+    before_time: Optional[int] = None,
+    before_local_id: Optional[int] = None,
 ):
     if username == "gh_3dfda90e39d6":
         raise HTTPException(status_code=400, detail="微信支付记录请请求 /api/biz/pay_records 接口")
@@ -588,51 +707,35 @@ def get_biz_messages(
                 "message": f"未找到 {username} 的消息历史",
             }
 
-    # ... (后续数据库查询逻辑保持不变) ...
     messages = []
     scanned = 0
+    next_cursor = None
     try:
-        if source_norm == "realtime" and rt_conn is not None:
-            query = (
-                "SELECT local_id, create_time, message_content "
-                f"FROM {_quote_ident(table_name)} "
-                "WHERE local_type != 1 "
-                f"ORDER BY create_time DESC LIMIT {int(limit)} OFFSET {int(offset)}"
-            )
-            rows = _exec_realtime_query(rt_conn, target_db, query)
-            iter_rows = [
-                (
-                    int((r or {}).get("local_id") or 0),
-                    int((r or {}).get("create_time") or 0),
-                    (r or {}).get("message_content"),
-                )
-                for r in rows
-            ]
-        else:
-            conn = sqlite3.connect(str(target_db))
-            cursor = conn.cursor()
-
-            query = f"""
-                SELECT local_id, create_time, message_content
-                FROM [{table_name}]
-                WHERE local_type != 1
-                ORDER BY create_time DESC
-                LIMIT ? OFFSET ?
-            """
-            iter_rows = cursor.execute(query, (limit, offset)).fetchall()
-            conn.close()
-
+        iter_rows = _fetch_biz_rows(
+            source_norm=source_norm,
+            rt_conn=rt_conn,
+            db_path=target_db,
+            table_name=table_name,
+            type_filter="local_type != 1",
+            limit=limit,
+            offset=offset,
+            before_time=before_time,
+            before_local_id=before_local_id,
+        )
         scanned = len(iter_rows)
-        for local_id, c_time, content in iter_rows:
-            raw_xml = extract_xml_from_db_content(content, username, local_id)
-            if not raw_xml:
-                continue
-
-            struct_data = parse_wechat_xml_to_struct(raw_xml, username, local_id)
-            if struct_data:
-                struct_data["local_id"] = local_id
-                struct_data["create_time"] = c_time
-                messages.append(struct_data)
+        next_cursor = _biz_next_cursor(iter_rows, limit)
+        for local_id, c_time, struct_data in _parse_biz_rows_cached(
+            account_dir=account_dir,
+            kind="article",
+            db_path=target_db,
+            table_name=table_name,
+            username=username,
+            rows=iter_rows,
+            parse=lambda raw_xml, local_id: parse_wechat_xml_to_struct(raw_xml, username, local_id),
+        ):
+            struct_data["local_id"] = local_id
+            struct_data["create_time"] = c_time
+            messages.append(struct_data)
     except Exception as e:
         logger.error(f"[biz] 数据库查询出错: {e}")
         return {"status": "error", "account": account_dir.name, "source": source_norm, "message": str(e)}
@@ -650,6 +753,7 @@ def get_biz_messages(
         "data": messages,
         "scanned": scanned,
         "hasMore": scanned >= limit,
+        "nextCursor": next_cursor,
     }
 
 
@@ -660,6 +764,8 @@ def get_wechat_pay_records(
     limit: int = 50,
     offset: int = 0,
     source: Optional[str] = None,
+    before_time: Optional[int] = None,
+    before_local_id: Optional[int] = None,
 ):
     username = "gh_3dfda90e39d6"
     limit, offset = _normalize_pagination(limit, offset)
@@ -702,54 +808,39 @@ def get_wechat_pay_records(
 
     messages = []
     scanned = 0
+    next_cursor = None
     try:
-        if source_norm == "realtime" and rt_conn is not None:
-            query = (
-                "SELECT local_id, create_time, message_content "
-                f"FROM {_quote_ident(table_name)} "
-                "WHERE local_type = 21474836529 OR local_type != 1 "
-                f"ORDER BY create_time DESC LIMIT {int(limit)} OFFSET {int(offset)}"
-            )
-            rows = _exec_realtime_query(rt_conn, target_db, query)
-            iter_rows = [
-                (
-                    int((r or {}).get("local_id") or 0),
-                    int((r or {}).get("create_time") or 0),
-                    (r or {}).get("message_content"),
-                )
-                for r in rows
-            ]
-        else:
-            conn = sqlite3.connect(str(target_db))
-            cursor = conn.cursor()
-
-            query = f"""
-                SELECT local_id, create_time, message_content
-                FROM [{table_name}]
-                WHERE local_type = 21474836529 OR local_type != 1
-                ORDER BY create_time DESC
-                LIMIT ? OFFSET ?
-            """
-            iter_rows = cursor.execute(query, (limit, offset)).fetchall()
-            conn.close()
-
+        iter_rows = _fetch_biz_rows(
+            source_norm=source_norm,
+            rt_conn=rt_conn,
+            db_path=target_db,
+            table_name=table_name,
+            type_filter="local_type = 21474836529 OR local_type != 1",
+            limit=limit,
+            offset=offset,
+            before_time=before_time,
+            before_local_id=before_local_id,
+        )
         scanned = len(iter_rows)
-        for local_id, c_time, content in iter_rows:
-            raw_xml = extract_xml_from_db_content(content, username, local_id)
-            if not raw_xml:
-                continue
-
-            parsed_data = parse_pay_xml(raw_xml, local_id)
-            if parsed_data:
-                parsed_data["local_id"] = local_id
-                parsed_data["create_time"] = c_time
-                if not parsed_data["timestamp"]:
-                    parsed_data["timestamp"] = c_time
-
-                parsed_data["formatted_time"] = time.strftime(
-                    "%Y-%m-%d %H:%M:%S", time.localtime(parsed_data["timestamp"])
-                )
-                messages.append(parsed_data)
+        next_cursor = _biz_next_cursor(iter_rows, limit)
+        for local_id, c_time, parsed_data in _parse_biz_rows_cached(
+            account_dir=account_dir,
+            kind="pay",
+            db_path=target_db,
+            table_name=table_name,
+            username=username,
+            rows=iter_rows,
+            parse=parse_pay_xml,
+        ):
+            parsed_data["local_id"] = local_id
+            parsed_data["create_time"] = c_time
+            if not parsed_data["timestamp"]:
+                parsed_data["timestamp"] = c_time
+
+            parsed_data["formatted_time"] = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(parsed_data["timestamp"])
+            )
+            messages.append(parsed_data)
     except Exception as e:
         logger.error(f"[biz] 查询微信支付数据库出错: {e}")
         return {"status": "error", "account": account_dir.name, "source": source_norm, "message": str(e)}
@@ -767,4 +858,5 @@ def get_wechat_pay_records(
         "data": messages,
         "scanned": scanned,
         "hasMore": scanned >= limit,
+        "nextCursor": next_cursor,
     }
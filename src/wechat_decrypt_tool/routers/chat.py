@@ -27,7 +27,11 @@ from ..chat_search_index import (
     get_chat_search_index_status,
     start_chat_search_index_build,
 )
-from ..chat_accounts import list_chat_account_contexts, resolve_chat_account_context
+from ..chat_accounts import (
+    invalidate_chat_account_registry,
+    list_chat_account_contexts,
+    resolve_chat_account_context,
+)
 from ..chat_helpers import (
     _build_avatar_url,
     _build_latest_message_preview,
@@ -80,19 +84,25 @@ from ..chat_helpers import (
 from ..media_helpers import _resolve_account_db_storage_dir, _try_find_decrypted_resource
 from ..app_paths import get_output_dir
 from ..chat_realtime_reader import (
+    RealtimeTableProbe,
     fetch_anchor_via_exec as _shared_fetch_realtime_anchor_via_exec,
     fetch_context_via_exec as _shared_fetch_realtime_context_via_exec,
     fetch_rows_via_cursor as _shared_fetch_realtime_rows_via_cursor,
+    fetch_new_rows_batched_via_exec as _shared_fetch_new_realtime_rows_batched_via_exec,
     fetch_rows_via_exec as _shared_fetch_realtime_rows_via_exec,
+    realtime_bulk_reads,
 )
 from ..database_filters import list_countable_database_names
+from ..db_storage_watch import DB_STORAGE_WATCH, DbStorageChange, change_in_scope
 from ..key_store import remove_account_family_keys_from_store
 from ..path_fix import PathFixRoute
 from ..perf_trace import create_perf_trace, get_request_perf_context
 from ..session_last_message import (
     build_session_last_message_table,
+    fill_missing_session_last_messages,
     get_session_last_message_status,
     load_session_last_messages,
+    update_session_last_messages,
 )
 from ..sqlite_diagnostics import collect_sqlite_diagnostics, format_sqlite_diagnostics
 from ..source_fallback import build_source_fallback_meta
@@ -110,8 +120,10 @@ from ..wcdb_realtime import (
     get_messages as _wcdb_get_messages,
     get_sessions as _wcdb_get_sessions,
     open_message_cursor as _wcdb_open_message_cursor,
+    read_handle as _wcdb_read_handle,
     resolve_account_native_wxid as _wcdb_resolve_account_native_wxid,
 )
+from .chat_contacts import _invalidate_contact_snapshots_for_changes
 
 logger = get_logger(__name__)
 
@@ -122,6 +134,8 @@ router = APIRouter(route_class=PathFixRoute)
 _REALTIME_SYNC_MU = threading.Lock()
 _REALTIME_SYNC_LOCKS: dict[tuple[str, str], threading.Lock] = {}
 _REALTIME_SYNC_ALL_LOCKS: dict[str, threading.Lock] = {}
+# account -> time.time() of the last sync_all pass that ignored per-session watermarks.
+_REALTIME_SYNC_RECONCILED_AT: dict[str, float] = {}
 _REALTIME_STATUS_PROBE_WAIT_SECONDS = 5.25
 _REALTIME_STATUS_PROBE_TASKS: set[asyncio.Task[Any]] = set()
 
@@ -972,48 +986,78 @@ async def stream_chat_realtime_events(
     )
 
     async def gen():
-        try:
-            last_mtime_ns = await asyncio.to_thread(
-                _scan_db_storage_mtime_ns,
-                db_storage_dir,
-                scope=scope_norm,
-            )
-        except Exception:
-            last_mtime_ns = 0
-        last_heartbeat = 0.0
+        # Subscribe before taking the baseline so no write can slip in between the two.
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
 
-        # initial snapshot
-        initial = {
-            "type": "ready",
-            "account": account_dir.name,
-            "dbStorageDir": str(db_storage_dir),
-            "scope": scope_norm,
-            "mtimeNs": int(last_mtime_ns),
-            "ts": int(time.time() * 1000),
-        }
-        yield f"data: {json.dumps(initial, ensure_ascii=False)}\n\n"
+        def on_changes(changes: list[DbStorageChange]) -> None:
+            _invalidate_contact_snapshots_for_changes(account_dir.name, changes)
+            loop.call_soon_threadsafe(queue.put_nowait, changes)
 
+        subscription = DB_STORAGE_WATCH.subscribe(db_storage_dir, on_changes)
         try:
+            try:
+                last_mtime_ns = await asyncio.to_thread(
+                    _scan_db_storage_mtime_ns,
+                    db_storage_dir,
+                    scope=scope_norm,
+                )
+            except Exception:
+                last_mtime_ns = 0
+            last_heartbeat = 0.0
+            last_change_at = 0.0
+
+            # initial snapshot
+            initial = {
+                "type": "ready",
+                "account": account_dir.name,
+                "dbStorageDir": str(db_storage_dir),
+                "scope": scope_norm,
+                "mtimeNs": int(last_mtime_ns),
+                "watch": subscription.mode,
+                "ts": int(time.time() * 1000),
+            }
+            yield f"data: {json.dumps(initial, ensure_ascii=False)}\n\n"
+
             while True:
                 if await request.is_disconnected():
                     break
 
-                # Avoid blocking the event loop on a potentially large directory walk.
-                scan_t0 = time.perf_counter()
-                try:
-                    mtime_ns = await asyncio.to_thread(
-                        _scan_db_storage_mtime_ns,
-                        db_storage_dir,
-                        scope=scope_norm,
-                    )
-                except Exception:
-                    mtime_ns = 0
-                scan_ms = (time.perf_counter() - scan_t0) * 1000.0
-                if scan_ms > 1000:
-                    logger.warning("[realtime] SSE scan slow account=%s ms=%.1f", account_dir.name, scan_ms)
+                mtime_ns = 0
+                if subscription.available:
+                    # Event-driven: sleep until the shared watcher reports a write (or the heartbeat is due).
+                    try:
+                        batch = await asyncio.wait_for(queue.get(), timeout=15.0)
+                    except asyncio.TimeoutError:
+                        batch = []
+                    if batch:
+                        # `interval_ms` now only rate-limits pushes: a burst of writes becomes one event.
+                        wait_s = (interval_ms / 1000.0) - (time.monotonic() - last_change_at)
+                        if wait_s > 0:
+                            await asyncio.sleep(wait_s)
+                        while not queue.empty():
+                            batch.extend(queue.get_nowait())
+                        relevant = [c for c in batch if change_in_scope(c, scope_norm)]
+                        if relevant:
+                            mtime_ns = max(int(c.mtime_ns) for c in relevant) or time.time_ns()
+                else:
+                    # Watcher unavailable on this platform/filesystem: fall back to the mtime scan.
+                    scan_t0 = time.perf_counter()
+                    try:
+                        mtime_ns = await asyncio.to_thread(
+                            _scan_db_storage_mtime_ns,
+                            db_storage_dir,
+                            scope=scope_norm,
+                        )
+                    except Exception:
+                        mtime_ns = 0
+                    scan_ms = (time.perf_counter() - scan_t0) * 1000.0
+                    if scan_ms > 1000:
+                        logger.warning("[realtime] SSE scan slow account=%s ms=%.1f", account_dir.name, scan_ms)
 
                 if mtime_ns and mtime_ns != last_mtime_ns:
                     last_mtime_ns = mtime_ns
+                    last_change_at = time.monotonic()
                     payload = {
                         "type": "change",
                         "account": account_dir.name,
@@ -1029,8 +1073,10 @@ async def stream_chat_realtime_events(
                     last_heartbeat = now
                     yield ": ping\n\n"
 
-                await asyncio.sleep(interval_ms / 1000.0)
+                if not subscription.available:
+                    await asyncio.sleep(interval_ms / 1000.0)
         finally:
+            subscription.close()
             logger.info("[realtime] SSE stream closed account=%s", account_dir.name)
 
     headers = {"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"}
@@ -1421,6 +1467,94 @@ def _load_session_last_message_times(conn: sqlite3.Connection, usernames: list[s
     return out
 
 
+def _ensure_realtime_sync_watermark_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS realtime_sync_watermark (
+            username TEXT PRIMARY KEY,
+            sort_timestamp INTEGER NOT NULL DEFAULT 0,
+            last_timestamp INTEGER NOT NULL DEFAULT 0,
+            last_msg_locald_id INTEGER NOT NULL DEFAULT 0,
+            synced_at INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+def _realtime_session_signature(row: dict[str, Any]) -> tuple[int, int, int]:
+    """(sort_timestamp, last_timestamp, last_msg_locald_id) of a WCDB Session row; any new message changes it."""
+
+    out: list[int] = []
+    for key in ("sort_timestamp", "last_timestamp", "last_msg_locald_id"):
+        try:
+            out.append(int((row or {}).get(key) or 0))
+        except Exception:
+            out.append(0)
+    return out[0], out[1], out[2]
+
+
+def _load_realtime_sync_watermarks(conn: sqlite3.Connection, usernames: list[str]) -> dict[str, tuple[int, int, int]]:
+    """Load the WCDB session signature recorded when each conversation was last synced (or found up to date)."""
+
+    uniq = list(dict.fromkeys([str(u or "").strip() for u in usernames if str(u or "").strip()]))
+    if not uniq:
+        return {}
+
+    out: dict[str, tuple[int, int, int]] = {}
+    chunk_size = 900
+    for i in range(0, len(uniq), chunk_size):
+        chunk = uniq[i : i + chunk_size]
+        placeholders = ",".join(["?"] * len(chunk))
+        try:
+            rows = conn.execute(
+                "SELECT username, sort_timestamp, last_timestamp, last_msg_locald_id "
+                f"FROM realtime_sync_watermark WHERE username IN ({placeholders})",
+                chunk,
+            ).fetchall()
+        except Exception:
+            continue
+        for r in rows:
+            try:
+                out[str(r[0] or "").strip()] = (int(r[1] or 0), int(r[2] or 0), int(r[3] or 0))
+            except Exception:
+                continue
+    return out
+
+
+def _save_realtime_sync_watermarks(account_dir: Path, signatures: dict[str, tuple[int, int, int]]) -> None:
+    if not signatures:
+        return
+    now = int(time.time())
+    conn = sqlite3.connect(str(account_dir / "session.db"))
+    try:
+        _ensure_realtime_sync_watermark_table(conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO realtime_sync_watermark"
+            "(username, sort_timestamp, last_timestamp, last_msg_locald_id, synced_at) VALUES (?, ?, ?, ?, ?)",
+            [(u, int(sig[0]), int(sig[1]), int(sig[2]), now) for u, sig in signatures.items()],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _realtime_sync_reconcile_interval_s() -> int:
+    return _chat_search_env_int(
+        "WECHAT_TOOL_REALTIME_SYNC_RECONCILE_S",
+        1800,
+        min_value=0,
+        max_value=7 * 24 * 3600,
+    )
+
+
+def _realtime_sync_reconcile_due(account: str, now: float) -> bool:
+    interval = _realtime_sync_reconcile_interval_s()
+    if interval <= 0:
+        return True
+    last = float(_REALTIME_SYNC_RECONCILED_AT.get(str(account or "").strip()) or 0.0)
+    return (now - last) >= float(interval)
+
+
 def _load_session_last_message_meta(account_dir: Path, usernames: list[str]) -> dict[str, dict[str, Any]]:
     """Load per-session latest message cache used to correct stale SessionTable rows."""
 
@@ -2188,6 +2322,7 @@ def _sync_chat_realtime_messages_for_table(
     table_name: str,
     max_scan: int,
     backfill_limit: int = 200,
+    prefetched_rows: Optional[list[dict[str, Any]]] = None,
 ) -> dict[str, Any]:
     if max_scan < 50:
         max_scan = 50
@@ -2262,17 +2397,27 @@ def _sync_chat_realtime_messages_for_table(
         placeholders = ",".join(["?"] * len(insert_cols))
         insert_sql = f"INSERT OR IGNORE INTO {quoted_table} ({','.join(insert_cols)}) VALUES ({placeholders})"
         stage = "collect_realtime_rows"
-        fetch_result = _collect_realtime_rows_for_session(
-            trace_id=None,
-            account_name=account_dir.name,
-            rt_conn=rt_conn,
-            username=username,
-            msg_db_path_real=msg_db_path_real,
-            table_name=table_name,
-            max_local_id=max_local_id,
-            max_scan=int(max_scan),
-            backfill_limit=int(backfill_limit),
-        )
+        if prefetched_rows is not None and int(backfill_limit) <= 0:
+            # Rows already fetched by sync_all's batched probe (newest local_id first).
+            fresh = [r for r in prefetched_rows if int(r.get("local_id") or 0) > int(max_local_id)]
+            fetch_result = {
+                "fetchMode": "batched_exec",
+                "scanned": len(prefetched_rows),
+                "new_rows": fresh[: int(max_scan)],
+                "backfill_rows": [],
+            }
+        else:
+            fetch_result = _collect_realtime_rows_for_session(
+                trace_id=None,
+                account_name=account_dir.name,
+                rt_conn=rt_conn,
+                username=username,
+                msg_db_path_real=msg_db_path_real,
+                table_name=table_name,
+                max_local_id=max_local_id,
+                max_scan=int(max_scan),
+                backfill_limit=int(backfill_limit),
+            )
         scanned = int(fetch_result.get("scanned") or 0)
         new_rows = list(fetch_result.get("new_rows") or [])
         backfill_rows = list(fetch_result.get("backfill_rows") or [])
@@ -2480,6 +2625,59 @@ def _sync_chat_realtime_messages_for_table(
             msg_conn.close()
 
 
+def _prefetch_realtime_new_rows(
+    *,
+    account_dir: Path,
+    rt_conn: Any,
+    usernames: list[str],
+    table_map: dict[str, tuple[Path, str]],
+    limit: int,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch new realtime rows for many sessions with one UNION ALL query per message shard.
+
+    The watermark of each session is the MAX(local_id) of its decrypted table. Sessions that are
+    missing from the result (probe failed) fall back to the per-session collect path.
+    """
+
+    by_db: dict[Path, list[tuple[str, str]]] = {}
+    for uname in usernames:
+        resolved = table_map.get(uname)
+        if resolved:
+            by_db.setdefault(resolved[0], []).append((uname, resolved[1]))
+
+    probes: list[RealtimeTableProbe] = []
+    owners: dict[tuple[str, str], str] = {}
+    for msg_db_path, items in by_db.items():
+        try:
+            msg_db_path_real, _res_db_path_real = _resolve_db_storage_message_paths(account_dir, msg_db_path.stem)
+        except HTTPException:
+            continue
+        conn = sqlite3.connect(str(msg_db_path))
+        try:
+            for uname, table_name in items:
+                try:
+                    row = conn.execute(f"SELECT MAX(local_id) FROM {_quote_ident(table_name)}").fetchone()
+                    max_local_id = int((row[0] if row is not None else 0) or 0)
+                except Exception:
+                    continue
+                probes.append(RealtimeTableProbe(msg_db_path_real, table_name, max_local_id))
+                owners[(str(msg_db_path_real), table_name)] = uname
+        finally:
+            conn.close()
+
+    if not probes:
+        return {}
+    with realtime_bulk_reads():
+        rows_by_table = _shared_fetch_new_realtime_rows_batched_via_exec(
+            rt_conn=rt_conn,
+            probes=probes,
+            limit=int(limit),
+            exec_query=_wcdb_exec_query,
+            normalize_item=_normalize_realtime_message_item,
+        )
+    return {owners[key]: rows for key, rows in rows_by_table.items() if key in owners}
+
+
 @router.post("/api/chat/realtime/sync_all", summary="实时消息同步到解密库（全会话增量）")
 def sync_chat_realtime_messages_all(
     request: Request,
@@ -2491,11 +2689,15 @@ def sync_chat_realtime_messages_all(
     include_official: bool = True,
     only_official: bool = False,
     backfill_limit: int = 200,
+    full_reconcile: Optional[bool] = None,
 ):
     """
     全量会话同步（增量）：遍历会话列表，对每个会话调用与 /realtime/sync 相同的“遇到已同步 local_id 即停止”逻辑。
 
     说明：这是增量同步，不会每次全表扫描；priority_username 会优先同步并可设置更大的 priority_max_scan。
+    每个会话同步后记录其 WCDB Session 签名（sort_timestamp / last_timestamp / last_msg_locald_id），
+    之后只同步签名发生变化的会话；按 WECHAT_TOOL_REALTIME_SYNC_RECONCILE_S（默认 30 分钟）周期性地
+    忽略签名做一次完整核对，也可通过 full_reconcile=true 强制。
     """
     account_dir = _resolve_account_dir(account)
     trace_id = f"rt-syncall-{int(time.time() * 1000)}-{threading.get_ident()}"
@@ -2644,7 +2846,13 @@ def sync_chat_realtime_messages_all(
 
         # Keep SessionTable fresh for UI consistency, and use session_last_message.create_time as the
         # "sync watermark" (instead of SessionTable timestamps) to decide whether a session needs syncing.
+        reconcile = (
+            bool(full_reconcile)
+            if full_reconcile is not None
+            else _realtime_sync_reconcile_due(account_dir.name, started)
+        )
         decrypted_ts_by_user: dict[str, int] = {}
+        watermarks: dict[str, tuple[int, int, int]] = {}
         if all_usernames:
             try:
                 session_db_path = account_dir / "session.db"
@@ -2689,6 +2897,8 @@ def sync_chat_realtime_messages_all(
                             pass
 
                     decrypted_ts_by_user = _load_session_last_message_times(sconn, all_usernames)
+                    if not reconcile:
+                        watermarks = _load_realtime_sync_watermarks(sconn, all_usernames)
                 finally:
                     try:
                         sconn.close()
@@ -2699,21 +2909,33 @@ def sync_chat_realtime_messages_all(
 
         sync_usernames: list[str] = []
         skipped_up_to_date = 0
+        skipped_unchanged = 0
+        signatures: dict[str, tuple[int, int, int]] = {}
+        new_watermarks: dict[str, tuple[int, int, int]] = {}
         for ts, u in sessions:
             if not u:
                 continue
+            sig = _realtime_session_signature(realtime_rows_by_user.get(u) or {})
+            signatures[u] = sig
+            wm = watermarks.get(u)
+            if wm is not None and wm == sig:
+                skipped_unchanged += 1
+                continue
             local_ts = int(decrypted_ts_by_user.get(u) or 0)
             if ts and local_ts and local_ts >= int(ts):
                 skipped_up_to_date += 1
+                new_watermarks[u] = sig
                 continue
             sync_usernames.append(u)
 
         logger.info(
-            "[%s] sessions need_sync account=%s need_sync=%s skipped_up_to_date=%s",
+            "[%s] sessions need_sync account=%s need_sync=%s skipped_unchanged=%s skipped_up_to_date=%s reconcile=%s",
             trace_id,
             account_dir.name,
             len(sync_usernames),
+            int(skipped_unchanged),
             int(skipped_up_to_date),
+            bool(reconcile),
         )
 
         if priority and priority in sync_usernames:
@@ -2728,11 +2950,36 @@ def sync_chat_realtime_messages_all(
             len(sync_usernames),
         )
 
+        # Without backfill, a session only needs rows above its decrypted watermark: probe all of them
+        # with a few batched native calls instead of one round trip (or more) per session.
+        prefetched: dict[str, list[dict[str, Any]]] = {}
+        if int(backfill_limit) <= 0 and sync_usernames:
+            batch_usernames = [u for u in sync_usernames if not (priority and u == priority)]
+            try:
+                prefetched = _prefetch_realtime_new_rows(
+                    account_dir=account_dir,
+                    rt_conn=rt_conn,
+                    usernames=batch_usernames,
+                    table_map=table_map,
+                    limit=int(max_scan),
+                )
+            except Exception:
+                logger.warning("[%s] batched realtime probe failed account=%s", trace_id, account_dir.name, exc_info=True)
+                prefetched = {}
+            logger.info(
+                "[%s] batched realtime probe account=%s sessions=%s prefetched=%s",
+                trace_id,
+                account_dir.name,
+                len(batch_usernames),
+                len(prefetched),
+            )
+
         scanned_total = 0
         inserted_total = 0
         synced = 0
         skipped_missing_table = 0
         updated_sessions = 0
+        touched_usernames: list[str] = []
         errors: list[str] = []
 
         for uname in sync_usernames:
@@ -2753,13 +3000,16 @@ def sync_chat_realtime_messages_all(
                         table_name=table_name,
                         max_scan=int(cur_scan),
                         backfill_limit=int(backfill_limit),
+                        prefetched_rows=prefetched.get(uname),
                     )
                 synced += 1
+                new_watermarks[uname] = signatures.get(uname) or (0, 0, 0)
                 scanned_total += int(result.get("scanned") or 0)
                 ins = int(result.get("inserted") or 0)
                 inserted_total += ins
                 if ins:
                     updated_sessions += 1
+                    touched_usernames.append(uname)
                     logger.info(
                         "[%s] synced session account=%s username=%s inserted=%s scanned=%s",
                         trace_id,
@@ -2792,6 +3042,27 @@ def sync_chat_realtime_messages_all(
                 )
                 continue
 
+        if touched_usernames:
+            # The per-session write takes the newest *inserted* row, which can be older than what the shards
+            # already hold (gap fills, sessions split across shards); recompute just the touched rows.
+            try:
+                update_session_last_messages(account_dir, touched_usernames)
+            except Exception:
+                logger.warning(
+                    "[%s] session_last_message update failed account=%s sessions=%s",
+                    trace_id,
+                    account_dir.name,
+                    len(touched_usernames),
+                    exc_info=True,
+                )
+
+        try:
+            _save_realtime_sync_watermarks(account_dir, new_watermarks)
+        except Exception:
+            logger.warning("[%s] save sync watermarks failed account=%s", trace_id, account_dir.name, exc_info=True)
+        if reconcile and not errors:
+            _REALTIME_SYNC_RECONCILED_AT[account_dir.name] = started
+
         elapsed_ms = int((time.time() - started) * 1000)
         if len(errors) > 20:
             errors = errors[:20] + [f"... and {len(errors) - 20} more"]
@@ -2815,6 +3086,8 @@ def sync_chat_realtime_messages_all(
             "sessionsTotal": len(all_usernames),
             "sessionsNeedSync": len(sync_usernames),
             "sessionsSkippedUpToDate": int(skipped_up_to_date),
+            "sessionsSkippedUnchanged": int(skipped_unchanged),
+            "fullReconcile": bool(reconcile),
             "sessionsResolved": len(table_map),
             "sessionsSynced": int(synced),
             "sessionsUpdated": int(updated_sessions),
@@ -3934,11 +4207,11 @@ def _postprocess_full_messages(
         need_avatar = list(dict.fromkeys(need_avatar))
         if (need_display or need_avatar) and not account_prefers_decrypted_snapshot(account_dir):
             wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
-            with wcdb_conn.lock:
+            with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
                 if need_display:
-                    wcdb_display_names = _wcdb_get_display_names(wcdb_conn.handle, need_display)
+                    wcdb_display_names = _wcdb_get_display_names(wcdb_handle, need_display)
                 if need_avatar:
-                    wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_conn.handle, need_avatar)
+                    wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_handle, need_avatar)
     except Exception:
         wcdb_display_names = {}
         wcdb_avatar_urls = {}
@@ -4600,6 +4873,7 @@ def delete_chat_account(account: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"清理账号密钥缓存失败：{e}")
 
+    invalidate_chat_account_registry()
     accounts = _list_decrypted_accounts()
     return {
         "status": "success",
@@ -4667,8 +4941,8 @@ def list_chat_sessions(
             logger.info("[%s] wcdb connected account=%s handle=%s", trace_id, account_dir.name, int(conn.handle))
             logger.info("[%s] wcdb_get_sessions account=%s", trace_id, account_dir.name)
             wcdb_t0 = time.perf_counter()
-            with conn.lock:
-                raw = _wcdb_get_sessions(conn.handle)
+            with _wcdb_read_handle(conn) as wcdb_handle:
+                raw = _wcdb_get_sessions(wcdb_handle)
             wcdb_ms = (time.perf_counter() - wcdb_t0) * 1000.0
             logger.info(
                 "[%s] wcdb_get_sessions done account=%s sessions=%s ms=%.1f",
@@ -4890,8 +5164,8 @@ def list_chat_sessions(
                 if can_connect:
                     wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
             if wcdb_conn is not None:
-                with wcdb_conn.lock:
-                    wcdb_display_names = _wcdb_get_display_names(wcdb_conn.handle, need_display)
+                with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
+                    wcdb_display_names = _wcdb_get_display_names(wcdb_handle, need_display)
     except Exception:
         wcdb_display_names = {}
 
@@ -4923,6 +5197,14 @@ def list_chat_sessions(
                     include_official=True,
                 )
                 last_previews = load_session_last_messages(account_dir, usernames)
+            elif usernames:
+                missing = [u for u in usernames if u not in last_previews]
+                if missing:
+                    # Sessions added after the last build (e.g. upserted by realtime sync): fill just those rows,
+                    # once per session.db state so sessions SessionTable lacks are not recomputed on every GET.
+                    filled = fill_missing_session_last_messages(account_dir, missing)
+                    if filled:
+                        last_previews.update(load_session_last_messages(account_dir, filled))
         except Exception:
             logger.exception(
                 "[sessions.list] session_last_message preview load failed account=%s preview_mode=%s usernames=%s diag=%s",
@@ -4979,8 +5261,8 @@ def list_chat_sessions(
     if unresolved and not account_prefers_decrypted_snapshot(account_dir):
         try:
             wcdb_conn = rt_conn or WCDB_REALTIME.ensure_connected(account_dir)
-            with wcdb_conn.lock:
-                wcdb_names = _wcdb_get_display_names(wcdb_conn.handle, unresolved)
+            with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
+                wcdb_names = _wcdb_get_display_names(wcdb_handle, unresolved)
             for sender_username in unresolved:
                 wcdb_name = str(wcdb_names.get(sender_username) or "").strip()
                 if wcdb_name and wcdb_name != sender_username:
@@ -5809,8 +6091,8 @@ def _fetch_realtime_message_rows(
 
     while scanned < max_scan:
         take = min(batch_size, max_scan - scanned)
-        with rt_conn.lock:
-            raw_rows = _wcdb_get_messages(rt_conn.handle, username, limit=take, offset=offset)
+        with _wcdb_read_handle(rt_conn) as wcdb_handle:
+            raw_rows = _wcdb_get_messages(wcdb_handle, username, limit=take, offset=offset)
         if not raw_rows:
             break
 
@@ -6497,8 +6779,8 @@ def list_chat_messages(
                     used_cursor = False
 
             if not used_exec_query and not used_cursor:
-                with rt_conn.lock:
-                    raw_rows = _wcdb_get_messages(rt_conn.handle, username, limit=probe, offset=0)
+                with _wcdb_read_handle(rt_conn) as wcdb_handle:
+                    raw_rows = _wcdb_get_messages(wcdb_handle, username, limit=probe, offset=0)
                 has_more_any = len(raw_rows) > int(scan_take)
                 raw_rows = raw_rows[: int(scan_take)] if int(scan_take) > 0 else []
                 norm_rows = [_normalize_realtime_message_item(r) for r in raw_rows if isinstance(r, dict)]
@@ -7322,8 +7604,8 @@ def list_chat_messages(
         need_display = list(dict.fromkeys(need_display))
         if need_display and not account_prefers_decrypted_snapshot(account_dir):
             wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
-            with wcdb_conn.lock:
-                wcdb_display_names = _wcdb_get_display_names(wcdb_conn.handle, need_display)
+            with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
+                wcdb_display_names = _wcdb_get_display_names(wcdb_handle, need_display)
     except Exception:
         wcdb_display_names = {}
 
@@ -8050,11 +8332,11 @@ async def _search_chat_messages_via_fts(
                 and not account_prefers_decrypted_snapshot(account_dir)
             ):
                 wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
-                with wcdb_conn.lock:
+                with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
                     if need_display:
-                        wcdb_display_names = _wcdb_get_display_names(wcdb_conn.handle, need_display)
+                        wcdb_display_names = _wcdb_get_display_names(wcdb_handle, need_display)
                     if need_avatar:
-                        wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_conn.handle, need_avatar)
+                        wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_handle, need_avatar)
         except Exception:
             wcdb_display_names = {}
             wcdb_avatar_urls = {}
@@ -8139,11 +8421,11 @@ async def _search_chat_messages_via_fts(
                 and not account_prefers_decrypted_snapshot(account_dir)
             ):
                 wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
-                with wcdb_conn.lock:
+                with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
                     if need_display:
-                        wcdb_display_names = _wcdb_get_display_names(wcdb_conn.handle, need_display)
+                        wcdb_display_names = _wcdb_get_display_names(wcdb_handle, need_display)
                     if need_avatar:
-                        wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_conn.handle, need_avatar)
+                        wcdb_avatar_urls = _wcdb_get_avatar_urls(wcdb_handle, need_avatar)
         except Exception:
             wcdb_display_names = {}
             wcdb_avatar_urls = {}
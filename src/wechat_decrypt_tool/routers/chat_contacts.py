@@ -4,8 +4,10 @@ import html
 import json
 import re
 import sqlite3
+import threading
 import unicodedata
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
@@ -35,6 +37,8 @@ from ..chat_helpers import (
     _resolve_account_dir,
     _should_keep_session,
 )
+from ..media_helpers import _resolve_account_db_storage_dir
+from ..metrics import record_cache_lookup
 from ..path_fix import PathFixRoute
 from ..source_fallback import build_source_fallback_meta
 from ..export_integrity import (
@@ -1856,7 +1860,7 @@ def _collect_contacts_for_account_realtime(
     return contacts
 
 
-def _collect_contacts_for_account(
+def _collect_contacts_for_account_decrypted(
     *,
     account_dir: Path,
     base_url: str,
@@ -1868,7 +1872,6 @@ def _collect_contacts_for_account(
     include_official_services: Optional[bool] = None,
     include_former_friends: bool = False,
     include_blocked: bool = False,
-    source: Optional[str] = None,
 ) -> list[dict[str, Any]]:
     official_subscriptions, official_services = _resolve_official_filter(
         include_officials,
@@ -1878,21 +1881,6 @@ def _collect_contacts_for_account(
     if not any([include_friends, include_groups, official_subscriptions, official_services, include_former_friends, include_blocked]):
         return []
 
-    source_norm = _resolve_contacts_source_for_account(_normalize_contacts_source(source), account_dir)
-    if source_norm == "realtime":
-        return _collect_contacts_for_account_realtime(
-            account_dir=account_dir,
-            base_url=base_url,
-            keyword=keyword,
-            include_friends=include_friends,
-            include_groups=include_groups,
-            include_officials=include_officials,
-            include_official_subscriptions=include_official_subscriptions,
-            include_official_services=include_official_services,
-            include_former_friends=include_former_friends,
-            include_blocked=include_blocked,
-        )
-
     contact_db_path = account_dir / "contact.db"
     session_db_path = account_dir / "session.db"
     contact_rows = _load_contact_rows_map(contact_db_path, include_stranger=True)
@@ -2028,6 +2016,187 @@ def _collect_contacts_for_account(
     return contacts
 
 
+# 联系人快照：每个账号只在 contact.db / session.db（或 db_storage 里对应的 WCDB 文件）变化后
+# 重新解析一次 extra_buffer、地区和拼音，列表筛选、搜索和导出都直接在快照上完成。
+_CONTACT_SNAPSHOT_FIELDS = (
+    "username",
+    "displayName",
+    "remark",
+    "nickname",
+    "alias",
+    "region",
+    "source",
+    "country",
+    "province",
+    "city",
+)
+_CONTACT_SNAPSHOT_MAX_ENTRIES = 16
+_CONTACT_SNAPSHOTS: dict[tuple[str, str, str], "_ContactSnapshot"] = {}
+_CONTACT_SNAPSHOT_BUILD_LOCKS: dict[tuple[str, str, str], threading.Lock] = {}
+_CONTACT_SNAPSHOT_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class _ContactSnapshot:
+    signature: tuple[tuple[str, int, int], ...]
+    # (contact, lowercase search text) in list order, pinyin and region already resolved.
+    entries: tuple[tuple[dict[str, Any], str], ...]
+
+
+def _contact_snapshot_search_text(item: dict[str, Any]) -> str:
+    return "\x00".join(_normalize_text(item.get(field, "")).lower() for field in _CONTACT_SNAPSHOT_FIELDS)
+
+
+def _contact_snapshot_source_files(account_dir: Path, source_norm: str) -> list[Path]:
+    if source_norm == "realtime":
+        db_storage_dir = _resolve_account_db_storage_dir(account_dir)
+        if db_storage_dir is None:
+            return []
+        contact_db = db_storage_dir / "contact" / "contact.db"
+        session_db = db_storage_dir / "session" / "session.db"
+    else:
+        contact_db = account_dir / "contact.db"
+        session_db = account_dir / "session.db"
+    return [
+        contact_db,
+        contact_db.with_name(contact_db.name + "-wal"),
+        session_db,
+        session_db.with_name(session_db.name + "-wal"),
+    ]
+
+
+def _contact_snapshot_signature(account_dir: Path, source_norm: str) -> Optional[tuple[tuple[str, int, int], ...]]:
+    paths = _contact_snapshot_source_files(account_dir, source_norm)
+    if not paths:
+        return None
+    signature: list[tuple[str, int, int]] = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            signature.append((path.name, -1, -1))
+            continue
+        signature.append((path.name, int(st.st_mtime_ns), int(st.st_size)))
+    if all(mtime < 0 for _name, mtime, _size in signature):
+        # Nothing to watch: the realtime source lives elsewhere, so always read it fresh.
+        return None
+    return tuple(signature)
+
+
+def _build_contact_snapshot_entries(*, account_dir: Path, base_url: str, source_norm: str) -> tuple[tuple[dict[str, Any], str], ...]:
+    collect = _collect_contacts_for_account_realtime if source_norm == "realtime" else _collect_contacts_for_account_decrypted
+    contacts = collect(
+        account_dir=account_dir,
+        base_url=base_url,
+        keyword=None,
+        include_friends=True,
+        include_groups=True,
+        include_officials=True,
+        include_former_friends=True,
+        include_blocked=True,
+    )
+    return tuple((item, _contact_snapshot_search_text(item)) for item in contacts)
+
+
+def _get_contact_snapshot_entries(*, account_dir: Path, base_url: str, source_norm: str) -> tuple[tuple[dict[str, Any], str], ...]:
+    signature = _contact_snapshot_signature(account_dir, source_norm)
+    if signature is None:
+        return _build_contact_snapshot_entries(account_dir=account_dir, base_url=base_url, source_norm=source_norm)
+
+    key = (str(account_dir), source_norm, str(base_url or ""))
+    with _CONTACT_SNAPSHOT_LOCK:
+        cached = _CONTACT_SNAPSHOTS.get(key)
+        if cached is not None and cached.signature == signature:
+            record_cache_lookup("contact_snapshot", True)
+            return cached.entries
+        build_lock = _CONTACT_SNAPSHOT_BUILD_LOCKS.setdefault(key, threading.Lock())
+
+    # One build per account at a time; concurrent requests wait and reuse the result.
+    with build_lock:
+        signature = _contact_snapshot_signature(account_dir, source_norm)
+        with _CONTACT_SNAPSHOT_LOCK:
+            cached = _CONTACT_SNAPSHOTS.get(key)
+        if cached is not None and cached.signature == signature:
+            return cached.entries
+
+        record_cache_lookup("contact_snapshot", False)
+        entries = _build_contact_snapshot_entries(account_dir=account_dir, base_url=base_url, source_norm=source_norm)
+        # Re-stat after the build so a write that landed mid-build forces the next request to rebuild.
+        if signature is not None and signature == _contact_snapshot_signature(account_dir, source_norm):
+            with _CONTACT_SNAPSHOT_LOCK:
+                _CONTACT_SNAPSHOTS.pop(key, None)
+                _CONTACT_SNAPSHOTS[key] = _ContactSnapshot(signature=signature, entries=entries)
+                while len(_CONTACT_SNAPSHOTS) > _CONTACT_SNAPSHOT_MAX_ENTRIES:
+                    oldest = next(iter(_CONTACT_SNAPSHOTS))
+                    _CONTACT_SNAPSHOTS.pop(oldest, None)
+                    _CONTACT_SNAPSHOT_BUILD_LOCKS.pop(oldest, None)
+        return entries
+
+
+def _invalidate_contact_snapshots(account: Optional[str] = None) -> None:
+    with _CONTACT_SNAPSHOT_LOCK:
+        if account is None:
+            _CONTACT_SNAPSHOTS.clear()
+            return
+        for key in [k for k in _CONTACT_SNAPSHOTS if Path(k[0]).name == account]:
+            _CONTACT_SNAPSHOTS.pop(key, None)
+
+
+def _invalidate_contact_snapshots_for_changes(account: str, changes: list[Any]) -> None:
+    """db_storage 监听回调：contact/session 目录有写入就丢弃该账号的快照。
+
+    WCDB 会在同一秒内原地覆写 WAL 页，mtime/size 签名可能看不出变化；监听事件才是准的。
+    """
+
+    if any(c.bucket in ("contact", "session") and not c.is_shm for c in changes):
+        _invalidate_contact_snapshots(str(account or ""))
+
+
+def _collect_contacts_for_account(
+    *,
+    account_dir: Path,
+    base_url: str,
+    keyword: Optional[str],
+    include_friends: bool,
+    include_groups: bool,
+    include_officials: bool,
+    include_official_subscriptions: Optional[bool] = None,
+    include_official_services: Optional[bool] = None,
+    include_former_friends: bool = False,
+    include_blocked: bool = False,
+    source: Optional[str] = None,
+) -> list[dict[str, Any]]:
+    official_subscriptions, official_services = _resolve_official_filter(
+        include_officials,
+        include_official_subscriptions,
+        include_official_services,
+    )
+    if not any([include_friends, include_groups, official_subscriptions, official_services, include_former_friends, include_blocked]):
+        return []
+
+    source_norm = _resolve_contacts_source_for_account(_normalize_contacts_source(source), account_dir)
+    entries = _get_contact_snapshot_entries(account_dir=account_dir, base_url=base_url, source_norm=source_norm)
+
+    kw = _normalize_text(keyword).lower()
+    contacts: list[dict[str, Any]] = []
+    for item, search_text in entries:
+        if kw and kw not in search_text:
+            continue
+        if not _contact_type_selected(
+            item,
+            include_friends=bool(include_friends),
+            include_groups=bool(include_groups),
+            include_official_subscriptions=official_subscriptions,
+            include_official_services=official_services,
+            include_former_friends=bool(include_former_friends),
+            include_blocked=bool(include_blocked),
+        ):
+            continue
+        # Callers decorate the rows (export, counts); keep the snapshot itself untouched.
+        contacts.append(dict(item))
+    return contacts
+
+
 def _build_counts(contacts: list[dict[str, Any]]) -> dict[str, int]:
     counts = {
         "friends": 0,
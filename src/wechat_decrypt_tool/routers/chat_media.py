@@ -4,6 +4,7 @@ from functools import lru_cache
 import hashlib
 import html
 import ipaddress
+import json
 import mimetypes
 import os
 import sqlite3
@@ -11,9 +12,12 @@ import subprocess
 import sys
 import time
 import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Optional
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 import requests
 from fastapi import APIRouter, HTTPException, Request
@@ -29,6 +33,7 @@ from ..avatar_cache import (
     cache_key_for_avatar_user,
     cache_key_for_avatar_url,
     get_avatar_cache_url_entry,
+    get_avatar_cache_user_entries,
     get_avatar_cache_user_entry,
     is_avatar_cache_enabled,
     normalize_avatar_source_url,
@@ -66,6 +71,7 @@ from ..media_helpers import (
 )
 from .. import cdn_image_service
 from ..chat_helpers import (
+    _build_avatar_url,
     _decode_message_content,
     _extract_md5_from_packed_info,
     _extract_xml_attr,
@@ -76,7 +82,13 @@ from ..chat_helpers import (
 )
 from ..path_fix import PathFixRoute
 from ..perf_trace import create_perf_trace
-from ..wcdb_realtime import WCDB_REALTIME, exec_query as _wcdb_exec_query, get_avatar_urls as _wcdb_get_avatar_urls
+from ..wcdb_realtime import (
+    WCDB_REALTIME,
+    exec_query as _wcdb_exec_query,
+    get_avatar_urls as _wcdb_get_avatar_urls,
+    read_handle as _wcdb_read_handle,
+)
+from ..voice_audio import convert_voice_for_browser, lookup_cached_voice_audio
 from ..voice_transcription import (
     VOICE_MODEL_DOWNLOAD_MANAGER,
     VOICE_TRANSCRIPTION_BATCH_MANAGER,
@@ -604,8 +616,8 @@ def _resolve_avatar_remote_url(
     if prefer_realtime:
         try:
             wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
-            with wcdb_conn.lock:
-                mp = _wcdb_get_avatar_urls(wcdb_conn.handle, [u])
+            with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
+                mp = _wcdb_get_avatar_urls(wcdb_handle, [u])
             wa = str(mp.get(u) or "").strip()
             if wa.lower().startswith(("http://", "https://")):
                 return normalize_avatar_source_url(wa)
@@ -1264,6 +1276,135 @@ def _fast_probe_record_video_in_chat_attach(
     return None
 
 
+def _download_remote_avatar(
+    source_url: str,
+    *,
+    etag: str,
+    last_modified: str,
+) -> tuple[bytes, str, str, str, bool]:
+    base_headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
+        "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+    }
+
+    header_variants = [
+        {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36 MicroMessenger/7.0.20.1781(0x6700143B) WindowsWechat(0x63090719) XWEB/8351",
+            "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+            "Accept-Language": "zh-CN,zh;q=0.9",
+            "Referer": "https://servicewechat.com/",
+            "Origin": "https://servicewechat.com",
+            "Range": "bytes=0-",
+        },
+        {"Referer": "https://wx.qq.com/", "Origin": "https://wx.qq.com"},
+        {"Referer": "https://mp.weixin.qq.com/", "Origin": "https://mp.weixin.qq.com"},
+        {"Referer": "https://www.baidu.com/", "Origin": "https://www.baidu.com"},
+        {},
+    ]
+
+    last_err: Exception | None = None
+    for extra in header_variants:
+        headers = dict(base_headers)
+        headers.update(extra)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        r = requests.get(source_url, headers=headers, timeout=20, stream=True)
+        try:
+            if r.status_code == 304:
+                e2, lm2 = _parse_304_headers(r.headers)
+                return b"", "", (e2 or etag), (lm2 or last_modified), True
+            r.raise_for_status()
+            content_type = str(r.headers.get("Content-Type") or "").strip()
+            e2, lm2 = _parse_304_headers(r.headers)
+            max_bytes = 10 * 1024 * 1024
+            chunks: list[bytes] = []
+            total = 0
+            for ch in r.iter_content(chunk_size=64 * 1024):
+                if not ch:
+                    continue
+                chunks.append(ch)
+                total += len(ch)
+                if total > max_bytes:
+                    raise HTTPException(status_code=400, detail="Avatar too large (>10MB).")
+            return b"".join(chunks), content_type, e2, lm2, False
+        except HTTPException:
+            raise
+        except Exception as e:
+            last_err = e
+        finally:
+            try:
+                r.close()
+            except Exception:
+                pass
+
+    raise last_err or RuntimeError("avatar remote download failed")
+
+
+def _bind_user_avatar_entry(account_name: str, user_key: str, remote_url: str, entry: dict[str, Any]) -> None:
+    """Point the user-key cache record at an URL-keyed file so the next lookup is direct."""
+    try:
+        upsert_avatar_cache_entry(
+            account_name,
+            cache_key=cache_key_for_avatar_user(user_key),
+            source_kind="user",
+            username=user_key,
+            source_url=remote_url,
+            source_md5=str(entry.get("source_md5") or ""),
+            source_update_time=int(entry.get("source_update_time") or 0),
+            rel_path=str(entry.get("rel_path") or ""),
+            media_type=str(entry.get("media_type") or "application/octet-stream"),
+            size_bytes=int(entry.get("size_bytes") or 0),
+            etag=str(entry.get("etag") or ""),
+            last_modified=str(entry.get("last_modified") or ""),
+            fetched_at=int(entry.get("fetched_at") or 0),
+            checked_at=int(entry.get("checked_at") or 0),
+            expires_at=int(entry.get("expires_at") or 0),
+        )
+    except Exception:
+        pass
+
+
+def _cache_remote_avatar_payload(
+    account_name: str,
+    user_key: str,
+    remote_url: str,
+    *,
+    payload: bytes,
+    content_type: str,
+    etag: str,
+    last_modified: str,
+) -> Optional[tuple[dict[str, Any], Path]]:
+    payload2, media_type, _ext = _detect_media_type_and_ext(payload)
+    if media_type == "application/octet-stream" and content_type:
+        try:
+            mt = content_type.split(";")[0].strip()
+            if mt.startswith("image/"):
+                media_type = mt
+        except Exception:
+            pass
+    if not str(media_type or "").startswith("image/"):
+        return None
+    entry, out_path = write_avatar_cache_payload(
+        account_name,
+        source_kind="url",
+        username=user_key,
+        source_url=remote_url,
+        payload=payload2,
+        media_type=media_type,
+        etag=etag,
+        last_modified=last_modified,
+        ttl_seconds=AVATAR_CACHE_TTL_SECONDS,
+    )
+    if not entry or not out_path:
+        return None
+    # bind user-key record to same file for quicker next access
+    _bind_user_avatar_entry(account_name, user_key, remote_url, entry)
+    return entry, out_path
+
+
 @router.get("/api/chat/avatar", summary="获取联系人头像")
 @router.head("/api/chat/avatar", include_in_schema=False)
 async def get_chat_avatar(username: str, account: Optional[str] = None, source: str = "auto"):
@@ -1422,26 +1563,7 @@ async def get_chat_avatar(username: str, account: Optional[str] = None, source:
             logger.debug(f"[avatar_cache_hit] kind=url account={account_name} username={user_key}")
             touch_avatar_cache_entry(account_name, str(url_entry.get("cache_key") or ""))
             # Keep user-key mapping aligned, so next user lookup is direct.
-            try:
-                upsert_avatar_cache_entry(
-                    account_name,
-                    cache_key=cache_key_for_avatar_user(user_key),
-                    source_kind="user",
-                    username=user_key,
-                    source_url=remote_url,
-                    source_md5=str(url_entry.get("source_md5") or ""),
-                    source_update_time=int(url_entry.get("source_update_time") or 0),
-                    rel_path=str(url_entry.get("rel_path") or ""),
-                    media_type=str(url_entry.get("media_type") or "application/octet-stream"),
-                    size_bytes=int(url_entry.get("size_bytes") or 0),
-                    etag=str(url_entry.get("etag") or ""),
-                    last_modified=str(url_entry.get("last_modified") or ""),
-                    fetched_at=int(url_entry.get("fetched_at") or 0),
-                    checked_at=int(url_entry.get("checked_at") or 0),
-                    expires_at=int(url_entry.get("expires_at") or 0),
-                )
-            except Exception:
-                pass
+            _bind_user_avatar_entry(account_name, user_key, remote_url, url_entry)
             headers = build_avatar_cache_response_headers(url_entry)
             trace("response:ready", result="url-cache-hit", mediaType=str(url_entry.get("media_type") or ""))
             return FileResponse(
@@ -1451,72 +1573,6 @@ async def get_chat_avatar(username: str, account: Optional[str] = None, source:
             )
 
         # Revalidate / download remote avatar
-        def _download_remote_avatar(
-            source_url: str,
-            *,
-            etag: str,
-            last_modified: str,
-        ) -> tuple[bytes, str, str, str, bool]:
-            base_headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36",
-                "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
-            }
-
-            header_variants = [
-                {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36 MicroMessenger/7.0.20.1781(0x6700143B) WindowsWechat(0x63090719) XWEB/8351",
-                    "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-                    "Accept-Language": "zh-CN,zh;q=0.9",
-                    "Referer": "https://servicewechat.com/",
-                    "Origin": "https://servicewechat.com",
-                    "Range": "bytes=0-",
-                },
-                {"Referer": "https://wx.qq.com/", "Origin": "https://wx.qq.com"},
-                {"Referer": "https://mp.weixin.qq.com/", "Origin": "https://mp.weixin.qq.com"},
-                {"Referer": "https://www.baidu.com/", "Origin": "https://www.baidu.com"},
-                {},
-            ]
-
-            last_err: Exception | None = None
-            for extra in header_variants:
-                headers = dict(base_headers)
-                headers.update(extra)
-                if etag:
-                    headers["If-None-Match"] = etag
-                if last_modified:
-                    headers["If-Modified-Since"] = last_modified
-
-                r = requests.get(source_url, headers=headers, timeout=20, stream=True)
-                try:
-                    if r.status_code == 304:
-                        e2, lm2 = _parse_304_headers(r.headers)
-                        return b"", "", (e2 or etag), (lm2 or last_modified), True
-                    r.raise_for_status()
-                    content_type = str(r.headers.get("Content-Type") or "").strip()
-                    e2, lm2 = _parse_304_headers(r.headers)
-                    max_bytes = 10 * 1024 * 1024
-                    chunks: list[bytes] = []
-                    total = 0
-                    for ch in r.iter_content(chunk_size=64 * 1024):
-                        if not ch:
-                            continue
-                        chunks.append(ch)
-                        total += len(ch)
-                        if total > max_bytes:
-                            raise HTTPException(status_code=400, detail="Avatar too large (>10MB).")
-                    return b"".join(chunks), content_type, e2, lm2, False
-                except HTTPException:
-                    raise
-                except Exception as e:
-                    last_err = e
-                finally:
-                    try:
-                        r.close()
-                    except Exception:
-                        pass
-
-            raise last_err or RuntimeError("avatar remote download failed")
-
         etag0 = str((url_entry or {}).get("etag") or "").strip()
         lm0 = str((url_entry or {}).get("last_modified") or "").strip()
         try:
@@ -1577,52 +1633,22 @@ async def get_chat_avatar(username: str, account: Optional[str] = None, source:
             )
 
         if payload:
-            payload2, media_type, _ext = _detect_media_type_and_ext(payload)
-            if media_type == "application/octet-stream" and ct:
-                try:
-                    mt = ct.split(";")[0].strip()
-                    if mt.startswith("image/"):
-                        media_type = mt
-                except Exception:
-                    pass
-            if str(media_type or "").startswith("image/"):
-                entry, out_path = write_avatar_cache_payload(
-                    account_name,
-                    source_kind="url",
-                    username=user_key,
-                    source_url=remote_url,
-                    payload=payload2,
-                    media_type=media_type,
-                    etag=etag_new,
-                    last_modified=lm_new,
-                    ttl_seconds=AVATAR_CACHE_TTL_SECONDS,
-                )
-                if entry and out_path:
-                    # bind user-key record to same file for quicker next access
-                    try:
-                        upsert_avatar_cache_entry(
-                            account_name,
-                            cache_key=cache_key_for_avatar_user(user_key),
-                            source_kind="user",
-                            username=user_key,
-                            source_url=remote_url,
-                            source_md5=str(entry.get("source_md5") or ""),
-                            source_update_time=int(entry.get("source_update_time") or 0),
-                            rel_path=str(entry.get("rel_path") or ""),
-                            media_type=str(entry.get("media_type") or "application/octet-stream"),
-                            size_bytes=int(entry.get("size_bytes") or 0),
-                            etag=str(entry.get("etag") or ""),
-                            last_modified=str(entry.get("last_modified") or ""),
-                            fetched_at=int(entry.get("fetched_at") or 0),
-                            checked_at=int(entry.get("checked_at") or 0),
-                            expires_at=int(entry.get("expires_at") or 0),
-                        )
-                    except Exception:
-                        pass
-                    logger.debug(f"[avatar_cache_download] kind=url account={account_name} username={user_key}")
-                    headers = build_avatar_cache_response_headers(entry)
-                    trace("response:ready", result="remote-download-cache-write", mediaType=media_type, bytes=len(payload2))
-                    return FileResponse(str(out_path), media_type=media_type, headers=headers)
+            stored = _cache_remote_avatar_payload(
+                account_name,
+                user_key,
+                remote_url,
+                payload=payload,
+                content_type=ct,
+                etag=etag_new,
+                last_modified=lm_new,
+            )
+            if stored is not None:
+                entry, out_path = stored
+                media_type = str(entry.get("media_type") or "application/octet-stream")
+                logger.debug(f"[avatar_cache_download] kind=url account={account_name} username={user_key}")
+                headers = build_avatar_cache_response_headers(entry)
+                trace("response:ready", result="remote-download-cache-write", mediaType=media_type, bytes=int(entry.get("size_bytes") or 0))
+                return FileResponse(str(out_path), media_type=media_type, headers=headers)
 
     if cached_file is not None and user_entry:
         headers = build_avatar_cache_response_headers(user_entry)
@@ -1637,6 +1663,439 @@ async def get_chat_avatar(username: str, account: Optional[str] = None, source:
     raise HTTPException(status_code=404, detail="Avatar not found.")
 
 
+_AVATAR_BATCH_MAX_USERNAMES = 1000
+_AVATAR_BATCH_SQL_CHUNK = 500
+_AVATAR_BLOB_SQL_CHUNK = 100
+_AVATAR_PREWARM_CHUNK = 200
+
+
+class AvatarBatchRequest(BaseModel):
+    account: Optional[str] = Field(None, description="账号目录名（可选，默认使用第一个）")
+    usernames: list[StrictStr] = Field(..., description=f"联系人 username 列表（最多 {_AVATAR_BATCH_MAX_USERNAMES} 个）")
+    format: StrictStr = Field("json", description="json 仅返回清单；multipart 返回 multipart/mixed 头像包")
+    known_etags: dict[str, str] = Field(
+        default_factory=dict,
+        description="客户端已缓存的 username -> etag（清单中的值）；未变化的头像标记为 not_modified 且不再返回内容",
+    )
+
+
+class AvatarPrewarmRequest(BaseModel):
+    account: Optional[str] = Field(None, description="账号目录名（可选，默认使用第一个）")
+    include_remote: bool = Field(True, description="本地 head_image 缺失时是否下载远程头像")
+    concurrency: conint(strict=True, ge=1, le=16) = Field(4, description="并发线程数")  # type: ignore[valid-type]
+
+
+def _load_head_image_meta(head_image_db_path: Path, usernames: list[str]) -> dict[str, tuple[str, int]]:
+    """Newest (md5, update_time) per username, mirroring the single-avatar lookup."""
+    if not usernames or not head_image_db_path.exists():
+        return {}
+    newest: dict[str, tuple[Any, int]] = {}
+    conn = sqlite3.connect(str(head_image_db_path))
+    try:
+        for start in range(0, len(usernames), _AVATAR_BATCH_SQL_CHUNK):
+            chunk = usernames[start : start + _AVATAR_BATCH_SQL_CHUNK]
+            placeholders = ",".join(["?"] * len(chunk))
+            rows = conn.execute(
+                f"SELECT username, md5, update_time FROM head_image WHERE username IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for username, md5, update_time in rows:
+                try:
+                    ts = int(update_time or 0)
+                except Exception:
+                    ts = 0
+                prev = newest.get(str(username or ""))
+                if prev is None or ts > prev[1]:
+                    newest[str(username or "")] = (md5, ts)
+    except Exception as e:
+        logger.warning(f"[avatar_cache_error] batch head_image meta failed path={head_image_db_path} err={e}")
+    finally:
+        conn.close()
+    return {u: (str(md5).strip().lower(), ts) for u, (md5, ts) in newest.items() if md5 is not None}
+
+
+def _cache_head_image_blobs(account_name: str, head_image_db_path: Path, usernames: list[str]) -> dict[str, tuple[dict[str, Any], Path]]:
+    out: dict[str, tuple[dict[str, Any], Path]] = {}
+    conn = sqlite3.connect(str(head_image_db_path))
+    try:
+        for start in range(0, len(usernames), _AVATAR_BLOB_SQL_CHUNK):
+            chunk = usernames[start : start + _AVATAR_BLOB_SQL_CHUNK]
+            placeholders = ",".join(["?"] * len(chunk))
+            newest: dict[str, tuple[int, Any, Any]] = {}
+            for username, md5, update_time, blob in conn.execute(
+                f"SELECT username, md5, update_time, image_buffer FROM head_image WHERE username IN ({placeholders})",
+                chunk,
+            ):
+                try:
+                    ts = int(update_time or 0)
+                except Exception:
+                    ts = 0
+                prev = newest.get(str(username or ""))
+                if prev is None or ts > prev[0]:
+                    newest[str(username or "")] = (ts, md5, blob)
+            for username, (ts, md5, blob) in newest.items():
+                if md5 is None or blob is None:
+                    continue
+                data = bytes(blob)
+                if not data:
+                    continue
+                media_type = _detect_image_media_type(data)
+                media_type = media_type if media_type.startswith("image/") else "application/octet-stream"
+                entry, out_path = write_avatar_cache_payload(
+                    account_name,
+                    source_kind="user",
+                    username=username,
+                    payload=data,
+                    media_type=media_type,
+                    source_md5=str(md5).strip().lower(),
+                    source_update_time=ts,
+                    ttl_seconds=AVATAR_CACHE_TTL_SECONDS,
+                )
+                if entry and out_path:
+                    out[username] = (entry, out_path)
+    except Exception as e:
+        logger.warning(f"[avatar_cache_error] batch head_image blobs failed account={account_name} err={e}")
+    finally:
+        conn.close()
+    return out
+
+
+def _resolve_avatar_batch(account_dir: Path, usernames: list[str]) -> dict[str, tuple[dict[str, Any], Path]]:
+    """Resolve locally available avatars for many usernames with one cache query and one head_image pass.
+
+    Cache entries that still match head_image metadata are reused; changed or first-seen
+    blobs are written to the cache. Usernames without a local avatar are left out so the
+    caller can fall back to `/api/chat/avatar`, which also resolves remote avatars.
+    """
+    account_name = str(account_dir.name or "").strip()
+    if not account_name or not usernames or not is_avatar_cache_enabled():
+        return {}
+    head_image_db_path = account_dir / "head_image.db"
+    entries = get_avatar_cache_user_entries(account_name, usernames)
+    metas = _load_head_image_meta(head_image_db_path, usernames)
+
+    resolved: dict[str, tuple[dict[str, Any], Path]] = {}
+    refresh: list[str] = []
+    for username in usernames:
+        entry = entries.get(username)
+        cached_file = avatar_cache_entry_file_exists(account_name, entry)
+        meta = metas.get(username)
+        if meta is not None:
+            if cached_file is not None and entry:
+                cached_md5 = str(entry.get("source_md5") or "").strip().lower()
+                try:
+                    cached_update = int(entry.get("source_update_time") or 0)
+                except Exception:
+                    cached_update = 0
+                if (cached_md5, cached_update) == meta:
+                    resolved[username] = (entry, cached_file)
+                    continue
+            refresh.append(username)
+        elif cached_file is not None and entry:
+            resolved[username] = (entry, cached_file)
+
+    if refresh:
+        resolved.update(_cache_head_image_blobs(account_name, head_image_db_path, refresh))
+    return resolved
+
+
+def _avatar_etag_token(value: Any) -> str:
+    # 清单里的 ETag 去掉引号：PathFixRoute 会改写 JSON 请求体里的反斜杠转义，客户端回传带引号的值会被破坏。
+    token = str(value or "").strip()
+    if token.startswith("W/"):
+        token = token[2:]
+    return token.strip('"')
+
+
+def _normalize_avatar_usernames(values: list[str]) -> list[str]:
+    return list(dict.fromkeys(str(v or "").strip() for v in values if str(v or "").strip()))
+
+
+def _build_avatar_batch_manifest(
+    account_name: str,
+    usernames: list[str],
+    resolved: dict[str, tuple[dict[str, Any], Path]],
+    known_etags: dict[str, str],
+) -> dict[str, Any]:
+    items: dict[str, dict[str, Any]] = {}
+    for username in usernames:
+        url = _build_avatar_url(account_name, username)
+        hit = resolved.get(username)
+        if hit is None:
+            items[username] = {"status": "missing", "url": url}
+            continue
+        entry = hit[0]
+        etag = _avatar_etag_token(entry.get("etag"))
+        items[username] = {
+            "status": "not_modified" if etag and _avatar_etag_token(known_etags.get(username)) == etag else "ok",
+            "etag": etag,
+            "lastModified": str(entry.get("last_modified") or ""),
+            "mediaType": str(entry.get("media_type") or "application/octet-stream"),
+            "size": int(entry.get("size_bytes") or 0),
+            "url": url,
+        }
+    return {
+        "status": "success",
+        "account": account_name,
+        "count": len(usernames),
+        "resolved": len(resolved),
+        "items": items,
+    }
+
+
+def _build_avatar_multipart(
+    manifest: dict[str, Any],
+    resolved: dict[str, tuple[dict[str, Any], Path]],
+) -> tuple[bytes, str]:
+    """Pack the manifest (first part, JSON) and every `ok` avatar into one multipart/mixed body."""
+    boundary = f"wcda-avatars-{secrets.token_hex(12)}"
+    parts: list[tuple[dict[str, str], bytes]] = []
+    for username, item in manifest["items"].items():
+        if item.get("status") != "ok":
+            continue
+        try:
+            data = resolved[username][1].read_bytes()
+        except Exception:
+            item.clear()
+            item.update(status="missing", url=_build_avatar_url(manifest["account"], username))
+            continue
+        headers = {
+            "Content-Type": str(item.get("mediaType") or "application/octet-stream"),
+            "Content-Disposition": f'inline; name="{quote(username, safe="@._-")}"',
+            "ETag": str(resolved[username][0].get("etag") or ""),
+        }
+        if item.get("lastModified"):
+            headers["Last-Modified"] = str(item["lastModified"])
+        parts.append((headers, data))
+
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+    parts.insert(
+        0,
+        ({"Content-Type": "application/json; charset=utf-8", "Content-Disposition": 'inline; name="manifest"'}, manifest_bytes),
+    )
+    chunks: list[bytes] = []
+    for headers, data in parts:
+        head = "".join(f"{k}: {v}\r\n" for k, v in headers.items() if v)
+        chunks.append(f"--{boundary}\r\n{head}Content-Length: {len(data)}\r\n\r\n".encode("utf-8"))
+        chunks.append(data)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(chunks), boundary
+
+
+@router.post("/api/chat/avatars/batch", summary="批量获取联系人头像")
+async def get_chat_avatars_batch(req: AvatarBatchRequest):
+    usernames = _normalize_avatar_usernames(list(req.usernames or []))
+    if not usernames:
+        raise HTTPException(status_code=400, detail="Missing usernames.")
+    if len(usernames) > _AVATAR_BATCH_MAX_USERNAMES:
+        raise HTTPException(status_code=400, detail=f"Too many usernames (max {_AVATAR_BATCH_MAX_USERNAMES}).")
+    fmt = str(req.format or "json").strip().lower()
+    if fmt not in {"json", "multipart"}:
+        raise HTTPException(status_code=400, detail="Invalid format. Use json or multipart.")
+    account_dir = _resolve_account_dir(req.account)
+    account_name = str(account_dir.name or "").strip()
+
+    resolved = await asyncio.to_thread(_resolve_avatar_batch, account_dir, usernames)
+    manifest = _build_avatar_batch_manifest(account_name, usernames, resolved, dict(req.known_etags or {}))
+    if fmt == "json":
+        return manifest
+    body, boundary = await asyncio.to_thread(_build_avatar_multipart, manifest, resolved)
+    return Response(
+        content=body,
+        media_type=f"multipart/mixed; boundary={boundary}",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+_AVATAR_PREWARM_LOCK = threading.Lock()
+_AVATAR_PREWARM_JOBS: dict[str, dict[str, Any]] = {}
+
+
+def _list_prewarm_avatar_usernames(account_dir: Path) -> list[str]:
+    names: list[str] = []
+    for db_name, sql in (
+        ("session.db", "SELECT username FROM SessionTable"),
+        ("contact.db", "SELECT username FROM contact"),
+    ):
+        db_path = account_dir / db_name
+        if not db_path.exists():
+            continue
+        conn = sqlite3.connect(str(db_path))
+        try:
+            names.extend(str(row[0] or "") for row in conn.execute(sql))
+        except Exception as e:
+            logger.warning(f"[avatar_prewarm] list usernames failed db={db_path} err={e}")
+        finally:
+            conn.close()
+    return _normalize_avatar_usernames(names)
+
+
+def _resolve_avatar_remote_urls(account_dir: Path, usernames: list[str], *, prefer_realtime: bool) -> dict[str, str]:
+    out: dict[str, str] = {}
+    try:
+        rows = _load_contact_rows(account_dir / "contact.db", usernames)
+    except Exception:
+        rows = {}
+    for username in usernames:
+        raw = str(_pick_avatar_url(rows.get(username)) or "").strip()
+        if raw.lower().startswith(("http://", "https://")):
+            out[username] = normalize_avatar_source_url(raw)
+    rest = [u for u in usernames if u not in out]
+    if rest and prefer_realtime:
+        try:
+            wcdb_conn = WCDB_REALTIME.ensure_connected(account_dir)
+            with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
+                mp = _wcdb_get_avatar_urls(wcdb_handle, rest)
+            for username in rest:
+                wa = str(mp.get(username) or "").strip()
+                if wa.lower().startswith(("http://", "https://")):
+                    out[username] = normalize_avatar_source_url(wa)
+        except Exception:
+            pass
+    return out
+
+
+def _prewarm_remote_avatar(account_name: str, user_key: str, remote_url: str) -> bool:
+    url_entry = get_avatar_cache_url_entry(account_name, remote_url)
+    url_file = avatar_cache_entry_file_exists(account_name, url_entry)
+    if url_entry and url_file and avatar_cache_entry_is_fresh(url_entry):
+        _bind_user_avatar_entry(account_name, user_key, remote_url, url_entry)
+        return True
+    payload, ct, etag_new, lm_new, not_modified = _download_remote_avatar(
+        remote_url,
+        etag=str((url_entry or {}).get("etag") or "").strip(),
+        last_modified=str((url_entry or {}).get("last_modified") or "").strip(),
+    )
+    if not_modified and url_entry and url_file:
+        touch_avatar_cache_entry(account_name, cache_key_for_avatar_url(remote_url))
+        _bind_user_avatar_entry(account_name, user_key, remote_url, url_entry)
+        return True
+    if not payload:
+        return False
+    stored = _cache_remote_avatar_payload(
+        account_name,
+        user_key,
+        remote_url,
+        payload=payload,
+        content_type=ct,
+        etag=etag_new,
+        last_modified=lm_new,
+    )
+    return stored is not None
+
+
+def _update_prewarm_job(job: dict[str, Any], **deltas: int) -> None:
+    with _AVATAR_PREWARM_LOCK:
+        for key, value in deltas.items():
+            job[key] = int(job.get(key) or 0) + int(value)
+
+
+def _run_avatar_prewarm(account_dir: Path, job: dict[str, Any], *, include_remote: bool, concurrency: int) -> None:
+    account_name = str(account_dir.name or "").strip()
+    started = time.perf_counter()
+    try:
+        usernames = _list_prewarm_avatar_usernames(account_dir)
+        with _AVATAR_PREWARM_LOCK:
+            job["total"] = len(usernames)
+        chunks = [usernames[i : i + _AVATAR_PREWARM_CHUNK] for i in range(0, len(usernames), _AVATAR_PREWARM_CHUNK)]
+        missing: list[str] = []
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="avatar-prewarm") as pool:
+            # 1) 本地 head_image：按块并行写入缓存。
+            for chunk, future in [(c, pool.submit(_resolve_avatar_batch, account_dir, c)) for c in chunks]:
+                try:
+                    resolved = future.result()
+                except Exception as e:
+                    logger.warning(f"[avatar_prewarm] local chunk failed account={account_name} err={e}")
+                    resolved = {}
+                missing.extend(u for u in chunk if u not in resolved)
+                _update_prewarm_job(job, local=len(resolved), done=len(resolved))
+
+            # 2) 本地缺失的头像：并行下载远程 URL。
+            remote_urls: dict[str, str] = {}
+            if include_remote and missing:
+                remote_urls = _resolve_avatar_remote_urls(
+                    account_dir,
+                    missing,
+                    prefer_realtime=not account_prefers_decrypted_snapshot(account_dir),
+                )
+            _update_prewarm_job(job, missing=len(missing) - len(remote_urls), done=len(missing) - len(remote_urls))
+            futures = {
+                pool.submit(_prewarm_remote_avatar, account_name, username, url): username
+                for username, url in remote_urls.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    ok = bool(future.result())
+                except Exception as e:
+                    logger.debug(f"[avatar_prewarm] remote failed account={account_name} username={futures[future]} err={e}")
+                    ok = False
+                _update_prewarm_job(job, remote=1 if ok else 0, failed=0 if ok else 1, done=1)
+        status, error = "done", ""
+    except Exception as e:
+        logger.warning(f"[avatar_prewarm] failed account={account_name} err={e}")
+        status, error = "error", str(e)
+    with _AVATAR_PREWARM_LOCK:
+        job.update(status=status, error=error, finishedAt=int(time.time()), durationSec=round(time.perf_counter() - started, 3))
+    logger.info(
+        f"[avatar_prewarm] account={account_name} status={status} total={job.get('total')} local={job.get('local')} "
+        f"remote={job.get('remote')} failed={job.get('failed')} missing={job.get('missing')} durationSec={job.get('durationSec')}"
+    )
+
+
+def start_avatar_prewarm(account_dir: Path, *, include_remote: bool = True, concurrency: int = 4) -> dict[str, Any]:
+    account_name = str(account_dir.name or "").strip()
+    with _AVATAR_PREWARM_LOCK:
+        current = _AVATAR_PREWARM_JOBS.get(account_name)
+        if current and current.get("status") == "running":
+            return dict(current)
+        job: dict[str, Any] = {
+            "status": "running",
+            "account": account_name,
+            "includeRemote": bool(include_remote),
+            "concurrency": int(concurrency),
+            "total": 0,
+            "done": 0,
+            "local": 0,
+            "remote": 0,
+            "failed": 0,
+            "missing": 0,
+            "error": "",
+            "startedAt": int(time.time()),
+            "finishedAt": 0,
+        }
+        _AVATAR_PREWARM_JOBS[account_name] = job
+        snapshot = dict(job)
+    threading.Thread(
+        target=_run_avatar_prewarm,
+        args=(account_dir, job),
+        kwargs={"include_remote": bool(include_remote), "concurrency": max(1, int(concurrency))},
+        name=f"avatar-prewarm-{account_name}",
+        daemon=True,
+    ).start()
+    return snapshot
+
+
+def get_avatar_prewarm_status(account_name: str) -> dict[str, Any]:
+    with _AVATAR_PREWARM_LOCK:
+        job = _AVATAR_PREWARM_JOBS.get(str(account_name or "").strip())
+        return dict(job) if job else {"status": "idle", "account": account_name}
+
+
+@router.post("/api/chat/avatars/prewarm", summary="预热会话与联系人头像缓存")
+async def prewarm_chat_avatars(req: AvatarPrewarmRequest):
+    if not is_avatar_cache_enabled():
+        raise HTTPException(status_code=409, detail="Avatar cache is disabled.")
+    account_dir = _resolve_account_dir(req.account)
+    return start_avatar_prewarm(account_dir, include_remote=bool(req.include_remote), concurrency=int(req.concurrency))
+
+
+@router.get("/api/chat/avatars/prewarm", summary="查询头像预热任务")
+async def get_chat_avatars_prewarm(account: Optional[str] = None):
+    account_dir = _resolve_account_dir(account)
+    return get_avatar_prewarm_status(account_dir.name)
+
+
 class EmojiDownloadRequest(BaseModel):
     account: Optional[str] = Field(None, description="账号目录名（可选，默认使用第一个）")
     md5: str = Field(..., description="表情 MD5")
@@ -3690,11 +4149,26 @@ async def get_chat_voice(server_id: int, account: Optional[str] = None):
     if not server_id:
         raise HTTPException(status_code=400, detail="Missing server_id.")
     account_dir = _resolve_account_dir(account)
+    cached = await asyncio.to_thread(lookup_cached_voice_audio, account_dir, int(server_id), preferred_format="mp3")
+    if cached is not None:
+        cached_path, ext, media_type = cached
+        return FileResponse(
+            str(cached_path),
+            media_type=media_type,
+            headers={"Content-Disposition": f"inline; filename=voice_{int(server_id)}.{ext}"},
+        )
+
     data = await asyncio.to_thread(load_voice_data, account_dir, int(server_id))
     if not data:
         raise HTTPException(status_code=404, detail="Voice not found.")
 
-    payload, ext, media_type = _convert_silk_to_browser_audio(data, preferred_format="mp3")
+    payload, ext, media_type = await asyncio.to_thread(
+        convert_voice_for_browser,
+        account_dir,
+        int(server_id),
+        data,
+        preferred_format="mp3",
+    )
     if payload and ext != "silk":
         return Response(
             content=payload,
@@ -4252,7 +4726,12 @@ async def open_chat_media_folder(
         if not isinstance(data, (bytes, bytearray)):
             data = bytes(data)
 
-        payload, ext, _media_type = _convert_silk_to_browser_audio(data, preferred_format="mp3")
+        payload, ext, _media_type = convert_voice_for_browser(
+            account_dir,
+            int(server_id),
+            data,
+            preferred_format="mp3",
+        )
         if not payload:
             payload = data
             ext = "silk"
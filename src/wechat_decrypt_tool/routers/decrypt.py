@@ -367,6 +367,26 @@ def _persist_db_keys(
     return attempted and not failed_accounts, failed_accounts
 
 
+def _start_avatar_prewarm(account_results: dict[str, Any] | None) -> None:
+    """解密成功后在后台为每个账号预热头像缓存（头像缓存关闭时跳过）。"""
+    from ..avatar_cache import is_avatar_cache_enabled
+
+    if not is_avatar_cache_enabled():
+        return
+    from .chat_media import start_avatar_prewarm
+
+    for account_name, account_result in (account_results or {}).items():
+        if not isinstance(account_result, dict) or int(account_result.get("success") or 0) <= 0:
+            continue
+        output_dir = Path(str(account_result.get("output_dir") or ""))
+        if not output_dir.is_dir():
+            continue
+        try:
+            start_avatar_prewarm(output_dir)
+        except Exception:
+            logger.exception("[decrypt] failed to start avatar prewarm account=%s", account_name)
+
+
 class DecryptRequest(BaseModel):
     """解密请求模型"""
 
@@ -422,6 +442,7 @@ async def decrypt_databases(request: DecryptRequest):
             results.get("account_results"),
             request.key,
         )
+        _start_avatar_prewarm(results.get("account_results"))
 
         return {
             "status": "completed" if results["status"] == "success" else "failed",
@@ -550,11 +571,12 @@ async def decrypt_databases_stream(
                 account_output_dir = base_output_dir / account
                 account_output_dir.mkdir(parents=True, exist_ok=True)
 
+                source_info = account_sources.get(account) or {}
+                source_db_storage_path = str(source_info.get("db_storage_path") or p)
+                wxid_dir = str(source_info.get("wxid_dir") or "")
+
                 # Save a hint for later UI (same as non-stream endpoint).
                 try:
-                    source_info = account_sources.get(account, {})
-                    source_db_storage_path = str(source_info.get("db_storage_path") or p)
-                    wxid_dir = str(source_info.get("wxid_dir") or "")
                     (account_output_dir / "_source.json").write_text(
                         json.dumps(
                             {"db_storage_path": source_db_storage_path, "wxid_dir": wxid_dir},
@@ -596,7 +618,14 @@ async def decrypt_databases_stream(
                     )
 
                     output_path = account_output_dir / db_name
-                    task = asyncio.create_task(asyncio.to_thread(decryptor.decrypt_database, db_path, str(output_path)))
+                    task = asyncio.create_task(
+                        asyncio.to_thread(
+                            decryptor.decrypt_database,
+                            db_path,
+                            str(output_path),
+                            key_cache_root=source_db_storage_path,
+                        )
+                    )
                     active_worker_task = task
 
                     # Wait with heartbeat (can't yield while awaiting the thread directly).
@@ -765,6 +794,7 @@ async def decrypt_databases_stream(
             db_key_persisted, db_key_persistence_errors = _persist_db_keys(account_results, k)
             result["db_key_persisted"] = db_key_persisted
             result["db_key_persistence_errors"] = db_key_persistence_errors
+            _start_avatar_prewarm(account_results)
 
             yield _sse({"type": "complete", **result})
         finally:
@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import json
 import re
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 from xml.etree import ElementTree as ET
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import Response
 
 from ..chat_accounts import resolve_chat_account_context
-from ..chat_helpers import _resolve_msg_table_name_by_map
+from ..chat_helpers import _build_fts_query, _resolve_msg_table_name_by_map, _to_char_token_text
 from ..chat_realtime_reader import _account_username_candidates, _sql_literal
 from ..wcdb_realtime import WCDB_REALTIME, resolve_account_native_wxid
 from ..wcdb_realtime import exec_query as _wcdb_exec_query
@@ -786,129 +788,414 @@ def _load_tags(conn: Any) -> tuple[list[dict[str, Any]], dict[int, list[dict[str
     return tags, by_favorite
 
 
-def _matches_query(item: dict[str, Any], query: str) -> bool:
-    needle = _text(query, max_len=300).lower()
-    if not needle:
-        return True
-    haystack = json.dumps(
-        {
-            "type": item.get("typeLabel"),
-            "title": item.get("title"),
-            "summary": item.get("summary"),
-            "text": item.get("textBlocks"),
-            "attachments": item.get("attachments"),
-            "source": item.get("sourceName"),
-            "sourceContact": item.get("sourceContact"),
-            "sourceChatContact": item.get("sourceChatContact"),
-            "tags": item.get("tags"),
-        },
+_INDEX_DB_NAME = "favorite_index.db"
+_INDEX_SCHEMA_VERSION = 1
+_INDEX_FETCH_CHUNK = 400
+_INDEX_LOCKS: dict[str, threading.Lock] = {}
+_INDEX_LOCKS_GUARD = threading.Lock()
+_CONTACT_USERNAME_KEYS = (
+    "sourceUsername",
+    "sourceChatUsername",
+    "sourceToUsername",
+    "senderUsername",
+    "conversationUsername",
+)
+
+
+def _favorite_index_lock(account_dir: Path) -> threading.Lock:
+    key = str(account_dir)
+    with _INDEX_LOCKS_GUARD:
+        lock = _INDEX_LOCKS.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _INDEX_LOCKS[key] = lock
+        return lock
+
+
+def _connect_favorite_index(account_dir: Path) -> sqlite3.Connection:
+    # Derived from favorite.db; safe to delete, it is rebuilt on the next request.
+    conn = sqlite3.connect(str(account_dir / _INDEX_DB_NAME), timeout=30, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or str(row[0]) != str(_INDEX_SCHEMA_VERSION):
+            conn.executescript(
+                """
+                DROP TABLE IF EXISTS favorite_item;
+                DROP TABLE IF EXISTS favorite_tag;
+                DROP TABLE IF EXISTS favorite_fts;
+                """
+            )
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS favorite_item (
+                local_id INTEGER PRIMARY KEY,
+                update_time INTEGER NOT NULL DEFAULT 0,
+                type INTEGER NOT NULL DEFAULT 0,
+                fingerprint TEXT NOT NULL,
+                search_text TEXT NOT NULL,
+                item_json TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_favorite_item_time ON favorite_item(update_time DESC, local_id DESC);
+            CREATE INDEX IF NOT EXISTS idx_favorite_item_type_time ON favorite_item(type, update_time DESC, local_id DESC);
+            CREATE TABLE IF NOT EXISTS favorite_tag (
+                tag_id INTEGER NOT NULL,
+                local_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, local_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_favorite_tag_local_id ON favorite_tag(local_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS favorite_fts USING fts5(text, tokenize='unicode61');
+            """
+        )
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES('schema_version', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(_INDEX_SCHEMA_VERSION),),
+        )
+        conn.commit()
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def _favorite_fingerprint(row: dict[str, Any], tags: list[dict[str, Any]]) -> str:
+    # Tag names are stored in item_json and search_text, so a renamed tag must re-index its rows.
+    return "|".join(
+        [
+            str(_safe_int(_row_value(row, "update_time"), 0)),
+            str(_safe_int(_row_value(row, "content_len"), 0)),
+            str(_safe_int(_row_value(row, "sync_status"), 0)),
+            str(_safe_int(_row_value(row, "upload_status"), 0)),
+            json.dumps(
+                [[_safe_int(tag.get("localId"), 0), str(tag.get("name") or "")] for tag in tags],
+                ensure_ascii=False,
+            ),
+        ]
+    )
+
+
+def _favorite_search_text(item: dict[str, Any]) -> str:
+    # Fields the list search has always matched against, flattened once at index time.
+    return json.dumps(
+        [
+            item.get("typeLabel"),
+            item.get("title"),
+            item.get("summary"),
+            item.get("textBlocks"),
+            item.get("attachments"),
+            item.get("sourceName"),
+            item.get("sourceContact"),
+            item.get("sourceChatContact"),
+            item.get("tags"),
+        ],
         ensure_ascii=False,
         default=str,
     ).lower()
-    return needle in haystack
 
 
-@router.get("/api/favorites", summary="获取微信收藏列表")
-def list_favorites(
-    request: Request,
-    account: Optional[str] = None,
-    q: str = "",
-    kind: str = "all",
-    tag_id: int = Query(0, ge=0),
-    source: str = Query("realtime", pattern="^(realtime|decrypted)$"),
-    limit: int = Query(80, ge=1, le=_MAX_LIMIT),
-    offset: int = Query(0, ge=0),
-):
-    ctx = resolve_chat_account_context(account)
-    with _open_db_source(
-        ctx,
-        source=source,
-        db_group="favorite",
-        db_name="favorite.db",
-        decrypted_name="favorite.db",
-    ) as conn:
-        meta = _source_meta(conn)
-        tags, tags_by_favorite = _load_tags(conn)
+def _attach_favorite_contacts(items: list[dict[str, Any]], contact_map: dict[str, dict[str, Any]]) -> None:
+    for item in items:
+        for prefix in ("source", "sourceChat", "sender", "conversation"):
+            username = _text(item.get(f"{prefix}Username"), max_len=260)
+            if username and username in contact_map:
+                item[f"{prefix}Contact"] = contact_map[username]
+
+
+def _favorite_usernames(items: list[dict[str, Any]]) -> list[str]:
+    return [
+        username
+        for item in items
+        for username in (item.get(key) for key in _CONTACT_USERNAME_KEYS)
+        if _text(username, max_len=260)
+    ]
+
+
+def _refresh_favorite_index(
+    *,
+    ctx: Any,
+    conn: Any,
+    index_conn: sqlite3.Connection,
+    tags_by_favorite: dict[int, list[dict[str, Any]]],
+) -> dict[str, int]:
+    """Bring favorite_index.db in line with favorite.db, re-parsing only new or changed rows."""
+    try:
+        rows = conn.execute(
+            "SELECT local_id, update_time, sync_status, upload_status, length(content) AS content_len "
+            "FROM fav_db_item"
+        ).fetchall()
+    except Exception as exc:
+        raise HTTPException(
+            status_code=400,
+            detail=f"favorite.db schema is not supported: {exc}",
+        ) from exc
+
+    current: dict[int, str] = {}
+    for row in rows:
+        row_dict = _row_dict(row)
+        local_id = _safe_int(_row_value(row_dict, "local_id"), 0)
+        current[local_id] = _favorite_fingerprint(row_dict, tags_by_favorite.get(local_id, []))
+
+    indexed = {
+        int(local_id): str(fingerprint)
+        for local_id, fingerprint in index_conn.execute("SELECT local_id, fingerprint FROM favorite_item")
+    }
+    changed = [local_id for local_id, fingerprint in current.items() if indexed.get(local_id) != fingerprint]
+    removed = [local_id for local_id in indexed if local_id not in current]
+    if not changed and not removed:
+        return {"changed": 0, "removed": 0}
+
+    parsed: list[tuple[dict[str, Any], str]] = []
+    for start in range(0, len(changed), _INDEX_FETCH_CHUNK):
+        chunk = changed[start:start + _INDEX_FETCH_CHUNK]
         try:
-            rows = conn.execute(
+            full_rows = conn.execute(
                 "SELECT local_id, server_id, type, update_time, content, source_id, "
                 "sync_status, upload_status, fromusr, realchatname "
-                "FROM fav_db_item ORDER BY update_time DESC, local_id DESC"
+                f"FROM fav_db_item WHERE local_id IN ({', '.join(str(int(v)) for v in chunk)})"
             ).fetchall()
         except Exception as exc:
             raise HTTPException(
                 status_code=400,
                 detail=f"favorite.db schema is not supported: {exc}",
             ) from exc
+        for row in full_rows:
+            row_dict = _row_dict(row)
+            local_id = _safe_int(_row_value(row_dict, "local_id"), 0)
+            item = _parse_favorite_row(row_dict, tags_by_favorite.get(local_id, []), account_name=ctx.name)
+            parsed.append((item, current.get(local_id, "")))
 
-    items = []
-    for row in rows:
-        row_dict = _row_dict(row)
-        local_id = _safe_int(_row_value(row_dict, "local_id"), 0)
-        items.append(
-            _parse_favorite_row(
-                row_dict,
-                tags_by_favorite.get(local_id, []),
-                account_name=ctx.name,
-            )
-        )
-
-    usernames = [
-        username
-        for item in items
-        for username in (
-            item.get("sourceUsername"),
-            item.get("sourceChatUsername"),
-            item.get("sourceToUsername"),
-            item.get("senderUsername"),
-            item.get("conversationUsername"),
-        )
-        if _text(username, max_len=260)
-    ]
+    # Contact names are part of the search text, so resolve them for the changed rows only.
     contact_map = _resolve_general_contacts(
         account_dir=ctx.account_dir,
         account_name=ctx.name,
-        usernames=usernames,
-        base_url=str(request.base_url).rstrip("/"),
-    )
-    for item in items:
-        source_username = _text(item.get("sourceUsername"), max_len=260)
-        source_chat = _text(item.get("sourceChatUsername"), max_len=260)
-        if source_username and source_username in contact_map:
-            item["sourceContact"] = contact_map[source_username]
-        if source_chat and source_chat in contact_map:
-            item["sourceChatContact"] = contact_map[source_chat]
-        sender_username = _text(item.get("senderUsername"), max_len=260)
-        conversation_username = _text(item.get("conversationUsername"), max_len=260)
-        if sender_username and sender_username in contact_map:
-            item["senderContact"] = contact_map[sender_username]
-        if conversation_username and conversation_username in contact_map:
-            item["conversationContact"] = contact_map[conversation_username]
-
-    _attach_original_messages(
-        ctx=ctx,
-        items=items,
-        base_url=str(request.base_url).rstrip("/"),
+        usernames=_favorite_usernames([item for item, _fingerprint in parsed]),
+        base_url="",
     )
+    with index_conn:
+        for local_id in removed:
+            index_conn.execute("DELETE FROM favorite_item WHERE local_id = ?", (local_id,))
+            index_conn.execute("DELETE FROM favorite_tag WHERE local_id = ?", (local_id,))
+            index_conn.execute("DELETE FROM favorite_fts WHERE rowid = ?", (local_id,))
+        for item, fingerprint in parsed:
+            local_id = _safe_int(item.get("localId"), 0)
+            search_item = dict(item)
+            _attach_favorite_contacts([search_item], contact_map)
+            search_text = _favorite_search_text(search_item)
+            index_conn.execute(
+                "INSERT OR REPLACE INTO favorite_item(local_id, update_time, type, fingerprint, search_text, item_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    local_id,
+                    _safe_int(item.get("updateTime"), 0),
+                    _safe_int(item.get("type"), 0),
+                    fingerprint,
+                    search_text,
+                    json.dumps(item, ensure_ascii=False, default=str),
+                ),
+            )
+            index_conn.execute("DELETE FROM favorite_tag WHERE local_id = ?", (local_id,))
+            index_conn.executemany(
+                "INSERT OR IGNORE INTO favorite_tag(tag_id, local_id) VALUES (?, ?)",
+                [(tag_id, local_id) for tag_id in item.get("tagIds") or [] if tag_id],
+            )
+            index_conn.execute("DELETE FROM favorite_fts WHERE rowid = ?", (local_id,))
+            index_conn.execute(
+                "INSERT INTO favorite_fts(rowid, text) VALUES (?, ?)",
+                (local_id, _to_char_token_text(search_text)),
+            )
+    return {"changed": len(parsed), "removed": len(removed)}
 
-    type_counts: dict[str, int] = {}
-    for item in items:
-        key = str(_safe_int(item.get("type"), 0))
-        type_counts[key] = type_counts.get(key, 0) + 1
 
+def _favorite_filter_sql(*, q: str, kind: str, tag_id: int) -> tuple[str, list[Any]]:
+    where: list[str] = []
+    params: list[Any] = []
     kind_norm = _text(kind, max_len=40).lower() or "all"
     if kind_norm != "all":
         try:
             wanted_type = int(kind_norm)
         except Exception:
             wanted_type = -1
-        items = [item for item in items if _safe_int(item.get("type"), 0) == wanted_type]
+        where.append("type = ?")
+        params.append(wanted_type)
     if tag_id > 0:
-        items = [item for item in items if tag_id in (item.get("tagIds") or [])]
-    items = [item for item in items if _matches_query(item, q)]
+        where.append("local_id IN (SELECT local_id FROM favorite_tag WHERE tag_id = ?)")
+        params.append(int(tag_id))
+
+    needle = _text(q, max_len=300).lower()
+    # Punctuation-only needles have no FTS tokens; those fall back to a plain substring scan.
+    fts_query = _build_fts_query(needle) if any(ch.isalnum() for ch in needle) else ""
+    if fts_query:
+        where.append("local_id IN (SELECT rowid FROM favorite_fts WHERE favorite_fts MATCH ?)")
+        params.append(fts_query)
+    elif needle:
+        where.append("instr(search_text, ?) > 0")
+        params.append(needle)
+
+    return (f" WHERE {' AND '.join(where)}" if where else ""), params
+
+
+def _favorite_type_counts(index_conn: sqlite3.Connection) -> dict[str, int]:
+    return {
+        str(int(type_value)): int(count)
+        for type_value, count in index_conn.execute(
+            "SELECT type, COUNT(*) FROM favorite_item GROUP BY type"
+        )
+    }
+
+
+def _query_favorite_index(
+    index_conn: sqlite3.Connection,
+    *,
+    q: str,
+    kind: str,
+    tag_id: int,
+    limit: int,
+    offset: int,
+) -> tuple[int, list[dict[str, Any]], dict[str, int]]:
+    type_counts = _favorite_type_counts(index_conn)
+    where_sql, params = _favorite_filter_sql(q=q, kind=kind, tag_id=tag_id)
+    total = int(index_conn.execute(f"SELECT COUNT(*) FROM favorite_item{where_sql}", params).fetchone()[0])
+    rows = index_conn.execute(
+        f"SELECT item_json FROM favorite_item{where_sql} "
+        "ORDER BY update_time DESC, local_id DESC LIMIT ? OFFSET ?",
+        [*params, int(limit), int(offset)],
+    ).fetchall()
+    return total, [json.loads(row[0]) for row in rows], type_counts
+
+
+def _hydrate_favorite_page(ctx: Any, items: list[dict[str, Any]], base_url: str) -> None:
+    contact_map = _resolve_general_contacts(
+        account_dir=ctx.account_dir,
+        account_name=ctx.name,
+        usernames=_favorite_usernames(items),
+        base_url=base_url,
+    )
+    _attach_favorite_contacts(items, contact_map)
+    _attach_original_messages(
+        ctx=ctx,
+        items=items,
+        base_url=base_url,
+    )
+
+
+def iter_favorite_pages(
+    request: Request,
+    *,
+    account: Optional[str] = None,
+    q: str = "",
+    kind: str = "all",
+    tag_id: int = 0,
+    source: str = "realtime",
+    page_size: int = _MAX_LIMIT,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``list_favorites``-shaped pages of every matching favorite in one pass.
+
+    Each ``list_favorites`` call re-fingerprints all of favorite.db before it
+    queries, so walking a large collection page by page costs O(n^2). Here the
+    index is refreshed once and the matching ids are snapshotted in display
+    order; pages are then read by id and hydrated one at a time, so only the
+    current page is held in memory. Favorites deleted mid-walk are skipped.
+    """
+    ctx = resolve_chat_account_context(account)
+    page_size = max(1, int(page_size or _MAX_LIMIT))
+    with _open_db_source(
+        ctx,
+        source=source,
+        db_group="favorite",
+        db_name="favorite.db",
+        decrypted_name="favorite.db",
+    ) as conn:
+        meta = _source_meta(conn)
+        tags, tags_by_favorite = _load_tags(conn)
+        with _favorite_index_lock(ctx.account_dir):
+            index_conn = _connect_favorite_index(ctx.account_dir)
+            try:
+                _refresh_favorite_index(ctx=ctx, conn=conn, index_conn=index_conn, tags_by_favorite=tags_by_favorite)
+                type_counts = _favorite_type_counts(index_conn)
+                where_sql, params = _favorite_filter_sql(q=q, kind=kind, tag_id=tag_id)
+                local_ids = [
+                    int(row[0])
+                    for row in index_conn.execute(
+                        f"SELECT local_id FROM favorite_item{where_sql} ORDER BY update_time DESC, local_id DESC",
+                        params,
+                    )
+                ]
+            finally:
+                index_conn.close()
+
+    base_url = str(request.base_url).rstrip("/")
+    total = len(local_ids)
+    for start in range(0, max(total, 1), page_size):
+        chunk = local_ids[start:start + page_size]
+        by_id: dict[int, dict[str, Any]] = {}
+        if chunk:
+            with _favorite_index_lock(ctx.account_dir):
+                index_conn = _connect_favorite_index(ctx.account_dir)
+                try:
+                    for local_id, item_json in index_conn.execute(
+                        f"SELECT local_id, item_json FROM favorite_item WHERE local_id IN ({', '.join('?' for _ in chunk)})",
+                        chunk,
+                    ):
+                        by_id[int(local_id)] = json.loads(item_json)
+                finally:
+                    index_conn.close()
+        page_items = [by_id[local_id] for local_id in chunk if local_id in by_id]
+        _hydrate_favorite_page(ctx, page_items, base_url)
+        yield {
+            "status": "success",
+            "account": ctx.name,
+            "total": total,
+            "databaseTotal": sum(type_counts.values()),
+            "hasMore": start + page_size < total,
+            "scanned": len(chunk),
+            "items": page_items,
+            "tags": tags,
+            "typeCounts": type_counts,
+            **meta,
+        }
+
+
+@router.get("/api/favorites", summary="获取微信收藏列表")
+def list_favorites(
+    request: Request,
+    account: Optional[str] = None,
+    q: str = "",
+    kind: str = "all",
+    tag_id: int = Query(0, ge=0),
+    source: str = Query("realtime", pattern="^(realtime|decrypted)$"),
+    limit: int = Query(80, ge=1, le=_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+):
+    ctx = resolve_chat_account_context(account)
+    with _open_db_source(
+        ctx,
+        source=source,
+        db_group="favorite",
+        db_name="favorite.db",
+        decrypted_name="favorite.db",
+    ) as conn:
+        meta = _source_meta(conn)
+        tags, tags_by_favorite = _load_tags(conn)
+        with _favorite_index_lock(ctx.account_dir):
+            index_conn = _connect_favorite_index(ctx.account_dir)
+            try:
+                _refresh_favorite_index(ctx=ctx, conn=conn, index_conn=index_conn, tags_by_favorite=tags_by_favorite)
+                total, page_items, type_counts = _query_favorite_index(
+                    index_conn,
+                    q=q,
+                    kind=kind,
+                    tag_id=tag_id,
+                    limit=limit,
+                    offset=offset,
+                )
+            finally:
+                index_conn.close()
+
+    _hydrate_favorite_page(ctx, page_items, str(request.base_url).rstrip("/"))
 
-    total = len(items)
-    page_items = items[offset:offset + limit]
     return {
         "status": "success",
         "account": ctx.name,
@@ -1,11 +1,14 @@
 ﻿from __future__ import annotations
 
+import hashlib
 import json
 import re
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 from urllib.parse import parse_qs, quote, unquote, urlsplit
 from xml.etree import ElementTree as ET
 
@@ -24,6 +27,7 @@ from ..chat_helpers import (
     _pick_display_name,
     _resolve_msg_table_name_by_map,
 )
+from ..metrics import record_db_open
 from ..sqlite_diagnostics import is_usable_sqlite_db
 from ..source_fallback import build_source_fallback_meta
 from ..wcdb_realtime import WCDB_REALTIME, exec_query as _wcdb_exec_query, get_display_names as _wcdb_get_display_names
@@ -209,7 +213,9 @@ def _open_db_source(
     retry_after_seconds = 0
     if source_norm in {"auto", "realtime"} and realtime_capable:
         try:
-            return _open_realtime_db_source(ctx, db_group=db_group, db_name=db_name)
+            realtime_source = _open_realtime_db_source(ctx, db_group=db_group, db_name=db_name)
+            record_db_open(db_group, "realtime")
+            return realtime_source
         except Exception as exc:
             fallback_reason = str(exc)
             try:
@@ -223,6 +229,7 @@ def _open_db_source(
 
     db_path = ctx.account_dir / decrypted_name
     if db_path.exists() and is_usable_sqlite_db(db_path):
+        record_db_open(db_group, "decrypted")
         return _SQLiteSource(
             db_path,
             requested_source=source_norm,
@@ -796,18 +803,19 @@ def _contains_keyword(item: dict[str, Any], keyword: str, fields: Iterable[str])
     if not kw:
         return True
     for field in fields:
-        value = item.get(field)
-        if isinstance(value, list):
-            hay = " ".join(_text(x) for x in value)
-        elif isinstance(value, dict):
-            hay = json.dumps(value, ensure_ascii=False)
-        else:
-            hay = _text(value)
-        if kw in hay.lower():
+        if kw in _keyword_haystack(item.get(field)).lower():
             return True
     return False
 
 
+def _keyword_haystack(value: Any) -> str:
+    if isinstance(value, list):
+        return " ".join(_text(x) for x in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return _text(value)
+
+
 def _page(items: list[dict[str, Any]], *, limit: int, offset: int) -> tuple[list[dict[str, Any]], bool]:
     return items[offset:offset + limit], offset + limit < len(items)
 
@@ -1296,6 +1304,411 @@ def _attach_revoke_message_details(account_dir: Path, items: list[dict[str, Any]
         item["messageSummary"] = _text(detail.get("content"), max_len=180)
 
 
+_RECORDS_INDEX_DB_NAME = "general_records_index.db"
+_RECORDS_INDEX_SCHEMA_VERSION = 1
+_RECORDS_INDEX_LOCKS: dict[str, threading.Lock] = {}
+_RECORDS_INDEX_LOCKS_GUARD = threading.Lock()
+_RECORD_FLAG_OPENABLE = 1
+# Mirrors _transfer_table_state; "expired" depends on the request time, so it is evaluated at query time.
+_TRANSFER_STATE_SQL = (
+    "CASE WHEN pay_sub_type = 4 THEN 'returned' "
+    "WHEN pay_sub_type = 3 THEN 'received' "
+    "WHEN pay_sub_type = 2 AND invalid_time > 0 AND invalid_time <= ? THEN 'expired' "
+    "WHEN pay_sub_type = 2 THEN 'pending' "
+    "ELSE 'unknown' END"
+)
+_FRIEND_SEARCH_FIELDS = ("userName", "content", "remark", "scene", "contact")
+_PAYMENT_SEARCH_FIELDS = (
+    "transferId", "transactionId", "sessionName", "payReceiver", "payPayer",
+    "senderUserName", "sendId", "nativeUrl", "sessionContact", "payerContact",
+    "receiverContact", "senderContact",
+)
+_REVOKE_SEARCH_FIELDS = (
+    "msgUniqueId", "sessionName", "batchId", "msgLocalId", "toUserName", "svrId", "content", "atUserList", "sessionContact",
+)
+_FINDER_SEARCH_FIELDS = (
+    "finderUsername", "finderExportId", "finderLiveId", "username", "contact",
+    "profile", "profileUrl", "description", "liveInfo",
+)
+
+
+def _records_index_lock(account_dir: Path) -> threading.Lock:
+    key = str(account_dir)
+    with _RECORDS_INDEX_LOCKS_GUARD:
+        lock = _RECORDS_INDEX_LOCKS.get(key)
+        if lock is None:
+            lock = threading.Lock()
+            _RECORDS_INDEX_LOCKS[key] = lock
+        return lock
+
+
+def _connect_records_index(account_dir: Path) -> sqlite3.Connection:
+    # Derived from general.db (and sns.db for finder lives); safe to delete, it is rebuilt on the next request.
+    conn = sqlite3.connect(str(account_dir / _RECORDS_INDEX_DB_NAME), timeout=30, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or str(row[0]) != str(_RECORDS_INDEX_SCHEMA_VERSION):
+            conn.execute("DROP TABLE IF EXISTS general_record")
+            conn.execute("DELETE FROM meta")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS general_record (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                record_key TEXT NOT NULL,
+                sort_time INTEGER NOT NULL DEFAULT 0,
+                sort_tie INTEGER NOT NULL DEFAULT 0,
+                pay_sub_type INTEGER NOT NULL DEFAULT 0,
+                invalid_time INTEGER NOT NULL DEFAULT 0,
+                flags INTEGER NOT NULL DEFAULT 0,
+                search_text TEXT NOT NULL,
+                item_json TEXT NOT NULL,
+                UNIQUE (kind, record_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_general_record_kind_time
+                ON general_record(kind, sort_time DESC, sort_tie DESC);
+            """
+        )
+        conn.execute(
+            "INSERT INTO meta(key, value) VALUES('schema_version', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(_RECORDS_INDEX_SCHEMA_VERSION),),
+        )
+        conn.commit()
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+@contextmanager
+def _open_records_index(account_dir: Path):
+    with _records_index_lock(account_dir):
+        index_conn = _connect_records_index(account_dir)
+        try:
+            yield index_conn
+        finally:
+            index_conn.close()
+
+
+def _records_source_signature(*paths: Path) -> str:
+    """Stat signature of the source DBs (plus WAL); "" when the primary file cannot be stat'ed."""
+    parts: list[str] = []
+    for index, path in enumerate(paths):
+        for candidate in (path, path.with_name(path.name + "-wal")):
+            try:
+                st = candidate.stat()
+            except OSError:
+                if index == 0 and candidate == path:
+                    return ""
+                parts.append(f"{candidate}:-")
+                continue
+            parts.append(f"{candidate}:{st.st_mtime_ns}:{st.st_size}")
+    return "|".join(parts)
+
+
+def _keyed_rows(rows: Iterable[Any]) -> dict[str, Any]:
+    """Key source rows by a digest of their values; an edited row simply becomes a new key."""
+    out: dict[str, Any] = {}
+    for row in rows:
+        values = [row[key] for key in row.keys()]
+        digest = hashlib.sha1(json.dumps(values, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        key = digest
+        n = 1
+        while key in out:
+            key = f"{digest}:{n}"
+            n += 1
+        out[key] = row
+    return out
+
+
+def _record_search_text(item: dict[str, Any], fields: Iterable[str]) -> str:
+    return "\n".join(_keyword_haystack(item.get(field)) for field in fields).lower()
+
+
+def _sync_general_records(
+    index_conn: sqlite3.Connection,
+    *,
+    group: str,
+    signature: str,
+    contacts_signature: str,
+    kinds: tuple[str, ...],
+    load_rows: Callable[[], dict[str, dict[str, Any]]],
+    build_records: Callable[[list[tuple[str, str, Any]]], list[dict[str, Any]]],
+) -> dict[str, int]:
+    """Bring one record group in line with its source, parsing only rows that are not indexed yet.
+
+    Contact display names are baked into search_text, so a change of ``contacts_signature``
+    (contact.db) rebuilds every row of the group.
+    """
+    meta_key = f"signature:{group}"
+    contacts_key = f"contacts:{group}"
+    stored = {
+        str(key): str(value)
+        for key, value in index_conn.execute(
+            "SELECT key, value FROM meta WHERE key IN (?, ?)", (meta_key, contacts_key)
+        )
+    }
+    contacts_changed = stored.get(contacts_key) != contacts_signature
+    if signature and stored.get(meta_key) == signature and not contacts_changed:
+        return {"added": 0, "removed": 0}
+
+    current = load_rows()
+    kind_sql = ", ".join("?" for _ in kinds)
+    indexed = [
+        (str(kind), str(key))
+        for kind, key in index_conn.execute(
+            f"SELECT kind, record_key FROM general_record WHERE kind IN ({kind_sql})", kinds
+        )
+    ]
+    indexed_set = set(indexed)
+    added = [
+        (kind, key, source_row)
+        for kind in kinds
+        for key, source_row in (current.get(kind) or {}).items()
+        if contacts_changed or (kind, key) not in indexed_set
+    ]
+    removed = [(kind, key) for kind, key in indexed if key not in (current.get(kind) or {})]
+    records = build_records(added) if added else []
+    with index_conn:
+        index_conn.executemany("DELETE FROM general_record WHERE kind = ? AND record_key = ?", removed)
+        index_conn.executemany(
+            "INSERT OR REPLACE INTO general_record(kind, record_key, sort_time, sort_tie, pay_sub_type, "
+            "invalid_time, flags, search_text, item_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    record["kind"],
+                    record["key"],
+                    _safe_int(record.get("sortTime"), 0),
+                    _safe_int(record.get("sortTie"), 0),
+                    _safe_int(record["item"].get("paySubType"), 0),
+                    _safe_int(record["item"].get("invalidTime"), 0),
+                    _safe_int(record.get("flags"), 0),
+                    record["searchText"],
+                    json.dumps(record["item"], ensure_ascii=False, default=str),
+                )
+                for record in records
+            ],
+        )
+        index_conn.executemany(
+            "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(meta_key, signature), (contacts_key, contacts_signature)],
+        )
+    return {"added": len(records), "removed": len(removed)}
+
+
+def _query_general_records(
+    index_conn: sqlite3.Connection,
+    *,
+    kinds: Iterable[str],
+    q: str,
+    order_by: str,
+    limit: int,
+    offset: int,
+    where: Iterable[str] = (),
+    params: Iterable[Any] = (),
+) -> tuple[dict[str, int], int, list[dict[str, Any]]]:
+    """Return (matches per kind, matches flagged openable, page items) for the filtered records."""
+    kind_list = list(kinds)
+    clauses = [f"kind IN ({', '.join('?' for _ in kind_list)})", *where]
+    args: list[Any] = [*kind_list, *params]
+    needle = str(q or "").strip().lower()
+    if needle:
+        clauses.append("instr(search_text, ?) > 0")
+        args.append(needle)
+    where_sql = " AND ".join(clauses)
+    counts: dict[str, int] = {}
+    flagged = 0
+    for kind, count, openable in index_conn.execute(
+        f"SELECT kind, COUNT(*), COALESCE(SUM(flags & {_RECORD_FLAG_OPENABLE}), 0) "
+        f"FROM general_record WHERE {where_sql} GROUP BY kind",
+        args,
+    ):
+        counts[str(kind)] = int(count)
+        flagged += int(openable)
+    rows = index_conn.execute(
+        f"SELECT item_json FROM general_record WHERE {where_sql} ORDER BY {order_by} LIMIT ? OFFSET ?",
+        [*args, int(limit), int(offset)],
+    ).fetchall()
+    return counts, flagged, [json.loads(row[0]) for row in rows]
+
+
+def _friend_verification_item(r: Any) -> dict[str, Any]:
+    return {
+        "userName": _text(r["user_name_"]),
+        "type": _safe_int(r["type_"], 0),
+        "timestamp": _safe_int(r["timestamp_"], 0),
+        "timeText": _time_text(r["timestamp_"]),
+        "encryptUserName": _text(r["encrypt_user_name_"], max_len=260),
+        "content": _text(r["content_"]),
+        "isSender": bool(_safe_int(r["is_sender_"], 0)),
+        "ticket": _text(r["ticket_"], max_len=260),
+        "scene": _safe_int(r["scene_"], 0),
+        "detailSize": _safe_int(r["fmessage_detail_size_"], 0),
+        "remark": _text(r["remark_"]),
+        "labelIds": _text(r["label_ids_"]),
+    }
+
+
+def _transfer_item(r: Any) -> dict[str, Any]:
+    return {
+        "kind": "transfer",
+        "transferId": _text(r["transfer_id"]),
+        "transactionId": _text(r["transcation_id"]),
+        "messageServerId": _safe_int(r["message_server_id"], 0),
+        "secondMessageServerId": _safe_int(r["second_message_server_id"], 0),
+        "sessionName": _text(r["session_name"]),
+        "paySubType": _safe_int(r["pay_sub_type"], 0),
+        "payReceiver": _text(r["pay_receiver"]),
+        "payPayer": _text(r["pay_payer"]),
+        "beginTransferTime": _safe_int(r["begin_transfer_time"], 0),
+        "beginTransferTimeText": _time_text(r["begin_transfer_time"]),
+        "lastModifiedTime": _safe_int(r["last_modified_time"], 0),
+        "lastModifiedTimeText": _time_text(r["last_modified_time"]),
+        "invalidTime": _safe_int(r["invalid_time"], 0),
+        "invalidTimeText": _time_text(r["invalid_time"]),
+        "lastUpdateTime": _safe_int(r["last_update_time"], 0),
+        "lastUpdateTimeText": _time_text(r["last_update_time"]),
+        "delayConfirmFlag": _safe_int(r["delay_confirm_flag"], 0),
+        "bubbleClickedFlag": r["bubble_clicked_flag"] if r["bubble_clicked_flag"] is not None else None,
+        "sortTime": _safe_int(r["begin_transfer_time"], 0),
+    }
+
+
+def _red_packet_item(r: Any) -> dict[str, Any]:
+    return {
+        "kind": "redpacket",
+        "messageServerId": _safe_int(r["message_server_id"], 0),
+        "sessionName": _text(r["session_name"]),
+        "senderUserName": _text(r["sender_user_name"]),
+        "nativeUrl": _text(r["native_url"], max_len=260),
+        "sendId": _text(r["send_id"]),
+        "sceneId": _safe_int(r["scene_id"], 0),
+        "hbStatus": _safe_int(r["hb_status"], 0),
+        "hbType": _safe_int(r["hb_type"], 0),
+        "receiveStatus": _safe_int(r["receive_status"], 0),
+        "sortTime": 0,
+    }
+
+
+def _revoke_batch_item(r: Any) -> dict[str, Any]:
+    return {
+        "kind": "batch",
+        "recordType": "batch_revoke_candidate",
+        "recordTypeLabel": "可批量撤回缓存",
+        "semantic": "revokebatchmessage 记录的是本机发送消息的批量撤回候选/索引，不等同于已经撤回。",
+        "isActualRevoke": False,
+        "localId": _safe_int(r["local_id"], 0),
+        "batchId": _safe_int(r["batch_id"], 0),
+        "msgUniqueId": _text(r["msg_unique_id"]),
+        "sessionName": _text(r["session_name"]),
+        "msgLocalId": _safe_int(r["msg_local_id"], 0),
+        "msgCreateTime": _safe_int(r["msg_create_time"], 0),
+        "msgCreateTimeText": _time_text(r["msg_create_time"]),
+    }
+
+
+def _revoke_single_item(r: Any) -> dict[str, Any]:
+    return {
+        "kind": "single",
+        "recordType": "actual_revoke",
+        "recordTypeLabel": "已撤回",
+        "semantic": "revokemessage 记录实际撤回通知。",
+        "isActualRevoke": True,
+        "toUserName": _text(r["to_user_name"]),
+        "svrId": _safe_int(r["svr_id"], 0),
+        "messageType": _safe_int(r["message_type"], 0),
+        "revokeTime": _safe_int(r["revoke_time"], 0),
+        "revokeTimeText": _time_text(r["revoke_time"]),
+        "content": _text(r["content"], max_len=320),
+        "atUserList": _text(r["at_user_list"], max_len=320),
+    }
+
+
+def _attach_payment_contacts(items: list[dict[str, Any]], contact_map: dict[str, dict[str, Any]]) -> None:
+    for item in items:
+        _attach_contact(item, contact_map, "sessionName", "sessionContact")
+        if item.get("kind") == "transfer":
+            _attach_contact(item, contact_map, "payPayer", "payerContact")
+            _attach_contact(item, contact_map, "payReceiver", "receiverContact")
+        else:
+            _attach_contact(item, contact_map, "senderUserName", "senderContact")
+
+
+def _payment_usernames(items: list[dict[str, Any]]) -> list[str]:
+    fields = ("sessionName", "payReceiver", "payPayer", "senderUserName")
+    return [_text(item.get(field)) for item in items for field in fields if _text(item.get(field))]
+
+
+def _attach_revoke_contacts(items: list[dict[str, Any]], contact_map: dict[str, dict[str, Any]]) -> None:
+    for item in items:
+        source_field = "sessionName" if item.get("kind") == "batch" else "toUserName"
+        _attach_contact(item, contact_map, source_field, "sessionContact")
+
+
+def _revoke_usernames(items: list[dict[str, Any]]) -> list[str]:
+    return [
+        username
+        for item in items
+        if (username := _text(item.get("sessionName" if item.get("kind") == "batch" else "toUserName")))
+    ]
+
+
+def _build_general_records(
+    account_dir: Path,
+    account_name: str,
+    added: list[tuple[str, str, dict[str, Any]]],
+    *,
+    usernames: Callable[[list[dict[str, Any]]], list[str]],
+    attach: Callable[[list[dict[str, Any]], dict[str, dict[str, Any]]], None],
+    fields: Iterable[str],
+    sort_key: Callable[[dict[str, Any]], tuple[int, int]],
+    flags: Callable[[dict[str, Any]], int] = lambda _item: 0,
+) -> list[dict[str, Any]]:
+    """Build index records for new items; contact names only feed the search text, never item_json."""
+    contact_map = _resolve_general_contacts(
+        account_dir=account_dir,
+        account_name=account_name,
+        usernames=usernames([item for _kind, _key, item in added]),
+        base_url="",
+    )
+    fields = tuple(fields)
+    records: list[dict[str, Any]] = []
+    for kind, key, item in added:
+        search_item = dict(item)
+        attach([search_item], contact_map)
+        sort_time, sort_tie = sort_key(item)
+        records.append({
+            "kind": kind,
+            "key": key,
+            "item": item,
+            "searchText": _record_search_text(search_item, fields),
+            "sortTime": sort_time,
+            "sortTie": sort_tie,
+            "flags": flags(item),
+        })
+    return records
+
+
+def _attach_friend_contacts(items: list[dict[str, Any]], contact_map: dict[str, dict[str, Any]]) -> None:
+    for item in items:
+        _attach_contact(item, contact_map, "userName", "contact")
+
+
+def _attach_finder_contacts(items: list[dict[str, Any]], contact_map: dict[str, dict[str, Any]]) -> None:
+    # Identities parsed from the finder user page / SNS win over plain contact rows.
+    for item in items:
+        if not item.get("contact"):
+            _attach_contact(item, contact_map, "finderUsername", "contact")
+
+
+def _finder_contact_usernames(items: list[dict[str, Any]]) -> list[str]:
+    return [_text(item.get("finderUsername")) for item in items if not item.get("contact")]
+
+
 @router.get("/api/general/overview", summary="general.db 概览")
 def get_general_overview(
     account: Optional[str] = None,
@@ -1328,50 +1741,59 @@ def list_friend_verifications(
     account_name = ctx.name
     limit = _clamp_limit(limit)
     offset = _clamp_offset(offset)
-    items: list[dict[str, Any]] = []
-    usernames: list[str] = []
     meta: dict[str, str] = {}
     with _open_general_source(ctx, source) as conn:
         meta = _source_meta(conn)
-        rows = conn.execute(
-            """
-            SELECT user_name_, type_, timestamp_, encrypt_user_name_, content_, is_sender_,
-                   ticket_, scene_, length(CAST(fmessage_detail_buf_ AS BLOB)) AS fmessage_detail_size_,
-                   remark_, label_ids_
-            FROM FMessageTable
-            ORDER BY timestamp_ DESC
-            """
-        ).fetchall()
-        for r in rows:
-            user_name = _text(r["user_name_"])
-            if user_name:
-                usernames.append(user_name)
-            item = {
-                "userName": user_name,
-                "type": _safe_int(r["type_"], 0),
-                "timestamp": _safe_int(r["timestamp_"], 0),
-                "timeText": _time_text(r["timestamp_"]),
-                "encryptUserName": _text(r["encrypt_user_name_"], max_len=260),
-                "content": _text(r["content_"]),
-                "isSender": bool(_safe_int(r["is_sender_"], 0)),
-                "ticket": _text(r["ticket_"], max_len=260),
-                "scene": _safe_int(r["scene_"], 0),
-                "detailSize": _safe_int(r["fmessage_detail_size_"], 0),
-                "remark": _text(r["remark_"]),
-                "labelIds": _text(r["label_ids_"]),
-            }
-            items.append(item)
+
+        def load_rows() -> dict[str, dict[str, Any]]:
+            rows = conn.execute(
+                """
+                SELECT user_name_, type_, timestamp_, encrypt_user_name_, content_, is_sender_,
+                       ticket_, scene_, length(CAST(fmessage_detail_buf_ AS BLOB)) AS fmessage_detail_size_,
+                       remark_, label_ids_
+                FROM FMessageTable
+                """
+            ).fetchall()
+            return {"friend_verification": _keyed_rows(rows)}
+
+        def build_records(added: list[tuple[str, str, Any]]) -> list[dict[str, Any]]:
+            return _build_general_records(
+                ctx.account_dir,
+                account_name,
+                [(kind, key, _friend_verification_item(r)) for kind, key, r in added],
+                usernames=lambda items: [_text(item.get("userName")) for item in items],
+                attach=_attach_friend_contacts,
+                fields=_FRIEND_SEARCH_FIELDS,
+                sort_key=lambda item: (_safe_int(item.get("timestamp"), 0), 0),
+            )
+
+        with _open_records_index(ctx.account_dir) as index_conn:
+            _sync_general_records(
+                index_conn,
+                group="friend_verifications",
+                signature=_records_source_signature(Path(conn.db_path)),
+                contacts_signature=_records_source_signature(ctx.account_dir / "contact.db"),
+                kinds=("friend_verification",),
+                load_rows=load_rows,
+                build_records=build_records,
+            )
+            counts, _flagged, items = _query_general_records(
+                index_conn,
+                kinds=("friend_verification",),
+                q=q,
+                order_by="sort_time DESC, id ASC",
+                limit=limit,
+                offset=offset,
+            )
     contact_map = _resolve_general_contacts(
         account_dir=ctx.account_dir,
         account_name=account_name,
-        usernames=usernames,
+        usernames=[_text(item.get("userName")) for item in items],
         base_url=str(request.base_url).rstrip("/"),
     )
-    for item in items:
-        _attach_contact(item, contact_map, "userName", "contact")
-    items = [item for item in items if _contains_keyword(item, q, ["userName", "content", "remark", "scene", "contact"])]
-    sliced, has_more = _page(items, limit=limit, offset=offset)
-    return {"status": "success", "account": account_name, "total": len(items), "hasMore": has_more, "items": sliced, **meta}
+    _attach_friend_contacts(items, contact_map)
+    total = sum(counts.values())
+    return {"status": "success", "account": account_name, "total": total, "hasMore": offset + limit < total, "items": items, **meta}
 
 
 def _extract_weapp_summary(external_info: Any) -> dict[str, Any]:
@@ -1471,6 +1893,94 @@ def list_mini_programs(
     return {"status": "success", "account": account_name, "total": len(items), "hasMore": has_more, "items": sliced, **meta}
 
 
+def _load_finder_live_items(ctx: Any, conn: Any, *, source: str) -> list[dict[str, Any]]:
+    """Live rows joined with finder identities from wcfinderuserpage and SNS, before contact lookup."""
+    lives = []
+    for r in conn.execute(
+        """
+        SELECT finder_live_id, finder_username, finder_export_id, live_status, replay_status, charge_flag
+        FROM wcfinderlivestatus
+        WHERE live_status IN (1, 2)
+        ORDER BY finder_live_id DESC
+        """
+    ).fetchall():
+        finder_username = _text(r["finder_username"])
+        finder_export_id = _text(r["finder_export_id"], max_len=260)
+        live_url = _finder_live_url(finder_export_id)
+        item = {
+            "finderLiveId": _safe_int(r["finder_live_id"], 0),
+            "finderUsername": finder_username,
+            "finderExportId": finder_export_id,
+            "liveUrl": live_url,
+            "jumpUrl": live_url,
+            "canOpenLive": bool(live_url),
+            "openLiveHint": "可通过 finder_export_id 打开直播页" if live_url else "该记录未保存 finder_export_id，无法可靠构造直播页直达链接",
+            "profileUrl": _finder_profile_url(finder_username),
+            "liveStatus": _safe_int(r["live_status"], 0),
+            "replayStatus": _safe_int(r["replay_status"], 0),
+            "chargeFlag": _safe_int(r["charge_flag"], 0),
+        }
+        lives.append(item)
+
+    page_finder_map: dict[str, dict[str, Any]] = {}
+    for r in conn.execute("SELECT username, extra_buffer FROM wcfinderuserpage ORDER BY username ASC").fetchall():
+        username = _text(r["username"])
+        profile = _parse_finder_userpage_extra_buffer(r["extra_buffer"])
+        finder_username = _text(profile.get("finderUsername"))
+        if finder_username:
+            page_finder_map[finder_username] = _finder_identity_from_parts(
+                username=finder_username,
+                display_name=_text(profile.get("nickname")),
+                profile_url=_text(profile.get("profileUrl")),
+                description=_compact_parts(
+                    _text(profile.get("signature")),
+                    _text(profile.get("description")),
+                ),
+                source="general.wcfinderuserpage",
+                owner_username=username,
+            )
+
+    sns_finder_map, sns_live_map = _load_finder_sns_maps(ctx, source=source)
+    finder_map: dict[str, dict[str, Any]] = dict(page_finder_map)
+    for username, identity in sns_finder_map.items():
+        finder_map[username] = _merge_finder_identity(identity, finder_map.get(username)) or identity
+
+    combined = [{"kind": "live", **x} for x in lives]
+    for item in combined:
+        live_info = sns_live_map.get(_safe_int(item.get("finderLiveId"), 0), {})
+        if live_info:
+            item["liveInfo"] = live_info
+            if not _text(item.get("finderUsername")) and _text(live_info.get("finderUsername")):
+                item["finderUsername"] = _text(live_info.get("finderUsername"))
+            if _text(live_info.get("desc")):
+                item["description"] = _text(live_info.get("desc"), max_len=220)
+            if _text(live_info.get("coverUrl")):
+                item["coverUrl"] = _text(live_info.get("coverUrl"))
+            if _text(live_info.get("objectId")):
+                item["objectId"] = _text(live_info.get("objectId"))
+        finder_username = _text(item.get("finderUsername"))
+        identity = finder_map.get(finder_username)
+        if not identity and live_info:
+            identity = _finder_identity_from_parts(
+                username=finder_username or _text(live_info.get("finderUsername")),
+                display_name=_text(live_info.get("nickname")),
+                avatar=_text(live_info.get("headUrl")),
+                description=_text(live_info.get("desc"), max_len=220),
+                source=_text(live_info.get("source")) or "sns.finderLive",
+            )
+        if identity:
+            item["contact"] = identity
+            if not _text(item.get("profileUrl")):
+                item["profileUrl"] = _text(identity.get("profileUrl"))
+    return combined
+
+
+def _finder_sns_path(ctx: Any, conn: Any) -> Path:
+    if str(getattr(conn, "source", "decrypted")) == "realtime":
+        return Path(conn.db_path).parent.parent / "sns" / "sns.db"
+    return ctx.account_dir / "sns.db"
+
+
 @router.get("/api/general/finder", summary="视频号/直播缓存")
 def list_finder_records(
     request: Request,
@@ -1484,69 +1994,45 @@ def list_finder_records(
     account_name = ctx.name
     limit = _clamp_limit(limit, 100)
     offset = _clamp_offset(offset)
-    usernames: list[str] = []
-    finder_usernames: list[str] = []
-    page_finder_map: dict[str, dict[str, Any]] = {}
     meta: dict[str, str] = {}
     with _open_general_source(ctx, source) as conn:
         meta = _source_meta(conn)
-        lives = []
-        for r in conn.execute(
-            """
-            SELECT finder_live_id, finder_username, finder_export_id, live_status, replay_status, charge_flag
-            FROM wcfinderlivestatus
-            WHERE live_status IN (1, 2)
-            ORDER BY finder_live_id DESC
-            """
-        ).fetchall():
-            finder_username = _text(r["finder_username"])
-            if finder_username:
-                finder_usernames.append(finder_username)
-            finder_export_id = _text(r["finder_export_id"], max_len=260)
-            live_url = _finder_live_url(finder_export_id)
-            item = {
-                "finderLiveId": _safe_int(r["finder_live_id"], 0),
-                "finderUsername": finder_username,
-                "finderExportId": finder_export_id,
-                "liveUrl": live_url,
-                "jumpUrl": live_url,
-                "canOpenLive": bool(live_url),
-                "openLiveHint": "可通过 finder_export_id 打开直播页" if live_url else "该记录未保存 finder_export_id，无法可靠构造直播页直达链接",
-                "profileUrl": _finder_profile_url(finder_username),
-                "liveStatus": _safe_int(r["live_status"], 0),
-                "replayStatus": _safe_int(r["replay_status"], 0),
-                "chargeFlag": _safe_int(r["charge_flag"], 0),
-            }
-            lives.append(item)
+        data_source = meta.get("dataSource", "decrypted")
+
+        def load_rows() -> dict[str, dict[str, Any]]:
+            return {"finder_live": _keyed_rows(_load_finder_live_items(ctx, conn, source=data_source))}
+
+        def build_records(added: list[tuple[str, str, Any]]) -> list[dict[str, Any]]:
+            return _build_general_records(
+                ctx.account_dir,
+                account_name,
+                added,
+                usernames=_finder_contact_usernames,
+                attach=_attach_finder_contacts,
+                fields=_FINDER_SEARCH_FIELDS,
+                sort_key=lambda item: (_safe_int(item.get("finderLiveId"), 0), 0),
+                flags=lambda item: _RECORD_FLAG_OPENABLE if item.get("canOpenLive") else 0,
+            )
 
-        pages = []
-        for r in conn.execute("SELECT username, extra_buffer FROM wcfinderuserpage ORDER BY username ASC").fetchall():
-            username = _text(r["username"])
-            if username:
-                usernames.append(username)
-            profile = _parse_finder_userpage_extra_buffer(r["extra_buffer"])
-            finder_username = _text(profile.get("finderUsername"))
-            if finder_username:
-                finder_usernames.append(finder_username)
-                page_finder_map[finder_username] = _finder_identity_from_parts(
-                    username=finder_username,
-                    display_name=_text(profile.get("nickname")),
-                    profile_url=_text(profile.get("profileUrl")),
-                    description=_compact_parts(
-                        _text(profile.get("signature")),
-                        _text(profile.get("description")),
-                    ),
-                    source="general.wcfinderuserpage",
-                    owner_username=username,
-                )
-            item = {
-                "username": username,
-                "finderUsername": finder_username,
-                "profileUrl": _text(profile.get("profileUrl")),
-                "profile": profile,
-                "extraBufferSize": _blob_len(r["extra_buffer"]),
-            }
-            pages.append(item)
+        with _open_records_index(ctx.account_dir) as index_conn:
+            # Live identities come from sns.db too, so either file changing re-checks the group.
+            _sync_general_records(
+                index_conn,
+                group="finder",
+                signature=_records_source_signature(Path(conn.db_path), _finder_sns_path(ctx, conn)),
+                contacts_signature=_records_source_signature(ctx.account_dir / "contact.db"),
+                kinds=("finder_live",),
+                load_rows=load_rows,
+                build_records=build_records,
+            )
+            kind_counts, openable_total, items = _query_general_records(
+                index_conn,
+                kinds=("finder_live",),
+                q=q,
+                order_by="sort_time DESC, id ASC",
+                limit=limit,
+                offset=offset,
+            )
 
         counts = [dict(row) for row in conn.execute(
             """
@@ -1558,71 +2044,24 @@ def list_finder_records(
             """
         ).fetchall()]
 
-    sns_finder_map, sns_live_map = _load_finder_sns_maps(ctx, source=meta.get("dataSource", "decrypted"))
-    finder_map: dict[str, dict[str, Any]] = dict(page_finder_map)
-    for username, identity in sns_finder_map.items():
-        finder_map[username] = _merge_finder_identity(identity, finder_map.get(username)) or identity
-
-    combined = [{"kind": "live", **x} for x in lives]
     contact_map = _resolve_general_contacts(
         account_dir=ctx.account_dir,
         account_name=account_name,
-        usernames=usernames,
+        usernames=_finder_contact_usernames(items),
         base_url=str(request.base_url).rstrip("/"),
     )
-    for item in combined:
-        if item.get("kind") == "live":
-            live_info = sns_live_map.get(_safe_int(item.get("finderLiveId"), 0), {})
-            if live_info:
-                item["liveInfo"] = live_info
-                if not _text(item.get("finderUsername")) and _text(live_info.get("finderUsername")):
-                    item["finderUsername"] = _text(live_info.get("finderUsername"))
-                if _text(live_info.get("desc")):
-                    item["description"] = _text(live_info.get("desc"), max_len=220)
-                if _text(live_info.get("coverUrl")):
-                    item["coverUrl"] = _text(live_info.get("coverUrl"))
-                if _text(live_info.get("objectId")):
-                    item["objectId"] = _text(live_info.get("objectId"))
-            finder_username = _text(item.get("finderUsername"))
-            identity = finder_map.get(finder_username)
-            if not identity and live_info:
-                identity = _finder_identity_from_parts(
-                    username=finder_username or _text(live_info.get("finderUsername")),
-                    display_name=_text(live_info.get("nickname")),
-                    avatar=_text(live_info.get("headUrl")),
-                    description=_text(live_info.get("desc"), max_len=220),
-                    source=_text(live_info.get("source")) or "sns.finderLive",
-                )
-            if identity:
-                item["contact"] = identity
-                if not _text(item.get("profileUrl")):
-                    item["profileUrl"] = _text(identity.get("profileUrl"))
-            else:
-                _attach_contact(item, contact_map, "finderUsername", "contact")
-    combined = [
-        item for item in combined
-        if _safe_int(item.get("liveStatus"), 0) in {1, 2}
-    ]
-    combined = [
-        item for item in combined
-        if _contains_keyword(item, q, [
-            "finderUsername", "finderExportId", "finderLiveId", "username", "contact",
-            "profile", "profileUrl", "description", "liveInfo",
-        ])
-    ]
-    live_total = sum(1 for item in combined if item.get("kind") == "live")
-    openable_total = sum(1 for item in combined if item.get("canOpenLive"))
-    sliced, has_more = _page(combined, limit=limit, offset=offset)
+    _attach_finder_contacts(items, contact_map)
+    live_total = sum(kind_counts.values())
     return {
         "status": "success",
         "account": account_name,
-        "total": len(combined),
-        "hasMore": has_more,
+        "total": live_total,
+        "hasMore": offset + limit < live_total,
         "counts": counts,
         "liveTotal": live_total,
         "userPageTotal": 0,
         "openableTotal": openable_total,
-        "items": sliced,
+        "items": items,
         **meta,
     }
 
@@ -1644,75 +2083,72 @@ def list_payment_records(
     account_name = ctx.name
     limit = _clamp_limit(limit, 120)
     offset = _clamp_offset(offset)
-    items: list[dict[str, Any]] = []
-    usernames: list[str] = []
     stats: dict[str, Any] = {}
     meta: dict[str, str] = {}
     with _open_general_source(ctx, source) as conn:
         meta = _source_meta(conn)
-        if kind in {"all", "transfer"}:
-            for r in conn.execute(
+        data_source = meta.get("dataSource", "decrypted")
+
+        def load_rows() -> dict[str, dict[str, Any]]:
+            transfers = conn.execute(
                 """
                 SELECT transfer_id, transcation_id, message_server_id, second_message_server_id,
                        session_name, pay_sub_type, pay_receiver, pay_payer, begin_transfer_time,
                        last_modified_time, invalid_time, last_update_time, delay_confirm_flag, bubble_clicked_flag
                 FROM transferTable
-                ORDER BY begin_transfer_time DESC
                 """
-            ).fetchall():
-                session_name = _text(r["session_name"])
-                pay_receiver = _text(r["pay_receiver"])
-                pay_payer = _text(r["pay_payer"])
-                usernames.extend([session_name, pay_receiver, pay_payer])
-                item = {
-                    "kind": "transfer",
-                    "transferId": _text(r["transfer_id"]),
-                    "transactionId": _text(r["transcation_id"]),
-                    "messageServerId": _safe_int(r["message_server_id"], 0),
-                    "secondMessageServerId": _safe_int(r["second_message_server_id"], 0),
-                    "sessionName": session_name,
-                    "paySubType": _safe_int(r["pay_sub_type"], 0),
-                    "payReceiver": pay_receiver,
-                    "payPayer": pay_payer,
-                    "beginTransferTime": _safe_int(r["begin_transfer_time"], 0),
-                    "beginTransferTimeText": _time_text(r["begin_transfer_time"]),
-                    "lastModifiedTime": _safe_int(r["last_modified_time"], 0),
-                    "lastModifiedTimeText": _time_text(r["last_modified_time"]),
-                    "invalidTime": _safe_int(r["invalid_time"], 0),
-                    "invalidTimeText": _time_text(r["invalid_time"]),
-                    "lastUpdateTime": _safe_int(r["last_update_time"], 0),
-                    "lastUpdateTimeText": _time_text(r["last_update_time"]),
-                    "delayConfirmFlag": _safe_int(r["delay_confirm_flag"], 0),
-                    "bubbleClickedFlag": r["bubble_clicked_flag"] if r["bubble_clicked_flag"] is not None else None,
-                    "sortTime": _safe_int(r["begin_transfer_time"], 0),
-                }
-                items.append(item)
-        if kind in {"all", "redpacket"}:
-            for r in conn.execute(
+            ).fetchall()
+            red_packets = conn.execute(
                 """
                 SELECT message_server_id, session_name, sender_user_name, native_url, send_id,
                        scene_id, hb_status, hb_type, receive_status
                 FROM redEnvelopeTable
-                ORDER BY message_server_id DESC
                 """
-            ).fetchall():
-                session_name = _text(r["session_name"])
-                sender_user_name = _text(r["sender_user_name"])
-                usernames.extend([session_name, sender_user_name])
-                item = {
-                    "kind": "redpacket",
-                    "messageServerId": _safe_int(r["message_server_id"], 0),
-                    "sessionName": session_name,
-                    "senderUserName": sender_user_name,
-                    "nativeUrl": _text(r["native_url"], max_len=260),
-                    "sendId": _text(r["send_id"]),
-                    "sceneId": _safe_int(r["scene_id"], 0),
-                    "hbStatus": _safe_int(r["hb_status"], 0),
-                    "hbType": _safe_int(r["hb_type"], 0),
-                    "receiveStatus": _safe_int(r["receive_status"], 0),
-                    "sortTime": 0,
-                }
-                items.append(item)
+            ).fetchall()
+            return {"transfer": _keyed_rows(transfers), "redpacket": _keyed_rows(red_packets)}
+
+        def build_records(added: list[tuple[str, str, Any]]) -> list[dict[str, Any]]:
+            parsed = [
+                (record_kind, key, _transfer_item(r) if record_kind == "transfer" else _red_packet_item(r))
+                for record_kind, key, r in added
+            ]
+            # Red packets sort by their message time, which lives in the message DBs; look it up once per new row.
+            _hydrate_and_sort_payment_items(ctx.account_dir, [item for _k, _key, item in parsed], source=data_source)
+            return _build_general_records(
+                ctx.account_dir,
+                account_name,
+                parsed,
+                usernames=_payment_usernames,
+                attach=_attach_payment_contacts,
+                fields=_PAYMENT_SEARCH_FIELDS,
+                sort_key=lambda item: (_safe_int(item.get("sortTime"), 0), _safe_int(item.get("messageServerId"), 0)),
+            )
+
+        where: list[str] = []
+        params: list[Any] = []
+        if status != "all":
+            where.append(f"kind = 'transfer' AND {_TRANSFER_STATE_SQL} = ?")
+            params.extend([int(datetime.now().timestamp()), status])
+        with _open_records_index(ctx.account_dir) as index_conn:
+            _sync_general_records(
+                index_conn,
+                group="payments",
+                signature=_records_source_signature(Path(conn.db_path)),
+                contacts_signature=_records_source_signature(ctx.account_dir / "contact.db"),
+                kinds=("transfer", "redpacket"),
+                load_rows=load_rows,
+                build_records=build_records,
+            )
+            counts, _flagged, items = _query_general_records(
+                index_conn,
+                kinds=("transfer", "redpacket") if kind == "all" else (kind,),
+                q=q,
+                where=where,
+                params=params,
+                order_by="sort_time DESC, sort_tie DESC, id ASC",
+                limit=limit,
+                offset=offset,
+            )
         try:
             stats["transferCount"] = int(conn.execute("SELECT COUNT(*) FROM transferTable").fetchone()[0] or 0)
             stats["redPacketCount"] = int(conn.execute("SELECT COUNT(*) FROM redEnvelopeTable").fetchone()[0] or 0)
@@ -1723,50 +2159,18 @@ def list_payment_records(
     contact_map = _resolve_general_contacts(
         account_dir=ctx.account_dir,
         account_name=account_name,
-        usernames=usernames,
+        usernames=_payment_usernames(items),
         base_url=str(request.base_url).rstrip("/"),
     )
-    for item in items:
-        _attach_contact(item, contact_map, "sessionName", "sessionContact")
-        if item.get("kind") == "transfer":
-            _attach_contact(item, contact_map, "payPayer", "payerContact")
-            _attach_contact(item, contact_map, "payReceiver", "receiverContact")
-        else:
-            _attach_contact(item, contact_map, "senderUserName", "senderContact")
-    now_ts = int(datetime.now().timestamp())
-    for item in items:
-        if item.get("kind") == "transfer":
-            _apply_transfer_table_state(item, now_ts=now_ts)
-    items = [
-        item for item in items
-        if _contains_keyword(
-            item,
-            q,
-            [
-                "transferId", "transactionId", "sessionName", "payReceiver", "payPayer",
-                "senderUserName", "sendId", "nativeUrl", "sessionContact", "payerContact",
-                "receiverContact", "senderContact",
-            ],
-        )
-    ]
-    if status != "all":
-        items = [
-            item for item in items
-            if item.get("kind") == "transfer" and item.get("transferState") == status
-        ]
-    _hydrate_and_sort_payment_items(
-        ctx.account_dir,
-        items,
-        source=meta.get("dataSource", "decrypted"),
-    )
-    sliced, has_more = _page(items, limit=limit, offset=offset)
-    visible_transfers = [item for item in sliced if item.get("kind") == "transfer"]
+    _attach_payment_contacts(items, contact_map)
+    visible_transfers = [item for item in items if item.get("kind") == "transfer"]
     _attach_payment_message_details(
         ctx.account_dir,
         visible_transfers,
         source=meta.get("dataSource", "decrypted"),
     )
-    return {"status": "success", "account": account_name, "total": len(items), "hasMore": has_more, "stats": stats, "items": sliced, **meta}
+    total = sum(counts.values())
+    return {"status": "success", "account": account_name, "total": total, "hasMore": offset + limit < total, "stats": stats, "items": items, **meta}
 
 
 @router.get("/api/general/revokes", summary="撤回/可撤回缓存")
@@ -1782,93 +2186,78 @@ def list_revoke_records(
     account_name = ctx.name
     limit = _clamp_limit(limit, 100)
     offset = _clamp_offset(offset)
-    items: list[dict[str, Any]] = []
-    usernames: list[str] = []
     meta: dict[str, str] = {}
     with _open_general_source(ctx, source) as conn:
         meta = _source_meta(conn)
-        for r in conn.execute(
-            """
-            SELECT local_id, batch_id, msg_unique_id, session_name, msg_local_id, msg_create_time
-            FROM revokebatchmessage
-            ORDER BY msg_create_time DESC, local_id DESC
-            """
-        ).fetchall():
-            session_name = _text(r["session_name"])
-            if session_name:
-                usernames.append(session_name)
-            item = {
-                "kind": "batch",
-                "recordType": "batch_revoke_candidate",
-                "recordTypeLabel": "可批量撤回缓存",
-                "semantic": "revokebatchmessage 记录的是本机发送消息的批量撤回候选/索引，不等同于已经撤回。",
-                "isActualRevoke": False,
-                "localId": _safe_int(r["local_id"], 0),
-                "batchId": _safe_int(r["batch_id"], 0),
-                "msgUniqueId": _text(r["msg_unique_id"]),
-                "sessionName": session_name,
-                "msgLocalId": _safe_int(r["msg_local_id"], 0),
-                "msgCreateTime": _safe_int(r["msg_create_time"], 0),
-                "msgCreateTimeText": _time_text(r["msg_create_time"]),
-            }
-            items.append(item)
-        for r in conn.execute(
-            """
-            SELECT to_user_name, svr_id, message_type, revoke_time, content, at_user_list
-            FROM revokemessage
-            ORDER BY revoke_time DESC
-            """
-        ).fetchall():
-            to_user_name = _text(r["to_user_name"])
-            if to_user_name:
-                usernames.append(to_user_name)
-            item = {
-                "kind": "single",
-                "recordType": "actual_revoke",
-                "recordTypeLabel": "已撤回",
-                "semantic": "revokemessage 记录实际撤回通知。",
-                "isActualRevoke": True,
-                "toUserName": to_user_name,
-                "svrId": _safe_int(r["svr_id"], 0),
-                "messageType": _safe_int(r["message_type"], 0),
-                "revokeTime": _safe_int(r["revoke_time"], 0),
-                "revokeTimeText": _time_text(r["revoke_time"]),
-                "content": _text(r["content"], max_len=320),
-                "atUserList": _text(r["at_user_list"], max_len=320),
-            }
-            items.append(item)
+
+        def load_rows() -> dict[str, dict[str, Any]]:
+            batches = conn.execute(
+                """
+                SELECT local_id, batch_id, msg_unique_id, session_name, msg_local_id, msg_create_time
+                FROM revokebatchmessage
+                """
+            ).fetchall()
+            singles = conn.execute(
+                """
+                SELECT to_user_name, svr_id, message_type, revoke_time, content, at_user_list
+                FROM revokemessage
+                """
+            ).fetchall()
+            return {"revoke_batch": _keyed_rows(batches), "revoke_single": _keyed_rows(singles)}
+
+        def build_records(added: list[tuple[str, str, Any]]) -> list[dict[str, Any]]:
+            return _build_general_records(
+                ctx.account_dir,
+                account_name,
+                [
+                    (record_kind, key, _revoke_batch_item(r) if record_kind == "revoke_batch" else _revoke_single_item(r))
+                    for record_kind, key, r in added
+                ],
+                usernames=_revoke_usernames,
+                attach=_attach_revoke_contacts,
+                fields=_REVOKE_SEARCH_FIELDS,
+                sort_key=lambda item: (
+                    _safe_int(item.get("msgCreateTime") or item.get("revokeTime"), 0),
+                    _safe_int(item.get("localId"), 0),
+                ),
+            )
+
+        with _open_records_index(ctx.account_dir) as index_conn:
+            _sync_general_records(
+                index_conn,
+                group="revokes",
+                signature=_records_source_signature(Path(conn.db_path)),
+                contacts_signature=_records_source_signature(ctx.account_dir / "contact.db"),
+                kinds=("revoke_batch", "revoke_single"),
+                load_rows=load_rows,
+                build_records=build_records,
+            )
+            # Batch candidates before actual revokes at equal times, as the old stable sort did.
+            counts, _flagged, items = _query_general_records(
+                index_conn,
+                kinds=("revoke_batch", "revoke_single"),
+                q=q,
+                order_by="sort_time DESC, kind ASC, sort_tie DESC, id ASC",
+                limit=limit,
+                offset=offset,
+            )
     contact_map = _resolve_general_contacts(
         account_dir=ctx.account_dir,
         account_name=account_name,
-        usernames=usernames,
+        usernames=_revoke_usernames(items),
         base_url=str(request.base_url).rstrip("/"),
     )
-    for item in items:
-        if item.get("kind") == "batch":
-            _attach_contact(item, contact_map, "sessionName", "sessionContact")
-        else:
-            _attach_contact(item, contact_map, "toUserName", "sessionContact")
-    items = [
-        item for item in items
-        if _contains_keyword(
-            item,
-            q,
-            ["msgUniqueId", "sessionName", "batchId", "msgLocalId", "toUserName", "svrId", "content", "atUserList", "sessionContact"],
-        )
-    ]
-    items.sort(key=lambda x: _safe_int(x.get("msgCreateTime") or x.get("revokeTime"), 0), reverse=True)
-    sliced, has_more = _page(items, limit=limit, offset=offset)
-    _attach_revoke_message_details(ctx.account_dir, sliced, source=meta.get("dataSource", "decrypted"))
-    actual_total = sum(1 for item in items if item.get("isActualRevoke"))
-    candidate_total = sum(1 for item in items if item.get("recordType") == "batch_revoke_candidate")
+    _attach_revoke_contacts(items, contact_map)
+    _attach_revoke_message_details(ctx.account_dir, items, source=meta.get("dataSource", "decrypted"))
+    total = sum(counts.values())
     return {
         "status": "success",
         "account": account_name,
-        "total": len(items),
-        "actualTotal": actual_total,
-        "candidateTotal": candidate_total,
-        "hasMore": has_more,
-        "items": sliced,
+        "total": total,
+        "actualTotal": counts.get("revoke_single", 0),
+        "candidateTotal": counts.get("revoke_batch", 0),
+        "hasMore": offset + limit < total,
+        "items": items,
         **meta,
     }
 
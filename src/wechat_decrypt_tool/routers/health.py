@@ -1,6 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
 from ..logging_config import get_logger
+from ..metrics import METRICS
 from ..path_fix import PathFixRoute
 
 logger = get_logger(__name__)
@@ -20,3 +22,18 @@ async def health_check():
     """健康检查端点"""
     logger.debug("健康检查请求")
     return {"status": "healthy", "service": "微信解密工具"}
+
+
+@router.get("/metrics", summary="Prometheus 指标", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """路由延迟直方图、perf_trace 阶段耗时、缓存命中与吞吐量（Prometheus 文本格式）"""
+    return PlainTextResponse(
+        METRICS.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/api/metrics", summary="进程内指标（JSON，含 p50/p95/p99）")
+async def metrics_snapshot():
+    """与 /metrics 相同的数据，直方图附带估算的 p50/p95/p99 毫秒值"""
+    return METRICS.snapshot()
@@ -9,10 +9,12 @@ import sqlite3
 import asyncio
 import stat
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path, PurePosixPath
-from typing import Optional
+from typing import Any, Callable, Optional
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
@@ -38,9 +40,27 @@ _WINDOWS_RESERVED_NAMES = {
 }
 
 
+_ARCHIVE_CHUNK_SIZE = 1024 * 1024
+# Linux FICLONE ioctl: whole-file copy-on-write clone (btrfs, xfs, bcachefs, ...).
+_FICLONE = 0x40049409
+
+
+def _import_workers() -> int:
+    raw = str(os.environ.get("WECHAT_TOOL_IMPORT_WORKERS", "") or "").strip()
+    try:
+        value = int(raw) if raw else min(8, os.cpu_count() or 4)
+    except ValueError:
+        value = min(8, os.cpu_count() or 4)
+    return max(1, min(32, value))
+
+
 class ImportCancelled(Exception):
     pass
 
+
+class _ParallelAborted(Exception):
+    """Raised inside workers once a sibling task failed; never surfaces to callers."""
+
 class ImportRequest(BaseModel):
     import_path: str = Field(..., description="账号归档 ZIP 或已解密数据库目录的绝对路径")
 
@@ -389,36 +409,224 @@ def _archive_manifest_hashes(archive: zipfile.ZipFile, files: dict[str, zipfile.
     return result
 
 
-def _extract_import_archive(import_path: Path, destination: Path, check_cancel) -> None:
+def _run_parallel(
+    jobs: list[Callable[[Callable[[], None]], Any]],
+    check_cancel: Callable[[], None],
+    *,
+    workers: Optional[int] = None,
+    on_done: Optional[Callable[[Any], None]] = None,
+) -> None:
+    """Run jobs on a thread pool in submission order; the first failure stops the rest.
+
+    Each job receives a `check()` callable that raises on user cancel or after
+    a sibling failed, so long copies stop promptly.
+    """
+    if not jobs:
+        return
+    stop = threading.Event()
+
+    def check() -> None:
+        check_cancel()
+        if stop.is_set():
+            raise _ParallelAborted()
+
+    first_error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=workers or _import_workers(), thread_name_prefix="import") as pool:
+        futures = [pool.submit(job, check) for job in jobs]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except _ParallelAborted:
+                continue
+            except BaseException as exc:
+                if first_error is None:
+                    first_error = exc
+                    stop.set()
+                    for pending in futures:
+                        pending.cancel()
+                continue
+            if on_done is not None and first_error is None:
+                on_done(result)
+    if first_error is not None:
+        raise first_error
+
+
+def _clone_file(src: Path, dst: Path, *, allow_hardlink: bool) -> str:
+    """Copy one file with the cheapest mechanism the filesystem offers.
+
+    Hardlinks are only used for files this import owns (the extracted archive
+    staging); user-provided directories get a reflink or in-kernel copy so
+    later writes to the account never reach the original backup.
+    """
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            import fcntl
+
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            method = "reflink"
+        except (ImportError, OSError):
+            method = ""
+        if not method and hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, 1 << 30))
+                    if copied <= 0:
+                        break
+                    remaining -= copied
+                if remaining <= 0:
+                    method = "copy_file_range"
+                else:
+                    fdst.seek(0)
+                    fdst.truncate()
+                    fsrc.seek(0)
+            except OSError:
+                fdst.seek(0)
+                fdst.truncate()
+                fsrc.seek(0)
+        if not method:
+            shutil.copyfileobj(fsrc, fdst, _ARCHIVE_CHUNK_SIZE)
+            method = "copy"
+    shutil.copystat(src, dst)
+    return method
+
+
+def _archive_member_order(files: dict[str, zipfile.ZipInfo]) -> list[str]:
+    # Databases first (largest first, to keep every worker busy), then resources.
+    return sorted(
+        files,
+        key=lambda name: (0 if name.lower().endswith(".db") else 1, -int(files[name].file_size or 0), name),
+    )
+
+
+def _extract_import_archive(
+    import_path: Path,
+    destination: Path,
+    check_cancel,
+    progress: Optional[dict] = None,
+    *,
+    workers: Optional[int] = None,
+) -> None:
     with zipfile.ZipFile(import_path, "r") as archive:
         files = _archive_file_map(archive)
         expected_hashes = _archive_manifest_hashes(archive, files)
-        if expected_hashes:
-            unsigned = sorted(name for name in files if not name.startswith("_integrity/") and name not in expected_hashes)
-            if unsigned:
-                raise RuntimeError(f"归档包含未登记到完整性清单的文件: {unsigned[0]}")
-        verified_names: set[str] = set()
-        for name, item in files.items():
-            check_cancel()
+    if expected_hashes:
+        unsigned = sorted(name for name in files if not name.startswith("_integrity/") and name not in expected_hashes)
+        if unsigned:
+            raise RuntimeError(f"归档包含未登记到完整性清单的文件: {unsigned[0]}")
+
+    order = _archive_member_order(files)
+    db_total = sum(1 for name in order if name.lower().endswith(".db"))
+    state = progress if progress is not None else {}
+    state.update({"total": len(order), "done": 0, "dbTotal": db_total, "dbDone": 0, "bytes": 0})
+
+    # One ZipFile per worker thread: a shared handle serialises every read on its seek lock.
+    local = threading.local()
+    handles: list[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
+
+    def _archive_for_thread() -> zipfile.ZipFile:
+        handle = getattr(local, "archive", None)
+        if handle is None:
+            handle = zipfile.ZipFile(import_path, "r")
+            local.archive = handle
+            with handles_lock:
+                handles.append(handle)
+        return handle
+
+    def _extract_member(name: str) -> Callable[[Callable[[], None]], tuple[str, int]]:
+        def job(check: Callable[[], None]) -> tuple[str, int]:
+            check()
             target = destination.joinpath(*PurePosixPath(name).parts)
             target.parent.mkdir(parents=True, exist_ok=True)
             digest = hashlib.sha256()
-            with archive.open(item, "r") as source, target.open("wb") as output:
+            written = 0
+            with _archive_for_thread().open(files[name], "r") as source, target.open("wb") as output:
                 while True:
-                    check_cancel()
-                    chunk = source.read(1024 * 1024)
+                    check()
+                    chunk = source.read(_ARCHIVE_CHUNK_SIZE)
                     if not chunk:
                         break
                     output.write(chunk)
                     digest.update(chunk)
+                    written += len(chunk)
             expected = expected_hashes.get(name)
             if expected and digest.hexdigest() != expected:
                 raise RuntimeError(f"归档文件校验失败: {name}")
-            if expected:
-                verified_names.add(name)
-        missing = sorted(set(expected_hashes) - verified_names)
-        if missing:
-            raise RuntimeError(f"归档完整性清单中的文件缺失: {missing[0]}")
+            return name, written
+
+        return job
+
+    verified_names: set[str] = set()
+
+    def _on_done(result: tuple[str, int]) -> None:
+        name, written = result
+        if name in expected_hashes:
+            verified_names.add(name)
+        state["done"] += 1
+        state["bytes"] += written
+        if name.lower().endswith(".db"):
+            state["dbDone"] += 1
+
+    try:
+        _run_parallel([_extract_member(name) for name in order], check_cancel, workers=workers, on_done=_on_done)
+    finally:
+        for handle in handles:
+            handle.close()
+
+    missing = sorted(set(expected_hashes) - verified_names)
+    if missing:
+        raise RuntimeError(f"归档完整性清单中的文件缺失: {missing[0]}")
+
+
+def _collect_resource_files(src: Path) -> list[tuple[Path, Path]]:
+    files: list[tuple[Path, Path]] = []
+    for root, _, names in os.walk(src):
+        root_path = Path(root)
+        for name in names:
+            file_path = root_path / name
+            try:
+                if file_path.is_file():
+                    files.append((file_path, file_path.relative_to(src)))
+            except Exception:
+                continue
+    return files
+
+
+def _copy_resource_batch(
+    batch: list[tuple[Path, Path]],
+    dst_root: Path,
+    check_cancel: Callable[[], None] = lambda: None,
+    *,
+    allow_hardlink: bool = False,
+    workers: Optional[int] = None,
+) -> int:
+    copied = 0
+
+    def _copy_one(src_file: Path, rel_path: Path) -> Callable[[Callable[[], None]], None]:
+        def job(check: Callable[[], None]) -> None:
+            check()
+            dst_file = dst_root / rel_path
+            dst_file.parent.mkdir(parents=True, exist_ok=True)
+            if dst_file.exists() or dst_file.is_symlink():
+                dst_file.unlink()
+            _clone_file(src_file, dst_file, allow_hardlink=allow_hardlink)
+
+        return job
+
+    def _on_done(_result: Any) -> None:
+        nonlocal copied
+        copied += 1
+
+    _run_parallel([_copy_one(s, r) for s, r in batch], check_cancel, workers=workers, on_done=_on_done)
+    return copied
 
 
 def _copy_supplemental_account_entries(info: dict, destination: Path) -> None:
@@ -560,12 +768,33 @@ async def import_decrypted_directory(
                 await asyncio.to_thread(temp_root.mkdir, parents=True, exist_ok=True)
                 archive_temp_dir = tempfile.TemporaryDirectory(prefix="account-archive-", dir=temp_root)
                 yield _sse({"type": "progress", "percent": 7, "message": "正在校验并解压账号归档..."})
-                await asyncio.to_thread(
-                    _extract_import_archive,
-                    import_path_obj,
-                    Path(archive_temp_dir.name),
-                    _check_cancel,
+                extract_progress: dict = {}
+                extract_task = asyncio.ensure_future(
+                    asyncio.to_thread(
+                        _extract_import_archive,
+                        import_path_obj,
+                        Path(archive_temp_dir.name),
+                        _check_cancel,
+                        extract_progress,
+                    )
                 )
+                last_done = -1
+                while not extract_task.done():
+                    await asyncio.wait({extract_task}, timeout=0.5)
+                    done = int(extract_progress.get("done") or 0)
+                    total = int(extract_progress.get("total") or 0)
+                    if extract_task.done() or done == last_done or total <= 0:
+                        continue
+                    last_done = done
+                    db_total = int(extract_progress.get("dbTotal") or 0)
+                    db_done = int(extract_progress.get("dbDone") or 0)
+                    stage = "数据库" if db_done < db_total else "资源文件"
+                    yield _sse({
+                        "type": "progress",
+                        "percent": 7 + int(done / total * 2),
+                        "message": f"正在解压账号归档（{stage}）：{done}/{total}",
+                    })
+                await extract_task
                 import_source = Path(archive_temp_dir.name)
 
             # 1. 验证并获取账号信息
@@ -615,10 +844,7 @@ async def import_decrypted_directory(
                 def _do_import_db(src, dst):
                     if dst.exists():
                         dst.unlink()
-                    try:
-                        os.link(src, dst)
-                    except Exception:
-                        shutil.copy2(src, dst)
+                    _clone_file(src, dst, allow_hardlink=True)
                 
                 try:
                     await asyncio.to_thread(_do_import_db, item, target)
@@ -650,28 +876,6 @@ async def import_decrypted_directory(
                     except Exception:
                         return False
 
-                def _collect_resource_files(src: Path) -> list[tuple[Path, Path]]:
-                    files: list[tuple[Path, Path]] = []
-                    for root, _, names in os.walk(src):
-                        root_path = Path(root)
-                        for name in names:
-                            file_path = root_path / name
-                            try:
-                                if file_path.is_file():
-                                    files.append((file_path, file_path.relative_to(src)))
-                            except Exception:
-                                continue
-                    return files
-
-                def _copy_resource_batch(batch: list[tuple[Path, Path]], dst_root: Path) -> int:
-                    copied = 0
-                    for src_file, rel_path in batch:
-                        dst_file = dst_root / rel_path
-                        dst_file.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(src_file, dst_file)
-                        copied += 1
-                    return copied
-
                 try:
                     prefer_copy_resource = info.get("source_format") in {"wxdump", "wechat_data_analysis_archive"}
                     await asyncio.to_thread(_reset_resource_dst, resource_dst)
@@ -692,12 +896,19 @@ async def import_decrypted_directory(
                             yield _sse({"type": "progress", "percent": 48, "message": "资源目录为空，已跳过资源复制。"})
                         else:
                             await asyncio.to_thread(resource_dst.mkdir, parents=True, exist_ok=True)
-                            batch_size = 300
+                            # Files extracted from an archive belong to this import, so they can be hardlinked.
+                            batch_size = 1000
                             copied_resources = 0
                             for batch_start in range(0, total_resources, batch_size):
                                 _check_cancel()
                                 batch = resource_files[batch_start:batch_start + batch_size]
-                                copied_resources += await asyncio.to_thread(_copy_resource_batch, batch, resource_dst)
+                                copied_resources += await asyncio.to_thread(
+                                    _copy_resource_batch,
+                                    batch,
+                                    resource_dst,
+                                    _check_cancel,
+                                    allow_hardlink=archive_source,
+                                )
                                 percent = 31 + int(min(copied_resources, total_resources) / total_resources * 17)
                                 yield _sse({
                                     "type": "progress",
@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import copy
 import html
+import itertools
 import json
 import re
+import shutil
+import tempfile
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field, SecretStr
@@ -26,9 +33,10 @@ from ..native_core_export import (
     encrypt_export_file_and_remove_source,
     erase_export_content_key,
 )
-from ..xlsx_export import build_xlsx_workbook
+from ..logging_config import get_logger
+from ..xlsx_export import write_xlsx_workbook
 from .biz import get_biz_messages, get_wechat_pay_records
-from .favorites import list_favorites
+from .favorites import iter_favorite_pages
 from .general import (
     list_finder_records,
     list_friend_verifications,
@@ -37,6 +45,8 @@ from .general import (
 )
 
 
+logger = get_logger(__name__)
+
 router = APIRouter()
 
 DatasetName = Literal[
@@ -58,6 +68,8 @@ _DATASET_LABELS = {
     "biz": "服务号记录",
 }
 _INVALID_FILE_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_EXPORT_PAGE_SIZE = 500
+_TXT_SPOOL_BYTES = 8 * 1024 * 1024
 
 
 class RecordExportRequest(BaseModel):
@@ -297,76 +309,80 @@ def _favorite_chat_messages(items: list[dict[str, Any]]) -> list[dict[str, Any]]
     return prepared
 
 
-def _collect_pages(loader, *, page_size: int = 500) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-    items: list[dict[str, Any]] = []
+def _iter_pages(
+    loader: Callable[[int, int, Optional[dict[str, Any]]], dict[str, Any]],
+    *,
+    page_size: int = _EXPORT_PAGE_SIZE,
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """Yield ``(response, rows)`` for each page until the source has no more rows.
+
+    Sources that hand back a ``nextCursor`` (biz) are walked by keyset rather
+    than offset, so later pages do not rescan the rows before them.
+    """
     offset = 0
-    first_response: dict[str, Any] = {}
+    cursor: Optional[dict[str, Any]] = None
     while True:
-        response = loader(offset, page_size)
-        if not first_response:
-            first_response = response
-        page = response.get("items") if isinstance(response, dict) else []
+        response = loader(offset, page_size, cursor)
+        response = response if isinstance(response, dict) else {}
+        page = response.get("items")
         page = page if isinstance(page, list) else []
-        items.extend(row for row in page if isinstance(row, dict))
-        scanned = 0
-        try:
-            scanned = int(response.get("scanned") if isinstance(response, dict) else 0)
-        except Exception:
-            scanned = 0
-        step = scanned if scanned > 0 else len(page)
+        yield response, [row for row in page if isinstance(row, dict)]
+        step = _safe_int(response.get("scanned"), 0) or len(page)
         if not response.get("hasMore") or step <= 0:
             break
         offset += step
-    return items, first_response
+        next_cursor = response.get("nextCursor")
+        cursor = next_cursor if isinstance(next_cursor, dict) else None
 
 
-def _load_records(request: Request, req: RecordExportRequest) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+def _iter_record_pages(
+    request: Request,
+    req: RecordExportRequest,
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """Read the requested dataset once, page by page, as ``(response, rows)``."""
     common = {
         "account": req.account,
         "q": _clean_text(req.query),
         "source": "realtime",
     }
     if req.dataset == "favorites":
-        return _collect_pages(
-            lambda offset, _limit: list_favorites(
-                request=request,
-                kind="all",
-                tag_id=0,
-                limit=200,
-                offset=offset,
-                **common,
-            ),
-            page_size=200,
-        )
+        # list_favorites 每页都会重新比对整个 favorite.db，分页导出会退化成 O(n^2)。
+        for response in iter_favorite_pages(request=request, kind="all", tag_id=0, **common):
+            page = response.get("items") if isinstance(response.get("items"), list) else []
+            yield response, [row for row in page if isinstance(row, dict)]
+        return
     if req.dataset == "friend-verifications":
-        return _collect_pages(
-            lambda offset, limit: list_friend_verifications(
+        yield from _iter_pages(
+            lambda offset, limit, _cursor: list_friend_verifications(
                 request=request,
                 limit=limit,
                 offset=offset,
                 **common,
             )
         )
+        return
     if req.dataset == "mini-programs":
-        return _collect_pages(
-            lambda offset, limit: list_mini_programs(
+        yield from _iter_pages(
+            lambda offset, limit, _cursor: list_mini_programs(
                 limit=limit,
                 offset=offset,
                 **common,
             )
         )
+        return
     if req.dataset == "finder":
-        return _collect_pages(
-            lambda offset, limit: list_finder_records(
+        yield from _iter_pages(
+            lambda offset, limit, _cursor: list_finder_records(
                 request=request,
                 limit=limit,
                 offset=offset,
                 **common,
             )
         )
+        return
     if req.dataset == "payments":
-        return _collect_pages(
-            lambda offset, limit: list_payment_records(
+        yield from _iter_pages(
+            lambda offset, limit, _cursor: list_payment_records(
                 request=request,
                 kind="all",
                 status="all",
@@ -375,36 +391,45 @@ def _load_records(request: Request, req: RecordExportRequest) -> tuple[list[dict
                 **common,
             )
         )
+        return
     if req.dataset == "biz":
         username = _clean_text(req.username)
         if not username:
             raise HTTPException(status_code=400, detail="username is required for biz export.")
 
-        def load_biz_page(offset: int, limit: int) -> dict[str, Any]:
+        def load_biz_page(offset: int, limit: int, cursor: Optional[dict[str, Any]]) -> dict[str, Any]:
+            paging: dict[str, Any] = {"limit": limit, "offset": offset}
+            if cursor:
+                paging = {
+                    "limit": limit,
+                    "offset": 0,
+                    "before_time": _safe_int(cursor.get("beforeTime"), 0),
+                    "before_local_id": _safe_int(cursor.get("beforeLocalId"), 0),
+                }
             if username == "gh_3dfda90e39d6":
-                response = get_wechat_pay_records(
-                    account=req.account,
-                    limit=limit,
-                    offset=offset,
-                    source="auto",
-                )
+                response = get_wechat_pay_records(account=req.account, source="auto", **paging)
             else:
-                response = get_biz_messages(
-                    username=username,
-                    account=req.account,
-                    limit=limit,
-                    offset=offset,
-                    source="auto",
-                )
+                response = get_biz_messages(username=username, account=req.account, source="auto", **paging)
             normalized = dict(response or {})
             normalized["items"] = normalized.get("data") if isinstance(normalized.get("data"), list) else []
             normalized["dataSource"] = _clean_text(normalized.get("source")) or "realtime"
             return normalized
 
-        return _collect_pages(load_biz_page)
+        yield from _iter_pages(load_biz_page)
+        return
     raise HTTPException(status_code=400, detail="Unsupported dataset.")
 
 
+def _load_records(request: Request, req: RecordExportRequest) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    items: list[dict[str, Any]] = []
+    first_response: dict[str, Any] = {}
+    for response, page in _iter_record_pages(request, req):
+        if not first_response:
+            first_response = response
+        items.extend(page)
+    return items, first_response
+
+
 def _contact_value(item: dict[str, Any], *keys: str) -> dict[str, Any]:
     for key in keys:
         value = item.get(key)
@@ -644,20 +669,50 @@ def _biz_export_html(item: dict[str, Any]) -> str:
     )
 
 
-def _render_project_records_html(payload: dict[str, Any]) -> str:
+_PROJECT_RECORD_RENDERERS = {
+    "mini-programs": _mini_program_export_html,
+    "finder": _finder_export_html,
+    "payments": _payment_export_html,
+    "biz": _biz_export_html,
+}
+
+
+def _generic_record_card_html(dataset: str, item: dict[str, Any]) -> str:
+    name, avatar, time_text = _record_identity(dataset, item)
+    fallback = html.escape((name[:1] or "?").upper())
+    avatar_html = f'<img src="{html.escape(avatar, quote=True)}" alt="">' if _safe_web_url(avatar) else fallback
+    content = _generic_record_html(dataset, item)
+    return (
+        '<article class="message">'
+        f'<div class="avatar">{avatar_html}</div>'
+        '<div class="message-body">'
+        f'<header><strong>{html.escape(name)}</strong><time>{html.escape(time_text)}</time></header>'
+        f'<div class="content">{content}</div>'
+        '</div></article>'
+    )
+
+
+def _render_html_rows(dataset: str, items: Iterable[Any]) -> str:
+    renderer = _PROJECT_RECORD_RENDERERS.get(dataset)
+    if renderer is not None:
+        return "".join(renderer(item) for item in items if isinstance(item, dict))
+    return "".join(_generic_record_card_html(dataset, item) for item in items)
+
+
+def _render_project_records_html(
+    payload: dict[str, Any],
+    *,
+    rows: Optional[str] = None,
+    count: Optional[int] = None,
+) -> str:
     dataset = _clean_text(payload.get("dataset"))
-    renderers = {
-        "mini-programs": _mini_program_export_html,
-        "finder": _finder_export_html,
-        "payments": _payment_export_html,
-        "biz": _biz_export_html,
-    }
-    renderer = renderers[dataset]
-    rows = "".join(renderer(item) for item in payload.get("items") or [] if isinstance(item, dict))
+    if rows is None:
+        rows = _render_html_rows(dataset, payload.get("items") or [])
     label = _DATASET_LABELS.get(dataset, dataset)
     subject_name = _clean_text(payload.get("subjectName"))
     heading = subject_name if dataset == "biz" and subject_name else label
-    count = len(payload.get("items") or [])
+    if count is None:
+        count = len(payload.get("items") or [])
     account = _clean_text(payload.get("account"))
     source = "实时库" if _clean_text(payload.get("dataSource")) == "realtime" else "已解密数据"
     grid_class = {
@@ -684,93 +739,274 @@ def _render_project_records_html(payload: dict[str, Any]) -> str:
 </main></div></body></html>'''
 
 
-def _render_html(payload: dict[str, Any]) -> str:
+def _render_html(
+    payload: dict[str, Any],
+    *,
+    rows: Optional[str] = None,
+    count: Optional[int] = None,
+) -> str:
+    """Render the HTML document; streaming callers pass pre-rendered ``rows`` and their ``count``."""
     dataset = _clean_text(payload.get("dataset"))
-    if dataset in {"mini-programs", "finder", "payments", "biz"}:
-        return _render_project_records_html(payload)
-    cards: list[str] = []
-    for item in payload.get("items") or []:
-        name, avatar, time_text = _record_identity(dataset, item)
-        fallback = html.escape((name[:1] or "?").upper())
-        avatar_html = f'<img src="{html.escape(avatar, quote=True)}" alt="">' if _safe_web_url(avatar) else fallback
-        content = _generic_record_html(dataset, item)
-        cards.append(
-            '<article class="message">'
-            f'<div class="avatar">{avatar_html}</div>'
-            '<div class="message-body">'
-            f'<header><strong>{html.escape(name)}</strong><time>{html.escape(time_text)}</time></header>'
-            f'<div class="content">{content}</div>'
-            '</div></article>'
-        )
+    if dataset in _PROJECT_RECORD_RENDERERS:
+        return _render_project_records_html(payload, rows=rows, count=count)
+    if rows is None:
+        rows = _render_html_rows(dataset, payload.get("items") or [])
+    if count is None:
+        count = len(payload.get("items") or [])
     label = _DATASET_LABELS.get(dataset, dataset)
     selected = "、".join(payload.get("types") or []) or "全部"
     return f'''<!doctype html>
 <html lang="zh-CN"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{html.escape(label)}导出</title><style>{export_css("records-generic")}</style></head><body><div class="page"><div class="mast"><h1>{html.escape(label)}</h1><div class="meta">账号 {html.escape(_clean_text(payload.get("account")))} · 实时库 · 共 {len(payload.get("items") or [])} 条 · 类型 {html.escape(selected)}</div></div><main>{''.join(cards)}</main></div></body></html>'''
+<title>{html.escape(label)}导出</title><style>{export_css("records-generic")}</style></head><body><div class="page"><div class="mast"><h1>{html.escape(label)}</h1><div class="meta">账号 {html.escape(_clean_text(payload.get("account")))} · 实时库 · 共 {count} 条 · 类型 {html.escape(selected)}</div></div><main>{rows}</main></div></body></html>'''
 
 
-def _render_txt(payload: dict[str, Any]) -> str:
+def _txt_header(payload: dict[str, Any], count: int) -> str:
     lines = [
         f"{_DATASET_LABELS.get(payload['dataset'], payload['dataset'])}导出",
         f"账号: {payload.get('account', '')}",
         f"数据源: {payload.get('dataSource', 'realtime')}",
-        f"数量: {len(payload.get('items') or [])}",
+        f"数量: {count}",
         "",
     ]
-    dataset = payload["dataset"]
-    for index, item in enumerate(payload.get("items") or [], 1):
-        name, _avatar, time_text = _record_identity(dataset, item)
-        lines.append(f"[{index}] {name}{('  ' + time_text) if time_text else ''}")
-        if dataset == "friend-verifications":
-            lines.append("方向: " + ("我发起" if item.get("isSender") else "对方发起"))
-            lines.append(_clean_text(item.get("content") or item.get("remark") or "无验证内容"))
-        else:
-            lines.append(json.dumps(item, ensure_ascii=False, default=str, sort_keys=True))
-        lines.append("")
-    return "\n".join(lines).rstrip() + "\n"
+    return "\n".join(lines) + "\n"
 
 
-def _write_atomic(path: Path, content: str) -> None:
-    temp_path = path.with_name(path.name + ".tmp")
-    temp_path.write_text(content, encoding="utf-8", newline="\n")
-    temp_path.replace(path)
+def _txt_entry(dataset: str, index: int, item: dict[str, Any]) -> str:
+    name, _avatar, time_text = _record_identity(dataset, item)
+    lines = [f"[{index}] {name}{('  ' + time_text) if time_text else ''}"]
+    if dataset == "friend-verifications":
+        lines.append("方向: " + ("我发起" if item.get("isSender") else "对方发起"))
+        lines.append(_clean_text(item.get("content") or item.get("remark") or "无验证内容"))
+    else:
+        lines.append(json.dumps(item, ensure_ascii=False, default=str, sort_keys=True))
+    return "\n".join(lines) + "\n\n"
 
 
-def _write_atomic_bytes(path: Path, content: bytes) -> None:
-    temp_path = path.with_name(path.name + ".tmp")
-    temp_path.write_bytes(content)
-    temp_path.replace(path)
+def _render_txt(payload: dict[str, Any]) -> str:
+    dataset = payload["dataset"]
+    items = payload.get("items") or []
+    body = "".join(_txt_entry(dataset, index, item) for index, item in enumerate(items, 1))
+    return (_txt_header(payload, len(items)) + body).rstrip() + "\n"
+
+
+def _excel_row(dataset: str, index: int, item: Any) -> list[str]:
+    record = item if isinstance(item, dict) else {"value": item}
+    name, _avatar, time_text = _record_identity(dataset, record)
+    return [
+        str(index),
+        name,
+        time_text,
+        ", ".join(sorted(_record_types(dataset, record))),
+        json.dumps(record, ensure_ascii=False, default=str, sort_keys=True),
+    ]
 
 
-def _render_excel(payload: dict[str, Any]) -> bytes:
-    dataset = _clean_text(payload.get("dataset"))
-    rows: list[list[str]] = []
-    for index, item in enumerate(payload.get("items") or [], start=1):
-        record = item if isinstance(item, dict) else {"value": item}
-        name, _avatar, time_text = _record_identity(dataset, record)
-        rows.append(
-            [
-                str(index),
-                name,
-                time_text,
-                ", ".join(sorted(_record_types(dataset, record))),
-                json.dumps(record, ensure_ascii=False, default=str, sort_keys=True),
-            ]
+@contextmanager
+def _atomic_output(path: Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """Open a sibling temp file for writing and move it over ``path`` only on success."""
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        if "b" in mode:
+            handle = open(temp_path, mode)
+        else:
+            handle = open(temp_path, mode, encoding="utf-8", newline="\n")
+        with handle:
+            yield handle
+        temp_path.replace(path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_json_stream(path: Path, header: dict[str, Any], batches: Iterable[list[dict[str, Any]]]) -> int:
+    """Write ``header`` plus an ``items`` array one record at a time; returns the record count.
+
+    The layout matches ``json.dumps(..., indent=2)`` except that ``count``
+    follows ``items``, since it is only known once the stream is drained.
+    """
+    count = 0
+    with _atomic_output(path) as out:
+        out.write("{\n")
+        for key, value in header.items():
+            rendered = json.dumps(value, ensure_ascii=False, indent=2, default=str).replace("\n", "\n  ")
+            out.write(f"  {json.dumps(key)}: {rendered},\n")
+        out.write('  "items": [')
+        for batch in batches:
+            for item in batch:
+                rendered = json.dumps(item, ensure_ascii=False, indent=2, default=str).replace("\n", "\n    ")
+                out.write(("," if count else "") + "\n    " + rendered)
+                count += 1
+        out.write("\n  ]" if count else "]")
+        out.write(f',\n  "count": {count}\n}}\n')
+    return count
+
+
+def _write_txt_stream(path: Path, header: dict[str, Any], batches: Iterable[list[dict[str, Any]]]) -> int:
+    # 头部要写总数，正文先落到溢出到磁盘的临时缓冲里，最后再拼接。
+    dataset = header["dataset"]
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=_TXT_SPOOL_BYTES, mode="w+", encoding="utf-8", newline="\n") as body:
+        for batch in batches:
+            for item in batch:
+                count += 1
+                body.write(_txt_entry(dataset, count, item))
+        with _atomic_output(path) as out:
+            out.write(_txt_header(header, count))
+            body.seek(0)
+            shutil.copyfileobj(body, out)
+    return count
+
+
+def _write_excel_stream(path: Path, dataset: str, batches: Iterable[list[dict[str, Any]]]) -> int:
+    count = 0
+
+    def rows() -> Iterator[list[str]]:
+        nonlocal count
+        for batch in batches:
+            for item in batch:
+                count += 1
+                yield _excel_row(dataset, count, item)
+
+    with _atomic_output(path, "wb") as out:
+        write_xlsx_workbook(
+            out,
+            [(_DATASET_LABELS.get(dataset, dataset) or "记录", ["序号", "名称", "时间", "类型", "完整数据"], rows())],
         )
-    return build_xlsx_workbook(
-        [
-            (
-                _DATASET_LABELS.get(dataset, dataset) or "记录",
-                ["序号", "名称", "时间", "类型", "完整数据"],
-                rows,
+    return count
+
+
+class RecordExportCancelled(Exception):
+    pass
+
+
+@dataclass
+class RecordExportJob:
+    export_id: str
+    account: str = ""
+    dataset: str = ""
+    format: str = ""
+    status: str = "queued"
+    message: str = "等待开始..."
+    error: str = ""
+    records_total: int = 0
+    records_scanned: int = 0
+    records_exported: int = 0
+    output_path: str = ""
+    result: dict[str, Any] = field(default_factory=dict)
+    created_at: int = field(default_factory=lambda: int(time.time()))
+    updated_at: int = field(default_factory=lambda: int(time.time()))
+    cancel_requested: bool = False
+    archive_job: Any = field(default=None, repr=False)
+    content_key: Optional[bytearray] = field(default=None, repr=False)
+
+    def to_public_dict(self) -> dict[str, Any]:
+        progress: dict[str, Any] = {
+            "recordsTotal": int(self.records_total or 0),
+            "recordsScanned": int(self.records_scanned or 0),
+            "recordsExported": int(self.records_exported or 0),
+        }
+        archive = self.archive_job
+        if archive is not None:
+            progress.update(
+                {
+                    "messagesExported": int(archive.progress.messages_exported or 0),
+                    "mediaCopied": int(archive.progress.media_copied or 0),
+                    "mediaMissing": int(archive.progress.media_missing or 0),
+                }
             )
-        ]
+        return {
+            "exportId": self.export_id,
+            "account": self.account,
+            "dataset": self.dataset,
+            "format": self.format,
+            "status": self.status,
+            "message": self.message,
+            "error": self.error,
+            "outputPath": self.output_path,
+            "progress": progress,
+            "result": self.result,
+            "createdAt": int(self.created_at or 0),
+            "updatedAt": int(self.updated_at or 0),
+            "cancelRequested": bool(self.cancel_requested),
+        }
+
+
+_JOBS: dict[str, RecordExportJob] = {}
+_JOBS_LOCK = threading.RLock()
+_FINISHED_JOB_STATUSES = frozenset({"done", "error", "cancelled"})
+# 结束的任务保留一段时间供前端取结果；过期或超出数量时从最旧的开始淘汰，运行中的任务不受影响。
+_FINISHED_JOB_TTL_SECONDS = 30 * 60
+_MAX_FINISHED_JOBS = 32
+
+
+def _prune_finished_jobs_locked(now: int) -> None:
+    finished = sorted(
+        (job for job in _JOBS.values() if job.status in _FINISHED_JOB_STATUSES),
+        key=lambda job: int(job.updated_at or 0),
     )
+    overflow = len(finished) - _MAX_FINISHED_JOBS
+    for index, job in enumerate(finished):
+        if index < overflow or now - int(job.updated_at or 0) > _FINISHED_JOB_TTL_SECONDS:
+            _JOBS.pop(job.export_id, None)
+
+
+def _get_job(export_id: str) -> Optional[RecordExportJob]:
+    key = str(export_id or "").strip()
+    if not key:
+        return None
+    with _JOBS_LOCK:
+        return _JOBS.get(key)
+
+
+def _update_job(job: Optional[RecordExportJob], **changes: Any) -> None:
+    if job is None:
+        return
+    with _JOBS_LOCK:
+        for key, value in changes.items():
+            if hasattr(job, key):
+                setattr(job, key, value)
+        job.updated_at = int(time.time())
+
+
+def _check_cancel(job: Optional[RecordExportJob]) -> None:
+    if job is None:
+        return
+    with _JOBS_LOCK:
+        cancelled = bool(job.cancel_requested)
+    if cancelled:
+        raise RecordExportCancelled()
+
+
+def _attach_archive_job(job: Optional[RecordExportJob], archive_job: Any) -> None:
+    if job is None:
+        return
+    with _JOBS_LOCK:
+        job.archive_job = archive_job
+        # 收藏归档在内部的聊天导出任务里运行，取消请求需要转发过去。
+        if job.cancel_requested:
+            archive_job.cancel_requested = True
+
+
+def _filtered_batches(
+    dataset: str,
+    pages: Iterable[tuple[dict[str, Any], list[dict[str, Any]]]],
+    selected_types: set[str],
+    job: Optional[RecordExportJob],
+) -> Iterator[list[dict[str, Any]]]:
+    for _response, page in pages:
+        _check_cancel(job)
+        batch = _filter_records(dataset, page, selected_types)
+        if job is not None:
+            _update_job(
+                job,
+                records_scanned=job.records_scanned + len(page),
+                records_exported=job.records_exported + len(batch),
+            )
+        if batch:
+            yield batch
 
 
-@router.post("/api/records/export", summary="导出收藏和通用记录")
-def export_records(request: Request, req: RecordExportRequest):
-    load_wce_integrity_native()
+def _prepare_output_dir(req: RecordExportRequest) -> Path:
     output_raw = _clean_text(req.output_dir)
     if not output_raw:
         raise HTTPException(status_code=400, detail="output_dir is required.")
@@ -781,82 +1017,144 @@ def export_records(request: Request, req: RecordExportRequest):
         output_dir.mkdir(parents=True, exist_ok=True)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Failed to prepare output_dir: {exc}") from exc
+    return output_dir
 
-    items, source_response = _load_records(request, req)
+
+def _decode_content_key(req: RecordExportRequest) -> Optional[bytearray]:
+    try:
+        return decode_export_content_key(
+            req.content_key_base64.get_secret_value() if req.content_key_base64 else None,
+            enabled=bool(req.encrypt),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _export_favorites(
+    req: RecordExportRequest,
+    *,
+    output_dir: Path,
+    account: str,
+    data_source: str,
+    batches: Iterable[list[dict[str, Any]]],
+    selected_types: set[str],
+    content_key: Optional[bytearray],
+    job: Optional[RecordExportJob],
+) -> dict[str, Any]:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    default_stem = f"favorites_{_safe_file_stem(account, 'account')}_{timestamp}"
+    stem = _safe_file_stem(req.file_name, default_stem)
+    count = 0
+    prepared_batches: list[list[dict[str, Any]]] = []
+    for batch in batches:
+        count += len(batch)
+        prepared_batches.append(_favorite_chat_messages(batch))
+    # 收藏按更新时间倒序分页读取，倒转批次顺序即得到归档需要的正序。
+    prepared_messages = [message for prepared in reversed(prepared_batches) for message in prepared]
+    del prepared_batches
+    last_timestamp = max((_safe_int(message.get("createTime"), 0) for message in prepared_messages), default=0)
+    conversations = [
+        {
+            "username": "__favorites__",
+            "displayName": "收藏",
+            "isGroup": False,
+            "previewText": f"{count} 条收藏",
+            "lastTimestamp": last_timestamp,
+            "messages": prepared_messages,
+        }
+    ]
+    _check_cancel(job)
+    _update_job(job, message="正在写入收藏归档...")
+    try:
+        archive_job = export_prepared_chat_archive(
+            account=account or req.account,
+            output_dir=output_dir,
+            file_name=f"{stem}.zip",
+            title="收藏",
+            export_format=req.format,
+            conversations=conversations,
+            include_media=True,
+            media_kinds=["image", "emoji", "video", "video_thumb", "voice", "file"],
+            message_types=sorted(selected_types),
+            encrypt=bool(req.encrypt),
+            content_key=content_key,
+            on_job=lambda inner: _attach_archive_job(job, inner),
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to export favorites: {exc}") from exc
+    if archive_job.status == "cancelled":
+        raise RecordExportCancelled()
+    if archive_job.status != "done" or not archive_job.zip_path:
+        raise HTTPException(status_code=500, detail=archive_job.error or "Failed to export favorites archive.")
+    return {
+        "status": "success",
+        "account": account,
+        "dataset": req.dataset,
+        "format": req.format,
+        "dataSource": data_source,
+        "outputPath": str(archive_job.zip_path),
+        "count": count,
+        "messagesExported": int(archive_job.progress.messages_exported or 0),
+        "mediaCopied": int(archive_job.progress.media_copied or 0),
+        "mediaMissing": int(archive_job.progress.media_missing or 0),
+        "types": sorted(selected_types),
+    }
+
+
+def _export_records(
+    request: Request,
+    req: RecordExportRequest,
+    content_key: Optional[bytearray],
+    *,
+    job: Optional[RecordExportJob] = None,
+) -> dict[str, Any]:
+    """Export one dataset in a single streaming pass over its source pages.
+
+    ``job`` is set when running in the background: progress is published on it
+    and a cancel request stops the export between pages.
+    """
+    output_dir = _prepare_output_dir(req)
     selected_types = _normalized_types(req.types)
-    items = _filter_records(req.dataset, items, selected_types)
+    pages = _iter_record_pages(request, req)
+    source_response, first_page = next(pages, ({}, []))
     account = _clean_text(source_response.get("account") or req.account)
+    data_source = _clean_text(source_response.get("dataSource")) or "realtime"
+    _update_job(
+        job,
+        account=account,
+        records_total=_safe_int(source_response.get("total"), 0),
+        message="正在读取记录...",
+    )
+    batches = _filtered_batches(
+        req.dataset,
+        itertools.chain([(source_response, first_page)], pages),
+        selected_types,
+        job,
+    )
 
     if req.dataset == "favorites":
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_stem = f"favorites_{_safe_file_stem(account, 'account')}_{timestamp}"
-        stem = _safe_file_stem(req.file_name, default_stem)
-        prepared_messages = _favorite_chat_messages(items)
-        last_timestamp = max((_safe_int(message.get("createTime"), 0) for message in prepared_messages), default=0)
-        conversations = [
-            {
-                "username": "__favorites__",
-                "displayName": "收藏",
-                "isGroup": False,
-                "previewText": f"{len(items)} 条收藏",
-                "lastTimestamp": last_timestamp,
-                "messages": prepared_messages,
-            }
-        ]
-        try:
-            content_key = decode_export_content_key(
-                req.content_key_base64.get_secret_value() if req.content_key_base64 else None,
-                enabled=bool(req.encrypt),
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
-        try:
-            job = export_prepared_chat_archive(
-                account=account or req.account,
-                output_dir=output_dir,
-                file_name=f"{stem}.zip",
-                title="收藏",
-                export_format=req.format,
-                conversations=conversations,
-                include_media=True,
-                media_kinds=["image", "emoji", "video", "video_thumb", "voice", "file"],
-                message_types=sorted(selected_types),
-                encrypt=bool(req.encrypt),
-                content_key=content_key,
-            )
-        except Exception as exc:
-            raise HTTPException(status_code=500, detail=f"Failed to export favorites: {exc}") from exc
-        finally:
-            erase_export_content_key(content_key)
-        if job.status != "done" or not job.zip_path:
-            raise HTTPException(status_code=500, detail=job.error or "Failed to export favorites archive.")
-        return {
-            "status": "success",
-            "account": account,
-            "dataset": req.dataset,
-            "format": req.format,
-            "dataSource": _clean_text(source_response.get("dataSource")) or "realtime",
-            "outputPath": str(job.zip_path),
-            "count": len(items),
-            "messagesExported": int(job.progress.messages_exported or 0),
-            "mediaCopied": int(job.progress.media_copied or 0),
-            "mediaMissing": int(job.progress.media_missing or 0),
-            "types": sorted(selected_types),
-        }
+        return _export_favorites(
+            req,
+            output_dir=output_dir,
+            account=account,
+            data_source=data_source,
+            batches=batches,
+            selected_types=selected_types,
+            content_key=content_key,
+            job=job,
+        )
 
-    payload = {
+    header = {
         "dataset": req.dataset,
         "datasetLabel": _DATASET_LABELS[req.dataset],
         "account": account,
         "username": _clean_text(req.username),
         "subjectName": _clean_text(req.subject_name),
-        "dataSource": _clean_text(source_response.get("dataSource")) or "realtime",
+        "dataSource": data_source,
         "database": _clean_text(source_response.get("database")),
         "query": _clean_text(req.query),
         "types": sorted(selected_types),
         "generatedAt": datetime.now().astimezone().isoformat(timespec="seconds"),
-        "count": len(items),
-        "items": items,
     }
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -876,26 +1174,26 @@ def export_records(request: Request, req: RecordExportRequest):
     )
     output_path = plaintext_output_path
     encrypted_output_path: Path | None = None
-    try:
-        content_key = decode_export_content_key(
-            req.content_key_base64.get_secret_value() if req.content_key_base64 else None,
-            enabled=bool(req.encrypt),
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
     try:
         if req.format == "json":
-            content = json.dumps(payload, ensure_ascii=False, indent=2, default=str) + "\n"
-            _write_atomic(output_path, content)
+            count = _write_json_stream(output_path, header, batches)
         elif req.format == "txt":
-            content = _render_txt(payload)
-            _write_atomic(output_path, content)
+            count = _write_txt_stream(output_path, header, batches)
         elif req.format == "excel":
-            _write_atomic_bytes(output_path, _render_excel(payload))
+            count = _write_excel_stream(output_path, req.dataset, batches)
         else:
-            content = _render_html(payload)
+            # 完整性保护要对整份文档签名，HTML 只能逐批渲染后整体写出。
+            row_chunks: list[str] = []
+            count = 0
+            for batch in batches:
+                count += len(batch)
+                row_chunks.append(_render_html_rows(req.dataset, batch))
+            content = _render_html(header, rows="".join(row_chunks), count=count)
+            del row_chunks
+            _check_cancel(job)
             integrity_manifest_path, integrity_signature_path = write_protected_html_file(output_path, content, export_id)
         if req.format != "html":
+            _check_cancel(job)
             integrity_manifest_path, integrity_signature_path = write_file_integrity_sidecars(output_path, export_id)
         native_integrity_manifest_path, native_integrity_signature_path = (
             native_file_integrity_sidecar_paths(output_path)
@@ -916,16 +1214,16 @@ def export_records(request: Request, req: RecordExportRequest):
             )
             remove_file_export_artifacts(plaintext_output_path, export_id)
             output_path = encrypted_path
-    except Exception as exc:
-        if encrypted_requested:
+    except BaseException as exc:
+        if encrypted_requested or isinstance(exc, RecordExportCancelled):
             try:
                 remove_file_export_artifacts(plaintext_output_path, export_id)
             finally:
                 if encrypted_output_path is not None:
                     encrypted_output_path.unlink(missing_ok=True)
+        if isinstance(exc, (RecordExportCancelled, HTTPException)) or not isinstance(exc, Exception):
+            raise
         raise HTTPException(status_code=500, detail=f"Failed to export records: {exc}") from exc
-    finally:
-        erase_export_content_key(content_key)
 
     return {
         "status": "success",
@@ -933,7 +1231,7 @@ def export_records(request: Request, req: RecordExportRequest):
         "dataset": req.dataset,
         "username": _clean_text(req.username),
         "format": req.format,
-        "dataSource": payload["dataSource"],
+        "dataSource": data_source,
         "outputPath": str(output_path),
         "integrityManifestPath": "" if encrypted_requested else str(integrity_manifest_path),
         "integritySignaturePath": "" if encrypted_requested else str(integrity_signature_path),
@@ -952,6 +1250,99 @@ def export_records(request: Request, req: RecordExportRequest):
             if encrypted_requested
             else ("WES1" if native_integrity_signature_path.is_file() else "legacy")
         ),
-        "count": len(items),
+        "count": count,
         "types": sorted(selected_types),
     }
+
+
+def _run_record_export_job(job: RecordExportJob, request: Request, req: RecordExportRequest) -> None:
+    _update_job(job, status="running", message="正在读取记录...")
+    try:
+        result = _export_records(request, req, job.content_key, job=job)
+        _update_job(
+            job,
+            status="done",
+            message="导出完成。",
+            output_path=str(result.get("outputPath") or ""),
+            result=result,
+        )
+    except RecordExportCancelled:
+        _update_job(job, status="cancelled", message="导出已取消。")
+    except HTTPException as exc:
+        _update_job(job, status="error", message="导出失败。", error=str(exc.detail))
+    except Exception as exc:
+        logger.exception("record export job failed: %s", job.export_id)
+        _update_job(job, status="error", message="导出失败。", error=str(exc))
+    finally:
+        erase_export_content_key(job.content_key)
+        job.content_key = None
+
+
+@router.post("/api/records/export", summary="导出收藏和通用记录")
+def export_records(request: Request, req: RecordExportRequest):
+    load_wce_integrity_native()
+    content_key = _decode_content_key(req)
+    try:
+        return _export_records(request, req, content_key)
+    finally:
+        erase_export_content_key(content_key)
+
+
+@router.post("/api/records/exports", summary="创建收藏和通用记录导出任务")
+def create_record_export(request: Request, req: RecordExportRequest):
+    load_wce_integrity_native()
+    _prepare_output_dir(req)
+    if req.dataset == "biz" and not _clean_text(req.username):
+        raise HTTPException(status_code=400, detail="username is required for biz export.")
+    content_key = _decode_content_key(req)
+    export_id = uuid.uuid4().hex[:12]
+    job = RecordExportJob(
+        export_id=export_id,
+        account=_clean_text(req.account),
+        dataset=req.dataset,
+        format=req.format,
+        content_key=content_key,
+    )
+    with _JOBS_LOCK:
+        _prune_finished_jobs_locked(int(time.time()))
+        _JOBS[export_id] = job
+
+    thread = threading.Thread(
+        target=_run_record_export_job,
+        args=(job, request, req),
+        name=f"record-export-{export_id}",
+        daemon=True,
+    )
+    try:
+        thread.start()
+    except Exception:
+        with _JOBS_LOCK:
+            _JOBS.pop(export_id, None)
+        erase_export_content_key(content_key)
+        job.content_key = None
+        raise
+    return {"status": "success", "job": job.to_public_dict()}
+
+
+@router.get("/api/records/exports/{export_id}", summary="获取记录导出任务")
+def get_record_export(export_id: str):
+    job = _get_job(export_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found.")
+    return {"status": "success", "job": job.to_public_dict()}
+
+
+@router.delete("/api/records/exports/{export_id}", summary="取消记录导出任务")
+def cancel_record_export(export_id: str):
+    job = _get_job(export_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found.")
+    with _JOBS_LOCK:
+        if job.status in _FINISHED_JOB_STATUSES:
+            return {"status": "success", "job": job.to_public_dict()}
+        job.cancel_requested = True
+        job.message = "正在取消..."
+        job.updated_at = int(time.time())
+        if job.archive_job is not None:
+            job.archive_job.cancel_requested = True
+    return {"status": "success", "job": job.to_public_dict()}
@@ -39,6 +39,7 @@ from ..wcdb_realtime import (
     exec_query as _wcdb_exec_query,
     get_display_names as _wcdb_get_display_names,
     get_sns_timeline as _wcdb_get_sns_timeline,
+    read_handle as _wcdb_read_handle,
 )
 
 try:
@@ -1653,8 +1654,8 @@ def api_sns_self_info(account: Optional[str] = None, source: str = "auto"):
             status = WCDB_REALTIME.get_status(account_dir)
             if status.get("dll_present") and status.get("key_present"):
                 rt_conn = WCDB_REALTIME.ensure_connected(account_dir)
-                with rt_conn.lock:
-                    names_map = _wcdb_get_display_names(rt_conn.handle, [wxid])
+                with _wcdb_read_handle(rt_conn) as wcdb_handle:
+                    names_map = _wcdb_get_display_names(wcdb_handle, [wxid])
                     if names_map and names_map.get(wxid):
                         nickname = names_map[wxid]
                         result_source = "wcdb_realtime"
@@ -2432,9 +2433,9 @@ def list_sns_timeline(
         """
 
         sql_rows: list[dict[str, Any]] = []
-        with wcdb_conn.lock:
+        with _wcdb_read_handle(wcdb_conn) as wcdb_handle:
             try:
-                sql_rows = _wcdb_exec_query(wcdb_conn.handle, kind="media", path=str(sns_db_path), sql=sql)
+                sql_rows = _wcdb_exec_query(wcdb_handle, kind="media", path=str(sns_db_path), sql=sql)
             except Exception:
                 # Older schema without pack_info_buf.
                 sql = f"""
@@ -2444,7 +2445,7 @@ def list_sns_timeline(
                     ORDER BY tid DESC
                     LIMIT {int(limit) + 1} OFFSET {int(offset)}
                 """
-                sql_rows = _wcdb_exec_query(wcdb_conn.handle, kind="media", path=str(sns_db_path), sql=sql)
+                sql_rows = _wcdb_exec_query(wcdb_handle, kind="media", path=str(sns_db_path), sql=sql)
 
         if not sql_rows:
             return None
@@ -2604,7 +2605,7 @@ def list_sns_timeline(
             return str(v or "").replace("\xa0", " ").strip()
 
         # Base timeline (includes likes/comments) from WCDB API.
-        with conn.lock:
+        with _wcdb_read_handle(conn) as wcdb_handle:
             wcdb_fetch_limit = limit + 1
             wcdb_probe_total: Optional[int] = None
 
@@ -2615,7 +2616,7 @@ def list_sns_timeline(
                 wcdb_fetch_limit = 201  # 200 + 1 sentinel
 
             rows = _wcdb_get_sns_timeline(
-                conn.handle,
+                wcdb_handle,
                 limit=wcdb_fetch_limit,
                 offset=offset,
                 usernames=users,
@@ -2675,10 +2676,10 @@ def list_sns_timeline(
                     in_sql = ",".join([str(x) for x in tids])
                     sql = f"SELECT tid, user_name, content, pack_info_buf FROM SnsTimeLine WHERE tid IN ({in_sql})"
                     try:
-                        sql_rows = _wcdb_exec_query(conn.handle, kind="media", path=str(sns_db_path), sql=sql)
+                        sql_rows = _wcdb_exec_query(wcdb_handle, kind="media", path=str(sns_db_path), sql=sql)
                     except Exception:
                         sql = f"SELECT tid, user_name, content FROM SnsTimeLine WHERE tid IN ({in_sql})"
-                        sql_rows = _wcdb_exec_query(conn.handle, kind="media", path=str(sns_db_path), sql=sql)
+                        sql_rows = _wcdb_exec_query(wcdb_handle, kind="media", path=str(sns_db_path), sql=sql)
                     for rr in sql_rows:
                         try:
                             tid_val = int(rr.get("tid"))
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import time
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
 
 from ..path_fix import PathFixRoute
-from ..wrapped.service import build_wrapped_annual_card, build_wrapped_annual_meta, build_wrapped_annual_response
+from ..wrapped.service import (
+    build_wrapped_annual_card,
+    build_wrapped_annual_meta,
+    build_wrapped_annual_response,
+    stream_wrapped_annual_cards,
+)
 
 router = APIRouter(route_class=PathFixRoute)
 
@@ -34,6 +42,40 @@ async def wrapped_annual_meta(
     return await asyncio.to_thread(build_wrapped_annual_meta, account=account, year=year, refresh=refresh)
 
 
+@router.get("/api/wrapped/annual/stream", summary="微信聊天年度总结（WeChat Wrapped）- 卡片流式推送（SSE）")
+async def wrapped_annual_stream(
+    request: Request,
+    year: Optional[int] = Query(None, description="年份（例如 2026）。默认当前年份。"),
+    account: Optional[str] = Query(None, description="解密后的账号目录名。默认取第一个可用账号。"),
+    refresh: bool = Query(False, description="是否强制重新计算（忽略缓存）。"),
+):
+    """并行计算全部卡片，按完成先后推送（先好的先到，不必等最慢的一张）。"""
+
+    meta, cards = await asyncio.to_thread(stream_wrapped_annual_cards, account=account, year=year, refresh=refresh)
+
+    async def gen():
+        yield "data: " + json.dumps({"type": "meta", **meta}, ensure_ascii=False) + "\n\n"
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
+                card = await asyncio.to_thread(next, cards, None)
+                if card is None:
+                    yield "data: " + json.dumps({"type": "done", "ts": int(time.time() * 1000)}) + "\n\n"
+                    break
+                yield "data: " + json.dumps({"type": "card", "card": card}, ensure_ascii=False) + "\n\n"
+        finally:
+            # Let already-running cards finish (and land in the cache) off the event loop.
+            try:
+                await asyncio.to_thread(cards.close)
+            except ValueError:
+                # The worker thread is still inside next(); it will finish on its own.
+                pass
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(gen(), media_type="text/event-stream", headers=headers)
+
+
 @router.get("/api/wrapped/annual/cards/{card_id}", summary="微信聊天年度总结（WeChat Wrapped）- 单张卡片（按页加载）")
 async def wrapped_annual_card(
     card_id: int = Path(..., description="卡片ID（与前端页面一一对应）", ge=0),
@@ -3,9 +3,10 @@ from __future__ import annotations
 import hashlib
 import re
 import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from .chat_helpers import (
     _build_latest_message_preview,
@@ -26,6 +27,11 @@ _TABLE_NAME = "session_last_message"
 _TABLE_NAME_RE = re.compile(r"^(msg_|chat_)([0-9a-f]{32})", re.IGNORECASE)
 _PREVIEW_MAX_LEN = 400
 
+# session.db path -> (session.db signature, usernames already refilled at that state). Sessions that
+# SessionTable does not know produce no row, so without this every session list request would retry them.
+_FILL_ATTEMPTS: dict[str, tuple[tuple[int, ...], set[str]]] = {}
+_FILL_ATTEMPTS_LOCK = threading.Lock()
+
 
 def _session_db_path(account_dir: Path) -> Path:
     return Path(account_dir) / "session.db"
@@ -152,62 +158,49 @@ def load_session_last_messages(account_dir: Path, usernames: list[str]) -> dict[
         conn.close()
 
 
-def build_session_last_message_table(
-    account_dir: Path,
-    *,
-    rebuild: bool = False,
-    include_hidden: bool = True,
-    include_official: bool = True,
-) -> dict[str, Any]:
-    """
-    Build a per-account cache table `{account}/session.db::{session_last_message}`.
-
-    The UI session list needs "last message preview" per conversation; querying message_*.db on every refresh is slow.
-    This shifts that work to decrypt-time (or one-time manual rebuild).
-    """
-
-    account_dir = Path(account_dir)
-    session_db_path = _session_db_path(account_dir)
-    if not session_db_path.exists():
-        return {
-            "status": "error",
-            "account": account_dir.name,
-            "message": "session.db not found.",
-        }
+_Best = dict[str, tuple[tuple[int, int, int], dict[str, Any]]]
 
-    db_paths = _iter_message_db_paths(account_dir)
-    if not db_paths:
-        return {
-            "status": "error",
-            "account": account_dir.name,
-            "message": "No message databases found.",
-        }
 
-    started = time.time()
-    logger.info(f"[session_last_message] build start account={account_dir.name} dbs={len(db_paths)}")
+def _load_session_rows(session_db_path: Path, usernames: Optional[list[str]] = None) -> list[sqlite3.Row]:
+    """Read SessionTable, optionally limited to `usernames`."""
+    columns_full = "username, is_hidden, summary, draft, last_msg_type, last_msg_sub_type, sort_timestamp, last_timestamp"
+    columns_min = "username, is_hidden, summary, draft, sort_timestamp, last_timestamp"
+    chunks: list[Optional[list[str]]] = [None]
+    if usernames is not None:
+        chunks = [usernames[i : i + 900] for i in range(0, len(usernames), 900)]
 
+    out: list[sqlite3.Row] = []
     sconn = sqlite3.connect(str(session_db_path))
     sconn.row_factory = sqlite3.Row
     try:
-        try:
-            srows = sconn.execute(
-                """
-                SELECT username, is_hidden, summary, draft, last_msg_type, last_msg_sub_type, sort_timestamp, last_timestamp
-                FROM SessionTable
-                ORDER BY sort_timestamp DESC
-                """
-            ).fetchall()
-        except sqlite3.OperationalError:
-            srows = sconn.execute(
-                """
-                SELECT username, is_hidden, summary, draft, sort_timestamp, last_timestamp
-                FROM SessionTable
-                ORDER BY sort_timestamp DESC
-                """
-            ).fetchall()
+        for chunk in chunks:
+            where = f"WHERE username IN ({','.join(['?'] * len(chunk))})" if chunk is not None else ""
+            params = chunk or []
+            try:
+                out.extend(
+                    sconn.execute(
+                        f"SELECT {columns_full} FROM SessionTable {where} ORDER BY sort_timestamp DESC",
+                        params,
+                    ).fetchall()
+                )
+            except sqlite3.OperationalError:
+                out.extend(
+                    sconn.execute(
+                        f"SELECT {columns_min} FROM SessionTable {where} ORDER BY sort_timestamp DESC",
+                        params,
+                    ).fetchall()
+                )
     finally:
         sconn.close()
+    return out
+
 
+def _filter_sessions(
+    srows: list[sqlite3.Row],
+    *,
+    include_hidden: bool,
+    include_official: bool,
+) -> tuple[list[sqlite3.Row], list[str], dict[str, int]]:
     sessions: list[sqlite3.Row] = []
     usernames: list[str] = []
     expected_ts_by_user: dict[str, int] = {}
@@ -225,22 +218,28 @@ def build_session_last_message_table(
         if ts <= 0:
             ts = int(_row_get(r, "last_timestamp") or 0)
         expected_ts_by_user[u] = int(ts or 0)
+    return sessions, usernames, expected_ts_by_user
 
-    if not usernames:
-        return {
-            "status": "success",
-            "account": account_dir.name,
-            "message": "No sessions to build.",
-            "built": 0,
-            "durationSec": 0.0,
-        }
 
+def _collect_latest_messages(
+    account_dir: Path,
+    db_paths: list[Path],
+    usernames: list[str],
+    expected_ts_by_user: dict[str, int],
+    *,
+    targeted: bool = False,
+) -> tuple[_Best, int]:
+    """Find the newest message per session across the message shards.
+
+    With `targeted`, each shard is probed only for the given sessions' table names, which keeps
+    small incremental updates cheap on accounts with many conversations.
+    """
     md5_to_users: dict[str, list[str]] = {}
     for u in usernames:
         h = hashlib.md5(u.encode("utf-8")).hexdigest()
         md5_to_users.setdefault(h, []).append(u)
 
-    best: dict[str, tuple[tuple[int, int, int], dict[str, Any]]] = {}
+    best: _Best = {}
 
     skipped_dbs = 0
     for db_path in db_paths:
@@ -249,7 +248,21 @@ def build_session_last_message_table(
             conn = sqlite3.connect(str(db_path))
             conn.row_factory = sqlite3.Row
             conn.text_factory = bytes
-            trows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+            if targeted:
+                # Look up just the touched sessions' tables instead of listing every table in the shard.
+                candidates = [f"{prefix}{md5_hex}" for md5_hex in md5_to_users for prefix in ("msg_", "chat_")]
+                trows = []
+                for i in range(0, len(candidates), 900):
+                    chunk = candidates[i : i + 900]
+                    trows.extend(
+                        conn.execute(
+                            "SELECT name FROM sqlite_master WHERE type='table' "
+                            f"AND lower(name) IN ({','.join(['?'] * len(chunk))})",
+                            chunk,
+                        ).fetchall()
+                    )
+            else:
+                trows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
             md5_to_table: dict[str, str] = {}
             for tr in trows:
                 if not tr or tr[0] is None:
@@ -434,6 +447,10 @@ def build_session_last_message_table(
                 except Exception:
                     pass
 
+    return best, skipped_dbs
+
+
+def _add_fallback_records(sessions: list[sqlite3.Row], best: _Best) -> None:
     # Fallback: always have a non-empty preview for UI.
     for r in sessions:
         u = str(_row_get(r, "username") or "").strip()
@@ -467,6 +484,14 @@ def build_session_last_message_table(
             },
         )
 
+
+def _write_records(
+    session_db_path: Path,
+    best: _Best,
+    *,
+    rebuild: bool = False,
+    delete_usernames: Optional[list[str]] = None,
+) -> None:
     built_at = int(time.time())
     conn_out = sqlite3.connect(str(session_db_path))
     try:
@@ -476,6 +501,11 @@ def build_session_last_message_table(
                 conn_out.execute(f"DELETE FROM {_TABLE_NAME}")
             except Exception:
                 pass
+        if delete_usernames:
+            conn_out.executemany(
+                f"DELETE FROM {_TABLE_NAME} WHERE username = ?",
+                [(u,) for u in delete_usernames],
+            )
 
         rows_to_insert: list[tuple[Any, ...]] = []
         for _, rec in best.values():
@@ -504,6 +534,60 @@ def build_session_last_message_table(
     finally:
         conn_out.close()
 
+
+def build_session_last_message_table(
+    account_dir: Path,
+    *,
+    rebuild: bool = False,
+    include_hidden: bool = True,
+    include_official: bool = True,
+) -> dict[str, Any]:
+    """
+    Build a per-account cache table `{account}/session.db::{session_last_message}`.
+
+    The UI session list needs "last message preview" per conversation; querying message_*.db on every refresh is slow.
+    This shifts that work to decrypt-time (or one-time manual rebuild).
+    """
+
+    account_dir = Path(account_dir)
+    session_db_path = _session_db_path(account_dir)
+    if not session_db_path.exists():
+        return {
+            "status": "error",
+            "account": account_dir.name,
+            "message": "session.db not found.",
+        }
+
+    db_paths = _iter_message_db_paths(account_dir)
+    if not db_paths:
+        return {
+            "status": "error",
+            "account": account_dir.name,
+            "message": "No message databases found.",
+        }
+
+    started = time.time()
+    logger.info(f"[session_last_message] build start account={account_dir.name} dbs={len(db_paths)}")
+
+    sessions, usernames, expected_ts_by_user = _filter_sessions(
+        _load_session_rows(session_db_path),
+        include_hidden=include_hidden,
+        include_official=include_official,
+    )
+
+    if not usernames:
+        return {
+            "status": "success",
+            "account": account_dir.name,
+            "message": "No sessions to build.",
+            "built": 0,
+            "durationSec": 0.0,
+        }
+
+    best, skipped_dbs = _collect_latest_messages(account_dir, db_paths, usernames, expected_ts_by_user)
+    _add_fallback_records(sessions, best)
+    _write_records(session_db_path, best, rebuild=rebuild)
+
     duration = max(0.0, time.time() - started)
     logger.info(
         f"[session_last_message] build done account={account_dir.name} sessions={len(best)} "
@@ -517,3 +601,91 @@ def build_session_last_message_table(
         "durationSec": round(duration, 3),
         "skippedDbs": int(skipped_dbs),
     }
+
+
+def update_session_last_messages(account_dir: Path, usernames: Iterable[str]) -> dict[str, Any]:
+    """
+    Recompute `session_last_message` rows for the given sessions only.
+
+    Realtime sync calls this with the sessions it touched, so previews stay fresh without a full
+    rebuild. Sessions that no longer exist in SessionTable lose their cached row. Hidden and
+    official sessions are kept, matching the tables built at decrypt time.
+    """
+
+    account_dir = Path(account_dir)
+    uniq = list(dict.fromkeys([str(u or "").strip() for u in usernames if str(u or "").strip()]))
+    session_db_path = _session_db_path(account_dir)
+    if not uniq or not session_db_path.exists():
+        return {"status": "success", "account": account_dir.name, "updated": 0, "removed": 0}
+
+    started = time.time()
+    sessions, kept, expected_ts_by_user = _filter_sessions(
+        _load_session_rows(session_db_path, uniq),
+        include_hidden=True,
+        include_official=True,
+    )
+    best: _Best = {}
+    skipped_dbs = 0
+    if kept:
+        best, skipped_dbs = _collect_latest_messages(
+            account_dir,
+            _iter_message_db_paths(account_dir),
+            kept,
+            expected_ts_by_user,
+            targeted=True,
+        )
+        _add_fallback_records(sessions, best)
+    removed = [u for u in uniq if u not in best]
+    _write_records(session_db_path, best, delete_usernames=removed)
+
+    duration = max(0.0, time.time() - started)
+    logger.info(
+        f"[session_last_message] update done account={account_dir.name} updated={len(best)} "
+        f"removed={len(removed)} durationSec={round(duration, 3)} skippedDbs={skipped_dbs}"
+    )
+    return {
+        "status": "success",
+        "account": account_dir.name,
+        "updated": len(best),
+        "removed": len(removed),
+        "durationSec": round(duration, 3),
+        "skippedDbs": int(skipped_dbs),
+    }
+
+
+def _session_db_signature(session_db_path: Path) -> tuple[int, ...]:
+    out: list[int] = []
+    for path in (session_db_path, session_db_path.with_name(session_db_path.name + "-wal")):
+        try:
+            st = path.stat()
+            out.extend((int(st.st_mtime_ns), int(st.st_size)))
+        except OSError:
+            out.extend((0, 0))
+    return tuple(out)
+
+
+def fill_missing_session_last_messages(account_dir: Path, usernames: Iterable[str]) -> list[str]:
+    """
+    Fill `session_last_message` rows for sessions the list found without a cached preview.
+
+    Each username is tried at most once per session.db state; a realtime sync or rebuild that writes
+    session.db makes them eligible again. Returns the usernames that were recomputed.
+    """
+
+    account_dir = Path(account_dir)
+    session_db_path = _session_db_path(account_dir)
+    key = str(session_db_path)
+    signature = _session_db_signature(session_db_path)
+    with _FILL_ATTEMPTS_LOCK:
+        entry = _FILL_ATTEMPTS.get(key)
+        attempted = set(entry[1]) if entry is not None and entry[0] == signature else set()
+
+    pending = [u for u in dict.fromkeys(str(u or "").strip() for u in usernames) if u and u not in attempted]
+    if not pending:
+        return []
+
+    update_session_last_messages(account_dir, pending)
+    attempted.update(pending)
+    with _FILL_ATTEMPTS_LOCK:
+        _FILL_ATTEMPTS[key] = (_session_db_signature(session_db_path), attempted)
+    return pending
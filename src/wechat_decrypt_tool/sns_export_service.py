@@ -25,6 +25,7 @@ import httpx
 from .chat_helpers import _load_contact_rows, _pick_display_name, _resolve_account_dir
 from .account_identity import resolve_account_self_username
 from .logging_config import get_logger
+from .metrics import record_throughput
 from .media_helpers import _detect_image_media_type, _read_and_maybe_decrypt_media, _resolve_account_wxid_dir
 from .export_integrity import (
     IntegrityZipWriter,
@@ -3533,6 +3534,15 @@ class SnsExportManager:
                 job.progress.users_done = job.progress.users_total
                 job.progress.posts_exported = job.progress.posts_total
             job.progress.current_user_posts_done = job.progress.current_user_posts_total
+        if output_mode == "zip" and job.status == "done":
+            try:
+                record_throughput(
+                    "sns_export",
+                    bytes_count=int(Path(final_out).stat().st_size),
+                    seconds=(job.finished_at or time.time()) - (job.started_at or job.created_at),
+                )
+            except (OSError, TypeError):
+                pass
 
         set_phase("done")
 
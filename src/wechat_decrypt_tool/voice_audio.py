@@ -0,0 +1,352 @@
+"""SILK voice decoding and browser-audio encoding without per-call temp files.
+
+pilk only accepts file paths, so SILK is handed to it through anonymous
+``memfd`` files where the kernel provides them (Linux) and through a reused
+per-thread scratch pair elsewhere.  WAV framing happens in memory and MP3 is
+produced by streaming PCM through ffmpeg's stdin/stdout.  Encoded results are
+kept in a small per-account disk cache keyed by ``(server_id, format)`` so a
+voice bubble that is played twice is only decoded once.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SILK_BROWSER_SAMPLE_RATE = 24000
+VOICE_AUDIO_CACHE_DIRNAME = "voice_audio"
+_VOICE_AUDIO_CACHE_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_VOICE_AUDIO_FORMATS = {"mp3": "audio/mpeg", "wav": "audio/wav"}
+_VOICE_AUDIO_CACHE_LOCK = threading.Lock()
+_VOICE_AUDIO_CACHE_SIZES: dict[str, int] = {}
+_SCRATCH_LOCAL = threading.local()
+
+
+def looks_like_mp3(data: bytes) -> bool:
+    if not data:
+        return False
+    if data.startswith(b"ID3"):
+        return True
+    return len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0
+
+
+def _memfd_available() -> bool:
+    return hasattr(os, "memfd_create") and os.path.isdir("/proc/self/fd")
+
+
+@contextmanager
+def _scratch_paths() -> Iterator[tuple[str, str, int, int]]:
+    """Yield (silk_path, pcm_path, silk_fd, pcm_fd) for one pilk call.
+
+    File descriptors are -1 on the scratch-file fallback.
+    """
+
+    if _memfd_available():
+        silk_fd = os.memfd_create("wechat-voice-silk")
+        pcm_fd = os.memfd_create("wechat-voice-pcm")
+        try:
+            yield f"/proc/self/fd/{silk_fd}", f"/proc/self/fd/{pcm_fd}", silk_fd, pcm_fd
+        finally:
+            os.close(silk_fd)
+            os.close(pcm_fd)
+        return
+
+    scratch = getattr(_SCRATCH_LOCAL, "paths", None)
+    if scratch is None:
+        root = Path(tempfile.gettempdir()) / "wechat_voice_scratch"
+        root.mkdir(parents=True, exist_ok=True)
+        stem = f"{os.getpid()}-{threading.get_ident()}"
+        scratch = (str(root / f"{stem}.silk"), str(root / f"{stem}.pcm"))
+        _SCRATCH_LOCAL.paths = scratch
+    yield scratch[0], scratch[1], -1, -1
+
+
+def decode_silk_to_pcm(data: bytes, *, rate: int = SILK_BROWSER_SAMPLE_RATE) -> bytes:
+    """Decode SILK bytes to mono s16le PCM at ``rate``; returns b"" on failure."""
+
+    payload = bytes(data or b"")
+    if not payload:
+        return b""
+    try:
+        import pilk
+    except ImportError:
+        return b""
+
+    try:
+        with _scratch_paths() as (silk_path, pcm_path, silk_fd, pcm_fd):
+            if silk_fd >= 0:
+                os.write(silk_fd, payload)
+                pilk.decode(silk_path, pcm_path, pcm_rate=int(rate))
+                size = os.fstat(pcm_fd).st_size
+                pcm = os.pread(pcm_fd, size, 0) if size > 0 else b""
+            else:
+                with open(silk_path, "wb") as silk_file:
+                    silk_file.write(payload)
+                pilk.decode(silk_path, pcm_path, pcm_rate=int(rate))
+                with open(pcm_path, "rb") as pcm_file:
+                    pcm = pcm_file.read()
+    except Exception as e:
+        logger.warning(f"SILK decode failed: {e}")
+        return b""
+    return pcm[: len(pcm) - (len(pcm) % 2)]
+
+
+def pcm_to_wav(pcm: bytes, *, rate: int = SILK_BROWSER_SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setparams((1, 2, int(rate), 0, "NONE", "NONE"))
+        writer.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def wav_to_pcm(wav_data: bytes) -> tuple[bytes, int]:
+    """Return (mono s16le PCM, sample rate) from a WAV payload, or (b"", 0)."""
+
+    try:
+        with wave.open(io.BytesIO(wav_data), "rb") as reader:
+            if reader.getnchannels() != 1 or reader.getsampwidth() != 2:
+                return b"", 0
+            return reader.readframes(reader.getnframes()), int(reader.getframerate())
+    except Exception:
+        return b"", 0
+
+
+@lru_cache(maxsize=1)
+def find_ffmpeg_executable() -> str:
+    env_value = str(os.environ.get("WECHAT_TOOL_FFMPEG") or "").strip()
+    if env_value:
+        resolved = shutil.which(env_value)
+        if resolved:
+            return resolved
+        candidate = Path(env_value).expanduser()
+        if candidate.is_file():
+            return str(candidate)
+
+    return shutil.which("ffmpeg") or ""
+
+
+def encode_pcm_to_mp3(pcm: bytes, *, rate: int = SILK_BROWSER_SAMPLE_RATE) -> bytes:
+    """Stream raw PCM through ffmpeg's stdin and collect MP3 from its stdout."""
+
+    if not pcm:
+        return b""
+    ffmpeg_exe = find_ffmpeg_executable()
+    if not ffmpeg_exe:
+        return b""
+
+    try:
+        proc = subprocess.run(
+            [
+                ffmpeg_exe,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-f",
+                "s16le",
+                "-ar",
+                str(int(rate)),
+                "-ac",
+                "1",
+                "-i",
+                "pipe:0",
+                "-vn",
+                "-codec:a",
+                "libmp3lame",
+                "-q:a",
+                "4",
+                "-f",
+                "mp3",
+                "pipe:1",
+            ],
+            input=pcm,
+            check=False,
+            capture_output=True,
+        )
+    except Exception as e:
+        logger.warning(f"PCM to MP3 conversion failed: {e}")
+        return b""
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", errors="ignore").strip()
+        if err:
+            logger.warning(f"PCM to MP3 conversion failed: {err}")
+        return b""
+    return proc.stdout if looks_like_mp3(proc.stdout) else b""
+
+
+def convert_silk_to_browser_audio(data: bytes, *, preferred_format: str = "mp3") -> tuple[bytes, str, str]:
+    """Convert SILK audio to a browser-friendly format.
+
+    Returns `(payload, ext, media_type)`.
+    Preference order:
+      1) MP3 if requested and ffmpeg is available
+      2) WAV if SILK decoding succeeds
+      3) original SILK bytes as a last-resort fallback
+    """
+
+    payload = bytes(data or b"")
+    if not payload:
+        return b"", "silk", "audio/silk"
+    if looks_like_mp3(payload):
+        return payload, "mp3", "audio/mpeg"
+
+    want_mp3 = str(preferred_format or "").strip().lower() == "mp3"
+    if payload.startswith(b"RIFF"):
+        if want_mp3:
+            pcm, rate = wav_to_pcm(payload)
+            mp3_data = encode_pcm_to_mp3(pcm, rate=rate) if pcm else b""
+            if mp3_data:
+                return mp3_data, "mp3", "audio/mpeg"
+        return payload, "wav", "audio/wav"
+
+    pcm = decode_silk_to_pcm(payload)
+    if not pcm:
+        return payload, "silk", "audio/silk"
+    if want_mp3:
+        mp3_data = encode_pcm_to_mp3(pcm)
+        if mp3_data:
+            return mp3_data, "mp3", "audio/mpeg"
+    return pcm_to_wav(pcm), "wav", "audio/wav"
+
+
+def _voice_audio_cache_max_bytes() -> int:
+    try:
+        value = int(os.environ.get("WECHAT_TOOL_VOICE_AUDIO_CACHE_MB") or 0)
+    except Exception:
+        value = 0
+    return value * 1024 * 1024 if value > 0 else _VOICE_AUDIO_CACHE_DEFAULT_MAX_BYTES
+
+
+def _voice_audio_cache_dir(account_dir: Path) -> Path:
+    return Path(account_dir) / "_cache" / VOICE_AUDIO_CACHE_DIRNAME
+
+
+def _voice_audio_cache_file(account_dir: Path, server_id: int, ext: str) -> Path:
+    return _voice_audio_cache_dir(account_dir) / f"{int(server_id)}.{ext}"
+
+
+def lookup_cached_voice_audio(
+    account_dir: Path,
+    server_id: int,
+    *,
+    preferred_format: str = "mp3",
+) -> Optional[tuple[Path, str, str]]:
+    """Return `(path, ext, media_type)` for an already encoded voice, without loading SILK."""
+
+    sid = int(server_id or 0)
+    if sid <= 0:
+        return None
+    preferred = str(preferred_format or "").strip().lower()
+    # A WAV entry is only written when MP3 encoding was impossible, so it also
+    # answers MP3 requests.
+    formats = ("mp3", "wav") if preferred == "mp3" else (preferred,)
+    for ext in formats:
+        media_type = _VOICE_AUDIO_FORMATS.get(ext)
+        if media_type is None:
+            continue
+        path = _voice_audio_cache_file(account_dir, sid, ext)
+        try:
+            if path.is_file() and path.stat().st_size > 0:
+                try:
+                    os.utime(path, None)
+                except OSError:
+                    pass
+                return path, ext, media_type
+        except OSError:
+            continue
+    return None
+
+
+def store_voice_audio(account_dir: Path, server_id: int, ext: str, payload: bytes) -> None:
+    """Remember an encoded voice; only MP3/WAV payloads are cached."""
+
+    if int(server_id or 0) <= 0 or not payload or ext not in _VOICE_AUDIO_FORMATS:
+        return
+    try:
+        _store_voice_audio(account_dir, int(server_id), ext, payload)
+    except Exception as e:
+        logger.warning(f"Voice audio cache write failed: {e}")
+
+
+def _store_voice_audio(account_dir: Path, server_id: int, ext: str, payload: bytes) -> None:
+    cache_dir = _voice_audio_cache_dir(account_dir)
+    target = _voice_audio_cache_file(account_dir, server_id, ext)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, target)
+
+    key = os.path.normcase(str(cache_dir.absolute()))
+    with _VOICE_AUDIO_CACHE_LOCK:
+        size = _VOICE_AUDIO_CACHE_SIZES.get(key)
+        if size is None:
+            size = sum(entry.stat().st_size for entry in cache_dir.iterdir() if entry.is_file())
+        else:
+            size += len(payload)
+        limit = _voice_audio_cache_max_bytes()
+        if size > limit:
+            size = _evict_voice_audio_cache(cache_dir, limit)
+        _VOICE_AUDIO_CACHE_SIZES[key] = size
+
+
+def _evict_voice_audio_cache(cache_dir: Path, limit: int) -> int:
+    """Drop least recently used entries until the cache is at 80% of ``limit``."""
+
+    entries = []
+    for entry in cache_dir.iterdir():
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+        except OSError:
+            continue
+    total = sum(size for _mtime, size, _entry in entries)
+    target = int(limit * 0.8)
+    for _mtime, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= target:
+            break
+        try:
+            entry.unlink()
+            total -= size
+        except OSError:
+            continue
+    return total
+
+
+def convert_voice_for_browser(
+    account_dir: Path,
+    server_id: int,
+    data: bytes,
+    *,
+    preferred_format: str = "mp3",
+) -> tuple[bytes, str, str]:
+    """Cached ``convert_silk_to_browser_audio`` for one voice message."""
+
+    sid = int(server_id or 0)
+    cached = lookup_cached_voice_audio(account_dir, sid, preferred_format=preferred_format) if sid > 0 else None
+    if cached is not None:
+        try:
+            return cached[0].read_bytes(), cached[1], cached[2]
+        except OSError:
+            pass
+
+    started_at = time.perf_counter()
+    payload, ext, media_type = convert_silk_to_browser_audio(data, preferred_format=preferred_format)
+    store_voice_audio(account_dir, sid, ext, payload)
+    logger.debug(
+        f"Voice {sid} converted to {ext} in {round((time.perf_counter() - started_at) * 1000.0, 1)}ms"
+    )
+    return payload, ext, media_type
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import bisect
 import errno
 import hashlib
 import gc
 import importlib.util
+import io
 import logging
 import os
 import re
@@ -13,11 +15,11 @@ import sqlite3
 import ssl
 import stat
 import subprocess
-import tempfile
 import threading
 import time
 import uuid
-from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import contextmanager
 from dataclasses import dataclass, replace
 from pathlib import Path
@@ -25,6 +27,8 @@ from typing import Any, Callable, Optional
 
 import httpx
 
+from .voice_audio import convert_silk_to_browser_audio, decode_silk_to_pcm, wav_to_pcm
+
 
 TRANSCRIPT_TEXT_VERSION = 1
 logger = logging.getLogger(__name__)
@@ -32,6 +36,7 @@ _OPENCC_CONVERTER: Any = None
 _OPENCC_LOOKED_UP = False
 _OPENCC_CONVERTER_LOCK = threading.Lock()
 _CUDA_PROBE_CACHE_TTL_SECONDS = 5.0
+_DEFAULT_CPU_BATCH_SIZE = 8
 _CUDA_PROBE_CACHE_LOCK = threading.Lock()
 _CUDA_PROBE_CACHE: Optional[tuple[float, dict[str, Any]]] = None
 
@@ -587,6 +592,8 @@ class VoiceTranscriptionConfig:
     allow_download: bool = False
     beam_size: int = 5
     num_workers: int = 1
+    batch_size: int = 1
+    decode_workers: int = 1
 
     @classmethod
     def from_env(cls) -> "VoiceTranscriptionConfig":
@@ -602,6 +609,18 @@ class VoiceTranscriptionConfig:
             beam_size = max(1, min(10, int(os.environ.get("WECHAT_TOOL_WHISPER_BEAM_SIZE") or 5)))
         except Exception:
             beam_size = 5
+        # CPU 默认小批量推理；显存受限的 CUDA 仍默认逐条。显式设为 1 可关闭批量。
+        default_batch_size = _DEFAULT_CPU_BATCH_SIZE if device == VOICE_TRANSCRIPTION_DEVICE_CPU else 1
+        try:
+            batch_size = max(1, min(64, int(os.environ.get("WECHAT_TOOL_WHISPER_BATCH_SIZE") or default_batch_size)))
+        except Exception:
+            batch_size = default_batch_size
+        try:
+            decode_workers = int(os.environ.get("WECHAT_TOOL_WHISPER_DECODE_WORKERS") or 0)
+        except Exception:
+            decode_workers = 0
+        if decode_workers <= 0:
+            decode_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
         return cls(
             enabled=enabled,
             model=model,
@@ -612,6 +631,8 @@ class VoiceTranscriptionConfig:
             model_source=model_source,
             allow_download=allow_download,
             beam_size=beam_size,
+            batch_size=batch_size,
+            decode_workers=min(16, decode_workers),
         )
 
     def cpu_fallback(self) -> "VoiceTranscriptionConfig":
@@ -1091,9 +1112,105 @@ def _numbered_db_shards(root: Path, prefix: str) -> list[Path]:
 
 
 def _convert_silk_to_browser_audio(data: bytes, *, preferred_format: str) -> tuple[bytes, str, str]:
-    from .media_helpers import _convert_silk_to_browser_audio as convert
+    return convert_silk_to_browser_audio(data, preferred_format=preferred_format)
+
+
+VOICE_PCM_SAMPLE_RATE = 16000
+# Bucket edges (seconds) used to group clips of similar length into one batch.
+_VOICE_BATCH_DURATION_BUCKETS = (5.0, 10.0, 15.0, 30.0)
+_VOICE_BATCH_CLIP_GAP_SECONDS = 1.0
+_VOICE_BATCH_MAX_CHUNK_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class _VoiceBatchClip:
+    server_id: int
+    source_hash: str
+    pcm: bytes
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / 2.0 / VOICE_PCM_SAMPLE_RATE
+
+
+def _voice_batch_error(server_id: int, exc: VoiceTranscriptionError) -> dict[str, Any]:
+    return {"status": "error", "serverId": int(server_id), "code": exc.code, "error": exc.user_message}
+
+
+def decode_voice_pcm(data: bytes) -> bytes:
+    """Decode one SILK (or 16 kHz WAV) voice clip into 16 kHz mono s16le PCM."""
+
+    payload = bytes(data or b"")
+    if not payload:
+        return b""
+    if payload.startswith(b"RIFF"):
+        pcm, rate = wav_to_pcm(payload)
+        return pcm if rate == VOICE_PCM_SAMPLE_RATE else b""
+    return decode_silk_to_pcm(payload, rate=VOICE_PCM_SAMPLE_RATE)
 
-    return convert(data, preferred_format=preferred_format)
+
+def _decode_voice_pcm_item(item: tuple[int, bytes]) -> tuple[int, bytes]:
+    # Top-level so ProcessPoolExecutor workers can pickle it.
+    server_id, data = item
+    return int(server_id), decode_voice_pcm(data)
+
+
+def create_voice_decode_executor(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Return a SILK decode process pool, or None when decoding should stay inline."""
+
+    worker_count = max(1, int(workers or 1))
+    if worker_count <= 1:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=worker_count)
+    except Exception:
+        logger.warning("Voice decode process pool unavailable; decoding inline", exc_info=True)
+        return None
+
+
+def _decode_voice_clips(
+    items: list[tuple[int, bytes]],
+    *,
+    executor: Optional[Executor] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> dict[int, bytes]:
+    decoded: dict[int, bytes] = {}
+    if executor is not None and len(items) > 1:
+        try:
+            for server_id, pcm in executor.map(_decode_voice_pcm_item, items, chunksize=4):
+                decoded[server_id] = pcm
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+            return decoded
+        except BrokenProcessPool:
+            logger.warning("Voice decode process pool broke; decoding remaining clips inline")
+    for item in items:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if int(item[0]) in decoded:
+            continue
+        server_id, pcm = _decode_voice_pcm_item(item)
+        decoded[server_id] = pcm
+    return decoded
+
+
+def _bucket_voice_batch_clips(
+    clips: list[_VoiceBatchClip],
+    batch_size: int,
+) -> list[list[_VoiceBatchClip]]:
+    """Group clips of similar duration so a batch pads as little as possible."""
+
+    size = max(1, int(batch_size or 1))
+    buckets: dict[int, list[_VoiceBatchClip]] = {}
+    for clip in sorted(clips, key=lambda item: (item.duration, item.server_id)):
+        index = bisect.bisect_left(_VOICE_BATCH_DURATION_BUCKETS, clip.duration)
+        buckets.setdefault(index, []).append(clip)
+    batches: list[list[_VoiceBatchClip]] = []
+    for index in sorted(buckets):
+        members = buckets[index]
+        for start in range(0, len(members), size):
+            batches.append(members[start : start + size])
+    return batches
 
 
 def load_voice_data(account_dir: Path, server_id: int) -> bytes:
@@ -1462,9 +1579,11 @@ class VoiceTranscriptionService:
         config: Optional[VoiceTranscriptionConfig] = None,
         *,
         model_loader: Optional[Callable[[VoiceTranscriptionConfig], Any]] = None,
+        batched_pipeline_factory: Optional[Callable[[Any], Any]] = None,
     ) -> None:
         self.config = config or VoiceTranscriptionConfig.from_env()
         self._model_loader = model_loader or self._load_faster_whisper_model
+        self._batched_pipeline_factory = batched_pipeline_factory or self._load_faster_whisper_batched_pipeline
         self._model: Any = None
         self._active_device = ""
         self._active_compute_type = ""
@@ -1553,6 +1672,7 @@ class VoiceTranscriptionService:
             "activeComputeType": self._active_compute_type or None,
             "modelLoaded": self._model is not None,
             "numWorkers": self._model_num_workers,
+            "batchSize": max(1, int(self.config.batch_size or 1)),
             "cuda": cuda,
             "requestedDeviceAvailable": bool(
                 self.config.device != VOICE_TRANSCRIPTION_DEVICE_CUDA or cuda["available"]
@@ -1656,46 +1776,297 @@ class VoiceTranscriptionService:
             if not payload or ext == "silk":
                 raise VoiceTranscriptionError("voice_decode_failed", "语音解码失败，无法交给 Whisper 识别。")
 
-            temp_path: Optional[Path] = None
+            text, info, result_device, result_compute_type = self._transcribe_with_fallback(
+                payload,
+                cancel_event=cancel_event,
+            )
+            result = {
+                "status": "success",
+                "serverId": sid,
+                "text": text,
+                "language": str(getattr(info, "language", "") or self.config.language),
+                "duration": float(getattr(info, "duration", 0.0) or 0.0),
+                "model": _public_model_name(self.config.model),
+                "device": result_device,
+                "computeType": result_compute_type,
+                "cached": False,
+            }
             try:
-                suffix = ".wav" if ext == "wav" else f".{ext}"
-                with tempfile.NamedTemporaryFile(prefix="wechat_voice_", suffix=suffix, delete=False) as temp_file:
-                    temp_file.write(payload)
-                    temp_path = Path(temp_file.name)
+                self._write_cache(
+                    account_path,
+                    sid,
+                    source_hash,
+                    result,
+                    expected_epoch=cache_epoch,
+                    expected_generation=operation_generation,
+                )
+            except Exception:
+                pass
+            return result
+
+    def transcribe_voice_batch(
+        self,
+        *,
+        account_dir: Path,
+        voices: list[tuple[int, bytes]],
+        force: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+        cache_generation: Optional[int] = None,
+        decode_executor: Optional[Executor] = None,
+    ) -> dict[int, dict[str, Any]]:
+        """Transcribe many clips through faster-whisper's batched pipeline.
+
+        Returns one entry per server id: the usual result dict on success, or
+        ``{"status": "error", "code": ..., "error": ...}`` for that clip only.
+        """
+
+        self._raise_if_retired()
+        with voice_model_activity(self.config.model):
+            self._raise_if_retired()
+            return self._transcribe_voice_batch_impl(
+                account_dir=account_dir,
+                voices=voices,
+                force=force,
+                cancel_event=cancel_event,
+                cache_generation=cache_generation,
+                decode_executor=decode_executor,
+            )
+
+    def _transcribe_voice_batch_impl(
+        self,
+        *,
+        account_dir: Path,
+        voices: list[tuple[int, bytes]],
+        force: bool,
+        cancel_event: Optional[threading.Event],
+        cache_generation: Optional[int],
+        decode_executor: Optional[Executor],
+    ) -> dict[int, dict[str, Any]]:
+        self._raise_if_cancelled(cancel_event)
+        account_path = Path(account_dir)
+        operation_generation = (
+            capture_voice_transcript_cache_generation()
+            if cache_generation is None
+            else int(cache_generation)
+        )
+        cache_epoch = _capture_voice_transcript_cache_epoch(account_path)
+        if not self.config.enabled:
+            raise VoiceTranscriptionError("disabled", "语音转文字功能未启用。")
+        if not str(self.config.model or "").strip():
+            raise VoiceTranscriptionError("model_not_configured", "未配置 Whisper 模型。")
+
+        results: dict[int, dict[str, Any]] = {}
+        sources: dict[int, bytes] = {}
+        hashes: dict[int, str] = {}
+        for raw_sid, raw_data in voices:
+            sid = int(raw_sid or 0)
+            if sid <= 0 or sid in sources or sid in results:
+                continue
+            data = bytes(raw_data or b"")
+            if not data:
+                results[sid] = _voice_batch_error(
+                    sid,
+                    VoiceTranscriptionError("voice_not_found", "未找到语音数据。"),
+                )
+                continue
+            sources[sid] = data
+            hashes[sid] = hashlib.sha256(data).hexdigest()
+
+        if not force and hashes:
+            for sid, cached in self._read_cache_many(account_path, hashes).items():
+                results[sid] = cached
+                sources.pop(sid, None)
+        if not sources:
+            return results
 
-                text, info, result_device, result_compute_type = self._transcribe_with_fallback(
-                    temp_path,
+        self._raise_if_cancelled(cancel_event)
+        decoded = _decode_voice_clips(
+            list(sources.items()),
+            executor=decode_executor,
+            cancel_event=cancel_event,
+        )
+        self._raise_if_cancelled(cancel_event)
+        clips: list[_VoiceBatchClip] = []
+        for sid in sources:
+            pcm = decoded.get(sid) or b""
+            if pcm:
+                clips.append(_VoiceBatchClip(server_id=sid, source_hash=hashes[sid], pcm=pcm))
+            else:
+                # pilk could not decode it to PCM; the single-clip path still
+                # gets a chance through the browser audio converters.
+                self._transcribe_batch_clip_individually(
+                    account_path,
+                    sid,
+                    sources[sid],
+                    results,
+                    force=True,
                     cancel_event=cancel_event,
+                    cache_generation=operation_generation,
                 )
+
+        written: list[tuple[int, str, dict[str, Any]]] = []
+        for batch in _bucket_voice_batch_clips(clips, self.config.batch_size):
+            self._raise_if_cancelled(cancel_event)
+            try:
+                outputs, device, compute_type = self._transcribe_batched_with_model(batch, cancel_event=cancel_event)
+            except (_VoiceTranscriptionCancelled, VoiceTranscriptionError):
+                raise
+            except Exception as exc:
+                logger.warning(
+                    "Batched voice transcription failed (%s); retrying %d clips individually",
+                    type(exc).__name__,
+                    len(batch),
+                )
+                for clip in batch:
+                    self._transcribe_batch_clip_individually(
+                        account_path,
+                        clip.server_id,
+                        sources[clip.server_id],
+                        results,
+                        force=True,
+                        cancel_event=cancel_event,
+                        cache_generation=operation_generation,
+                    )
+                continue
+            for clip in batch:
+                text, language = outputs.get(clip.server_id, ("", ""))
                 result = {
                     "status": "success",
-                    "serverId": sid,
-                    "text": text,
-                    "language": str(getattr(info, "language", "") or self.config.language),
-                    "duration": float(getattr(info, "duration", 0.0) or 0.0),
+                    "serverId": clip.server_id,
+                    "text": normalize_transcript_text(text),
+                    "language": str(language or self.config.language),
+                    "duration": round(clip.duration, 3),
                     "model": _public_model_name(self.config.model),
-                    "device": result_device,
-                    "computeType": result_compute_type,
+                    "device": device,
+                    "computeType": compute_type,
                     "cached": False,
                 }
-                try:
-                    self._write_cache(
-                        account_path,
-                        sid,
-                        source_hash,
-                        result,
-                        expected_epoch=cache_epoch,
-                        expected_generation=operation_generation,
-                    )
-                except Exception:
-                    pass
-                return result
-            finally:
-                if temp_path is not None:
+                results[clip.server_id] = result
+                written.append((clip.server_id, clip.source_hash, result))
+
+        if written:
+            try:
+                self._write_cache_many(
+                    account_path,
+                    written,
+                    expected_epoch=cache_epoch,
+                    expected_generation=operation_generation,
+                )
+            except Exception:
+                pass
+        return results
+
+    def _transcribe_batch_clip_individually(
+        self,
+        account_dir: Path,
+        server_id: int,
+        data: bytes,
+        results: dict[int, dict[str, Any]],
+        *,
+        force: bool,
+        cancel_event: Optional[threading.Event],
+        cache_generation: int,
+    ) -> None:
+        try:
+            results[server_id] = self._transcribe_voice_impl(
+                account_dir=account_dir,
+                server_id=server_id,
+                force=force,
+                voice_data=data,
+                cancel_event=cancel_event,
+                cache_generation=cache_generation,
+            )
+        except _VoiceTranscriptionCancelled:
+            raise
+        except VoiceTranscriptionError as exc:
+            results[server_id] = _voice_batch_error(server_id, exc)
+        except Exception as exc:
+            results[server_id] = _voice_batch_error(
+                server_id,
+                VoiceTranscriptionError("transcription_failed", f"语音识别失败：{type(exc).__name__}"),
+            )
+
+    def _transcribe_batched_with_model(
+        self,
+        clips: list[_VoiceBatchClip],
+        *,
+        cancel_event: Optional[threading.Event],
+    ) -> tuple[dict[int, tuple[str, str]], str, str]:
+        model, _generation, device, compute_type = self._acquire_inference_model(cancel_event)
+        try:
+            pipeline = self._batched_pipeline_factory(model)
+            return self._transcribe_batched_once(pipeline, clips, cancel_event=cancel_event), device, compute_type
+        finally:
+            model = None
+            self._release_inference_model()
+
+    def _transcribe_batched_once(
+        self,
+        pipeline: Any,
+        clips: list[_VoiceBatchClip],
+        *,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> dict[int, tuple[str, str]]:
+        """Run one duration bucket as a single concatenated, clip-stamped waveform.
+
+        Clips are separated by silence and addressed through ``clip_timestamps``
+        so faster-whisper batches them without VAD; segments are mapped back to
+        their clip by start time.
+        """
+
+        import numpy as np
+
+        self._raise_if_cancelled(cancel_event)
+        rate = VOICE_PCM_SAMPLE_RATE
+        gap = bytes(int(_VOICE_BATCH_CLIP_GAP_SECONDS * rate) * 2)
+        parts: list[bytes] = []
+        starts: list[float] = []
+        owners: list[int] = []
+        clip_timestamps: list[dict[str, float]] = []
+        cursor = 0
+        for clip in clips:
+            samples = len(clip.pcm) // 2
+            start = cursor / rate
+            end = (cursor + samples) / rate
+            starts.append(start)
+            owners.append(clip.server_id)
+            piece = start
+            while piece < end:
+                clip_timestamps.append({"start": piece, "end": min(end, piece + _VOICE_BATCH_MAX_CHUNK_SECONDS)})
+                piece += _VOICE_BATCH_MAX_CHUNK_SECONDS
+            parts.append(clip.pcm)
+            parts.append(gap)
+            cursor += samples + len(gap) // 2
+        audio = np.frombuffer(b"".join(parts), dtype=np.int16).astype(np.float32) / 32768.0
+
+        segments, info = pipeline.transcribe(
+            audio,
+            language=self.config.language,
+            beam_size=self.config.beam_size,
+            clip_timestamps=clip_timestamps,
+            batch_size=max(1, int(self.config.batch_size or 1)),
+            vad_filter=False,
+            without_timestamps=True,
+            condition_on_previous_text=False,
+        )
+        texts: dict[int, list[str]] = {sid: [] for sid in owners}
+        try:
+            for segment in segments:
+                self._raise_if_cancelled(cancel_event)
+                index = bisect.bisect_right(starts, float(getattr(segment, "start", 0.0) or 0.0) + 1e-3) - 1
+                if index < 0:
+                    continue
+                texts[owners[index]].append(str(getattr(segment, "text", "") or ""))
+        finally:
+            if cancel_event is not None and cancel_event.is_set():
+                close = getattr(segments, "close", None)
+                if callable(close):
                     try:
-                        temp_path.unlink(missing_ok=True)
+                        close()
                     except Exception:
                         pass
+        language = str(getattr(info, "language", "") or self.config.language)
+        return {sid: (_join_transcript_segments(values), language) for sid, values in texts.items()}
 
     @staticmethod
     def _raise_if_cancelled(cancel_event: Optional[threading.Event]) -> None:
@@ -1805,7 +2176,7 @@ class VoiceTranscriptionService:
 
     def _transcribe_with_fallback(
         self,
-        path: Path,
+        audio: bytes,
         *,
         cancel_event: Optional[threading.Event],
     ) -> tuple[str, Any, str, str]:
@@ -1814,7 +2185,7 @@ class VoiceTranscriptionService:
         cuda_fallback_required = False
         try:
             try:
-                text, info = self._transcribe_once(model, path, cancel_event=cancel_event)
+                text, info = self._transcribe_once(model, audio, cancel_event=cancel_event)
             except _VoiceTranscriptionCancelled as exc:
                 try:
                     exc.__traceback__ = None
@@ -1869,7 +2240,7 @@ class VoiceTranscriptionService:
         cpu_model, _generation, cpu_device, cpu_compute_type = self._acquire_inference_model(cancel_event)
         try:
             try:
-                text, info = self._transcribe_once(cpu_model, path, cancel_event=cancel_event)
+                text, info = self._transcribe_once(cpu_model, audio, cancel_event=cancel_event)
             except _VoiceTranscriptionCancelled:
                 raise
             except VoiceTranscriptionError:
@@ -1917,13 +2288,15 @@ class VoiceTranscriptionService:
     def _transcribe_once(
         self,
         model: Any,
-        path: Path,
+        audio: bytes,
         *,
         cancel_event: Optional[threading.Event] = None,
     ) -> tuple[str, Any]:
         self._raise_if_cancelled(cancel_event)
+        # faster-whisper decodes file-like objects itself, so the WAV never
+        # has to touch the temp directory.
         segments, info = model.transcribe(
-            str(path),
+            io.BytesIO(audio),
             language=self.config.language,
             beam_size=self.config.beam_size,
             vad_filter=True,
@@ -2046,6 +2419,17 @@ class VoiceTranscriptionService:
             local_files_only=not config.allow_download,
         )
 
+    @staticmethod
+    def _load_faster_whisper_batched_pipeline(model: Any) -> Any:
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError as exc:
+            raise VoiceTranscriptionError(
+                "dependency_missing",
+                "未安装 faster-whisper，请安装语音转文字可选依赖。",
+            ) from exc
+        return BatchedInferencePipeline(model=model)
+
     def _cache_path(self, account_dir: Path) -> Path:
         return _voice_transcript_cache_path(account_dir)
 
@@ -2123,6 +2507,70 @@ class VoiceTranscriptionService:
             "cached": True,
         }
 
+    def _read_cache_many(
+        self,
+        account_dir: Path,
+        source_hashes: dict[int, str],
+    ) -> dict[int, dict[str, Any]]:
+        """Bulk variant of ``_read_cache`` that only returns exact (server_id, source_hash) hits."""
+
+        path = self._cache_path(account_dir)
+        if not source_hashes or not path.exists():
+            return {}
+        ids = list(source_hashes)
+        rows: list[tuple[Any, ...]] = []
+        with self._cache_lock:
+            conn: Optional[sqlite3.Connection] = None
+            try:
+                conn = sqlite3.connect(str(path))
+                self._ensure_cache_schema(conn)
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start : start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    for row in conn.execute(
+                        "SELECT server_id, source_hash, text, detected_language, duration, text_version FROM transcript "
+                        f"WHERE model = ? AND language = ? AND server_id IN ({placeholders})",
+                        (self.config.model, self.config.language, *chunk),
+                    ):
+                        if source_hashes.get(int(row[0])) != str(row[1]):
+                            continue
+                        normalized_text, needs_update = self._normalize_cached_text(row[2], row[5])
+                        if needs_update:
+                            conn.execute(
+                                "UPDATE transcript SET text = ?, text_version = ?, updated_at = ? "
+                                "WHERE server_id = ? AND source_hash = ? AND model = ? AND language = ?",
+                                (
+                                    normalized_text,
+                                    TRANSCRIPT_TEXT_VERSION,
+                                    time.time(),
+                                    int(row[0]),
+                                    str(row[1]),
+                                    self.config.model,
+                                    self.config.language,
+                                ),
+                            )
+                        rows.append((int(row[0]), normalized_text, row[3], row[4]))
+                conn.commit()
+            except VoiceTranscriptionError:
+                raise
+            except Exception:
+                rows = []
+            finally:
+                if conn is not None:
+                    conn.close()
+        return {
+            sid: {
+                "status": "success",
+                "serverId": sid,
+                "text": str(text or ""),
+                "language": str(language or self.config.language),
+                "duration": float(duration or 0.0),
+                "model": _public_model_name(self.config.model),
+                "cached": True,
+            }
+            for sid, text, language, duration in rows
+        }
+
     def lookup_cached_transcripts(
         self,
         account_dir: Path,
@@ -2257,6 +2705,63 @@ class VoiceTranscriptionService:
                 conn.close()
         return True
 
+    def _write_cache_many(
+        self,
+        account_dir: Path,
+        entries: list[tuple[int, str, dict[str, Any]]],
+        *,
+        expected_epoch: Optional[int] = None,
+        expected_generation: Optional[int] = None,
+    ) -> bool:
+        """Write a whole batch of results in one transaction."""
+
+        if not entries:
+            return True
+        path = self._cache_path(account_dir)
+        now = time.time()
+        rows = []
+        for server_id, source_hash, result in entries:
+            normalized_text = normalize_transcript_text(result.get("text"))
+            result["text"] = normalized_text
+            rows.append(
+                (
+                    int(server_id),
+                    source_hash,
+                    self.config.model,
+                    self.config.language,
+                    normalized_text,
+                    str(result.get("language") or self.config.language),
+                    float(result.get("duration") or 0.0),
+                    now,
+                    TRANSCRIPT_TEXT_VERSION,
+                )
+            )
+        with self._cache_lock:
+            if (
+                expected_generation is not None
+                and int(_VOICE_TRANSCRIPT_CACHE_GENERATION) != expected_generation
+            ):
+                return False
+            if expected_epoch is not None:
+                account_key = _voice_transcript_cache_account_key(account_dir)
+                current_epoch = int(_VOICE_TRANSCRIPT_CACHE_EPOCHS.get(account_key, 0))
+                if current_epoch != expected_epoch:
+                    return False
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path))
+            try:
+                self._ensure_cache_schema(conn)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO transcript "
+                    "(server_id, source_hash, model, language, text, detected_language, duration, updated_at, text_version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        return True
+
 
 def _download_voice_model_snapshot(
     model_id: str,
@@ -3196,6 +3701,78 @@ class VoiceTranscriptionBatchManager:
                 finishedAt=time.time(),
             )
 
+    def _run_batched_inference(
+        self,
+        job_id: str,
+        account_dir: Path,
+        server_ids: list[int],
+        *,
+        native: set[int],
+        force: bool,
+        service: VoiceTranscriptionService,
+        batch_size: int,
+        cancel_event: threading.Event,
+        cache_generation: int,
+    ) -> None:
+        """Feed clips to the batched pipeline in windows of a few duration buckets."""
+
+        total = len(server_ids)
+        window = max(32, batch_size * 4)
+        decode_executor = create_voice_decode_executor(service.config.decode_workers)
+        try:
+            pending: list[int] = []
+            for server_id in server_ids:
+                if server_id in native:
+                    self._record_batch_result(
+                        job_id,
+                        server_id,
+                        {"success": 1, "native": 1, "cached": 0, "failed": 0, "error": ""},
+                        total,
+                    )
+                else:
+                    pending.append(server_id)
+            for start in range(0, len(pending), window):
+                if cancel_event.is_set():
+                    return
+                chunk = pending[start : start + window]
+                self._update(job_id, currentServerId=str(chunk[0]))
+                voices = [(server_id, load_voice_data(account_dir, server_id)) for server_id in chunk]
+                try:
+                    results = service.transcribe_voice_batch(
+                        account_dir=account_dir,
+                        voices=voices,
+                        force=force,
+                        cancel_event=cancel_event,
+                        cache_generation=cache_generation,
+                        decode_executor=decode_executor,
+                    )
+                except _VoiceTranscriptionCancelled:
+                    return
+                except VoiceTranscriptionError as exc:
+                    results = {server_id: _voice_batch_error(server_id, exc) for server_id in chunk}
+                for server_id in chunk:
+                    result = results.get(server_id) or {"status": "error", "error": "语音识别失败。"}
+                    if result.get("status") == "success":
+                        outcome = {
+                            "success": 1,
+                            "native": 0,
+                            "cached": 1 if result.get("cached") else 0,
+                            "failed": 0,
+                            "error": "",
+                        }
+                    else:
+                        outcome = {
+                            "success": 0,
+                            "native": 0,
+                            "cached": 0,
+                            "failed": 1,
+                            "error": str(result.get("error") or ""),
+                        }
+                    self._record_batch_result(job_id, server_id, outcome, total)
+        finally:
+            if decode_executor is not None:
+                decode_executor.shutdown(wait=False, cancel_futures=True)
+
     def _run(
         self,
         job_id: str,
@@ -3248,6 +3825,25 @@ class VoiceTranscriptionBatchManager:
             if total == 0:
                 self._update(job_id, status="done", currentServerId="", finishedAt=time.time())
                 return
+            batch_size = max(1, int(getattr(service.config, "batch_size", 1) or 1))
+            if batch_size > 1:
+                self._update(job_id, concurrency=1)
+                self._run_batched_inference(
+                    job_id,
+                    account_dir,
+                    server_ids,
+                    native=native,
+                    force=force,
+                    service=service,
+                    batch_size=batch_size,
+                    cancel_event=cancel_event,
+                    cache_generation=cache_generation,
+                )
+                if cancel_event.is_set():
+                    self._update(job_id, status="cancelled", currentServerId="", finishedAt=time.time())
+                else:
+                    self._update(job_id, status="done", percent=100, currentServerId="", finishedAt=time.time())
+                return
             configure = getattr(service, "configure_inference_concurrency", None)
             if callable(configure):
                 configured = configure(concurrency, cancel_event=cancel_event)
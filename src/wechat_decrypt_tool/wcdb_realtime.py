@@ -5,9 +5,11 @@ import os
 import sys
 import threading
 import time
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Mapping, Optional, TypeVar
+from typing import Any, Callable, Iterator, Mapping, Optional, TypeVar
 
 from . import native_core_realtime
 from .key_store import get_account_keys_from_store
@@ -316,6 +318,155 @@ def _resolve_session_db_path(db_storage_dir: Path) -> Path:
     raise WCDBRealtimeError(f"Cannot find session db in: {root}")
 
 
+def _read_handle_pool_size() -> int:
+    raw = str(os.environ.get("WECHAT_TOOL_WCDB_READ_HANDLES", "") or "").strip()
+    try:
+        size = int(raw)
+    except Exception:
+        size = 2
+    return max(0, min(8, size))
+
+
+class WCDBReadHandlePool:
+    """Bounded set of extra native handles that serve interactive reads for one account.
+
+    The connection's own handle (guarded by ``connection.lock``) stays the
+    writer/sync lane. Read handles are opened lazily, health-checked on checkout
+    and handed out in FIFO order, so a burst of readers cannot starve an earlier
+    one. When no read handle can be opened the caller falls back to the sync lane.
+    """
+
+    _OPEN_RETRY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        opener: Callable[[], int],
+        *,
+        max_handles: int,
+        closer: Optional[Callable[[int], None]] = None,
+        is_alive: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        self._opener = opener
+        self._closer = closer or (lambda handle: close_account(handle))
+        self._is_alive = is_alive or (lambda handle: _is_native_core_handle(handle))
+        self._max = max(0, int(max_handles))
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: list[int] = []
+        self._opened = 0
+        self._queue: deque[object] = deque()
+        self._open_retry_at = 0.0
+        self._closed = False
+
+    @property
+    def max_handles(self) -> int:
+        return self._max
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "max": self._max,
+                "opened": self._opened,
+                "idle": len(self._idle),
+                "waiting": len(self._queue),
+            }
+
+    def _close_quietly(self, handle: int) -> None:
+        try:
+            self._closer(int(handle))
+        except Exception:
+            pass
+
+    def _checkout(self, timeout: float) -> tuple[Optional[int], bool]:
+        """Return ``(handle, needs_open)``; ``(None, False)`` means use the sync lane."""
+
+        ticket = object()
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        dead: list[int] = []
+        try:
+            with self._cond:
+                if self._closed or self._max <= 0:
+                    return None, False
+                self._queue.append(ticket)
+                try:
+                    while True:
+                        if self._closed:
+                            return None, False
+                        if self._queue[0] is ticket:
+                            while self._idle:
+                                handle = self._idle.pop()
+                                if self._is_alive(handle):
+                                    return handle, False
+                                dead.append(handle)
+                                self._opened -= 1
+                            if self._opened < self._max and time.monotonic() >= self._open_retry_at:
+                                self._opened += 1
+                                return None, True
+                            if self._opened <= 0:
+                                # Nothing open and opening is backing off: don't wait.
+                                return None, False
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return None, False
+                        self._cond.wait(remaining)
+                finally:
+                    try:
+                        self._queue.remove(ticket)
+                    except ValueError:
+                        pass
+                    self._cond.notify_all()
+        finally:
+            for handle in dead:
+                self._close_quietly(handle)
+
+    def _checkin(self, handle: int) -> None:
+        close_now = False
+        with self._cond:
+            if self._closed or not self._is_alive(handle):
+                self._opened -= 1
+                close_now = True
+            else:
+                self._idle.append(int(handle))
+            self._cond.notify_all()
+        if close_now:
+            self._close_quietly(handle)
+
+    @contextmanager
+    def lease(self, *, timeout: float = 2.0) -> Iterator[Optional[int]]:
+        """Yield an exclusive read handle, or None when the sync lane should be used."""
+
+        handle, needs_open = self._checkout(timeout)
+        if needs_open:
+            try:
+                handle = int(self._opener())
+            except Exception as exc:
+                with self._cond:
+                    self._opened -= 1
+                    self._open_retry_at = time.monotonic() + self._OPEN_RETRY_SECONDS
+                    self._cond.notify_all()
+                logger.warning(
+                    "[native-core] read handle open failed; using the sync lane error=%s",
+                    str(exc).strip() or exc.__class__.__name__,
+                )
+                handle = None
+        if handle is None:
+            yield None
+            return
+        try:
+            yield handle
+        finally:
+            self._checkin(handle)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+            self._cond.notify_all()
+        for handle in idle:
+            self._close_quietly(handle)
+
+
 @dataclass(frozen=True)
 class WCDBRealtimeConnection:
     account: str
@@ -325,6 +476,36 @@ class WCDBRealtimeConnection:
     session_db_path: Path
     connected_at: float
     lock: threading.Lock
+    readers: Optional[WCDBReadHandlePool] = None
+
+
+@contextmanager
+def read_handle(connection: Any, *, timeout: float = 2.0) -> Iterator[int]:
+    """Yield a handle for an interactive read on ``connection``.
+
+    Uses a pooled read handle when one is available, so the read does not queue
+    behind a bulk sync holding ``connection.lock``; otherwise runs on the
+    connection's own handle under its lock.
+    """
+
+    readers = getattr(connection, "readers", None)
+    if isinstance(readers, WCDBReadHandlePool):
+        with readers.lease(timeout=timeout) as handle:
+            if handle is not None:
+                yield handle
+                return
+    with connection.lock:
+        yield connection.handle
+
+
+def _close_connection_readers(connection: Any) -> None:
+    readers = getattr(connection, "readers", None)
+    if readers is None:
+        return
+    try:
+        readers.close()
+    except Exception:
+        pass
 
 
 def resolve_account_native_wxid(
@@ -521,6 +702,7 @@ class WCDBRealtimeManager:
             self._connecting_roots.clear()
             self._failed.clear()
         for connection in connections:
+            _close_connection_readers(connection)
             try:
                 close_account(connection.handle)
             except Exception:
@@ -606,6 +788,7 @@ class WCDBRealtimeManager:
                     connect_now = True
 
             if stale_connection is not None:
+                _close_connection_readers(stale_connection)
                 try:
                     with stale_connection.lock:
                         close_account(stale_connection.handle)
@@ -642,6 +825,24 @@ class WCDBRealtimeManager:
                 session_db_path=session_db_path,
                 key_hex=key,
             )
+            readers: WCDBReadHandlePool | None = None
+            pool_size = _read_handle_pool_size()
+            if pool_size > 0:
+                open_kwargs = {
+                    "account": account,
+                    "native_wxid": native_wxid,
+                    "db_storage_dir": db_storage_dir,
+                    "session_db_path": session_db_path,
+                    "key_hex": key,
+                }
+                readers = WCDBReadHandlePool(
+                    lambda: _native_call(
+                        "open read handle",
+                        native_core_realtime.open_account,
+                        **open_kwargs,
+                    ),
+                    max_handles=pool_size,
+                )
             connection = WCDBRealtimeConnection(
                 account=account,
                 native_wxid=native_wxid,
@@ -650,6 +851,7 @@ class WCDBRealtimeManager:
                 session_db_path=session_db_path,
                 connected_at=time.time(),
                 lock=threading.Lock(),
+                readers=readers,
             )
             with self._mu:
                 self._conns[account] = connection
@@ -697,6 +899,7 @@ class WCDBRealtimeManager:
                         self._conns.pop(alias, None)
         if connection is None:
             return
+        _close_connection_readers(connection)
         try:
             with connection.lock:
                 close_account(connection.handle)
@@ -724,6 +927,7 @@ class WCDBRealtimeManager:
 
         ok = True
         for connection in connections:
+            _close_connection_readers(connection)
             acquired = False
             try:
                 if lock_timeout_s is None:
@@ -820,6 +1024,7 @@ __all__ = [
     "WCDBRealtimeConnection",
     "WCDBRealtimeError",
     "WCDBRealtimeManager",
+    "WCDBReadHandlePool",
     "close_account",
     "close_message_cursor",
     "decrypt_sns_image",
@@ -837,6 +1042,7 @@ __all__ = [
     "get_sns_timeline",
     "open_account",
     "open_message_cursor",
+    "read_handle",
     "resolve_account_native_wxid",
     "shutdown",
 ]
@@ -23,6 +23,8 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from .app_paths import get_output_databases_dir
 from .database_filters import should_skip_source_database
+from .key_derivation import compute_page_hmac, derive_enc_key, derive_mac_key, resolve_page1_key_material
+from .metrics import record_throughput
 from .sqlite_diagnostics import collect_sqlite_diagnostics, sqlite_diagnostics_status
 
 # 注意：不再支持默认密钥，所有密钥必须通过参数传入
@@ -39,24 +41,9 @@ HMAC_SIZE = 64
 RESERVE_SIZE = IV_SIZE + HMAC_SIZE
 
 
-def _derive_mac_key(enc_key: bytes, salt: bytes) -> bytes:
-    """Derive SQLCipher/WCDB page HMAC key."""
-    mac_salt = bytes(b ^ 0x3A for b in salt)
-    return hashlib.pbkdf2_hmac("sha512", enc_key, mac_salt, 2, dklen=KEY_SIZE)
-
-
-def _derive_sqlcipher_enc_key(key_material: bytes, salt: bytes) -> bytes:
-    """Derive AES enc_key from SQLCipher passphrase/base key."""
-    return hashlib.pbkdf2_hmac("sha512", key_material, salt, 256000, dklen=KEY_SIZE)
-
-
-def _compute_page_hmac(mac_key: bytes, page: bytes, page_num: int) -> bytes:
-    offset = SALT_SIZE if page_num == 1 else 0
-    data_end = PAGE_SIZE - RESERVE_SIZE + IV_SIZE
-    mac = hmac.new(mac_key, digestmod=hashlib.sha512)
-    mac.update(page[offset:data_end])
-    mac.update(page_num.to_bytes(4, "little"))
-    return mac.digest()
+_derive_mac_key = derive_mac_key
+_derive_sqlcipher_enc_key = derive_enc_key
+_compute_page_hmac = compute_page_hmac
 
 
 def _compute_page_hmac_variant(
@@ -254,25 +241,20 @@ def _build_page_anomaly_debug(
     return out
 
 
-def _resolve_page1_key_material(key_material: bytes, page1: bytes) -> tuple[bytes, bytes, str] | None:
+def _resolve_page1_key_material(
+    key_material: bytes,
+    page1: bytes,
+    *,
+    database_root: str | Path | None = None,
+    database_path: str | Path | None = None,
+) -> tuple[bytes, bytes, str] | None:
     """Detect whether input key is raw enc_key or SQLCipher passphrase by page-1 HMAC."""
-    if len(page1) < PAGE_SIZE:
-        return None
-
-    salt = page1[:SALT_SIZE]
-    stored_page1_hmac = page1[PAGE_SIZE - HMAC_SIZE: PAGE_SIZE]
-    candidates = [
-        ("raw_enc_key", key_material, _derive_mac_key(key_material, salt)),
-    ]
-
-    derived_key = _derive_sqlcipher_enc_key(key_material, salt)
-    candidates.append(("sqlcipher_passphrase", derived_key, _derive_mac_key(derived_key, salt)))
-
-    for mode, enc_key, mac_key in candidates:
-        if hmac.compare_digest(stored_page1_hmac, _compute_page_hmac(mac_key, page1, 1)):
-            return enc_key, mac_key, mode
-
-    return None
+    return resolve_page1_key_material(
+        key_material,
+        page1,
+        database_root=database_root,
+        database_path=database_path,
+    )
 
 
 def validate_realtime_database_key(
@@ -367,7 +349,12 @@ def validate_realtime_database_key(
             if page1.startswith(SQLITE_HEADER):
                 mode = ""
             else:
-                resolved = _resolve_page1_key_material(key_material, page1)
+                resolved = _resolve_page1_key_material(
+                    key_material,
+                    page1,
+                    database_root=root,
+                    database_path=database_path,
+                )
                 mode = str(resolved[2]) if resolved is not None else ""
             path_results[database_path] = mode
         if mode:
@@ -687,7 +674,7 @@ class WeChatDatabaseDecryptor:
             raise ValueError("密钥必须是有效的十六进制字符串")
         self.last_result: dict = {}
     
-    def decrypt_database(self, db_path: str, output_path: str) -> bool:
+    def decrypt_database(self, db_path: str, output_path: str, *, key_cache_root: str | None = None) -> bool:
         """解密微信4.x版本数据库
 
         使用SQLCipher 4.0参数:
@@ -695,6 +682,9 @@ class WeChatDatabaseDecryptor:
         - AES-256-CBC加密
         - HMAC-SHA512验证
         - 页面大小4096字节
+
+        key_cache_root 为该库所在的 db_storage 目录时，派生出的 enc_key 会写入
+        加密的 raw-key 缓存，下次解密同一个库可跳过 PBKDF2。
         """
         from .logging_config import get_logger
         logger = get_logger(__name__)
@@ -729,6 +719,7 @@ class WeChatDatabaseDecryptor:
             "error": "",
         }
         self.last_result = result
+        decrypt_started = time.perf_counter()
 
         def _append_failed_page(page_num: int, reason: str, error: str = "") -> None:
             result["failure_reasons"][reason] = int(result["failure_reasons"].get(reason) or 0) + 1
@@ -749,6 +740,8 @@ class WeChatDatabaseDecryptor:
             result["hmac_warning_samples"].append({"page": int(page_num), "reason": "hmac"})
 
         def _finalize(success: bool, error: str = "") -> bool:
+            # 计时不含下面的输出诊断，吞吐只反映解密本身。
+            decrypt_seconds = time.perf_counter() - decrypt_started
             normalized_success = bool(success)
             result["success"] = normalized_success
             if error:
@@ -779,6 +772,13 @@ class WeChatDatabaseDecryptor:
                         except Exception as exc:
                             logger.warning("删除无效解密输出失败: %s, 错误: %s", output_file, exc)
 
+            record_throughput(
+                "decrypt",
+                bytes_count=int(result.get("input_size") or 0),
+                seconds=decrypt_seconds,
+                success=normalized_success,
+            )
+
             payload = {
                 "db_name": result["db_name"],
                 "db_path": result["db_path"],
@@ -912,7 +912,12 @@ class WeChatDatabaseDecryptor:
                 return _finalize(True)
             
             page1 = encrypted_data[:PAGE_SIZE]
-            resolved_key_material = _resolve_page1_key_material(self.key_bytes, page1)
+            resolved_key_material = _resolve_page1_key_material(
+                self.key_bytes,
+                page1,
+                database_root=key_cache_root or None,
+                database_path=db_path if key_cache_root else None,
+            )
             if resolved_key_material is None:
                 _append_failed_page(1, "hmac")
                 result["total_pages"] = int(len(encrypted_data) // PAGE_SIZE)
@@ -1245,7 +1250,11 @@ def decrypt_wechat_databases(db_storage_path: str = None, key: str = None) -> di
 
             # 解密数据库
             logger.info(f"解密 {account_name}/{db_name}")
-            ok = decryptor.decrypt_database(db_path, str(output_path))
+            ok = decryptor.decrypt_database(
+                db_path,
+                str(output_path),
+                key_cache_root=source_db_storage_path or None,
+            )
             db_diagnostic = dict(getattr(decryptor, "last_result", {}) or {})
             if not db_diagnostic:
                 db_diagnostic = {
@@ -24,6 +24,7 @@ from ...chat_helpers import (
     _to_char_token_text,
 )
 from ...logging_config import get_logger
+from ..year_cube import YearCube
 
 logger = get_logger(__name__)
 
@@ -214,7 +215,13 @@ def _accumulate_db_daily_counts(
             pass
 
 
-def compute_annual_daily_counts(*, account_dir: Path, year: int, sender_username: str | None = None) -> list[int]:
+def compute_annual_daily_counts(
+    *,
+    account_dir: Path,
+    year: int,
+    sender_username: str | None = None,
+    cube: YearCube | None = None,
+) -> list[int]:
     """Compute per-day message counts for the given year.
 
     The output is a 0-indexed day-of-year list (length 365/366). Counts default to
@@ -227,6 +234,10 @@ def compute_annual_daily_counts(*, account_dir: Path, year: int, sender_username
 
     sender = str(sender_username or "").strip()
 
+    if cube is not None and (not sender or sender == str(account_dir.name or "").strip()):
+        # Same filters as the search-index path: sender-only counts keep every session.
+        return cube.daily_counts(days=days, sent_only=bool(sender), keep_session_only=not sender)
+
     # Prefer using our unified search index if available; it's much faster than scanning all msg tables.
     index_path = get_chat_search_index_db_path(account_dir)
     try:
@@ -1135,11 +1146,14 @@ def build_card_00_global_overview(
     account_dir: Path,
     year: int,
     heatmap: WeekdayHourHeatmap | None = None,
+    cube: YearCube | None = None,
 ) -> dict[str, Any]:
     """Card #0: 年度全局概览（开场综合页，建议作为第2页）。"""
 
     sender = str(account_dir.name or "").strip()
-    heatmap = heatmap or compute_weekday_hour_heatmap(account_dir=account_dir, year=year, sender_username=sender)
+    heatmap = heatmap or compute_weekday_hour_heatmap(
+        account_dir=account_dir, year=year, sender_username=sender, cube=cube
+    )
     stats = compute_global_overview_stats(account_dir=account_dir, year=year, sender_username=sender)
 
     # Resolve display names for top sessions (best-effort).
@@ -1232,6 +1246,7 @@ def build_card_00_global_overview(
         account_dir=account_dir,
         year=year,
         sender_username=None,
+        cube=cube,
     )
     activity_total_messages = sum(int(count or 0) for count in daily_counts)
     activity_active_days = sum(1 for count in daily_counts if int(count or 0) > 0)
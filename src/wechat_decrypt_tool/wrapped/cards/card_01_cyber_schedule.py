@@ -22,6 +22,7 @@ from ...chat_helpers import (
     _should_keep_session,
 )
 from ...logging_config import get_logger
+from ..year_cube import YearCube
 
 logger = get_logger(__name__)
 
@@ -847,7 +848,23 @@ def _accumulate_db(
             pass
 
 
-def compute_weekday_hour_heatmap(*, account_dir: Path, year: int, sender_username: str | None = None) -> WeekdayHourHeatmap:
+def compute_weekday_hour_heatmap(
+    *,
+    account_dir: Path,
+    year: int,
+    sender_username: str | None = None,
+    cube: YearCube | None = None,
+) -> WeekdayHourHeatmap:
+    # The year cube only records whether the account owner sent a message; other senders need a scan.
+    if cube is not None and (not sender_username or str(sender_username).strip() == str(account_dir.name or "").strip()):
+        matrix = cube.weekday_hour_matrix(sent_only=bool(sender_username))
+        return WeekdayHourHeatmap(
+            weekday_labels=list(_WEEKDAY_LABELS_ZH),
+            hour_labels=list(_HOUR_LABELS),
+            matrix=matrix,
+            total_messages=sum(sum(row) for row in matrix),
+        )
+
     start_ts, end_ts = _year_range_epoch_seconds(year)
 
     matrix: list[list[int]] = [[0 for _ in range(24)] for _ in range(7)]
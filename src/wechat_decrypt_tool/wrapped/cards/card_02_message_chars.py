@@ -27,6 +27,7 @@ from ...chat_helpers import (
 )
 from ...chat_search_index import get_chat_search_index_db_path
 from ...logging_config import get_logger
+from ..year_cube import YearCube
 
 logger = get_logger(__name__)
 
@@ -754,9 +755,14 @@ def sample_typed_phrases(
     return _build_typed_phrase_payload(pool=pool, year=year, k=k)
 
 
-def compute_text_message_char_counts(*, account_dir: Path, year: int) -> tuple[int, int]:
+def compute_text_message_char_counts(
+    *, account_dir: Path, year: int, cube: YearCube | None = None
+) -> tuple[int, int]:
     """Return (sent_chars, received_chars) for render_type='text' messages in the year."""
 
+    if cube is not None:
+        return cube.text_chars()
+
     start_ts, end_ts = _year_range_epoch_seconds(year)
     my_username = str(account_dir.name or "").strip()
 
@@ -1268,8 +1274,8 @@ def compute_voice_call_stats(*, account_dir: Path, year: int) -> dict[str, Any]:
     return {"voice": voice, "calls": calls}
 
 
-def build_card_02_message_chars(*, account_dir: Path, year: int) -> dict[str, Any]:
-    sent_chars, recv_chars = compute_text_message_char_counts(account_dir=account_dir, year=year)
+def build_card_02_message_chars(*, account_dir: Path, year: int, cube: YearCube | None = None) -> dict[str, Any]:
+    sent_chars, recv_chars = compute_text_message_char_counts(account_dir=account_dir, year=year, cube=cube)
 
     sent_book = _pick_book_analogy(sent_chars)
     recv_a4 = _pick_a4_analogy(recv_chars)
@@ -12,16 +12,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-import jieba
-
 from ...chat_helpers import _decode_message_content, _decode_sqlite_text, _iter_message_db_paths, _quote_ident
 from ...logging_config import get_logger
 
 logger = get_logger(__name__)
-try:
-    jieba.setLogLevel(logging.ERROR)
-except Exception:
-    pass
+
+
+def _jieba():
+    # Card#6 counts common phrases and never segments; only load jieba (and its dictionary)
+    # when the keyword helpers below are actually used.
+    import jieba
+
+    try:
+        jieba.setLogLevel(logging.ERROR)
+    except Exception:
+        pass
+    return jieba
 
 
 _MD5_HEX_RE = re.compile(r"(?i)\b[0-9a-f]{32}\b")
@@ -283,6 +289,7 @@ def _normalize_token(tok: str) -> str:
 
 
 def extract_keywords_jieba(texts: list[str], *, top_n: int = 40) -> list[dict[str, Any]]:
+    jieba = _jieba()
     counter: Counter[str] = Counter()
     for raw in texts:
         s = _clean_text(raw)
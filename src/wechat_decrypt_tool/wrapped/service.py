@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import sqlite3
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from ..chat_helpers import _decode_sqlite_text, _iter_message_db_paths, _quote_ident, _resolve_account_dir
 from ..chat_search_index import get_chat_search_index_db_path, get_chat_search_index_status
@@ -20,6 +23,7 @@ from .cards.card_03_reply_speed import build_card_03_reply_speed
 from .cards.card_04_monthly_best_friends_wall import build_card_04_monthly_best_friends_wall
 from .cards.card_04_emoji_universe import build_card_04_emoji_universe
 from .cards.card_07_bento_summary import build_card_07_bento_summary_from_sources
+from .year_cube import YearCube, build_year_cube, load_year_cube, save_year_cube
 
 logger = get_logger(__name__)
 
@@ -93,6 +97,27 @@ _WRAPPED_CARD_MANIFEST: tuple[dict[str, Any], ...] = (
 )
 _WRAPPED_CARD_ID_SET = {int(c["id"]) for c in _WRAPPED_CARD_MANIFEST}
 
+# Cards assembled from other cards' payloads; everything else can be computed concurrently.
+_WRAPPED_CARD_DEPENDENCIES: dict[int, tuple[int, ...]] = {
+    7: (0, 1, 2, 3, 4, 5, 6),
+}
+
+# Which year-cube cells each card reads (by local_type), used to fingerprint its inputs so a new
+# message only invalidates the cards it can affect. Cards not listed depend on every cell.
+_WRAPPED_CARD_INPUTS: dict[int, dict[str, tuple[int, ...]]] = {
+    # Text chars / keyboard, voice messages, VoIP calls.
+    2: {"local_types": (1, 34, 50)},
+    3: {"exclude_local_types": (10000,)},
+    4: {"exclude_local_types": (10000,)},
+    # Unicode / WeChat emoji inside text, plus stickers.
+    5: {"local_types": (1, 47)},
+    6: {"local_types": (1,)},
+}
+
+# Cards whose payload is computed from the year cube (card#1 through the sent-message heatmap).
+# Other cards only use an already-built cube for their fingerprint and never trigger a build.
+_WRAPPED_CUBE_CARDS = frozenset({0, 1, 2})
+
 
 # Prevent duplicated heavy computations when multiple card endpoints are hit concurrently.
 _LOCKS: dict[str, threading.Lock] = {}
@@ -108,6 +133,31 @@ def _get_lock(key: str) -> threading.Lock:
         return lock
 
 
+# Results built under a `_get_lock` key, stamped with `time.monotonic_ns()`. A caller that waited on
+# the lock (e.g. the SSE deck and a per-card request both refreshing) reuses a result finished after
+# it started instead of computing it a second time. Waiters pick the result up as soon as the lock is
+# released, so entries only need to outlive that hand-off; older ones are pruned on every write.
+_FRESH_RESULT_TTL_NS = 60 * 1_000_000_000
+_FRESH_RESULTS: dict[str, tuple[int, Any]] = {}
+_FRESH_RESULTS_GUARD = threading.Lock()
+
+
+def _fresh_result(key: str, started_ns: int) -> Any:
+    with _FRESH_RESULTS_GUARD:
+        hit = _FRESH_RESULTS.get(key)
+    if hit is not None and hit[0] >= started_ns:
+        return hit[1]
+    return None
+
+
+def _remember_result(key: str, value: Any) -> None:
+    now_ns = time.monotonic_ns()
+    with _FRESH_RESULTS_GUARD:
+        for stale in [k for k, (ts, _) in _FRESH_RESULTS.items() if now_ns - ts > _FRESH_RESULT_TTL_NS]:
+            del _FRESH_RESULTS[stale]
+        _FRESH_RESULTS[key] = (now_ns, value)
+
+
 def _prepare_wrapped_derived_data(account_dir: Path) -> None:
     """Drop annual-report artifacts that predate their decrypted/index inputs."""
 
@@ -125,6 +175,11 @@ def _prepare_wrapped_derived_data(account_dir: Path) -> None:
         cache_dir = wrapped_cache_dir(account_dir)
         removed = 0
         for cache_path in cache_dir.glob("*.json"):
+            # Current card caches carry an input fingerprint and are revalidated per card instead.
+            if cache_path.name.endswith(f"{_wrapped_cache_suffix()}.json") and (
+                _wrapped_card_fingerprint_path(cache_path).exists()
+            ):
+                continue
             try:
                 cache_is_old = cache_path.stat().st_mtime_ns < dependency_mtime_ns
                 if cache_is_old:
@@ -389,44 +444,14 @@ def build_wrapped_annual_response(
         except Exception:
             pass
 
-    cards: list[dict[str, Any]] = []
-    # Wrapped cards default to "messages sent by me" (outgoing), to avoid mixing directions
-    # in first-person narratives like "你最常...".
-    heatmap_sent = _get_or_compute_heatmap_sent(account_dir=account_dir, scope=scope, year=y, refresh=refresh)
-    # Page 2: global overview (page 1 is the frontend cover slide).
-    card_overview = build_card_00_global_overview(account_dir=account_dir, year=y, heatmap=heatmap_sent)
-    cards.append(card_overview)
-    # Page 3: cyber schedule heatmap.
-    card_heatmap = build_card_01_cyber_schedule(account_dir=account_dir, year=y, heatmap=heatmap_sent)
-    cards.append(card_heatmap)
-    # Page 4: message char counts (sent vs received).
-    card_message_chars = build_card_02_message_chars(account_dir=account_dir, year=y)
-    cards.append(card_message_chars)
-    # Page 5: annual keywords (bubble storm -> word cloud).
-    card_keywords = build_card_05_keywords_wordcloud(account_dir=account_dir, year=y)
-    cards.append(card_keywords)
-    # Page 6: reply speed / best chat buddy.
-    card_reply_speed = build_card_03_reply_speed(account_dir=account_dir, year=y)
-    cards.append(card_reply_speed)
-    # Page 7: monthly best friends wall (photo wall).
-    card_monthly = build_card_04_monthly_best_friends_wall(account_dir=account_dir, year=y)
-    cards.append(card_monthly)
-    # Page 8: annual emoji universe / meme almanac.
-    card_emoji = build_card_04_emoji_universe(account_dir=account_dir, year=y)
-    cards.append(card_emoji)
-    # Page 9: bento summary (prototype). Build from prior cards for consistency.
-    cards.append(
-        build_card_07_bento_summary_from_sources(
-            year=y,
-            overview=card_overview,
-            heatmap=card_heatmap,
-            message_chars=card_message_chars,
-            reply_speed=card_reply_speed,
-            monthly=card_monthly,
-            emoji=card_emoji,
-            keywords=card_keywords,
+    # Independent cards are computed concurrently; keep the deck in manifest (display) order.
+    cards_by_id = {
+        int(card["id"]): card
+        for card in _schedule_wrapped_cards(
+            account_dir=account_dir, scope=scope, year=y, refresh=refresh, raise_errors=True
         )
-    )
+    }
+    cards: list[dict[str, Any]] = [cards_by_id[int(c["id"])] for c in _WRAPPED_CARD_MANIFEST]
 
     obj: dict[str, Any] = {
         "account": account_dir.name,
@@ -491,10 +516,78 @@ def _wrapped_card_cache_path(*, account_dir: Path, scope: str, year: int, card_i
     return wrapped_cache_dir(account_dir) / f"{scope}_{year}_card_{card_id}{_wrapped_cache_suffix()}.json"
 
 
+def _wrapped_card_fingerprint_path(cache_path: Path) -> Path:
+    return cache_path.with_suffix(".fingerprint")
+
+
 def _wrapped_heatmap_sent_cache_path(*, account_dir: Path, scope: str, year: int) -> Path:
     return wrapped_cache_dir(account_dir) / f"{scope}_{year}_heatmap_sent{_wrapped_cache_suffix()}.json"
 
 
+def _wrapped_year_cube_cache_path(*, account_dir: Path, scope: str, year: int) -> Path:
+    # Lives next to the card caches so `_prepare_wrapped_derived_data` invalidates it with them.
+    return wrapped_cache_dir(account_dir) / f"{scope}_{year}_year_cube{_wrapped_cache_suffix()}.json"
+
+
+# Parsed cubes keyed by cache path -> (file mtime_ns, cube); every card request needs one for
+# its fingerprint, so avoid re-reading the JSON each time.
+_YEAR_CUBES: dict[str, tuple[int, YearCube]] = {}
+
+
+def _get_or_build_year_cube(*, account_dir: Path, scope: str, year: int, refresh: bool) -> YearCube:
+    path = _wrapped_year_cube_cache_path(account_dir=account_dir, scope=scope, year=year)
+    key = str(path)
+    started_ns = time.monotonic_ns()
+    lock = _get_lock(key)
+    with lock:
+        fresh = _fresh_result(key, started_ns)
+        if fresh is not None:
+            return fresh
+        if not refresh:
+            try:
+                mtime_ns = int(path.stat().st_mtime_ns)
+            except OSError:
+                mtime_ns = 0
+            memo = _YEAR_CUBES.get(key)
+            if mtime_ns and memo is not None and memo[0] == mtime_ns:
+                return memo[1]
+            cached = load_year_cube(path, year=year) if mtime_ns else None
+            if cached is not None:
+                _YEAR_CUBES[key] = (mtime_ns, cached)
+                return cached
+
+        cube = build_year_cube(account_dir=account_dir, year=year)
+        save_year_cube(path, cube)
+        try:
+            _YEAR_CUBES[key] = (int(path.stat().st_mtime_ns), cube)
+        except OSError:
+            _YEAR_CUBES.pop(key, None)
+        _remember_result(key, cube)
+        return cube
+
+
+def _peek_year_cube(*, account_dir: Path, scope: str, year: int) -> YearCube | None:
+    """Return the persisted cube for `year` if one exists, without scanning messages.
+
+    Deliberately lock-free: a card that doesn't read the cube shouldn't wait on another caller's
+    build; a half-written file just fails to parse and the caller falls back to file signatures.
+    """
+
+    path = _wrapped_year_cube_cache_path(account_dir=account_dir, scope=scope, year=year)
+    key = str(path)
+    try:
+        mtime_ns = int(path.stat().st_mtime_ns)
+    except OSError:
+        return None
+    memo = _YEAR_CUBES.get(key)
+    if memo is not None and memo[0] == mtime_ns:
+        return memo[1]
+    cached = load_year_cube(path, year=year)
+    if cached is not None:
+        _YEAR_CUBES[key] = (mtime_ns, cached)
+    return cached
+
+
 def _load_cached_heatmap_sent(path: Path) -> WeekdayHourHeatmap | None:
     if not path.exists():
         return None
@@ -540,16 +633,31 @@ def _load_cached_heatmap_sent(path: Path) -> WeekdayHourHeatmap | None:
     )
 
 
-def _get_or_compute_heatmap_sent(*, account_dir: Path, scope: str, year: int, refresh: bool) -> WeekdayHourHeatmap:
+def _get_or_compute_heatmap_sent(
+    *,
+    account_dir: Path,
+    scope: str,
+    year: int,
+    refresh: bool,
+    cube: YearCube | None = None,
+) -> WeekdayHourHeatmap:
     path = _wrapped_heatmap_sent_cache_path(account_dir=account_dir, scope=scope, year=year)
+    started_ns = time.monotonic_ns()
     lock = _get_lock(str(path))
     with lock:
+        fresh = _fresh_result(str(path), started_ns)
+        if fresh is not None:
+            return fresh
         if not refresh:
             cached = _load_cached_heatmap_sent(path)
             if cached is not None:
                 return cached
 
-        heatmap = compute_weekday_hour_heatmap(account_dir=account_dir, year=year, sender_username=account_dir.name)
+        if cube is None:
+            cube = _get_or_build_year_cube(account_dir=account_dir, scope=scope, year=year, refresh=refresh)
+        heatmap = compute_weekday_hour_heatmap(
+            account_dir=account_dir, year=year, sender_username=account_dir.name, cube=cube
+        )
         try:
             path.write_text(
                 json.dumps(
@@ -566,6 +674,7 @@ def _get_or_compute_heatmap_sent(*, account_dir: Path, scope: str, year: int, re
             )
         except Exception:
             logger.exception("Failed to write wrapped heatmap cache: %s", path)
+        _remember_result(str(path), heatmap)
         return heatmap
 
 
@@ -624,14 +733,202 @@ def build_wrapped_annual_card(
     if available_years and y not in available_years:
         y = int(available_years[0])
 
-    scope = "global"
+    return _get_or_build_card(account_dir=account_dir, scope="global", year=y, card_id=cid, refresh=refresh)
+
+
+def stream_wrapped_annual_cards(
+    *,
+    account: Optional[str],
+    year: Optional[int],
+    refresh: bool = False,
+) -> tuple[dict[str, Any], Iterator[dict[str, Any]]]:
+    """Return the deck meta plus an iterator yielding cards in completion order.
+
+    Used by the SSE endpoint so the frontend can render each page as soon as it is
+    ready instead of waiting for the slowest card.
+    """
+
+    meta = build_wrapped_annual_meta(account=account, year=year, refresh=refresh)
+    account_dir = _resolve_account_dir(account)
+    cards = _schedule_wrapped_cards(
+        account_dir=account_dir,
+        scope="global",
+        year=int(meta["year"]),
+        refresh=refresh,
+        raise_errors=False,
+    )
+    return meta, cards
+
+
+def _wrapped_card_workers() -> int:
+    raw = str(os.environ.get("WECHAT_TOOL_WRAPPED_CARD_WORKERS", "") or "").strip()
+    try:
+        workers = int(raw)
+    except Exception:
+        workers = min(4, os.cpu_count() or 1)
+    return max(1, min(8, workers))
+
+
+def _wrapped_error_card(card_id: int, message: str) -> dict[str, Any]:
+    manifest = next((dict(c) for c in _WRAPPED_CARD_MANIFEST if int(c["id"]) == int(card_id)), {"id": int(card_id)})
+    return {**manifest, "status": "error", "narrative": "", "data": None, "error": message}
+
+
+def _schedule_wrapped_cards(
+    *,
+    account_dir: Path,
+    scope: str,
+    year: int,
+    refresh: bool,
+    raise_errors: bool,
+) -> Iterator[dict[str, Any]]:
+    """Compute every card of the deck and yield each one as soon as it finishes.
+
+    Cards without dependencies run concurrently (they spend most of their time in
+    sqlite/zstd, which release the GIL for long stretches); derived cards are
+    assembled afterwards from the finished payloads.
+    """
+
+    t0 = time.time()
+    # Shared single-pass inputs first, so parallel cards don't race to build them.
+    cube = _get_or_build_year_cube(account_dir=account_dir, scope=scope, year=year, refresh=refresh)
+    _get_or_compute_heatmap_sent(account_dir=account_dir, scope=scope, year=year, refresh=refresh, cube=cube)
+
+    independent = [int(c["id"]) for c in _WRAPPED_CARD_MANIFEST if int(c["id"]) not in _WRAPPED_CARD_DEPENDENCIES]
+    done: dict[int, dict[str, Any]] = {}
+    failed: set[int] = set()
+
+    def finish(cid: int, compute: Any) -> dict[str, Any]:
+        try:
+            return compute()
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.exception("Wrapped card#%s failed: account=%s year=%s", cid, account_dir.name, year)
+            failed.add(cid)
+            return _wrapped_error_card(cid, str(e) or e.__class__.__name__)
+
+    with ThreadPoolExecutor(max_workers=_wrapped_card_workers(), thread_name_prefix="wrapped-card") as pool:
+        futures = {
+            pool.submit(
+                _get_or_build_card,
+                account_dir=account_dir,
+                scope=scope,
+                year=year,
+                card_id=cid,
+                refresh=refresh,
+                cube=cube,
+            ): cid
+            for cid in independent
+        }
+        for future in as_completed(futures):
+            cid = futures[future]
+            card = finish(cid, future.result)
+            done[cid] = card
+            yield card
+
+    for cid, deps in _WRAPPED_CARD_DEPENDENCIES.items():
+        if failed.intersection(deps):
+            yield _wrapped_error_card(cid, "依赖的卡片生成失败")
+            continue
+        yield finish(
+            cid,
+            lambda cid=cid, deps=deps: _get_or_build_card(
+                account_dir=account_dir,
+                scope=scope,
+                year=year,
+                card_id=cid,
+                refresh=refresh,
+                cube=cube,
+                sources={d: done[d] for d in deps},
+            ),
+        )
+
+    logger.info(
+        "Wrapped deck scheduled: account=%s year=%s cards=%s failed=%s elapsed=%.2fs",
+        account_dir.name,
+        year,
+        len(done) + len(_WRAPPED_CARD_DEPENDENCIES),
+        sorted(failed),
+        time.time() - t0,
+    )
+
+
+def _file_signature(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return ""
+    return f"{int(st.st_size)}:{int(st.st_mtime_ns)}"
+
+
+def _wrapped_card_uses_cube(card_id: int) -> bool:
+    deps = _WRAPPED_CARD_DEPENDENCIES.get(int(card_id), (int(card_id),))
+    return any(int(d) in _WRAPPED_CUBE_CARDS for d in deps)
+
+
+def _message_sources_signature(account_dir: Path) -> list[str]:
+    paths = [p for p in _iter_message_db_paths(account_dir) if not p.name.lower().startswith("biz_message")]
+    paths.append(get_chat_search_index_db_path(account_dir))
+    return sorted(f"{p.name}:{_file_signature(p)}" for p in paths)
+
+
+def _wrapped_card_fingerprint(*, account_dir: Path, cube: YearCube | None, card_id: int) -> str:
+    deps = _WRAPPED_CARD_DEPENDENCIES.get(int(card_id), (int(card_id),))
+    parts = {
+        "version": _CACHE_VERSION,
+        # Without a cube (cards that don't read it, before anything built it) fall back to the
+        # coarser message-database signatures.
+        "cells": [cube.fingerprint(**_WRAPPED_CARD_INPUTS.get(d, {})) for d in deps] if cube is not None else None,
+        "sources": _message_sources_signature(account_dir) if cube is None else None,
+        # Display names / avatars are resolved from contact.db.
+        "contact": _file_signature(account_dir / "contact.db"),
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _read_card_fingerprint(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except Exception:
+        return ""
+
+
+def _get_or_build_card(
+    *,
+    account_dir: Path,
+    scope: str,
+    year: int,
+    card_id: int,
+    refresh: bool,
+    cube: YearCube | None = None,
+    sources: dict[int, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    cid = int(card_id)
+    y = int(year)
     cache_path = _wrapped_card_cache_path(account_dir=account_dir, scope=scope, year=y, card_id=cid)
+    fingerprint_path = _wrapped_card_fingerprint_path(cache_path)
     # Card#6 需要每次随机抽样，不使用按卡片缓存。
     cacheable = cid != 6
+    started_ns = time.monotonic_ns()
+
+    if cube is None and _wrapped_card_uses_cube(cid):
+        cube = _get_or_build_year_cube(account_dir=account_dir, scope=scope, year=y, refresh=refresh)
+    elif cube is None and cacheable:
+        cube = _peek_year_cube(account_dir=account_dir, scope=scope, year=y)
+    fingerprint = _wrapped_card_fingerprint(account_dir=account_dir, cube=cube, card_id=cid) if cacheable else ""
 
     lock = _get_lock(str(cache_path))
     with lock:
-        if cacheable and (not refresh) and cache_path.exists():
+        fresh = _fresh_result(str(cache_path), started_ns)
+        if fresh is not None:
+            return fresh
+        if (
+            cacheable
+            and (not refresh)
+            and cache_path.exists()
+            and _read_card_fingerprint(fingerprint_path) == fingerprint
+        ):
             try:
                 cached_obj = json.loads(cache_path.read_text(encoding="utf-8"))
                 if isinstance(cached_obj, dict) and int(cached_obj.get("id") or -1) == cid:
@@ -657,14 +954,16 @@ def build_wrapped_annual_card(
 
         heatmap_sent: WeekdayHourHeatmap | None = None
         if cid in (0, 1):
-            heatmap_sent = _get_or_compute_heatmap_sent(account_dir=account_dir, scope=scope, year=y, refresh=refresh)
+            heatmap_sent = _get_or_compute_heatmap_sent(
+                account_dir=account_dir, scope=scope, year=y, refresh=refresh, cube=cube
+            )
 
         if cid == 0:
-            card = build_card_00_global_overview(account_dir=account_dir, year=y, heatmap=heatmap_sent)
+            card = build_card_00_global_overview(account_dir=account_dir, year=y, heatmap=heatmap_sent, cube=cube)
         elif cid == 1:
             card = build_card_01_cyber_schedule(account_dir=account_dir, year=y, heatmap=heatmap_sent)
         elif cid == 2:
-            card = build_card_02_message_chars(account_dir=account_dir, year=y)
+            card = build_card_02_message_chars(account_dir=account_dir, year=y, cube=cube)
         elif cid == 6:
             card = build_card_05_keywords_wordcloud(account_dir=account_dir, year=y)
         elif cid == 3:
@@ -675,24 +974,23 @@ def build_wrapped_annual_card(
             card = build_card_04_emoji_universe(account_dir=account_dir, year=y)
         elif cid == 7:
             # Build from already-implemented cards so we can reuse their caches if available.
-            overview = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=0, refresh=refresh)
-            heatmap = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=1, refresh=refresh)
-            message_chars = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=2, refresh=refresh)
-            reply_speed = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=3, refresh=refresh)
-            monthly = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=4, refresh=refresh)
-            emoji = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=5, refresh=refresh)
-            # card 6（关键词）不可缓存，这里会实打实重扫一遍；card 7 自身可缓存，
+            # card 6（关键词）不可缓存，没有现成结果时会实打实重扫一遍；card 7 自身可缓存，
             # 所以每个 (account, year) 只付一次这个代价。
-            keywords = build_wrapped_annual_card(account=account_dir.name, year=y, card_id=6, refresh=refresh)
+            deps = dict(sources or {})
+            for dep in _WRAPPED_CARD_DEPENDENCIES[7]:
+                if dep not in deps:
+                    deps[dep] = _get_or_build_card(
+                        account_dir=account_dir, scope=scope, year=y, card_id=dep, refresh=refresh, cube=cube
+                    )
             card = build_card_07_bento_summary_from_sources(
                 year=y,
-                overview=overview,
-                heatmap=heatmap,
-                message_chars=message_chars,
-                reply_speed=reply_speed,
-                monthly=monthly,
-                emoji=emoji,
-                keywords=keywords,
+                overview=deps[0],
+                heatmap=deps[1],
+                message_chars=deps[2],
+                reply_speed=deps[3],
+                monthly=deps[4],
+                emoji=deps[5],
+                keywords=deps[6],
             )
         else:
             # Should be unreachable due to _WRAPPED_CARD_ID_SET check.
@@ -701,7 +999,9 @@ def build_wrapped_annual_card(
         if cacheable:
             try:
                 cache_path.write_text(json.dumps(card, ensure_ascii=False, indent=2), encoding="utf-8")
+                fingerprint_path.write_text(fingerprint, encoding="utf-8")
             except Exception:
                 logger.exception("Failed to write wrapped card cache: %s", cache_path)
 
+        _remember_result(str(cache_path), card)
         return card
@@ -0,0 +1,573 @@
+"""Single-pass year scanner and the persisted "year cube" for Wrapped cards.
+
+Most Wrapped cards need the same coarse aggregates (who, which day, which hour,
+sent or received, what type, how many characters). Instead of letting every card
+walk all `Msg_*` tables again, we stream each message of the year exactly once
+and dispatch it to accumulators. The default accumulator folds messages into a
+compact columnar cube that is persisted next to the other Wrapped caches, so
+cards can be recomputed without touching the message shards again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional, Protocol
+
+from ..chat_helpers import (
+    _decode_message_content,
+    _decode_sqlite_text,
+    _iter_message_db_paths,
+    _quote_ident,
+    _should_keep_session,
+)
+from ..chat_search_index import get_chat_search_index_db_path, get_chat_search_index_status
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Bump when the cube layout or scan semantics change; older files are ignored.
+YEAR_CUBE_VERSION = 1
+
+# Local time offsets are multiples of 15 minutes, so every timestamp inside the
+# same 15-minute slot shares (day-of-year, hour). Caching per slot avoids one
+# `datetime.fromtimestamp` call per message.
+_TIME_SLOT_SECONDS = 15 * 60
+
+
+class YearMessageAccumulator(Protocol):
+    """Receives every message of the scanned year exactly once."""
+
+    def add(self, *, username: str, ts: int, doy: int, hour: int, sent: bool, local_type: int, chars: int) -> None:
+        ...
+
+
+@dataclass(frozen=True)
+class YearCube:
+    """Columnar per (contact, day, hour, direction, local_type) message counts for one year.
+
+    Every column has one entry per non-empty cell; `user` indexes into `usernames`.
+    `chars` only counts non-whitespace characters of text messages.
+    """
+
+    year: int
+    source: str
+    usernames: tuple[str, ...]
+    user: tuple[int, ...]
+    doy: tuple[int, ...]
+    hour: tuple[int, ...]
+    sent: tuple[int, ...]
+    local_type: tuple[int, ...]
+    count: tuple[int, ...]
+    chars: tuple[int, ...]
+    latest_ts: int = 0
+    latest_sent_ts: int = 0
+    _fingerprints: dict[tuple[Any, ...], str] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def total_messages(self) -> int:
+        return int(sum(self.count))
+
+    def _rows(self, *, sent_only: bool, keep_session_only: bool = False) -> Iterable[int]:
+        keep: Optional[list[bool]] = None
+        if keep_session_only:
+            # Messages from unknown tables have no username; keep them like the shard scans do.
+            keep = [(not u) or _should_keep_session(u, include_official=False) for u in self.usernames]
+        for i in range(len(self.count)):
+            if sent_only and not self.sent[i]:
+                continue
+            if keep is not None and not keep[self.user[i]]:
+                continue
+            yield i
+
+    def weekday_hour_matrix(self, *, sent_only: bool = True) -> list[list[int]]:
+        """Return a Monday-first 7x24 matrix of message counts."""
+
+        first_weekday = datetime(int(self.year), 1, 1).weekday()
+        matrix = [[0 for _ in range(24)] for _ in range(7)]
+        for i in self._rows(sent_only=sent_only):
+            weekday = (first_weekday + int(self.doy[i])) % 7
+            matrix[weekday][int(self.hour[i])] += int(self.count[i])
+        return matrix
+
+    def daily_counts(self, *, days: int, sent_only: bool = False, keep_session_only: bool = True) -> list[int]:
+        """Return 0-indexed day-of-year message counts."""
+
+        counts = [0 for _ in range(int(days))]
+        for i in self._rows(sent_only=sent_only, keep_session_only=keep_session_only):
+            d = int(self.doy[i])
+            if 0 <= d < len(counts):
+                counts[d] += int(self.count[i])
+        return counts
+
+    def text_chars(self) -> tuple[int, int]:
+        """Return (sent_chars, received_chars) of text messages."""
+
+        sent_chars = 0
+        recv_chars = 0
+        for i in range(len(self.chars)):
+            c = int(self.chars[i])
+            if c <= 0:
+                continue
+            if self.sent[i]:
+                sent_chars += c
+            else:
+                recv_chars += c
+        return sent_chars, recv_chars
+
+    def fingerprint(
+        self,
+        *,
+        local_types: Optional[tuple[int, ...]] = None,
+        exclude_local_types: tuple[int, ...] = (),
+    ) -> str:
+        """Hash the cells a card depends on, so unrelated new messages keep its cache valid."""
+
+        memo_key = (local_types, exclude_local_types)
+        cached = self._fingerprints.get(memo_key)
+        if cached is not None:
+            return cached
+
+        h = hashlib.sha1(f"{self.year}:{self.source}".encode("utf-8"))
+        for i in range(len(self.count)):
+            lt = int(self.local_type[i])
+            if local_types is not None and lt not in local_types:
+                continue
+            if lt in exclude_local_types:
+                continue
+            h.update(
+                f"{self.usernames[self.user[i]]}|{self.doy[i]}|{self.hour[i]}|{self.sent[i]}|{lt}|"
+                f"{self.count[i]}|{self.chars[i]};".encode("utf-8")
+            )
+        digest = h.hexdigest()
+        self._fingerprints[memo_key] = digest
+        return digest
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": YEAR_CUBE_VERSION,
+            "year": int(self.year),
+            "source": self.source,
+            "latestTs": int(self.latest_ts),
+            "latestSentTs": int(self.latest_sent_ts),
+            "usernames": list(self.usernames),
+            "columns": {
+                "user": list(self.user),
+                "doy": list(self.doy),
+                "hour": list(self.hour),
+                "sent": list(self.sent),
+                "localType": list(self.local_type),
+                "count": list(self.count),
+                "chars": list(self.chars),
+            },
+        }
+
+    @classmethod
+    def from_json(cls, obj: Any) -> Optional["YearCube"]:
+        if not isinstance(obj, dict) or int(obj.get("version") or 0) != YEAR_CUBE_VERSION:
+            return None
+        columns = obj.get("columns")
+        usernames = obj.get("usernames")
+        if not isinstance(columns, dict) or not isinstance(usernames, list):
+            return None
+        try:
+            cols = {
+                key: tuple(int(v) for v in columns[key])
+                for key in ("user", "doy", "hour", "sent", "localType", "count", "chars")
+            }
+        except Exception:
+            return None
+        size = len(cols["count"])
+        if any(len(col) != size for col in cols.values()):
+            return None
+        if any(not (0 <= u < len(usernames)) for u in cols["user"]):
+            return None
+        return cls(
+            year=int(obj.get("year") or 0),
+            source=str(obj.get("source") or ""),
+            usernames=tuple(str(u or "") for u in usernames),
+            user=cols["user"],
+            doy=cols["doy"],
+            hour=cols["hour"],
+            sent=cols["sent"],
+            local_type=cols["localType"],
+            count=cols["count"],
+            chars=cols["chars"],
+            latest_ts=int(obj.get("latestTs") or 0),
+            latest_sent_ts=int(obj.get("latestSentTs") or 0),
+        )
+
+
+class YearCubeAccumulator:
+    """Folds streamed messages into `YearCube` cells."""
+
+    def __init__(self) -> None:
+        self._user_index: dict[str, int] = {}
+        self._cells: dict[tuple[int, int, int, int, int], list[int]] = {}
+        self.latest_ts = 0
+        self.latest_sent_ts = 0
+
+    def add(self, *, username: str, ts: int, doy: int, hour: int, sent: bool, local_type: int, chars: int) -> None:
+        user = self._user_index.get(username)
+        if user is None:
+            user = len(self._user_index)
+            self._user_index[username] = user
+        key = (user, doy, hour, 1 if sent else 0, local_type)
+        cell = self._cells.get(key)
+        if cell is None:
+            self._cells[key] = [1, chars]
+        else:
+            cell[0] += 1
+            cell[1] += chars
+        if ts > self.latest_ts:
+            self.latest_ts = ts
+        if sent and ts > self.latest_sent_ts:
+            self.latest_sent_ts = ts
+
+    def build(self, *, year: int, source: str) -> YearCube:
+        # Number users alphabetically so cell order (and fingerprints) don't depend on scan order.
+        usernames = sorted(self._user_index)
+        remap = {self._user_index[u]: i for i, u in enumerate(usernames)}
+        cells = {(remap[k[0]], *k[1:]): v for k, v in self._cells.items()}
+        keys = sorted(cells)
+        return YearCube(
+            year=int(year),
+            source=source,
+            usernames=tuple(usernames),
+            user=tuple(k[0] for k in keys),
+            doy=tuple(k[1] for k in keys),
+            hour=tuple(k[2] for k in keys),
+            sent=tuple(k[3] for k in keys),
+            local_type=tuple(k[4] for k in keys),
+            count=tuple(cells[k][0] for k in keys),
+            chars=tuple(cells[k][1] for k in keys),
+            latest_ts=int(self.latest_ts),
+            latest_sent_ts=int(self.latest_sent_ts),
+        )
+
+
+def _year_range_epoch_seconds(year: int) -> tuple[int, int]:
+    start = int(datetime(year, 1, 1).timestamp())
+    end = int(datetime(year + 1, 1, 1).timestamp())
+    return start, end
+
+
+class _LocalTimeSlots:
+    def __init__(self, year_start_ts: int) -> None:
+        self._year_start_ordinal = datetime.fromtimestamp(int(year_start_ts)).toordinal()
+        self._slots: dict[int, tuple[int, int]] = {}
+
+    def lookup(self, ts: int) -> tuple[int, int]:
+        slot = ts // _TIME_SLOT_SECONDS
+        hit = self._slots.get(slot)
+        if hit is None:
+            dt = datetime.fromtimestamp(slot * _TIME_SLOT_SECONDS)
+            hit = (dt.toordinal() - self._year_start_ordinal, dt.hour)
+            self._slots[slot] = hit
+        return hit
+
+
+def _non_space_len(text: str) -> int:
+    return sum(1 for ch in text if not ch.isspace())
+
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> set[str]:
+    try:
+        rows = conn.execute(f"PRAGMA table_info({_quote_ident(table_name)})").fetchall()
+    except Exception:
+        return set()
+    return {_decode_sqlite_text(r[1]).strip().lower() for r in rows if len(r) > 1 and r[1]}
+
+
+def _list_message_tables(conn: sqlite3.Connection) -> list[str]:
+    try:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+    except Exception:
+        return []
+    names: list[str] = []
+    for r in rows:
+        if not r or not r[0]:
+            continue
+        name = _decode_sqlite_text(r[0]).strip()
+        if name and name.lower().startswith(("msg_", "chat_")):
+            names.append(name)
+    return names
+
+
+def _load_name2id(conn: sqlite3.Connection) -> list[tuple[int, str]]:
+    for column in ("user_name", "username"):
+        try:
+            rows = conn.execute(f"SELECT rowid, {_quote_ident(column)} FROM Name2Id").fetchall()
+        except Exception:
+            continue
+        out: list[tuple[int, str]] = []
+        for r in rows:
+            if not r or r[0] is None or r[1] is None:
+                continue
+            name = _decode_sqlite_text(r[1]).strip()
+            if name:
+                out.append((int(r[0]), name))
+        return out
+    return []
+
+
+def _index_ready_for_scan(account_dir: Path) -> bool:
+    try:
+        status = get_chat_search_index_status(account_dir, source="auto")
+        index = dict(status.get("index") or {})
+    except Exception:
+        return False
+    # A stale index would silently miss newly synced shards; scan the shards instead.
+    return bool(index.get("ready") and index.get("upToDate"))
+
+
+def _scan_search_index(
+    *,
+    index_path: Path,
+    start_ts: int,
+    end_ts: int,
+    my_username: str,
+    slots: _LocalTimeSlots,
+    accumulators: list[YearMessageAccumulator],
+) -> Optional[int]:
+    conn = sqlite3.connect(str(index_path))
+    try:
+        columns = _table_columns(conn, "message_fts")
+        if "create_time" not in columns:
+            return None
+
+        ts_expr = (
+            "CASE "
+            "WHEN CAST(create_time AS INTEGER) > 1000000000000 "
+            "THEN CAST(CAST(create_time AS INTEGER)/1000 AS INTEGER) "
+            "ELSE CAST(create_time AS INTEGER) "
+            "END"
+        )
+        username_expr = "username" if "username" in columns else "''"
+        sender_expr = "sender_username" if "sender_username" in columns else "''"
+        local_type_expr = "CAST(local_type AS INTEGER)" if "local_type" in columns else "0"
+        # Same character semantics as card#2's index query.
+        chars_expr = "0"
+        if "render_type" in columns and "text" in columns:
+            chars_expr = (
+                "CASE WHEN render_type = 'text' AND \"text\" IS NOT NULL "
+                "AND TRIM(CAST(\"text\" AS TEXT)) != '' "
+                "THEN LENGTH(REPLACE(\"text\", ' ', '')) ELSE 0 END"
+            )
+        biz_where = " AND db_stem NOT LIKE 'biz_message%'" if "db_stem" in columns else ""
+
+        sql = (
+            f"SELECT {username_expr}, {sender_expr}, {ts_expr} AS ts, {local_type_expr}, {chars_expr} "
+            "FROM message_fts "
+            f"WHERE {ts_expr} >= ? AND {ts_expr} < ?{biz_where}"
+        )
+        try:
+            cur = conn.execute(sql, (start_ts, end_ts))
+        except Exception:
+            logger.exception("Wrapped year scan over search index failed: %s", index_path)
+            return None
+
+        scanned = 0
+        for username, sender, ts, local_type, chars in cur:
+            ts_i = int(ts or 0)
+            doy, hour = slots.lookup(ts_i)
+            sent = bool(my_username) and str(sender or "").strip() == my_username
+            for acc in accumulators:
+                acc.add(
+                    username=str(username or "").strip(),
+                    ts=ts_i,
+                    doy=doy,
+                    hour=hour,
+                    sent=sent,
+                    local_type=int(local_type or 0),
+                    chars=int(chars or 0),
+                )
+            scanned += 1
+        return scanned
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _scan_message_shard(
+    *,
+    db_path: Path,
+    start_ts: int,
+    end_ts: int,
+    my_username: str,
+    slots: _LocalTimeSlots,
+    accumulators: list[YearMessageAccumulator],
+) -> int:
+    if not db_path.exists():
+        return 0
+
+    conn: sqlite3.Connection | None = None
+    try:
+        conn = sqlite3.connect(str(db_path))
+        conn.text_factory = bytes
+        tables = _list_message_tables(conn)
+        if not tables:
+            return 0
+
+        # Name2Id maps `real_sender_id` to usernames and hashed table names back to sessions.
+        my_rowid: Optional[int] = None
+        table_usernames: dict[str, str] = {}
+        for rowid, name in _load_name2id(conn):
+            if my_username and name == my_username:
+                my_rowid = rowid
+            digest = hashlib.md5(name.encode("utf-8")).hexdigest()
+            table_usernames[f"msg_{digest}"] = name
+            table_usernames[f"chat_{digest}"] = name
+
+        ts_expr = "CASE WHEN create_time > 1000000000000 THEN CAST(create_time/1000 AS INTEGER) ELSE create_time END"
+
+        scanned = 0
+        for table_name in tables:
+            columns = _table_columns(conn, table_name)
+            if "create_time" not in columns:
+                continue
+            local_type_expr = "local_type" if "local_type" in columns else "0"
+            sender_expr = "real_sender_id" if "real_sender_id" in columns else "NULL"
+            # Only text messages need their body, skip fetching media/XML payloads.
+            message_expr = (
+                "CASE WHEN local_type = 1 THEN message_content END"
+                if "message_content" in columns and "local_type" in columns
+                else "NULL"
+            )
+            compress_expr = (
+                "CASE WHEN local_type = 1 THEN compress_content END"
+                if "compress_content" in columns and "local_type" in columns
+                else "NULL"
+            )
+            sql = (
+                f"SELECT {ts_expr} AS ts, {local_type_expr}, {sender_expr}, {message_expr}, {compress_expr} "
+                f"FROM {_quote_ident(table_name)} "
+                f"WHERE {ts_expr} >= ? AND {ts_expr} < ?"
+            )
+            username = table_usernames.get(table_name.lower(), "")
+            try:
+                cur = conn.execute(sql, (start_ts, end_ts))
+            except Exception:
+                continue
+
+            for ts, local_type, sender_id, message_content, compress_content in cur:
+                ts_i = int(ts or 0)
+                doy, hour = slots.lookup(ts_i)
+                lt = int(local_type or 0)
+                chars = 0
+                if lt == 1 and (message_content is not None or compress_content is not None):
+                    try:
+                        chars = _non_space_len(_decode_message_content(compress_content, message_content))
+                    except Exception:
+                        chars = 0
+                try:
+                    sent = my_rowid is not None and int(sender_id or 0) == my_rowid
+                except Exception:
+                    sent = False
+                for acc in accumulators:
+                    acc.add(username=username, ts=ts_i, doy=doy, hour=hour, sent=sent, local_type=lt, chars=chars)
+                scanned += 1
+        return scanned
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def scan_year_messages(
+    *,
+    account_dir: Path,
+    year: int,
+    accumulators: list[YearMessageAccumulator],
+) -> str:
+    """Stream every non-official message of `year` once into all `accumulators`.
+
+    Prefers the unified search index when it is up to date, otherwise scans the
+    message shards. Returns the source that was used ("index" or "shards").
+    """
+
+    start_ts, end_ts = _year_range_epoch_seconds(int(year))
+    my_username = str(account_dir.name or "").strip()
+    slots = _LocalTimeSlots(start_ts)
+
+    index_path = get_chat_search_index_db_path(account_dir)
+    if index_path.exists() and _index_ready_for_scan(account_dir):
+        scanned = _scan_search_index(
+            index_path=index_path,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            my_username=my_username,
+            slots=slots,
+            accumulators=accumulators,
+        )
+        if scanned is not None:
+            return "index"
+
+    db_paths = [p for p in _iter_message_db_paths(account_dir) if not p.name.lower().startswith("biz_message")]
+    for db_path in db_paths:
+        _scan_message_shard(
+            db_path=db_path,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            my_username=my_username,
+            slots=slots,
+            accumulators=accumulators,
+        )
+    return "shards"
+
+
+def build_year_cube(
+    *,
+    account_dir: Path,
+    year: int,
+    extra_accumulators: Optional[list[YearMessageAccumulator]] = None,
+) -> YearCube:
+    """Scan `year` once and fold it into a `YearCube` (plus any extra accumulators)."""
+
+    t0 = time.time()
+    cube_acc = YearCubeAccumulator()
+    source = scan_year_messages(
+        account_dir=account_dir,
+        year=year,
+        accumulators=[cube_acc, *(extra_accumulators or [])],
+    )
+    cube = cube_acc.build(year=year, source=source)
+    logger.info(
+        "Wrapped year cube built: account=%s year=%s source=%s messages=%s cells=%s elapsed=%.2fs",
+        str(account_dir.name or "").strip(),
+        year,
+        source,
+        cube.total_messages,
+        len(cube.count),
+        time.time() - t0,
+    )
+    return cube
+
+
+def load_year_cube(path: Path, *, year: int) -> Optional[YearCube]:
+    if not path.exists():
+        return None
+    try:
+        cube = YearCube.from_json(json.loads(path.read_text(encoding="utf-8")))
+    except Exception:
+        return None
+    if cube is None or cube.year != int(year):
+        return None
+    return cube
+
+
+def save_year_cube(path: Path, cube: YearCube) -> None:
+    try:
+        path.write_text(json.dumps(cube.to_json(), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    except Exception:
+        logger.exception("Failed to write wrapped year cube: %s", path)
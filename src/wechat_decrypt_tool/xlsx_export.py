@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import io
 import math
+import os
 import re
+import shutil
+import tempfile
 import zipfile
 from datetime import date, datetime
-from typing import Any, Iterable, Sequence
+from typing import Any, BinaryIO, Iterable, Sequence
 from xml.sax.saxutils import escape
 
 
 _INVALID_SHEET_NAME_RE = re.compile(r"[\\[\\]:*?/\\\\]")
 _MAX_SHEET_NAME_LENGTH = 31
+_SHEET_SPOOL_BYTES = 8 * 1024 * 1024
 
 
 def _column_name(index: int) -> str:
@@ -60,11 +64,16 @@ def _inline_string_cell(reference: str, value: Any, style: int | None = None) ->
     return f"<c{attrs}><is><t{preserve}>{text}</t></is></c>"
 
 
-def _sheet_xml(headers: Sequence[object], rows: Iterable[Sequence[Any]]) -> str:
-    rendered_rows: list[str] = []
+def _write_sheet_xml(out: BinaryIO, headers: Sequence[object], rows: Iterable[Sequence[Any]]) -> None:
+    """Stream one worksheet into ``out``.
+
+    Column widths precede ``<sheetData>`` in the XML but depend on every row,
+    so rows are rendered once into a spooled buffer (RAM first, temp file past
+    ``_SHEET_SPOOL_BYTES``) and copied in after the ``<cols>`` header.
+    """
     column_widths = [len(_text(header)) for header in headers]
 
-    def append_row(row_index: int, values: Sequence[Any], *, header: bool = False) -> None:
+    def row_xml(row_index: int, values: Sequence[Any], *, header: bool = False) -> bytes:
         cells: list[str] = []
         for column_index, value in enumerate(values, start=1):
             if column_index > len(column_widths):
@@ -72,23 +81,32 @@ def _sheet_xml(headers: Sequence[object], rows: Iterable[Sequence[Any]]) -> str:
             text = _text(value)
             column_widths[column_index - 1] = min(48, max(column_widths[column_index - 1], len(text)))
             cells.append(_inline_string_cell(f"{_column_name(column_index)}{row_index}", text, 1 if header else None))
-        rendered_rows.append(f'<row r="{row_index}">{"".join(cells)}</row>')
+        return f'<row r="{row_index}">{"".join(cells)}</row>'.encode("utf-8")
 
-    append_row(1, headers, header=True)
-    for row_index, row in enumerate(rows, start=2):
-        append_row(row_index, row)
+    with tempfile.SpooledTemporaryFile(max_size=_SHEET_SPOOL_BYTES) as body:
+        body.write(row_xml(1, headers, header=True))
+        for row_index, row in enumerate(rows, start=2):
+            body.write(row_xml(row_index, row))
 
-    columns = "".join(
-        f'<col min="{index}" max="{index}" width="{max(10, min(52, width + 2))}" customWidth="1"/>'
-        for index, width in enumerate(column_widths, start=1)
-    )
-    return (
-        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
-        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
-        f"<cols>{columns}</cols><sheetData>{''.join(rendered_rows)}</sheetData>"
-        "<autoFilter ref=\"A1:"
-        f"{_column_name(max(1, len(headers)))}1\"/>"
-        "</worksheet>"
+        columns = "".join(
+            f'<col min="{index}" max="{index}" width="{max(10, min(52, width + 2))}" customWidth="1"/>'
+            for index, width in enumerate(column_widths, start=1)
+        )
+        out.write(
+            (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f"<cols>{columns}</cols><sheetData>"
+            ).encode("utf-8")
+        )
+        body.seek(0)
+        shutil.copyfileobj(body, out)
+    out.write(
+        (
+            "</sheetData><autoFilter ref=\"A1:"
+            f"{_column_name(max(1, len(headers)))}1\"/>"
+            "</worksheet>"
+        ).encode("utf-8")
     )
 
 
@@ -99,6 +117,21 @@ def build_xlsx_workbook(sheets: Iterable[tuple[object, Sequence[object], Iterabl
     shared-string table and keep the implementation small. Excel, LibreOffice,
     and Numbers all open this Open XML subset.
     """
+    output = io.BytesIO()
+    write_xlsx_workbook(output, sheets)
+    return output.getvalue()
+
+
+def write_xlsx_workbook(
+    target: str | os.PathLike[str] | BinaryIO,
+    sheets: Iterable[tuple[object, Sequence[object], Iterable[Sequence[Any]]]],
+) -> None:
+    """Write the workbook from :func:`build_xlsx_workbook` to a path or binary file.
+
+    Row iterables are consumed lazily, one sheet at a time, so large exports
+    can stream rows straight from their source without building the sheet in
+    memory.
+    """
     normalized: list[tuple[str, Sequence[object], Iterable[Sequence[Any]]]] = []
     used_names: set[str] = set()
     for index, (name, headers, rows) in enumerate(sheets, start=1):
@@ -126,8 +159,7 @@ def build_xlsx_workbook(sheets: Iterable[tuple[object, Sequence[object], Iterabl
         for index in range(1, len(normalized) + 1)
     )
 
-    output = io.BytesIO()
-    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
         archive.writestr(
             "[Content_Types].xml",
             '<?xml version="1.0" encoding="UTF-8"?>'
@@ -171,5 +203,5 @@ def build_xlsx_workbook(sheets: Iterable[tuple[object, Sequence[object], Iterabl
             '</styleSheet>',
         )
         for index, (_name, headers, rows) in enumerate(normalized, start=1):
-            archive.writestr(f"xl/worksheets/sheet{index}.xml", _sheet_xml(headers, rows))
-    return output.getvalue()
+            with archive.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True) as sheet:
+                _write_sheet_xml(sheet, headers, rows)
@@ -2,6 +2,7 @@ import os
 import logging
 import sqlite3
 import sys
+import time
 import unittest
 import importlib
 from pathlib import Path
@@ -266,6 +267,137 @@ class TestAvatarCacheChatMedia(unittest.TestCase):
                 else:
                     os.environ["WECHAT_TOOL_AVATAR_CACHE_ENABLED"] = prev_cache
 
+    def test_remote_avatar_urls_use_the_realtime_read_lane(self):
+        from contextlib import contextmanager
+
+        import wechat_decrypt_tool.routers.chat_media as chat_media
+
+        class _BusyConnection:
+            handle = 1
+
+            @property
+            def lock(self):
+                raise AssertionError("bulk sync lock must not be taken for avatar reads")
+
+        @contextmanager
+        def read_handle(_conn):
+            yield 42
+
+        remote_url = "https://wx.qlogo.cn/mmhead/realtime-avatar/132"
+        with TemporaryDirectory() as td, patch.object(
+            chat_media.WCDB_REALTIME, "ensure_connected", return_value=_BusyConnection()
+        ), patch.object(chat_media, "_wcdb_read_handle", side_effect=read_handle), patch.object(
+            chat_media, "_wcdb_get_avatar_urls", return_value={"wxid_friend": remote_url}
+        ) as get_urls:
+            out = chat_media._resolve_avatar_remote_urls(Path(td), ["wxid_friend"], prefer_realtime=True)
+
+        self.assertEqual(get_urls.call_args.args[0], 42)
+        self.assertEqual(out, {"wxid_friend": chat_media.normalize_avatar_source_url(remote_url)})
+
+    def test_avatar_batch_and_prewarm_fill_cache_in_one_pass(self):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        png = bytes.fromhex(
+            "89504E470D0A1A0A"
+            "0000000D49484452000000010000000108060000001F15C489"
+            "0000000D49444154789C6360606060000000050001A5F64540"
+            "0000000049454E44AE426082"
+        )
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            account = "wxid_batch"
+            account_dir = root / "output" / "databases" / account
+            account_dir.mkdir(parents=True, exist_ok=True)
+            # wxid_friend has a remote URL only; wxid_local_* have head_image blobs.
+            self._seed_contact_db(account_dir / "contact.db", username="wxid_friend")
+            self._seed_session_db(account_dir / "session.db", username="wxid_local_0")
+            self._seed_head_image_db(account_dir / "head_image.db", username="wxid_local_0")
+            conn = sqlite3.connect(str(account_dir / "head_image.db"))
+            try:
+                conn.execute(
+                    "INSERT INTO head_image VALUES ('wxid_local_1', 'fedcba9876543210fedcba9876543210', ?, 1735689700)",
+                    (sqlite3.Binary(png + b"\x00"),),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            prev_data = os.environ.get("WECHAT_TOOL_DATA_DIR")
+            prev_cache = os.environ.get("WECHAT_TOOL_AVATAR_CACHE_ENABLED")
+            try:
+                os.environ["WECHAT_TOOL_DATA_DIR"] = str(root)
+                os.environ["WECHAT_TOOL_AVATAR_CACHE_ENABLED"] = "1"
+
+                import wechat_decrypt_tool.app_paths as app_paths
+                import wechat_decrypt_tool.chat_helpers as chat_helpers
+                import wechat_decrypt_tool.avatar_cache as avatar_cache
+                import wechat_decrypt_tool.routers.chat_media as chat_media
+
+                importlib.reload(app_paths)
+                importlib.reload(chat_helpers)
+                importlib.reload(avatar_cache)
+                importlib.reload(chat_media)
+
+                app = FastAPI()
+                app.include_router(chat_media.router)
+                client = TestClient(app)
+                usernames = ["wxid_local_0", "wxid_local_1", "wxid_friend", "wxid_local_0"]
+
+                with patch.object(avatar_cache, "_connect", wraps=avatar_cache._connect) as connect:
+                    first = client.post("/api/chat/avatars/batch", json={"account": account, "usernames": usernames})
+                    self.assertEqual(first.status_code, 200)
+                    items = first.json()["items"]
+                    self.assertEqual(list(items), ["wxid_local_0", "wxid_local_1", "wxid_friend"])
+                    self.assertEqual([items[u]["status"] for u in items], ["ok", "ok", "missing"])
+                    self.assertEqual(items["wxid_friend"]["url"], f"/api/chat/avatar?account={account}&username=wxid_friend")
+
+                    connect.reset_mock()
+                    known = {"wxid_local_0": items["wxid_local_0"]["etag"]}
+                    bundle = client.post(
+                        "/api/chat/avatars/batch",
+                        json={"account": account, "usernames": usernames, "format": "multipart", "known_etags": known},
+                    )
+                    # Warm lookups read every entry with a single cache-db connection.
+                    self.assertEqual(connect.call_count, 1)
+
+                self.assertEqual(bundle.status_code, 200)
+                content_type = bundle.headers["content-type"]
+                self.assertTrue(content_type.startswith("multipart/mixed; boundary="))
+                boundary = content_type.split("boundary=", 1)[1].encode()
+                parts = [p for p in bundle.content.split(b"--" + boundary) if p.strip(b"-\r\n")]
+                self.assertEqual(len(parts), 2)
+                self.assertIn(b'"not_modified"', parts[0])
+                self.assertIn(b'name="wxid_local_1"', parts[1])
+                self.assertIn(('ETag: "%s"' % items["wxid_local_1"]["etag"]).encode(), parts[1])
+                self.assertTrue(parts[1].rstrip(b"\r\n").endswith(png + b"\x00"))
+
+                with patch.object(chat_media, "_download_remote_avatar", return_value=(png, "image/png", "", "", False)) as download:
+                    started = client.post("/api/chat/avatars/prewarm", json={"account": account, "concurrency": 2})
+                    self.assertEqual(started.status_code, 200)
+                    for _ in range(200):
+                        status = client.get("/api/chat/avatars/prewarm", params={"account": account}).json()
+                        if status["status"] != "running":
+                            break
+                        time.sleep(0.02)
+                self.assertEqual(status["status"], "done")
+                self.assertEqual((status["total"], status["done"], status["local"], status["remote"]), (2, 2, 1, 1))
+                download.assert_called_once()
+
+                after = client.post("/api/chat/avatars/batch", json={"account": account, "usernames": ["wxid_friend"]})
+                self.assertEqual(after.json()["items"]["wxid_friend"]["status"], "ok")
+            finally:
+                _close_logging_handlers()
+                if prev_data is None:
+                    os.environ.pop("WECHAT_TOOL_DATA_DIR", None)
+                else:
+                    os.environ["WECHAT_TOOL_DATA_DIR"] = prev_data
+                if prev_cache is None:
+                    os.environ.pop("WECHAT_TOOL_AVATAR_CACHE_ENABLED", None)
+                else:
+                    os.environ["WECHAT_TOOL_AVATAR_CACHE_ENABLED"] = prev_cache
+
 
 if __name__ == "__main__":
     unittest.main()
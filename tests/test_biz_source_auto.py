@@ -1,4 +1,5 @@
 import hashlib
+import sqlite3
 import sys
 import threading
 import unittest
@@ -131,6 +132,61 @@ class TestBizSourceAuto(unittest.TestCase):
         self.assertFalse(resp.get("hasMore"))
         self.assertEqual((resp.get("data") or [])[0].get("title"), "实时服务号文章")
 
+    def test_biz_messages_keyset_paging_reuses_parsed_rows(self):
+        username = "gh_paged_official"
+        table_name = f"Msg_{hashlib.md5(username.encode('utf-8')).hexdigest().lower()}"
+
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "acc"
+            account_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(account_dir / "biz_message_0.db"))
+            try:
+                conn.execute(
+                    f'CREATE TABLE "{table_name}" (local_id INTEGER PRIMARY KEY, local_type INTEGER, '
+                    "create_time INTEGER, message_content TEXT)"
+                )
+                conn.executemany(
+                    f'INSERT INTO "{table_name}" VALUES (?, 49, ?, ?)',
+                    [
+                        (i, 1700000000 + (i // 2), f"<msg><appmsg><title>文章{i}</title></appmsg></msg>")
+                        for i in range(1, 6)
+                    ],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            def page(**kwargs):
+                return biz_router.get_biz_messages(
+                    username=username, account="acc", limit=2, source="decrypted", **kwargs
+                )
+
+            biz_router._clear_biz_parsed_cache()
+            parse = biz_router.parse_wechat_xml_to_struct
+            with (
+                patch.object(biz_router, "_resolve_account_dir", return_value=account_dir),
+                patch.object(biz_router, "parse_wechat_xml_to_struct", wraps=parse) as parsed,
+            ):
+                seen: list[int] = []
+                cursor: dict = {}
+                while True:
+                    resp = page(
+                        before_time=cursor.get("beforeTime"),
+                        before_local_id=cursor.get("beforeLocalId"),
+                    )
+                    seen.extend(item["local_id"] for item in resp["data"])
+                    cursor = resp.get("nextCursor") or {}
+                    if not cursor:
+                        break
+                self.assertEqual(seen, [5, 4, 3, 2, 1])
+                self.assertEqual(parsed.call_count, 5)
+
+                again = page(offset=2)
+                self.assertEqual([item["local_id"] for item in again["data"]], [3, 2])
+                self.assertEqual(again["data"][0]["title"], "文章3")
+                self.assertEqual(parsed.call_count, 5)
+            biz_router._clear_biz_parsed_cache()
+
     def test_biz_page_refreshes_in_the_background_and_exposes_scoped_export(self):
         source = (ROOT / "frontend" / "components" / "BizMessages.vue").read_text(encoding="utf-8")
 
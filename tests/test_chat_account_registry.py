@@ -0,0 +1,74 @@
+import importlib
+import os
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def _seed_decrypted_account(account_dir: Path) -> None:
+    account_dir.mkdir(parents=True, exist_ok=True)
+    for name in ("session.db", "contact.db"):
+        conn = sqlite3.connect(str(account_dir / name))
+        try:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class TestChatAccountRegistry(unittest.TestCase):
+    def test_registry_is_reused_until_accounts_or_key_store_change(self) -> None:
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            prev_data_dir = os.environ.get("WECHAT_TOOL_DATA_DIR")
+            try:
+                os.environ["WECHAT_TOOL_DATA_DIR"] = str(root)
+
+                import wechat_decrypt_tool.app_paths as app_paths
+                import wechat_decrypt_tool.key_store as key_store
+                import wechat_decrypt_tool.chat_accounts as chat_accounts
+
+                importlib.reload(app_paths)
+                importlib.reload(key_store)
+                importlib.reload(chat_accounts)
+
+                databases_dir = root / "output" / "databases"
+                _seed_decrypted_account(databases_dir / "wxid_first")
+
+                with patch.object(chat_accounts, "_context_for_name", wraps=chat_accounts._context_for_name) as build:
+                    self.assertEqual(chat_accounts.list_chat_account_names(), ["wxid_first"])
+                    self.assertEqual(chat_accounts.resolve_chat_account_context(None).name, "wxid_first")
+                    self.assertEqual(build.call_count, 1)
+
+                    key_store.upsert_account_keys_in_store("wxid_first", db_key="A" * 64)
+                    self.assertTrue(chat_accounts.resolve_chat_account_context("wxid_first").db_key_present)
+                    self.assertEqual(build.call_count, 2)
+
+                    _seed_decrypted_account(databases_dir / "wxid_second")
+                    self.assertEqual(chat_accounts.list_chat_account_names(), ["wxid_first", "wxid_second"])
+                    self.assertEqual(build.call_count, 4)
+
+                    leaked = chat_accounts.list_chat_account_contexts()[0]
+                    leaked.source_info["db_storage_path"] = "tampered"
+                    self.assertNotIn("db_storage_path", chat_accounts.list_chat_account_contexts()[0].source_info)
+                    self.assertEqual(build.call_count, 4)
+
+                    chat_accounts.invalidate_chat_account_registry()
+                    chat_accounts.list_chat_account_contexts()
+                    self.assertEqual(build.call_count, 6)
+            finally:
+                if prev_data_dir is None:
+                    os.environ.pop("WECHAT_TOOL_DATA_DIR", None)
+                else:
+                    os.environ["WECHAT_TOOL_DATA_DIR"] = prev_data_dir
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import sqlite3
+import sys
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import chat_realtime_reader as reader
+
+
+def _create_msg_table(conn: sqlite3.Connection, name: str, local_ids: list[int], *, with_source: bool = True) -> None:
+    source_col = ", source TEXT" if with_source else ""
+    conn.execute(
+        f'CREATE TABLE "{name}" (local_id INTEGER PRIMARY KEY, server_id INTEGER, local_type INTEGER, '
+        "sort_seq INTEGER, real_sender_id INTEGER, create_time INTEGER, message_content TEXT, "
+        f"compress_content BLOB, packed_info_data BLOB{source_col})"
+    )
+    conn.executemany(
+        f'INSERT INTO "{name}"(local_id, real_sender_id, create_time, message_content) VALUES (?, 1, ?, ?)',
+        [(lid, 1000 + lid, f"{name}-{lid}") for lid in local_ids],
+    )
+
+
+class _SqliteExec:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __call__(self, handle, *, kind, path, sql):
+        self.calls.append(path)
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(r) for r in conn.execute(sql).fetchall()]
+        finally:
+            conn.close()
+
+
+class TestRealtimeBatchedProbe(unittest.TestCase):
+    def setUp(self):
+        reader._clear_realtime_reader_caches()
+
+    def tearDown(self):
+        reader._clear_realtime_reader_caches()
+
+    def _seed(self, root: Path, *, legacy_table: bool = False) -> Path:
+        db_path = root / "message_0.db"
+        conn = sqlite3.connect(str(db_path))
+        try:
+            conn.execute("CREATE TABLE Name2Id (user_name TEXT)")
+            conn.execute("INSERT INTO Name2Id(user_name) VALUES ('wxid_me')")
+            _create_msg_table(conn, "Msg_a", [1, 2, 3, 4])
+            _create_msg_table(conn, "Msg_b", [1, 2])
+            if legacy_table:
+                _create_msg_table(conn, "Msg_c", [1, 2], with_source=False)
+            conn.commit()
+        finally:
+            conn.close()
+        return db_path
+
+    def test_one_native_call_per_shard_with_rows_split_by_table(self):
+        with TemporaryDirectory() as td:
+            db_path = self._seed(Path(td))
+            exec_query = _SqliteExec()
+            rt_conn = SimpleNamespace(handle=1, lock=threading.Lock())
+
+            out = reader.fetch_new_rows_batched_via_exec(
+                rt_conn=rt_conn,
+                probes=[
+                    reader.RealtimeTableProbe(db_path, "Msg_a", 2),
+                    reader.RealtimeTableProbe(db_path, "Msg_b", 2),
+                ],
+                limit=10,
+                exec_query=exec_query,
+                normalize_item=dict,
+            )
+
+        self.assertEqual(len(exec_query.calls), 1)
+        self.assertEqual([r["local_id"] for r in out[(str(db_path), "Msg_a")]], [4, 3])
+        self.assertEqual(out[(str(db_path), "Msg_b")], [])
+        self.assertEqual(out[(str(db_path), "Msg_a")][0]["sender_username"], "wxid_me")
+        self.assertEqual(out[(str(db_path), "Msg_a")][0]["table_name"], "Msg_a")
+
+    def test_failing_table_is_isolated_and_left_out(self):
+        with TemporaryDirectory() as td:
+            db_path = self._seed(Path(td), legacy_table=True)
+            exec_query = _SqliteExec()
+            rt_conn = SimpleNamespace(handle=1, lock=threading.Lock())
+
+            out = reader.fetch_new_rows_batched_via_exec(
+                rt_conn=rt_conn,
+                probes=[
+                    reader.RealtimeTableProbe(db_path, "Msg_a", 0),
+                    reader.RealtimeTableProbe(db_path, "Msg_missing", 0),
+                    reader.RealtimeTableProbe(db_path, "Msg_c", 0),
+                ],
+                limit=3,
+                exec_query=exec_query,
+                normalize_item=dict,
+            )
+
+        self.assertNotIn((str(db_path), "Msg_missing"), out)
+        self.assertEqual([r["local_id"] for r in out[(str(db_path), "Msg_a")]], [4, 3, 2])
+        self.assertEqual([r["local_id"] for r in out[(str(db_path), "Msg_c")]], [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
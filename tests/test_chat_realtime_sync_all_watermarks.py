@@ -0,0 +1,87 @@
+import sqlite3
+import sys
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.routers import chat as chat_router
+
+
+class _DummyConn:
+    def __init__(self) -> None:
+        self.handle = 1
+        self.lock = threading.Lock()
+
+
+def _session(username: str, ts: int, local_id: int) -> dict:
+    return {
+        "username": username,
+        "last_timestamp": ts,
+        "sort_timestamp": ts,
+        "last_msg_locald_id": local_id,
+    }
+
+
+class TestChatRealtimeSyncAllWatermarks(unittest.TestCase):
+    def test_only_changed_sessions_are_visited_until_the_next_reconcile(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "acc"
+            account_dir.mkdir(parents=True, exist_ok=True)
+            sqlite3.connect(str(account_dir / "session.db")).close()
+
+            sessions = [_session("wxid_a", 100, 1), _session("wxid_b", 200, 5)]
+            visited: list[str] = []
+
+            def fake_sync(**kwargs):
+                visited.append(kwargs["username"])
+                return {"scanned": 1, "inserted": 0}
+
+            def run(**kwargs):
+                with (
+                    patch.object(chat_router, "_resolve_account_dir", return_value=account_dir),
+                    patch.object(chat_router.WCDB_REALTIME, "ensure_connected", return_value=_DummyConn()),
+                    patch.object(chat_router, "_wcdb_get_sessions", return_value=[dict(s) for s in sessions]),
+                    patch.object(chat_router, "_should_keep_session", return_value=True),
+                    patch.object(chat_router, "build_session_last_message_table", return_value={}),
+                    patch.object(
+                        chat_router,
+                        "_ensure_decrypted_message_tables",
+                        side_effect=lambda _dir, names: {u: (account_dir / "message_0.db", f"Msg_{u}") for u in names},
+                    ),
+                    patch.object(chat_router, "_sync_chat_realtime_messages_for_table", side_effect=fake_sync),
+                ):
+                    return chat_router.sync_chat_realtime_messages_all(None, account="acc", **kwargs)
+
+            chat_router._REALTIME_SYNC_RECONCILED_AT.pop("acc", None)
+            try:
+                first = run()
+                self.assertTrue(first["fullReconcile"])
+                self.assertEqual(sorted(visited), ["wxid_a", "wxid_b"])
+
+                visited.clear()
+                second = run()
+                self.assertFalse(second["fullReconcile"])
+                self.assertEqual(visited, [])
+                self.assertEqual(second["sessionsSkippedUnchanged"], 2)
+
+                sessions[0] = _session("wxid_a", 150, 2)
+                third = run()
+                self.assertEqual(visited, ["wxid_a"])
+                self.assertEqual(third["sessionsSkippedUnchanged"], 1)
+
+                visited.clear()
+                reconciled = run(full_reconcile=True)
+                self.assertTrue(reconciled["fullReconcile"])
+                self.assertEqual(sorted(visited), ["wxid_a", "wxid_b"])
+            finally:
+                chat_router._REALTIME_SYNC_RECONCILED_AT.pop("acc", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.routers import chat_contacts
+
+
+_ROWS = {
+    "wxid_alice": {"local_type": 1, "verify_flag": 0, "nick_name": "Alice", "remark": "", "alias": "", "city": "Shenzhen"},
+    "wxid_bob": {"local_type": 1, "verify_flag": 0, "nick_name": "Bob", "remark": "同事", "alias": "", "city": ""},
+    "123@chatroom": {"local_type": 0, "verify_flag": 0, "nick_name": "Team", "remark": "", "alias": "", "city": ""},
+}
+
+
+class TestContactSnapshot(unittest.TestCase):
+    def setUp(self):
+        chat_contacts._invalidate_contact_snapshots()
+
+    def tearDown(self):
+        chat_contacts._invalidate_contact_snapshots()
+
+    def _collect(self, account_dir: Path, **kwargs):
+        params = {
+            "account_dir": account_dir,
+            "base_url": "",
+            "keyword": None,
+            "include_friends": True,
+            "include_groups": True,
+            "include_officials": True,
+            "source": "decrypted",
+        }
+        params.update(kwargs)
+        return chat_contacts._collect_contacts_for_account(**params)
+
+    def test_snapshot_serves_filters_and_rebuilds_after_contact_db_changes(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "wxid_me"
+            account_dir.mkdir()
+            (account_dir / "contact.db").write_bytes(b"v1")
+            (account_dir / "session.db").write_bytes(b"")
+
+            with (
+                patch.object(chat_contacts, "_load_contact_rows_map", side_effect=lambda *_a, **_k: dict(_ROWS)) as load_rows,
+                patch.object(chat_contacts, "_load_official_account_type_map", return_value={}),
+                patch.object(chat_contacts, "_load_session_sort_timestamps", return_value={"wxid_bob": 20}),
+                patch.object(chat_contacts, "_load_session_group_usernames", return_value=[]),
+                patch.object(chat_contacts, "_build_contact_pinyin_key", wraps=chat_contacts._build_contact_pinyin_key) as pinyin,
+            ):
+                everyone = self._collect(account_dir)
+                self.assertEqual([c["username"] for c in everyone], ["wxid_bob", "wxid_alice", "123@chatroom"])
+                self.assertEqual(pinyin.call_count, 3)
+
+                friends = self._collect(account_dir, include_groups=False)
+                self.assertEqual([c["username"] for c in friends], ["wxid_bob", "wxid_alice"])
+                self.assertEqual([c["username"] for c in self._collect(account_dir, keyword="同事")], ["wxid_bob"])
+                self.assertEqual([c["username"] for c in self._collect(account_dir, keyword="SHENZHEN")], ["wxid_alice"])
+
+                # Callers may decorate their rows without leaking into the shared snapshot.
+                friends[0]["displayName"] = "mutated"
+                self.assertEqual(self._collect(account_dir)[0]["displayName"], "同事")
+                self.assertEqual(load_rows.call_count, 1)
+                self.assertEqual(pinyin.call_count, 3)
+
+                (account_dir / "contact.db").write_bytes(b"v2-changed")
+                st = (account_dir / "contact.db").stat()
+                os.utime(account_dir / "contact.db", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+                self._collect(account_dir)
+                self.assertEqual(load_rows.call_count, 2)
+
+    def test_watcher_events_drop_only_the_changed_accounts_snapshot(self):
+        from wechat_decrypt_tool.db_storage_watch import DbStorageChange
+
+        def change(bucket: str, name: str) -> DbStorageChange:
+            return DbStorageChange(path=f"{bucket}/{name}", bucket=bucket, name=name, kind="modified", mtime_ns=1)
+
+        snapshot = chat_contacts._ContactSnapshot(signature=(), entries=())
+        chat_contacts._CONTACT_SNAPSHOTS[("/out/wxid_me", "realtime", "")] = snapshot
+        chat_contacts._CONTACT_SNAPSHOTS[("/out/wxid_other", "realtime", "")] = snapshot
+
+        chat_contacts._invalidate_contact_snapshots_for_changes(
+            "wxid_me", [change("message", "message_0.db-wal"), change("contact", "contact.db-shm")]
+        )
+        self.assertEqual(len(chat_contacts._CONTACT_SNAPSHOTS), 2)
+
+        chat_contacts._invalidate_contact_snapshots_for_changes("wxid_me", [change("contact", "contact.db-wal")])
+        self.assertEqual(list(chat_contacts._CONTACT_SNAPSHOTS), [("/out/wxid_other", "realtime", "")])
+
+
+if __name__ == "__main__":
+    unittest.main()
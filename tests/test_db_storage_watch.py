@@ -0,0 +1,173 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.db_storage_watch import DbStorageChange, DbStorageWatchBus, change_in_scope
+
+
+def _change(relative: str, *, mtime_ns: int = 1) -> DbStorageChange:
+    parts = Path(relative).parts
+    return DbStorageChange(
+        path=relative,
+        bucket=parts[0].lower() if len(parts) > 1 else "",
+        name=parts[-1].lower(),
+        kind="modified",
+        mtime_ns=mtime_ns,
+    )
+
+
+class _FakeSubscription:
+    mode = "native"
+    available = True
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeBus:
+    def __init__(self) -> None:
+        self.callback = None
+        self.subscription = _FakeSubscription()
+
+    def subscribe(self, _db_storage_dir, callback):
+        self.callback = callback
+        return self.subscription
+
+
+class TestDbStorageWatch(unittest.TestCase):
+    def test_scopes_match_the_realtime_change_scan(self):
+        self.assertTrue(change_in_scope(_change("message/message_0.db-wal"), "chat"))
+        self.assertTrue(change_in_scope(_change("session/session.db"), "chat"))
+        self.assertFalse(change_in_scope(_change("message/message_0.db-shm"), "chat"))
+        self.assertFalse(change_in_scope(_change("general/general.db-wal"), "chat"))
+
+        self.assertTrue(change_in_scope(_change("general/general.db-wal"), "all"))
+        self.assertFalse(change_in_scope(_change("general/general.db-wal"), "sync"))
+        self.assertTrue(change_in_scope(_change("contact/contact.db"), "sync"))
+        self.assertFalse(change_in_scope(_change("message/message_0.db-shm"), "all"))
+
+    def test_bus_publishes_file_writes_and_stops_with_last_subscriber(self):
+        bus = DbStorageWatchBus()
+        got: list[DbStorageChange] = []
+        seen = threading.Event()
+
+        def on_changes(changes):
+            got.extend(changes)
+            if any(c.name == "message_0.db-wal" for c in changes):
+                seen.set()
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            (root / "message").mkdir()
+            (root / "cache").mkdir()
+            sub = bus.subscribe(root, on_changes)
+            try:
+                deadline = time.monotonic() + 5.0
+                while not seen.is_set() and time.monotonic() < deadline:
+                    (root / "cache" / "ignored.db").write_bytes(b"x")
+                    (root / "message" / "message_0.db-wal").write_bytes(b"new-message")
+                    seen.wait(timeout=0.3)
+                self.assertTrue(seen.is_set(), bus.status())
+                self.assertTrue(sub.available)
+                self.assertFalse(any(c.bucket == "cache" for c in got))
+                wal = next(c for c in got if c.name == "message_0.db-wal")
+                self.assertEqual(wal.bucket, "message")
+                self.assertGreater(wal.mtime_ns, 0)
+            finally:
+                sub.close()
+            self.assertEqual(bus.status(), [])
+            bus.stop_all()
+
+    def test_sse_stream_pushes_watcher_events_without_rescanning(self):
+        from wechat_decrypt_tool.routers import chat
+
+        class RequestStub:
+            async def is_disconnected(self):
+                return False
+
+        bus = _FakeBus()
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            account_dir = root / "account"
+            db_storage_dir = root / "db_storage"
+            account_dir.mkdir()
+            db_storage_dir.mkdir()
+            scans: list[str] = []
+
+            def fake_scan(_path, *, scope="all"):
+                scans.append(scope)
+                return 100
+
+            async def run_case():
+                with (
+                    mock.patch.object(chat, "_resolve_account_dir", return_value=account_dir),
+                    mock.patch.object(chat.WCDB_REALTIME, "get_status", return_value={"db_storage_dir": str(db_storage_dir)}),
+                    mock.patch.object(chat, "_scan_db_storage_mtime_ns", side_effect=fake_scan),
+                    mock.patch.object(chat, "DB_STORAGE_WATCH", bus),
+                ):
+                    response = await chat.stream_chat_realtime_events(
+                        RequestStub(), account=account_dir.name, interval_ms=100, scope="chat"
+                    )
+                    it = response.body_iterator
+                    chunks = [await it.__anext__()]
+                    threading.Thread(
+                        target=bus.callback,
+                        args=([_change("general/general.db-wal", mtime_ns=999), _change("message/message_0.db-wal", mtime_ns=200)],),
+                    ).start()
+                    while not str(chunks[-1]).startswith("data:") or len(chunks) < 2:
+                        chunks.append(await asyncio.wait_for(it.__anext__(), timeout=5.0))
+                    await it.aclose()
+                    return chunks
+
+            chunks = asyncio.run(run_case())
+
+        events = [json.loads(str(c).removeprefix("data: ").strip()) for c in chunks if str(c).startswith("data:")]
+        self.assertEqual([e["type"] for e in events], ["ready", "change"])
+        self.assertEqual(events[1]["mtimeNs"], 200)
+        self.assertEqual(scans, ["chat"])
+        self.assertTrue(bus.subscription.closed)
+
+    def test_autosync_schedules_on_watcher_events_and_defers_while_paused(self):
+        from wechat_decrypt_tool.chat_realtime_autosync import ChatRealtimeAutoSyncService, _AccountState
+
+        svc = ChatRealtimeAutoSyncService()
+        svc._states["wxid_me"] = _AccountState()
+
+        svc._on_db_storage_changes("wxid_me", [_change("sns/sns.db-wal")])
+        self.assertEqual(svc._states["wxid_me"].due_at, 0.0)
+        self.assertFalse(svc._wake.is_set())
+
+        svc._on_db_storage_changes("wxid_me", [_change("message/message_0.db-wal", mtime_ns=42)])
+        self.assertGreater(svc._states["wxid_me"].due_at, 0.0)
+        self.assertEqual(svc._states["wxid_me"].last_mtime_ns, 42)
+        self.assertTrue(svc._wake.is_set())
+
+        svc._wake.clear()
+        svc._states["wxid_me"].due_at = 0.0
+        svc.pause_account("wxid_me", reason="test")
+        svc._on_db_storage_changes("wxid_me", [_change("session/session.db-wal", mtime_ns=43)])
+        self.assertEqual(svc._states["wxid_me"].due_at, 0.0)
+        self.assertTrue(svc._states["wxid_me"].changed_while_paused)
+        svc.resume_account("wxid_me", reason="test")
+
+        with mock.patch("wechat_decrypt_tool.chat_realtime_autosync._list_decrypted_accounts", return_value=["wxid_me"]):
+            svc._tick()
+        self.assertFalse(svc._states["wxid_me"].changed_while_paused)
+        self.assertGreater(svc._states["wxid_me"].due_at, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -152,6 +152,29 @@ class TestDecryptStreamSSE(unittest.TestCase):
         self.assertIs(persisted, False)
         self.assertEqual(failed_accounts, ["wxid_persist_error"])
 
+    def test_avatar_prewarm_starts_only_for_decrypted_accounts(self):
+        import wechat_decrypt_tool.routers.chat_media as chat_media
+        import wechat_decrypt_tool.routers.decrypt as decrypt_router
+
+        with TemporaryDirectory() as td:
+            ok_dir = Path(td) / "wxid_ok"
+            ok_dir.mkdir()
+            account_results = {
+                "wxid_ok": {"success": 2, "output_dir": str(ok_dir)},
+                "wxid_failed": {"success": 0, "output_dir": str(Path(td) / "wxid_failed")},
+            }
+            with mock.patch("wechat_decrypt_tool.avatar_cache.is_avatar_cache_enabled", return_value=True), mock.patch.object(
+                chat_media, "start_avatar_prewarm"
+            ) as start_mock:
+                decrypt_router._start_avatar_prewarm(account_results)
+            start_mock.assert_called_once_with(ok_dir)
+
+            with mock.patch("wechat_decrypt_tool.avatar_cache.is_avatar_cache_enabled", return_value=False), mock.patch.object(
+                chat_media, "start_avatar_prewarm"
+            ) as start_mock:
+                decrypt_router._start_avatar_prewarm(account_results)
+            start_mock.assert_not_called()
+
     def test_cancelled_while_waiting_for_guard_releases_guard_after_acquire(self):
         with TemporaryDirectory() as td:
             root = Path(td)
@@ -256,6 +279,7 @@ class TestDecryptStreamSSE(unittest.TestCase):
             allow_worker_finish = threading.Event()
             guard_released = threading.Event()
             release_calls = []
+            key_cache_roots = []
 
             class ConnectedRequest:
                 async def is_disconnected(self):
@@ -265,7 +289,8 @@ class TestDecryptStreamSSE(unittest.TestCase):
                 def __init__(self, _key):
                     self.last_result = {}
 
-                def decrypt_database(self, _source, _target):
+                def decrypt_database(self, _source, _target, *, key_cache_root=None):
+                    key_cache_roots.append(key_cache_root)
                     worker_started.set()
                     if not allow_worker_finish.wait(timeout=5):
                         raise TimeoutError("test worker was not released")
@@ -305,6 +330,7 @@ class TestDecryptStreamSSE(unittest.TestCase):
                 try:
                     started = await asyncio.to_thread(worker_started.wait, 2)
                     self.assertTrue(started, "decrypt worker did not start")
+                    self.assertEqual(key_cache_roots, [str(db_storage)])
 
                     consumer.cancel()
                     with self.assertRaises(asyncio.CancelledError):
@@ -385,7 +411,9 @@ class TestDecryptStreamSSE(unittest.TestCase):
                 client = TestClient(app)
 
                 events: list[dict] = []
-                with mock.patch.object(decrypt_router, "upsert_account_keys_in_store") as upsert_mock:
+                with mock.patch.object(decrypt_router, "upsert_account_keys_in_store") as upsert_mock, mock.patch.object(
+                    decrypt_router, "_start_avatar_prewarm"
+                ) as prewarm_mock:
                     with client.stream(
                         "GET",
                         "/api/decrypt_stream",
@@ -418,6 +446,7 @@ class TestDecryptStreamSSE(unittest.TestCase):
                 # A plaintext SQLite copy proves that the source is readable,
                 # but it does not verify the supplied encrypted database key.
                 upsert_mock.assert_not_called()
+                self.assertEqual(list(prewarm_mock.call_args.args[0]), ["wxid_foo"])
                 self.assertIs(events[-1].get("db_key_persisted"), False)
                 self.assertEqual(events[-1].get("db_key_persistence_errors"), ["wxid_foo"])
 
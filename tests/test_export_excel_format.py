@@ -111,7 +111,7 @@ class TestExcelExportFormat(unittest.TestCase):
                 "transferState": "received",
                 "amount": "¥10.00",
             }
-            with patch.object(record_export, "_load_records", return_value=([record], {"account": "wxid_test"})):
+            with patch.object(record_export, "_iter_record_pages", return_value=iter([({"account": "wxid_test"}, [record])])):
                 result = record_export.export_records(
                     _request(),
                     record_export.RecordExportRequest(
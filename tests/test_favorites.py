@@ -13,6 +13,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
 
+from wechat_decrypt_tool.database_filters import should_skip_source_database
 from wechat_decrypt_tool.routers import favorites as favorites_router
 
 
@@ -175,6 +176,100 @@ class TestFavorites(unittest.TestCase):
         self.assertEqual(item["title"], "链接")
         self.assertEqual(item["attachments"], [])
 
+    def test_index_reparses_only_changed_rows_and_pages_in_sql(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td)
+            db_path = account_dir / "favorite.db"
+            self._seed_favorite_db(db_path)
+            parse = favorites_router._parse_favorite_row
+
+            with patch.object(favorites_router, "_parse_favorite_row", wraps=parse) as parsed:
+                first = self._call(account_dir, limit=1)
+                self.assertEqual(parsed.call_count, 2)
+                self.assertEqual([item["localId"] for item in first["items"]], [1])
+                self.assertTrue(first["hasMore"])
+
+                second = self._call(account_dir, limit=1, offset=1)
+                self.assertEqual(parsed.call_count, 2)
+                self.assertEqual([item["localId"] for item in second["items"]], [2])
+                self.assertFalse(second["hasMore"])
+
+                conn = sqlite3.connect(str(db_path))
+                try:
+                    conn.execute(
+                        "UPDATE fav_db_item SET update_time = 1735689700, "
+                        "content = '<favitem type=\"5\"><title>新标题</title></favitem>' WHERE local_id = 2"
+                    )
+                    conn.execute("INSERT INTO fav_bind_tag_db_item VALUES (7, 700, 2, 102, 0)")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+                by_title = self._call(account_dir, q="新标题")
+                self.assertEqual(parsed.call_count, 3)
+                self.assertEqual([item["localId"] for item in by_title["items"]], [2])
+                self.assertEqual(self._call(account_dir, tag_id=7)["total"], 2)
+                self.assertEqual(self._call(account_dir, q="测试好友")["total"], 1)
+
+                conn = sqlite3.connect(str(db_path))
+                try:
+                    conn.execute("DELETE FROM fav_db_item WHERE local_id = 1")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+                after_delete = self._call(account_dir)
+                self.assertEqual(parsed.call_count, 3)
+                self.assertEqual(after_delete["databaseTotal"], 1)
+                self.assertEqual(after_delete["typeCounts"], {"5": 1})
+
+    def test_renamed_tag_reindexes_tagged_rows(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td)
+            db_path = account_dir / "favorite.db"
+            self._seed_favorite_db(db_path)
+            self.assertEqual(self._call(account_dir, q="工作")["total"], 1)
+
+            conn = sqlite3.connect(str(db_path))
+            try:
+                conn.execute("UPDATE fav_tag_db_item SET name = '旅行' WHERE local_id = 7")
+                conn.commit()
+            finally:
+                conn.close()
+
+            renamed = self._call(account_dir, q="旅行")
+            self.assertEqual(self._call(account_dir, q="工作")["total"], 0)
+
+        self.assertEqual([item["localId"] for item in renamed["items"]], [1])
+        self.assertEqual([tag["name"] for tag in renamed["items"][0]["tags"]], ["旅行"])
+
+    def test_index_database_is_not_treated_as_a_source_database(self):
+        self.assertTrue(should_skip_source_database(favorites_router._INDEX_DB_NAME))
+
+    def test_export_pages_refresh_the_index_once(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td)
+            self._seed_favorite_db(account_dir / "favorite.db")
+            listed = self._call(account_dir)
+            ctx = SimpleNamespace(name="wxid_test", account_dir=account_dir, db_key_present=False, db_storage_path="", wxid_dir="")
+            refresh = favorites_router._refresh_favorite_index
+
+            with (
+                patch.object(favorites_router, "resolve_chat_account_context", return_value=ctx),
+                patch.object(favorites_router, "_resolve_general_contacts", return_value={}),
+                patch.object(favorites_router, "_refresh_favorite_index", wraps=refresh) as refreshed,
+            ):
+                pages = list(
+                    favorites_router.iter_favorite_pages(_request(), account="wxid_test", source="decrypted", page_size=1)
+                )
+
+        self.assertEqual(refreshed.call_count, 1)
+        self.assertEqual([page["hasMore"] for page in pages], [True, False])
+        self.assertEqual(
+            [item["localId"] for page in pages for item in page["items"]],
+            [item["localId"] for item in listed["items"]],
+        )
+
     def test_endpoint_defaults_to_realtime_source(self):
         parameter = favorites_router.list_favorites.__signature__.parameters["source"] if hasattr(
             favorites_router.list_favorites, "__signature__"
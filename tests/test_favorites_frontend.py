@@ -13,6 +13,12 @@ class TestFavoritesFrontend(unittest.TestCase):
         self.assertIn("request('/favorites'", source)
         self.assertIn("listFavorites,", source)
 
+    def test_api_exports_records_through_background_jobs(self):
+        source = (ROOT / "frontend" / "composables" / "useApi.js").read_text(encoding="utf-8")
+        self.assertIn("request('/records/exports', {", source)
+        self.assertNotIn("request('/records/export',", source)
+        self.assertIn("{ method: 'DELETE' }", source.split("const cancelRecordExport = async", 1)[1].split("\n  }\n", 1)[0])
+
     def test_sidebar_has_favorites_route(self):
         source = (ROOT / "frontend" / "components" / "SidebarRail.vue").read_text(encoding="utf-8")
         self.assertIn('title="收藏"', source)
@@ -68,7 +74,9 @@ class TestFavoritesFrontend(unittest.TestCase):
         self.assertIn("HTML", component)
         self.assertIn("JSON", component)
         self.assertIn("TXT", component)
-        self.assertIn("api.exportRecords", component)
+        self.assertIn("api.createRecordExport", component)
+        self.assertIn("api.getRecordExport(exportId)", component)
+        self.assertIn("api.cancelRecordExport(exportId)", component)
         self.assertNotIn("实时库 ·", component)
         self.assertNotIn("未选择账号", component)
 
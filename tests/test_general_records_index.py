@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from starlette.requests import Request
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.routers import general
+
+
+def _request() -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/api/general/payments",
+            "headers": [],
+        }
+    )
+
+
+def _seed_general_db(path: Path) -> None:
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE transferTable(
+                transfer_id TEXT, transcation_id TEXT, message_server_id INTEGER, second_message_server_id INTEGER,
+                session_name TEXT, pay_sub_type INTEGER, pay_receiver TEXT, pay_payer TEXT,
+                begin_transfer_time INTEGER, last_modified_time INTEGER, invalid_time INTEGER,
+                last_update_time INTEGER, delay_confirm_flag INTEGER, bubble_clicked_flag INTEGER
+            );
+            CREATE TABLE redEnvelopeTable(
+                message_server_id INTEGER, session_name TEXT, sender_user_name TEXT, native_url TEXT,
+                send_id TEXT, scene_id INTEGER, hb_status INTEGER, hb_type INTEGER, receive_status INTEGER
+            );
+            CREATE TABLE revokebatchmessage(
+                local_id INTEGER, batch_id INTEGER, msg_unique_id TEXT, session_name TEXT,
+                msg_local_id INTEGER, msg_create_time INTEGER
+            );
+            CREATE TABLE revokemessage(
+                to_user_name TEXT, svr_id INTEGER, message_type INTEGER, revoke_time INTEGER,
+                content TEXT, at_user_list TEXT
+            );
+            INSERT INTO revokebatchmessage VALUES (1, 7, 'uniq-1', 'wxid_alice', 11, 500);
+            INSERT INTO revokemessage VALUES ('wxid_bob', 99, 1, 600, '撤回了一条消息', '');
+            """
+        )
+        conn.executemany(
+            "INSERT INTO transferTable VALUES (?, ?, ?, 0, ?, ?, 'wxid_self', ?, ?, 0, ?, 0, 0, NULL)",
+            [
+                (f"tr-{i}", f"tx-{i}", 1000 + i, "wxid_alice" if i % 2 else "wxid_bob", 3 if i % 3 else 2,
+                 "wxid_alice" if i % 2 else "wxid_bob", 1_700_000_000 + i, 1 if i % 3 == 0 else 0)
+                for i in range(30)
+            ],
+        )
+        conn.execute(
+            "INSERT INTO redEnvelopeTable VALUES (5000, 'wxid_bob', 'wxid_bob', 'url', 'send-1', 0, 0, 0, 0)"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class TestGeneralRecordsIndex(unittest.TestCase):
+    def test_payments_and_revokes_page_from_incrementally_refreshed_index(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "wxid_test"
+            account_dir.mkdir(parents=True)
+            db_path = account_dir / "general.db"
+            _seed_general_db(db_path)
+            ctx = SimpleNamespace(name="wxid_test", account_dir=account_dir)
+            contact_calls: list[list[str]] = []
+
+            def fake_contacts(*, account_dir, account_name, usernames, base_url):
+                contact_calls.append(list(usernames))
+                names = {"wxid_alice": "Alice 张", "wxid_bob": "Bob 李"}
+                return {
+                    u: {"username": u, "displayName": names.get(u, u), "avatar": f"{base_url}/a/{u}"}
+                    for u in usernames
+                }
+
+            with patch.object(general, "_general_context", return_value=(ctx, db_path)), patch.object(
+                general,
+                "_open_general_source",
+                side_effect=lambda _ctx, _source: general._SQLiteSource(db_path),
+            ), patch.object(general, "_lookup_messages_for_requests", return_value={}), patch.object(
+                general, "_resolve_general_contacts", side_effect=fake_contacts
+            ), patch.object(general, "_keyed_rows", wraps=general._keyed_rows) as keyed_rows:
+                first = general.list_payment_records(
+                    request=_request(), account="wxid_test", q="", kind="all", status="all",
+                    source="decrypted", limit=10, offset=0,
+                )
+                self.assertEqual(first["total"], 31)
+                self.assertTrue(first["hasMore"])
+                self.assertEqual([item["transferId"] for item in first["items"][:2]], ["tr-29", "tr-28"])
+                self.assertEqual(first["items"][0]["sessionContact"]["avatar"], "http://testserver/a/wxid_alice")
+                with general._open_records_index(account_dir) as index_conn:
+                    stored = index_conn.execute("SELECT item_json FROM general_record LIMIT 1").fetchone()[0]
+                self.assertNotIn("sessionContact", stored)
+
+                contact_calls.clear()
+                reads = keyed_rows.call_count
+                received = general.list_payment_records(
+                    request=_request(), account="wxid_test", q="alice 张", kind="transfer", status="received",
+                    source="decrypted", limit=5, offset=5,
+                )
+                self.assertEqual(keyed_rows.call_count, reads)
+                self.assertEqual(received["total"], 10)
+                self.assertFalse(received["hasMore"])
+                self.assertTrue(all(item["transferState"] == "received" for item in received["items"]))
+                self.assertEqual(len(contact_calls), 1)
+                self.assertLessEqual(len(set(contact_calls[0])), 3)
+
+                expired = general.list_payment_records(
+                    request=_request(), account="wxid_test", q="", kind="all", status="expired",
+                    source="decrypted", limit=50, offset=0,
+                )
+                self.assertEqual(expired["total"], 10)
+
+                conn = sqlite3.connect(str(db_path))
+                try:
+                    conn.execute("UPDATE transferTable SET pay_sub_type = 4 WHERE transfer_id = 'tr-29'")
+                    conn.execute("DELETE FROM redEnvelopeTable")
+                    conn.commit()
+                finally:
+                    conn.close()
+                os.utime(db_path, ns=(db_path.stat().st_atime_ns, db_path.stat().st_mtime_ns + 1_000_000_000))
+                contact_calls.clear()
+                refreshed = general.list_payment_records(
+                    request=_request(), account="wxid_test", q="", kind="all", status="returned",
+                    source="decrypted", limit=10, offset=0,
+                )
+                self.assertEqual([item["transferId"] for item in refreshed["items"]], ["tr-29"])
+                # Only the edited row is re-parsed, so contacts are resolved for it plus the visible page.
+                self.assertEqual(sorted(set(contact_calls[0])), ["wxid_alice", "wxid_self"])
+                self.assertEqual(refreshed["stats"]["redPacketCount"], 0)
+
+                revokes = general.list_revoke_records(
+                    request=_request(), account="wxid_test", q="bob 李", source="decrypted", limit=10, offset=0,
+                )
+                self.assertEqual(revokes["total"], 1)
+                self.assertEqual(revokes["actualTotal"], 1)
+                self.assertEqual(revokes["candidateTotal"], 0)
+                self.assertEqual(revokes["items"][0]["sessionContact"]["displayName"], "Bob 李")
+
+
+    def test_contact_rename_rebuilds_search_text(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "wxid_test"
+            account_dir.mkdir(parents=True)
+            db_path = account_dir / "general.db"
+            _seed_general_db(db_path)
+            contact_db = account_dir / "contact.db"
+            contact_db.write_bytes(b"v1")
+            ctx = SimpleNamespace(name="wxid_test", account_dir=account_dir)
+            names = {"wxid_bob": "Bob 李"}
+
+            def fake_contacts(*, account_dir, account_name, usernames, base_url):
+                return {u: {"username": u, "displayName": names.get(u, u)} for u in usernames}
+
+            def revokes(q: str) -> dict:
+                return general.list_revoke_records(
+                    request=_request(), account="wxid_test", q=q, source="decrypted", limit=10, offset=0,
+                )
+
+            with patch.object(general, "_general_context", return_value=(ctx, db_path)), patch.object(
+                general,
+                "_open_general_source",
+                side_effect=lambda _ctx, _source: general._SQLiteSource(db_path),
+            ), patch.object(general, "_resolve_general_contacts", side_effect=fake_contacts):
+                self.assertEqual(revokes("bob 李")["total"], 1)
+
+                names["wxid_bob"] = "老王"
+                contact_db.write_bytes(b"v2 renamed")
+                self.assertEqual(revokes("老王")["total"], 1)
+                self.assertEqual(revokes("bob 李")["total"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -245,6 +245,76 @@ def test_process_scan_filters_regions_and_finds_cross_chunk_candidate(tmp_path:
     assert api.closed == 1
 
 
+def _synthetic_regions(chunk_size: int) -> tuple[list[MemoryRegion], dict[int, bytes]]:
+    decoy = b"!" + b"Zz9" * 10 + b"Yy" + b"?"
+    regions: list[MemoryRegion] = []
+    memory: dict[int, bytes] = {}
+    for index in range(3):
+        base = 0x1000_0000 * (index + 1)
+        payload = bytearray(b"." * (chunk_size * 3))
+        payload[100 : 100 + len(decoy)] = decoy
+        payload[chunk_size + 7 : chunk_size + 7 + len(decoy)] = decoy
+        memory[base] = bytes(payload)
+    # The real key straddles a chunk boundary of the last region, UTF-16 encoded.
+    last = 0x1000_0000 * 3
+    wide = b"!\x00" + FULL_CANDIDATE.encode("utf-16le") + b"?\x00"
+    start = 2 * chunk_size - 30
+    payload = bytearray(memory[last])
+    payload[start : start + len(wide)] = wide
+    memory[last] = bytes(payload)
+    for base, data in memory.items():
+        regions.append(MemoryRegion(base, len(data), MEM_COMMIT, PAGE_READWRITE))
+    return regions, memory
+
+
+def test_parallel_scan_matches_serial_scan_on_synthetic_regions(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(memory_scan, "MEMORY_CHUNK_SIZE", 4096)
+    scan = _template_scan(tmp_path)
+
+    results = []
+    for workers in (1, 2):
+        regions, memory = _synthetic_regions(4096)
+        api = _FakeMemoryApi(regions, memory)
+        results.append(scan_process_for_image_key(77, scan, memory_api=api, workers=workers))
+        assert api.closed == 1
+
+    assert results[0] == results[1] == ProcessMemoryKeyMatch(
+        aes_key=AES_KEY,
+        template_path=scan.templates[0].path,
+        encoding="utf-16le",
+    )
+
+
+def test_process_scan_verifies_each_candidate_once_across_regions(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(memory_scan, "MEMORY_CHUNK_SIZE", 4096)
+    verified: list[str] = []
+    real_verify = memory_scan.trusted_xor_for_verified_aes_key
+
+    def counting_verify(aes_key, template_scan):
+        verified.append(aes_key)
+        return real_verify(aes_key, template_scan)
+
+    monkeypatch.setattr(memory_scan, "trusted_xor_for_verified_aes_key", counting_verify)
+    regions, memory = _synthetic_regions(4096)
+
+    match = scan_process_for_image_key(
+        77,
+        _template_scan(tmp_path),
+        memory_api=_FakeMemoryApi(regions, memory),
+        workers=1,
+    )
+
+    assert match is not None and match.aes_key == AES_KEY
+    assert verified == ["Zz9Zz9Zz9Zz9Zz9Z", AES_KEY]
+
+
+def test_scan_workers_stay_serial_for_small_processes(monkeypatch) -> None:
+    monkeypatch.setenv("WECHAT_TOOL_IMAGE_KEY_WORKERS", "4")
+    assert memory_scan._scan_workers(None, 8 * 1024 * 1024) == 1
+    assert memory_scan._scan_workers(None, 512 * 1024 * 1024) == 4
+    assert memory_scan._scan_workers(3, 8 * 1024 * 1024) == 2
+
+
 def test_process_scan_requires_templates_and_inferred_xor(tmp_path: Path) -> None:
     api = _FakeMemoryApi([], {})
     assert scan_process_for_image_key(1, _template_scan(tmp_path, xor_key=None), memory_api=api) is None
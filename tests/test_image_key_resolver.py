@@ -2,6 +2,7 @@ import hashlib
 import os
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -9,15 +10,19 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
+import wechat_decrypt_tool.image_key_resolver as image_key_resolver
 from wechat_decrypt_tool.image_key_resolver import (
     TemplateScanResult,
     V2_MAGIC,
     V2Template,
     clean_wxid,
+    clear_verified_image_key_cache,
     collect_wxid_candidates,
     derive_image_keys,
     enumerate_kvcomm_codes,
+    find_first_verified_candidate,
     infer_xor_key_from_v2_tails,
+    order_image_key_candidates,
     resolve_local_image_key,
     scan_v2_templates,
     trusted_xor_for_verified_aes_key,
@@ -420,3 +425,89 @@ def test_resolver_never_returns_an_unverified_fallback(tmp_path: Path) -> None:
         xor_key=wrong_keys.xor_key,
     )
     assert resolve_local_image_key(kvcomm_dir=kvcomm, account_dir=account_dir) is None
+
+
+def test_candidates_try_xor_matching_codes_for_every_wxid_first() -> None:
+    ordered = order_image_key_candidates([0x301, 0x2AB, 0x1AB], ["wxid_a_1234", "wxid_b", "wxid_a"], 0xAB)
+
+    assert ordered == [
+        (0x1AB, "wxid_a"),
+        (0x2AB, "wxid_a"),
+        (0x1AB, "wxid_b"),
+        (0x2AB, "wxid_b"),
+        (0x301, "wxid_a"),
+        (0x301, "wxid_b"),
+    ]
+
+
+def test_parallel_verifier_returns_the_same_first_match_as_a_serial_scan() -> None:
+    target = derive_image_keys(7_000, "wxid_real")
+    ciphertext = _encrypt_first_block(target.aes_key, b"\xff\xd8\xff")
+    candidates = [(code, "wxid_real") for code in range(1, 9_000)]
+    # A second, later pair that also verifies must not win over the earlier one.
+    candidates.append((7_000, "wxid_real"))
+
+    serial = find_first_verified_candidate(candidates, ciphertext, workers=1)
+    parallel = find_first_verified_candidate(candidates, ciphertext, workers=2)
+
+    assert serial == parallel == 6_999
+    assert find_first_verified_candidate(candidates[:6_000], ciphertext, workers=2) == -1
+
+
+def test_resolver_checks_the_cached_verified_pair_without_the_candidate_scan(tmp_path: Path) -> None:
+    kvcomm = tmp_path / "kvcomm"
+    kvcomm.mkdir()
+    for code in range(1, 40):
+        (kvcomm / f"key_{code}_x.statistic").write_bytes(b"")
+    account_dir = tmp_path / "wxid_real_abcd"
+    keys = derive_image_keys(33, "wxid_real")
+    _write_v2_template(
+        account_dir / "msg" / "attach" / "contact" / "2026-07" / "Img" / "image_t.dat",
+        aes_key=keys.aes_key,
+        xor_key=0x05,
+    )
+    clear_verified_image_key_cache(account_dir)
+
+    with patch.object(
+        image_key_resolver,
+        "find_first_verified_candidate",
+        wraps=image_key_resolver.find_first_verified_candidate,
+    ) as verifier:
+        first = resolve_local_image_key(kvcomm_dir=kvcomm, account_dir=account_dir, target_wxid="wxid_other")
+        second = resolve_local_image_key(kvcomm_dir=kvcomm, account_dir=account_dir, target_wxid="wxid_other")
+
+    assert first is not None and second is not None
+    assert (first.code, first.wxid) == (second.code, second.wxid) == (33, "wxid_real")
+    assert verifier.call_count == 1
+    assert verifier.call_args_list[0].args[0][0] != (33, "wxid_real")
+    clear_verified_image_key_cache()
+
+
+def test_resolver_falls_back_to_the_scan_without_duplicating_a_stale_cached_pair(tmp_path: Path) -> None:
+    kvcomm = tmp_path / "kvcomm"
+    kvcomm.mkdir()
+    for code in range(1, 40):
+        (kvcomm / f"key_{code}_x.statistic").write_bytes(b"")
+    account_dir = tmp_path / "wxid_real_abcd"
+    keys = derive_image_keys(33, "wxid_real")
+    _write_v2_template(
+        account_dir / "msg" / "attach" / "contact" / "2026-07" / "Img" / "image_t.dat",
+        aes_key=keys.aes_key,
+        xor_key=0x05,
+    )
+    clear_verified_image_key_cache(account_dir)
+    with image_key_resolver._VERIFIED_PAIRS_LOCK:
+        image_key_resolver._VERIFIED_PAIRS[image_key_resolver._account_cache_key(account_dir)] = (12, "wxid_real")
+
+    with patch.object(
+        image_key_resolver,
+        "find_first_verified_candidate",
+        wraps=image_key_resolver.find_first_verified_candidate,
+    ) as verifier:
+        result = resolve_local_image_key(kvcomm_dir=kvcomm, account_dir=account_dir)
+
+    assert result is not None and (result.code, result.wxid) == (33, "wxid_real")
+    candidates = verifier.call_args.args[0]
+    assert (12, "wxid_real") not in candidates
+    assert len(candidates) == len(set(candidates))
+    clear_verified_image_key_cache()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from wechat_decrypt_tool.routers import import_decrypted
+
+
+def _write_archive(path: Path, members: dict[str, bytes], *, tamper: str = "") -> None:
+    manifest = {"f": [{"path": name, "sha256": hashlib.sha256(data).hexdigest()} for name, data in members.items()]}
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data + b"!" if name == tamper else data)
+        archive.writestr("_integrity/manifest.wce", json.dumps(manifest))
+
+
+def _members() -> dict[str, bytes]:
+    members = {f"wxid_a/resource/{i:03d}.dat": bytes([i % 256]) * (4096 + i) for i in range(40)}
+    members["wxid_a/databases/session.db"] = b"session" * 1000
+    members["wxid_a/databases/message_0.db"] = b"message" * 5000
+    return members
+
+
+def test_parallel_extract_verifies_every_member_and_orders_databases_first(tmp_path: Path) -> None:
+    members = _members()
+    archive_path = tmp_path / "account.zip"
+    _write_archive(archive_path, members)
+    progress: dict = {}
+
+    import_decrypted._extract_import_archive(archive_path, tmp_path / "out", lambda: None, progress, workers=4)
+
+    for name, data in members.items():
+        assert (tmp_path / "out" / name).read_bytes() == data
+    assert progress["done"] == progress["total"] == len(members) + 1
+    assert progress["dbDone"] == progress["dbTotal"] == 2
+    with zipfile.ZipFile(archive_path) as archive:
+        order = import_decrypted._archive_member_order(import_decrypted._archive_file_map(archive))
+    assert order[:2] == ["wxid_a/databases/message_0.db", "wxid_a/databases/session.db"]
+
+
+def test_parallel_extract_rejects_tampered_member_and_honours_cancel(tmp_path: Path) -> None:
+    members = _members()
+    tampered = tmp_path / "tampered.zip"
+    _write_archive(tampered, members, tamper="wxid_a/resource/007.dat")
+    with pytest.raises(RuntimeError, match="校验失败"):
+        import_decrypted._extract_import_archive(tampered, tmp_path / "bad", lambda: None, workers=4)
+
+    archive_path = tmp_path / "account.zip"
+    _write_archive(archive_path, members)
+
+    def cancel() -> None:
+        raise import_decrypted.ImportCancelled("cancelled")
+
+    with pytest.raises(import_decrypted.ImportCancelled):
+        import_decrypted._extract_import_archive(archive_path, tmp_path / "cancelled", cancel, workers=4)
+
+
+def test_resource_copy_hardlinks_only_owned_files(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    (src / "img").mkdir(parents=True)
+    for i in range(12):
+        (src / "img" / f"{i}.jpg").write_bytes(b"x" * (1000 + i))
+    files = import_decrypted._collect_resource_files(src)
+
+    copied = import_decrypted._copy_resource_batch(files, tmp_path / "copy", workers=4)
+    linked = import_decrypted._copy_resource_batch(files, tmp_path / "link", allow_hardlink=True, workers=4)
+
+    assert copied == linked == 12
+    for src_file, rel in files:
+        copy_file = tmp_path / "copy" / rel
+        assert copy_file.read_bytes() == src_file.read_bytes()
+        assert copy_file.stat().st_ino != src_file.stat().st_ino
+        assert (tmp_path / "link" / rel).stat().st_ino == src_file.stat().st_ino
@@ -0,0 +1,89 @@
+import hashlib
+import hmac
+from pathlib import Path
+
+import pytest
+
+import wechat_decrypt_tool.key_derivation as key_derivation
+from wechat_decrypt_tool import key_v4
+from wechat_decrypt_tool.key_derivation import (
+    DERIVED_KEY_CACHE,
+    PAGE_SIZE,
+    RESERVE_SIZE,
+    SALT_SIZE,
+    derive_enc_key,
+    derive_mac_key,
+    find_page1_passphrase,
+    resolve_page1_key_material,
+)
+
+
+PASSPHRASE = bytes.fromhex("9f5dd0d3b6d0477ea5045c9e380ee272e53927993eb548dd98a022e842d5f7bd")
+
+
+def _page1(passphrase: bytes, salt: bytes) -> bytes:
+    # HMAC only covers ciphertext bytes, so an arbitrary body is a valid synthetic page 1.
+    enc_key = derive_enc_key(passphrase, salt)
+    body = bytes(range(256)) * ((PAGE_SIZE - RESERVE_SIZE - SALT_SIZE) // 256 + 1)
+    page = salt + body[: PAGE_SIZE - RESERVE_SIZE - SALT_SIZE] + b"\x11" * 16
+    mac = hmac.new(derive_mac_key(enc_key, salt), digestmod=hashlib.sha512)
+    mac.update(page[SALT_SIZE:])
+    mac.update((1).to_bytes(4, "little"))
+    return page + mac.digest()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("WECHAT_TOOL_DATA_DIR", str(tmp_path / "data"))
+    DERIVED_KEY_CACHE.clear()
+    yield
+    DERIVED_KEY_CACHE.clear()
+
+
+def test_resolve_reuses_memory_and_persisted_derivations(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "db_storage"
+    db_path = root / "message" / "message_0.db"
+    db_path.parent.mkdir(parents=True)
+    page1 = _page1(PASSPHRASE, bytes(range(16)))
+    db_path.write_bytes(page1)
+    expected = derive_enc_key(PASSPHRASE, page1[:SALT_SIZE])
+
+    enc_key, _mac_key, mode = resolve_page1_key_material(
+        PASSPHRASE, page1, database_root=root, database_path=db_path
+    )
+    assert (enc_key, mode) == (expected, "sqlcipher_passphrase")
+    assert len(DERIVED_KEY_CACHE) == 1
+
+    def no_kdf(*_args):
+        raise AssertionError("PBKDF2 should not run for a cached derivation")
+
+    monkeypatch.setattr(key_derivation, "derive_enc_key", no_kdf)
+    assert resolve_page1_key_material(PASSPHRASE, page1)[0] == expected
+
+    # A new process only has the encrypted on-disk cache.
+    DERIVED_KEY_CACHE.clear()
+    resolved = resolve_page1_key_material(PASSPHRASE, page1, database_root=root, database_path=db_path)
+    assert resolved is not None and resolved[0] == expected
+
+    # A wrong passphrase can neither read the persisted entry nor verify page 1.
+    DERIVED_KEY_CACHE.clear()
+    monkeypatch.setattr(key_derivation, "derive_enc_key", derive_enc_key)
+    assert resolve_page1_key_material(b"\x01" * 32, page1, database_root=root, database_path=db_path) is None
+    assert len(DERIVED_KEY_CACHE) == 0
+
+
+def test_parallel_verifier_returns_first_matching_candidate(monkeypatch) -> None:
+    mask = bytes([0x5A]) * 32
+    page1 = _page1(PASSPHRASE, bytes(range(16, 32)))
+    masked = bytes(a ^ b for a, b in zip(PASSPHRASE, mask))
+    candidates = [bytes([i]) * 32 for i in range(1, 4)] + [masked, bytes([9]) * 32]
+    unmask = lambda key: bytes(a ^ b for a, b in zip(key, mask))  # noqa: E731
+
+    assert find_page1_passphrase(candidates, page1, transform=unmask, workers=2) == 3
+    assert find_page1_passphrase(candidates[:3], page1, transform=unmask, workers=2) == -1
+
+    # The verified derivation is cached, so rechecking the winner needs no PBKDF2.
+    monkeypatch.setattr(key_derivation, "derive_enc_key", lambda *_args: b"\0" * 32)
+    assert find_page1_passphrase([masked], page1, transform=unmask, workers=1) == 0
+    assert find_page1_passphrase([key_v4.xor_raw_key(masked, mask)], page1, workers=1) == 0
+    assert key_v4.verify_keys(candidates, page1, mask) == masked.hex()
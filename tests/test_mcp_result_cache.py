@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.mcp.cache import McpResultCache
+from wechat_decrypt_tool.mcp.registry import McpTool, McpToolContext, McpToolRegistry, object_schema
+from wechat_decrypt_tool.mcp.tools import MCP_REGISTRY
+
+
+def _context() -> McpToolContext:
+    return McpToolContext(SimpleNamespace(base_url="http://testserver/"))
+
+
+class TestMcpResultCache(unittest.TestCase):
+    def test_identical_calls_share_one_computation_until_generation_changes(self):
+        generation = {"value": "g1"}
+        calls: list[dict] = []
+        lock = threading.Lock()
+
+        def handler(args, _ctx):
+            with lock:
+                calls.append(dict(args))
+            time.sleep(0.2)
+            if args.get("fail"):
+                return {"status": "error", "message": "boom"}
+            return {"status": "success", "limit": args.get("limit")}
+
+        registry = McpToolRegistry(
+            result_cache=McpResultCache(max_entries=8, ttl_seconds=60),
+            generation=lambda _args: generation["value"],
+        )
+        registry.register(McpTool("t.read", "read", object_schema(additional_properties=True), handler, cacheable=True))
+        registry.register(McpTool("t.live", "live", object_schema(additional_properties=True), handler))
+        ctx = _context()
+
+        def burst(name, args, count):
+            # One event loop per thread, like concurrent MCP requests served by different workers.
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                futures = [pool.submit(asyncio.run, registry.call_tool(name, dict(args), ctx)) for _ in range(count)]
+                return [f.result() for f in futures]
+
+        results = burst("t.read", {"limit": 5, "account": None}, 6)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r["structuredContent"] == {"status": "success", "limit": 5} for r in results))
+
+        # Key order and None-valued arguments do not change the cache key.
+        asyncio.run(registry.call_tool("t.read", {"account": None, "limit": 5}, ctx))
+        self.assertEqual(len(calls), 1)
+
+        generation["value"] = "g2"
+        asyncio.run(registry.call_tool("t.read", {"limit": 5}, ctx))
+        self.assertEqual(len(calls), 2)
+
+        burst("t.read", {"fail": True}, 2)
+        asyncio.run(registry.call_tool("t.read", {"fail": True}, ctx))
+        self.assertEqual(len(calls), 4)
+
+        burst("t.live", {"limit": 5}, 3)
+        self.assertEqual(len(calls), 7)
+
+    def test_batch_runs_read_only_calls_and_reports_per_call_errors(self):
+        payload = {
+            "arguments": {
+                "account": "wxid_demo",
+                "calls": [
+                    {"name": "wechat.media.get_avatar_url", "arguments": {"username": "wxid_a"}},
+                    {"name": "wechat.media.get_avatar_url", "arguments": {"username": "wxid_b", "account": "wxid_other"}},
+                    {"name": "wechat.missing.tool"},
+                    {"name": "wechat.core.batch", "arguments": {"calls": []}},
+                ],
+            }
+        }
+        result = asyncio.run(MCP_REGISTRY.call_tool("wechat.core.batch", payload["arguments"], _context()))
+
+        body = result["structuredContent"]
+        self.assertEqual((body["count"], body["failed"]), (4, 2))
+        first, second, missing, nested = body["results"]
+        self.assertTrue(first["ok"])
+        self.assertEqual(first["result"]["params"], {"account": "wxid_demo", "username": "wxid_a"})
+        self.assertEqual(second["result"]["params"]["account"], "wxid_other")
+        self.assertIn("Unknown tool", missing["error"])
+        self.assertIn("not allowed", nested["error"])
+
+        with self.assertRaises(ValueError):
+            asyncio.run(MCP_REGISTRY.call_tool("wechat.core.batch", {"calls": []}, _context()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import sys
+import unittest
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import metrics as metrics_mod
+from wechat_decrypt_tool.metrics import METRICS, MetricsRegistry
+from wechat_decrypt_tool.perf_trace import RequestMetricsMiddleware, create_perf_trace
+
+
+class _Logger:
+    def info(self, *_args):
+        pass
+
+
+def _series(snapshot: dict, kind: str, name: str) -> list[dict]:
+    return [item for item in snapshot[kind] if item["name"] == name]
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        METRICS.reset()
+
+    def tearDown(self):
+        METRICS.reset()
+
+    def test_histogram_quantiles_and_prometheus_text(self):
+        registry = MetricsRegistry()
+        for _ in range(90):
+            registry.observe("latency_seconds", 0.004, route="/api/x")
+        for _ in range(10):
+            registry.observe("latency_seconds", 0.8, route="/api/x")
+        registry.inc("hits_total", cache="c", result="hit")
+
+        hist = _series(registry.snapshot(), "histograms", "latency_seconds")[0]
+        self.assertEqual(hist["count"], 100)
+        self.assertLessEqual(hist["p50Ms"], 5.0)
+        self.assertGreater(hist["p95Ms"], 500.0)
+        self.assertLessEqual(hist["p99Ms"], 1000.0)
+
+        text = registry.render_prometheus()
+        self.assertIn('latency_seconds_bucket{route="/api/x",le="0.005"} 90', text)
+        self.assertIn('latency_seconds_bucket{route="/api/x",le="+Inf"} 100', text)
+        self.assertIn('latency_seconds_count{route="/api/x"} 100', text)
+        self.assertIn('hits_total{cache="c",result="hit"} 1', text)
+
+    def test_series_past_the_cap_fold_into_one_overflow_series(self):
+        registry = MetricsRegistry(max_series_per_metric=2)
+        for value in ("a", "b", "c", "d"):
+            registry.inc("requests_total", route=value)
+
+        labels = sorted(item["labels"]["route"] for item in registry.snapshot()["counters"])
+        self.assertEqual(labels, [metrics_mod.OVERFLOW_LABEL_VALUE, "a", "b"])
+
+    def test_middleware_labels_by_route_template_and_perf_phases_are_recorded(self):
+        app = FastAPI()
+        app.add_middleware(RequestMetricsMiddleware)
+
+        @app.get("/api/items/{username}")
+        def read_item(username: str):
+            _trace_id, trace = create_perf_trace(_Logger(), "test.items", username=username)
+            trace("loaded")
+            return {"ok": True}
+
+        from wechat_decrypt_tool.routers.health import router as health_router
+
+        app.include_router(health_router)
+        client = TestClient(app)
+        self.assertEqual(client.get("/api/items/wxid_secret").status_code, 200)
+        self.assertEqual(client.get("/api/missing").status_code, 404)
+
+        snapshot = client.get("/api/metrics").json()
+        routes = {item["labels"]["route"]: item for item in _series(snapshot, "counters", "wcda_http_requests_total")}
+        self.assertEqual(routes["/api/items/{username}"]["labels"]["status"], "2xx")
+        self.assertEqual(routes["unmatched"]["labels"]["status"], "4xx")
+        phases = _series(snapshot, "histograms", "wcda_perf_phase_duration_seconds")
+        self.assertEqual([p["labels"] for p in phases], [{"category": "test.items", "phase": "loaded"}])
+
+        text = client.get("/metrics").text
+        self.assertIn("# TYPE wcda_http_request_duration_seconds histogram", text)
+        self.assertNotIn("wxid_secret", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
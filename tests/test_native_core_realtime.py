@@ -17,7 +17,11 @@ from wechat_decrypt_tool import (
     native_core_raw_key_cache,
     native_core_realtime,
 )
-from wechat_decrypt_tool.native_core_client import NativeCoreDatabaseKeyMode
+from wechat_decrypt_tool.native_core_client import (
+    NativeCoreDatabaseKeyMode,
+    encode_native_query_page,
+    parse_native_query_page_columnar,
+)
 
 
 class _RowsPage:
@@ -1051,6 +1055,56 @@ class TestNativeCoreRealtime(unittest.TestCase):
 
                 native_core_realtime.close_account(handle)
 
+    def test_message_batch_merges_shards_and_decodes_only_selected_rows(self) -> None:
+        columns = (
+            "local_id", "server_id", "local_type", "sort_seq", "real_sender_id", "create_time",
+            "message_content", "compress_content", "packed_info_data", "msg_source", "sender_username",
+        )
+
+        newer = encode_native_query_page(columns, [(2, 0, 1, 20, 1, 200, "newest", None, None, None, "wxid_a")])
+        older = bytearray(encode_native_query_page(columns, [(1, 0, 1, 10, 1, 100, "xx", None, None, None, "wxid_a")]))
+        # The dropped candidate carries an undecodable body; it must never be materialized.
+        body = older.index(b"xx")
+        older[body : body + 2] = b"\xff\xfe"
+        pages = {
+            "message_0.db": [parse_native_query_page_columnar(newer, has_more=False)],
+            "message_1.db": [parse_native_query_page_columnar(bytes(older), has_more=False)],
+        }
+
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            context = _make_context(root, 77)
+            shard_0, shard_1 = root / "message_0.db", root / "message_1.db"
+            state = native_core_realtime._MessageCursor(
+                cursor=991,
+                account_handle=context.handle,
+                username="wxid_a",
+                batch_size=1,
+                ascending=False,
+                begin_timestamp=0,
+                end_timestamp=0,
+                tables=((shard_0, "Msg_a"), (shard_1, "Msg_a")),
+            )
+            with native_core_realtime._registry_lock:
+                native_core_realtime._accounts[context.handle] = context
+                native_core_realtime._message_cursors[state.cursor] = state
+            try:
+                with patch.object(
+                    native_core_realtime,
+                    "_query_columns",
+                    side_effect=lambda _context, path, _sql: pages[path.name],
+                ):
+                    rows, has_more = native_core_realtime.fetch_message_batch(context.handle, state.cursor)
+            finally:
+                with native_core_realtime._registry_lock:
+                    native_core_realtime._accounts.pop(context.handle, None)
+                    native_core_realtime._message_cursors.pop(state.cursor, None)
+
+        self.assertTrue(has_more)
+        self.assertEqual([row["message_content"] for row in rows], ["newest"])
+        self.assertEqual((rows[0]["db_name"], rows[0]["table_name"]), ("message_0.db", "Msg_a"))
+        self.assertEqual(list(state.last_by_path.values()), [(200, 20, 2)])
+
     def test_raw_sql_and_realtime_api_do_not_expose_database_mutations(self) -> None:
         with TemporaryDirectory() as td:
             db_storage = Path(td) / "db_storage"
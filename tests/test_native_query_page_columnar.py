@@ -0,0 +1,88 @@
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from wechat_decrypt_tool import native_core_client as core
+
+
+_COLUMNS = ("local_id", "score", "message_content", "compress_content", "note")
+_ROWS = [
+    (1, 0.5, "你好", b"\x00\x01", None),
+    (-(2**63), -1.25, "", b"", "x"),
+    (2**63 - 1, None, None, None, None),
+]
+
+
+class TestNativeQueryPageColumnar(unittest.TestCase):
+    def test_round_trip_matches_the_row_decoder(self):
+        payload = core.encode_native_query_page(_COLUMNS, _ROWS)
+        page = core.parse_native_query_page(payload, has_more=True)
+        columnar = core.parse_native_query_page_columnar(memoryview(payload), has_more=True)
+
+        self.assertEqual(page.rows, tuple(_ROWS))
+        self.assertEqual(columnar.rows, page.rows)
+        self.assertEqual(columnar.records(), page.records())
+        self.assertTrue(columnar.has_more)
+        self.assertEqual(len(columnar), 3)
+        self.assertEqual(columnar.column("local_id"), [1, -(2**63), 2**63 - 1])
+        self.assertEqual(columnar.named_columns()["compress_content"], [b"\x00\x01", b"", None])
+        self.assertEqual(columnar.row(-1), _ROWS[-1])
+
+    def test_text_is_decoded_only_when_its_column_is_read(self):
+        payload = bytearray(core.encode_native_query_page(("id", "text"), [(7, "ab")]))
+        payload[-2:] = b"\xff\xfe"
+
+        columnar = core.parse_native_query_page_columnar(bytes(payload), has_more=False)
+        self.assertEqual(columnar.column("id"), [7])
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "not UTF-8"):
+            columnar.column("text")
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "not UTF-8"):
+            core.parse_native_query_page(bytes(payload), has_more=False)
+
+    def test_single_record_decodes_only_its_own_cells(self):
+        payload = bytearray(core.encode_native_query_page(("id", "text"), [(1, "ok"), (2, "ab")]))
+        payload[-2:] = b"\xff\xfe"
+        columnar = core.parse_native_query_page_columnar(bytes(payload), has_more=False)
+
+        self.assertEqual(columnar.record(0), {"id": 1, "text": "ok"})
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "not UTF-8"):
+            columnar.record(-1)
+        with self.assertRaises(IndexError):
+            columnar.record(2)
+
+    def test_framing_errors_are_rejected_while_indexing(self):
+        payload = core.encode_native_query_page(_COLUMNS, _ROWS)
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "truncated"):
+            core.parse_native_query_page_columnar(payload[:-1], has_more=False)
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "trailing data"):
+            core.parse_native_query_page_columnar(payload + b"\x00", has_more=False)
+
+        bad_cell = bytearray(core.encode_native_query_page(("id",), [(None,)]))
+        bad_cell[-1] = 9
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "unknown cell type 9"):
+            core.parse_native_query_page_columnar(bytes(bad_cell), has_more=False)
+
+        duplicate = core.parse_native_query_page_columnar(
+            core.encode_native_query_page(("a", "a"), [(1, 2)]), has_more=False
+        )
+        self.assertEqual(duplicate.rows, ((1, 2),))
+        with self.assertRaisesRegex(core.NativeCoreProtocolError, "duplicate column"):
+            duplicate.records()
+
+    def test_benchmark_page_builder_fits_a_native_page(self):
+        import bench_native_query_page
+
+        payload = bench_native_query_page.build_page(512, text_bytes=64, blob_bytes=32, seed=1)
+        columnar = core.parse_native_query_page_columnar(payload, has_more=False)
+        self.assertLessEqual(len(payload), 768 * 1024)
+        self.assertEqual(columnar.rows, core.parse_native_query_page(payload, has_more=False).rows)
+        self.assertEqual(columnar.column("local_id")[:3], [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,9 +37,9 @@ class TestRecordExport(unittest.TestCase):
     def test_favorites_loader_always_requests_realtime(self):
         calls = []
 
-        def fake_list_favorites(**kwargs):
+        def fake_iter_favorite_pages(**kwargs):
             calls.append(kwargs)
-            return {
+            yield {
                 "account": "wxid_test",
                 "dataSource": "realtime",
                 "items": [],
@@ -52,7 +52,7 @@ class TestRecordExport(unittest.TestCase):
             format="json",
             output_dir="C:\\temp",
         )
-        with patch.object(record_export, "list_favorites", side_effect=fake_list_favorites):
+        with patch.object(record_export, "iter_favorite_pages", side_effect=fake_iter_favorite_pages):
             items, meta = record_export._load_records(_request(), req)
 
         self.assertEqual(items, [])
@@ -329,7 +329,7 @@ class TestRecordExport(unittest.TestCase):
                             output_dir=str(output_dir),
                             file_name=f"unsafe/name.{fmt}",
                         )
-                        with patch.object(record_export, "_load_records", return_value=(source_items, source_meta)):
+                        with patch.object(record_export, "_iter_record_pages", return_value=iter([(source_meta, source_items)])):
                             response = record_export.export_records(_request(), req)
 
                         path = Path(response["outputPath"])
@@ -395,7 +395,7 @@ class TestRecordExport(unittest.TestCase):
                 file_name="收藏备份",
             )
             with (
-                patch.object(record_export, "_load_records", return_value=(source_items, source_meta)),
+                patch.object(record_export, "_iter_record_pages", return_value=iter([(source_meta, source_items)])),
                 patch.object(record_export, "export_prepared_chat_archive", return_value=fake_job) as archive_export,
             ):
                 response = record_export.export_records(_request(), req)
@@ -0,0 +1,198 @@
+import io
+import json
+import sys
+import threading
+import time
+import unittest
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from starlette.requests import Request
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.chat_export_service import _ZipIntegrityWriter
+from wechat_decrypt_tool.routers import record_export
+
+
+def _request() -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/api/records/exports",
+            "headers": [],
+        }
+    )
+
+
+def _payments(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "kind": "transfer",
+            "transferId": f"t{i}",
+            "transferState": "received" if i % 2 else "expired",
+            "lastUpdateTimeText": f"2026-01-01 00:00:{i % 60:02d}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _wait_for(job_id: str, statuses: set[str]) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = record_export.get_record_export(job_id)["job"]
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {statuses}")
+
+
+def _fake_sidecars(path, _export_id):
+    return path.with_name(path.name + ".manifest.json"), path.with_name(path.name + ".sig")
+
+
+class TestRecordExportJobs(unittest.TestCase):
+    def test_streaming_writers_match_in_memory_renderers(self):
+        header = {"dataset": "payments", "account": "wxid_test", "dataSource": "realtime", "types": []}
+        items = _payments(0, 5)
+        with TemporaryDirectory() as td:
+            root = Path(td)
+            json_path = root / "out.json"
+            self.assertEqual(record_export._write_json_stream(json_path, header, [items[:2], items[2:]]), 5)
+            self.assertEqual(json.loads(json_path.read_text(encoding="utf-8")), {**header, "items": items, "count": 5})
+
+            empty_path = root / "empty.json"
+            self.assertEqual(record_export._write_json_stream(empty_path, header, []), 0)
+            self.assertEqual(json.loads(empty_path.read_text(encoding="utf-8"))["items"], [])
+
+            txt_path = root / "out.txt"
+            record_export._write_txt_stream(txt_path, header, [items[:3], items[3:]])
+            expected = record_export._render_txt({**header, "items": items})
+            self.assertEqual(txt_path.read_text(encoding="utf-8").rstrip() + "\n", expected)
+
+            xlsx_path = root / "out.xlsx"
+            self.assertEqual(record_export._write_excel_stream(xlsx_path, "payments", iter([items])), 5)
+            with zipfile.ZipFile(xlsx_path) as archive:
+                self.assertIn('<row r="6">', archive.read("xl/worksheets/sheet1.xml").decode("utf-8"))
+            self.assertEqual(sorted(p.name for p in root.iterdir()), ["empty.json", "out.json", "out.txt", "out.xlsx"])
+
+    def test_biz_pages_follow_the_keyset_cursor(self):
+        calls = []
+
+        def fake_biz_messages(**kwargs):
+            calls.append(kwargs)
+            if "before_time" not in kwargs:
+                return {
+                    "data": [{"local_id": 9}],
+                    "scanned": 1,
+                    "hasMore": True,
+                    "nextCursor": {"beforeTime": 90, "beforeLocalId": 9},
+                }
+            return {"data": [{"local_id": 8}], "scanned": 1, "hasMore": False}
+
+        req = record_export.RecordExportRequest(dataset="biz", username="gh_test", output_dir="C:\\temp")
+        with patch.object(record_export, "get_biz_messages", side_effect=fake_biz_messages):
+            items, _meta = record_export._load_records(_request(), req)
+
+        self.assertEqual([item["local_id"] for item in items], [9, 8])
+        self.assertEqual((calls[1]["offset"], calls[1]["before_time"], calls[1]["before_local_id"]), (0, 90, 9))
+
+    def test_background_job_streams_pages_and_reports_progress(self):
+        pages = [({"account": "wxid_test", "total": 6}, _payments(0, 3)), ({}, _payments(3, 3))]
+        with TemporaryDirectory() as td, patch.object(
+            record_export, "_iter_record_pages", return_value=iter(pages)
+        ), patch.object(record_export, "load_wce_integrity_native"), patch.object(
+            record_export, "write_file_integrity_sidecars", side_effect=_fake_sidecars
+        ):
+            req = record_export.RecordExportRequest(
+                account="wxid_test",
+                dataset="payments",
+                format="json",
+                types=["received"],
+                output_dir=td,
+                file_name="payments",
+            )
+            created = record_export.create_record_export(_request(), req)["job"]
+            job = _wait_for(created["exportId"], {"done", "error", "cancelled"})
+
+            self.assertEqual(job["status"], "done", msg=job["error"])
+            self.assertEqual(
+                job["progress"],
+                {"recordsTotal": 6, "recordsScanned": 6, "recordsExported": 3},
+            )
+            payload = json.loads(Path(job["outputPath"]).read_text(encoding="utf-8"))
+            self.assertEqual([item["transferId"] for item in payload["items"]], ["t1", "t3", "t5"])
+            self.assertEqual(payload["count"], 3)
+
+    def test_cancel_stops_between_pages_and_removes_partial_output(self):
+        released = threading.Event()
+
+        def slow_pages(*_args, **_kwargs):
+            yield {"account": "wxid_test"}, _payments(0, 2)
+            released.wait(5)
+            yield {}, _payments(2, 2)
+
+        with TemporaryDirectory() as td, patch.object(
+            record_export, "_iter_record_pages", side_effect=slow_pages
+        ), patch.object(record_export, "load_wce_integrity_native"):
+            req = record_export.RecordExportRequest(
+                account="wxid_test", dataset="payments", format="txt", output_dir=td, file_name="partial"
+            )
+            created = record_export.create_record_export(_request(), req)["job"]
+            _wait_for(created["exportId"], {"running"})
+            cancelled = record_export.cancel_record_export(created["exportId"])["job"]
+            self.assertTrue(cancelled["cancelRequested"])
+            released.set()
+
+            job = _wait_for(created["exportId"], {"done", "error", "cancelled"})
+            self.assertEqual(job["status"], "cancelled")
+            self.assertEqual(list(Path(td).iterdir()), [])
+
+        with self.assertRaises(record_export.HTTPException):
+            record_export.get_record_export("missing")
+
+    def test_finished_jobs_are_pruned_by_age_and_count(self):
+        now = int(time.time())
+        jobs = {
+            "running": record_export.RecordExportJob("running", status="running", updated_at=now - 7200),
+            "expired": record_export.RecordExportJob("expired", status="done", updated_at=now - 7200),
+        }
+        for i in range(record_export._MAX_FINISHED_JOBS + 2):
+            jobs[f"done{i}"] = record_export.RecordExportJob(f"done{i}", status="error", updated_at=now - 100 + i)
+
+        with patch.dict(record_export._JOBS, jobs, clear=True):
+            with record_export._JOBS_LOCK:
+                record_export._prune_finished_jobs_locked(now)
+            remaining = set(record_export._JOBS)
+
+        self.assertIn("running", remaining)
+        self.assertNotIn("expired", remaining)
+        self.assertNotIn("done0", remaining)
+        self.assertNotIn("done1", remaining)
+        self.assertEqual(len(remaining), record_export._MAX_FINISHED_JOBS + 1)
+
+    def test_chat_archive_stores_precompressed_media_without_deflate(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as raw:
+            zf = _ZipIntegrityWriter(raw)
+            zf.writestr("media/images/a.jpg", b"\xff\xd8" + b"\0" * 4096)
+            zf.writestr("conversations/messages.json", "{}" * 2048)
+            zf.writestr("media/files/report.bin", b"\0" * 4096, compress_type=zipfile.ZIP_DEFLATED)
+
+        with zipfile.ZipFile(buffer) as archive:
+            kinds = {info.filename: info.compress_type for info in archive.infolist()}
+        self.assertEqual(kinds["media/images/a.jpg"], zipfile.ZIP_STORED)
+        self.assertEqual(kinds["conversations/messages.json"], zipfile.ZIP_DEFLATED)
+        self.assertEqual(kinds["media/files/report.bin"], zipfile.ZIP_DEFLATED)
+        self.assertEqual(len(zf.integrity_entries()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
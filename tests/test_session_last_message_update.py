@@ -0,0 +1,129 @@
+import hashlib
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import session_last_message as slm
+
+
+def _msg_table(username: str) -> str:
+    return "Msg_" + hashlib.md5(username.encode("utf-8")).hexdigest()
+
+
+def _seed_account(account_dir: Path, usernames: list[str]) -> None:
+    conn = sqlite3.connect(str(account_dir / "session.db"))
+    try:
+        conn.execute(
+            "CREATE TABLE SessionTable(username TEXT PRIMARY KEY, is_hidden INTEGER, summary TEXT, draft TEXT, "
+            "last_msg_type INTEGER, last_msg_sub_type INTEGER, sort_timestamp INTEGER, last_timestamp INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO SessionTable VALUES (?, 0, '', '', 1, 0, 100, 100)",
+            [(u,) for u in usernames],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(str(account_dir / "message_0.db"))
+    try:
+        conn.execute("CREATE TABLE Name2Id(user_name TEXT)")
+        for username in usernames:
+            conn.execute("INSERT INTO Name2Id(user_name) VALUES (?)", (username,))
+            conn.execute(
+                f'CREATE TABLE "{_msg_table(username)}"(local_id INTEGER PRIMARY KEY, local_type INTEGER, '
+                "sort_seq INTEGER, create_time INTEGER, message_content TEXT, compress_content BLOB, "
+                "real_sender_id INTEGER)"
+            )
+            conn.execute(
+                f'INSERT INTO "{_msg_table(username)}" VALUES (1, 1, 100000, 100, ?, NULL, 1)',
+                (f"hello from {username}",),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _previews(account_dir: Path) -> dict[str, tuple[str, int]]:
+    conn = sqlite3.connect(str(account_dir / "session.db"))
+    try:
+        return {
+            row[0]: (row[1], row[2])
+            for row in conn.execute("SELECT username, preview, local_id FROM session_last_message")
+        }
+    finally:
+        conn.close()
+
+
+class TestSessionLastMessageUpdate(unittest.TestCase):
+    def test_update_recomputes_only_touched_sessions(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "wxid_me"
+            account_dir.mkdir(parents=True)
+            _seed_account(account_dir, ["wxid_a", "wxid_b", "wxid_c"])
+
+            built = slm.build_session_last_message_table(account_dir, rebuild=True)
+            self.assertEqual(built["built"], 3)
+            self.assertEqual(_previews(account_dir)["wxid_a"], ("hello from wxid_a", 1))
+
+            conn = sqlite3.connect(str(account_dir / "message_0.db"))
+            try:
+                for username in ("wxid_a", "wxid_b"):
+                    conn.execute(
+                        f'INSERT INTO "{_msg_table(username)}" VALUES (2, 1, 200000, 200, ?, NULL, 1)',
+                        (f"newer for {username}",),
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+            conn = sqlite3.connect(str(account_dir / "session.db"))
+            try:
+                conn.execute("DELETE FROM SessionTable WHERE username = 'wxid_c'")
+                conn.commit()
+            finally:
+                conn.close()
+
+            result = slm.update_session_last_messages(account_dir, ["wxid_a", "wxid_c", "", "wxid_a"])
+
+            self.assertEqual((result["updated"], result["removed"]), (1, 1))
+            previews = _previews(account_dir)
+            self.assertEqual(previews["wxid_a"], ("newer for wxid_a", 2))
+            # Untouched sessions keep their cached row until they are reported as touched.
+            self.assertEqual(previews["wxid_b"], ("hello from wxid_b", 1))
+            self.assertNotIn("wxid_c", previews)
+            self.assertEqual(slm.load_session_last_messages(account_dir, ["wxid_a"]), {"wxid_a": "newer for wxid_a"})
+
+    def test_missing_sessions_are_filled_once_per_session_db_state(self):
+        with TemporaryDirectory() as td:
+            account_dir = Path(td) / "wxid_me"
+            account_dir.mkdir(parents=True)
+            _seed_account(account_dir, ["wxid_a"])
+            slm.build_session_last_message_table(account_dir, rebuild=True)
+
+            with patch.object(slm, "update_session_last_messages", wraps=slm.update_session_last_messages) as update:
+                # wxid_ghost is not in SessionTable, so no row is ever written for it.
+                self.assertEqual(slm.fill_missing_session_last_messages(account_dir, ["wxid_ghost"]), ["wxid_ghost"])
+                self.assertEqual(slm.fill_missing_session_last_messages(account_dir, ["wxid_ghost"]), [])
+                self.assertEqual(update.call_count, 1)
+
+                conn = sqlite3.connect(str(account_dir / "session.db"))
+                try:
+                    conn.execute("INSERT INTO SessionTable VALUES ('wxid_ghost', 0, 'hi', '', 1, 0, 300, 300)")
+                    conn.commit()
+                finally:
+                    conn.close()
+
+                self.assertEqual(slm.fill_missing_session_last_messages(account_dir, ["wxid_ghost"]), ["wxid_ghost"])
+                self.assertEqual(update.call_count, 2)
+            self.assertEqual(slm.load_session_last_messages(account_dir, ["wxid_ghost"]), {"wxid_ghost": "hi"})
+
+
+if __name__ == "__main__":
+    unittest.main()
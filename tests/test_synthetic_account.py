@@ -0,0 +1,68 @@
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import bench_suite
+from synthetic_account import SyntheticAccountSpec, generate_synthetic_account, msg_table_name
+from wechat_decrypt_tool import wechat_decrypt
+from wechat_decrypt_tool.media_helpers import _decrypt_wechat_dat_v3, _decrypt_wechat_dat_v4
+
+
+_TINY = SyntheticAccountSpec(contacts=8, chats=4, messages_per_chat=40, media_files=4, media_bytes=4096, min_db_pages=12)
+
+
+class TestSyntheticAccount(unittest.TestCase):
+    def test_generated_databases_decrypt_back_to_the_plain_copies(self):
+        with TemporaryDirectory() as td:
+            account = generate_synthetic_account(Path(td) / "a", _TINY)
+            again = generate_synthetic_account(Path(td) / "b", _TINY)
+            self.assertEqual(
+                [p.read_bytes() for p in account.encrypted_dbs],
+                [p.read_bytes() for p in again.encrypted_dbs],
+            )
+
+            message_db = account.encrypted_dbs[-1]
+            self.assertGreaterEqual(message_db.stat().st_size // wechat_decrypt.PAGE_SIZE, 12)
+            decryptor = wechat_decrypt.WeChatDatabaseDecryptor(_TINY.key_hex)
+            out = Path(td) / "out.db"
+            self.assertTrue(decryptor.decrypt_database(str(message_db), str(out)))
+            self.assertEqual(out.read_bytes(), account.plain_dbs[-1].read_bytes())
+
+            conn = sqlite3.connect(str(out))
+            try:
+                username = account.chat_usernames[0]
+                names = {r[0] for r in conn.execute("SELECT user_name FROM Name2Id")}
+                self.assertIn(username, names)
+                blobs = conn.execute(
+                    f'SELECT count(*) FROM "{msg_table_name(username)}" WHERE typeof(message_content) = \'blob\''
+                ).fetchone()[0]
+            finally:
+                conn.close()
+            self.assertGreater(blobs, 0)
+
+            v3 = _decrypt_wechat_dat_v3(account.media_v3[0].read_bytes(), account.image_xor_key)
+            v4 = _decrypt_wechat_dat_v4(account.media_v4[0].read_bytes(), account.image_xor_key, account.image_aes_key)
+            for image in (v3, v4):
+                self.assertTrue(image.startswith(b"\xff\xd8\xff"))
+                self.assertTrue(image.endswith(b"\xff\xd9"))
+                self.assertEqual(len(image), _TINY.media_bytes)
+
+    def test_baseline_comparison_flags_only_slow_cases(self):
+        results = {"fast": {"p50Ms": 10.0}, "slow": {"p50Ms": 20.0}, "new": {"p50Ms": 5.0}}
+        baseline = {"fast": {"p50Ms": 9.0}, "slow": {"p50Ms": 10.0}}
+
+        regressions = bench_suite.compare_to_baseline(results, baseline, threshold=0.25)
+
+        self.assertEqual([r["case"] for r in regressions], ["slow"])
+        self.assertEqual(results["fast"]["ratio"], 1.111)
+
+
+if __name__ == "__main__":
+    unittest.main()
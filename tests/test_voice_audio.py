@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import voice_audio  # noqa: E402
+
+
+HAS_PILK = importlib.util.find_spec("pilk") is not None
+
+
+def _encode_silk(seconds: float = 1.0) -> bytes:
+    import pilk
+
+    samples = int(24000 * seconds)
+    pcm = b"".join(struct.pack("<h", int(6000 * math.sin(index / 9.0))) for index in range(samples))
+    with tempfile.TemporaryDirectory() as tmp:
+        pcm_path = Path(tmp) / "in.pcm"
+        silk_path = Path(tmp) / "out.silk"
+        pcm_path.write_bytes(pcm)
+        pilk.encode(str(pcm_path), str(silk_path), pcm_rate=24000, tencent=True)
+        return silk_path.read_bytes()
+
+
+@unittest.skipUnless(HAS_PILK, "pilk is required for SILK decoding")
+class TestVoiceAudioDecode(unittest.TestCase):
+    def test_silk_decodes_to_pcm_and_wav_without_touching_temp_dir(self):
+        silk = _encode_silk(1.0)
+        with tempfile.TemporaryDirectory() as scratch_root, patch.object(
+            voice_audio.tempfile,
+            "gettempdir",
+            return_value=scratch_root,
+        ):
+            pcm = voice_audio.decode_silk_to_pcm(silk, rate=16000)
+            with patch.object(voice_audio, "find_ffmpeg_executable", return_value=""):
+                payload, ext, media_type = voice_audio.convert_silk_to_browser_audio(silk, preferred_format="mp3")
+            leftovers = list(Path(scratch_root).rglob("*")) if voice_audio._memfd_available() else []
+
+        self.assertEqual(len(pcm), 16000 * 2)
+        self.assertEqual((ext, media_type), ("wav", "audio/wav"))
+        self.assertTrue(payload.startswith(b"RIFF"))
+        self.assertEqual(voice_audio.wav_to_pcm(payload)[1], 24000)
+        self.assertEqual(leftovers, [])
+
+    def test_scratch_fallback_reuses_one_file_pair_per_thread(self):
+        silk = _encode_silk(0.5)
+        with tempfile.TemporaryDirectory() as scratch_root, patch.object(
+            voice_audio.tempfile,
+            "gettempdir",
+            return_value=scratch_root,
+        ), patch.object(voice_audio, "_memfd_available", return_value=False), patch.object(
+            voice_audio,
+            "_SCRATCH_LOCAL",
+            voice_audio.threading.local(),
+        ):
+            first = voice_audio.decode_silk_to_pcm(silk)
+            second = voice_audio.decode_silk_to_pcm(silk)
+            files = sorted(path.suffix for path in (Path(scratch_root) / "wechat_voice_scratch").iterdir())
+
+        self.assertEqual(first, second)
+        self.assertEqual(files, [".pcm", ".silk"])
+
+
+class TestVoiceAudioCache(unittest.TestCase):
+    def test_encoded_voice_is_served_from_cache_without_reconverting(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            voice_audio,
+            "convert_silk_to_browser_audio",
+            return_value=(b"ID3-mp3", "mp3", "audio/mpeg"),
+        ) as convert:
+            account_dir = Path(tmp)
+            first = voice_audio.convert_voice_for_browser(account_dir, 7, b"silk")
+            second = voice_audio.convert_voice_for_browser(account_dir, 7, b"silk")
+            cached = voice_audio.lookup_cached_voice_audio(account_dir, 7)
+
+        self.assertEqual(first, (b"ID3-mp3", "mp3", "audio/mpeg"))
+        self.assertEqual(second, first)
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(cached[1:], ("mp3", "audio/mpeg"))
+
+    def test_raw_silk_fallback_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            voice_audio,
+            "convert_silk_to_browser_audio",
+            return_value=(b"silk", "silk", "audio/silk"),
+        ):
+            voice_audio.convert_voice_for_browser(Path(tmp), 8, b"silk")
+            self.assertIsNone(voice_audio.lookup_cached_voice_audio(Path(tmp), 8))
+
+    def test_cache_evicts_least_recently_used_entries_over_budget(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            os.environ,
+            {"WECHAT_TOOL_VOICE_AUDIO_CACHE_MB": "1"},
+        ):
+            account_dir = Path(tmp)
+            chunk = b"ID3" + bytes(300 * 1024)
+            for sid in (1, 2, 3):
+                voice_audio.store_voice_audio(account_dir, sid, "mp3", chunk)
+                cache_file = account_dir / "_cache" / "voice_audio" / f"{sid}.mp3"
+                os.utime(cache_file, (sid, sid))
+            voice_audio.store_voice_audio(account_dir, 4, "mp3", chunk)
+            remaining = sorted(path.name for path in (account_dir / "_cache" / "voice_audio").iterdir())
+
+        self.assertEqual(remaining, ["3.mp3", "4.mp3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool.voice_transcription import (  # noqa: E402
+    VOICE_PCM_SAMPLE_RATE,
+    VoiceTranscriptionBatchManager,
+    VoiceTranscriptionConfig,
+    VoiceTranscriptionService,
+    _bucket_voice_batch_clips,
+    _VoiceBatchClip,
+)
+
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _pcm(seconds: float) -> bytes:
+    return bytes(int(seconds * VOICE_PCM_SAMPLE_RATE) * 2)
+
+
+def _fake_decode(data: bytes) -> bytes:
+    # Test payloads are b"voice:<seconds>"; the real decoder runs pilk.
+    text = bytes(data).decode("ascii")
+    if not text.startswith("voice:"):
+        return b""
+    return _pcm(float(text.split(":", 1)[1]))
+
+
+class _FakeBatchedPipeline:
+    """Emits one segment per clip_timestamps entry, like faster-whisper without timestamps."""
+
+    def __init__(self, calls: list[dict]) -> None:
+        self.calls = calls
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append({"samples": int(audio.shape[0]), **kwargs})
+        segments = [
+            SimpleNamespace(start=round(stamp["start"], 3), end=round(stamp["end"], 3), text=f" 片段{index}")
+            for index, stamp in enumerate(kwargs["clip_timestamps"])
+        ]
+        return iter(segments), SimpleNamespace(language="zh", duration=audio.shape[0] / VOICE_PCM_SAMPLE_RATE)
+
+
+class _UnusedModel:
+    def transcribe(self, path, **kwargs):
+        return iter([SimpleNamespace(text="单条")]), SimpleNamespace(language="zh", duration=1.0)
+
+
+def _service(calls: list[dict], *, batch_size: int = 4, pipeline_factory=None) -> VoiceTranscriptionService:
+    return VoiceTranscriptionService(
+        VoiceTranscriptionConfig(model="small", language="zh", batch_size=batch_size),
+        model_loader=lambda _config: _UnusedModel(),
+        batched_pipeline_factory=pipeline_factory or (lambda _model: _FakeBatchedPipeline(calls)),
+    )
+
+
+class TestVoiceBatchConfig(unittest.TestCase):
+    def _from_env(self, device: str, env: dict[str, str]) -> VoiceTranscriptionConfig:
+        with patch.dict(os.environ, env, clear=False), patch(
+            "wechat_decrypt_tool.voice_transcription.read_effective_voice_transcription_device",
+            return_value=(device, "test"),
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.read_effective_voice_transcription_model",
+            return_value=("small", "test"),
+        ):
+            return VoiceTranscriptionConfig.from_env()
+
+    def test_cpu_defaults_to_batched_inference_and_one_opts_out(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("WECHAT_TOOL_WHISPER_BATCH_SIZE", None)
+            self.assertEqual(self._from_env("cpu", {}).batch_size, 8)
+            self.assertEqual(self._from_env("cuda", {}).batch_size, 1)
+        self.assertEqual(self._from_env("cpu", {"WECHAT_TOOL_WHISPER_BATCH_SIZE": "1"}).batch_size, 1)
+        self.assertEqual(self._from_env("cpu", {"WECHAT_TOOL_WHISPER_BATCH_SIZE": "16"}).batch_size, 16)
+
+
+class TestVoiceBatchBuckets(unittest.TestCase):
+    def test_clips_are_grouped_by_duration_bucket_and_batch_size(self):
+        clips = [
+            _VoiceBatchClip(server_id=sid, source_hash=str(sid), pcm=_pcm(seconds))
+            for sid, seconds in [(1, 2.0), (2, 12.0), (3, 3.0), (4, 4.0), (5, 13.0), (6, 45.0)]
+        ]
+
+        batches = _bucket_voice_batch_clips(clips, 2)
+
+        self.assertEqual([[clip.server_id for clip in batch] for batch in batches], [[1, 3], [4], [2, 5], [6]])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is installed alongside faster-whisper")
+class TestVoiceBatchService(unittest.TestCase):
+    def test_batch_results_are_demultiplexed_and_cached_in_bulk(self):
+        calls: list[dict] = []
+        service = _service(calls)
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "wechat_decrypt_tool.voice_transcription.decode_voice_pcm",
+            side_effect=_fake_decode,
+        ):
+            account_dir = Path(tmp)
+            voices = [(11, b"voice:2"), (12, b"voice:3"), (13, b"voice:40"), (14, b"")]
+            first = service.transcribe_voice_batch(account_dir=account_dir, voices=voices)
+            second = service.transcribe_voice_batch(account_dir=account_dir, voices=voices)
+            conn = sqlite3.connect(str(account_dir / "_cache" / "voice_transcripts.sqlite3"))
+            try:
+                cached_rows = conn.execute("SELECT COUNT(*) FROM transcript").fetchone()[0]
+            finally:
+                conn.close()
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0]["batch_size"], 4)
+        self.assertFalse(calls[0]["vad_filter"])
+        self.assertEqual(len(calls[0]["clip_timestamps"]), 2)
+        self.assertEqual(len(calls[1]["clip_timestamps"]), 2)
+        self.assertEqual(first[11]["text"], "片段0")
+        self.assertEqual(first[12]["text"], "片段1")
+        self.assertEqual(first[13]["text"], "片段0片段1")
+        self.assertAlmostEqual(first[13]["duration"], 40.0)
+        self.assertEqual(first[14]["status"], "error")
+        self.assertEqual(first[14]["code"], "voice_not_found")
+        self.assertEqual(cached_rows, 3)
+        self.assertTrue(all(second[sid]["cached"] for sid in (11, 12, 13)))
+
+    def test_failed_batch_falls_back_to_single_clip_transcription(self):
+        class BrokenPipeline:
+            def transcribe(self, audio, **kwargs):
+                raise RuntimeError("batch failed")
+
+        service = _service([], pipeline_factory=lambda _model: BrokenPipeline())
+        with tempfile.TemporaryDirectory() as tmp, patch(
+            "wechat_decrypt_tool.voice_transcription.decode_voice_pcm",
+            side_effect=_fake_decode,
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription._convert_silk_to_browser_audio",
+            return_value=(b"RIFF-WAV", "wav", "audio/wav"),
+        ):
+            results = service.transcribe_voice_batch(
+                account_dir=Path(tmp),
+                voices=[(21, b"voice:2"), (22, b"voice:3")],
+            )
+
+        self.assertEqual({sid: result["text"] for sid, result in results.items()}, {21: "单条", 22: "单条"})
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is installed alongside faster-whisper")
+class TestVoiceBatchManagerBatchedInference(unittest.TestCase):
+    def test_batch_size_routes_job_through_batched_pipeline(self):
+        calls: list[dict] = []
+        service = _service(calls, batch_size=8)
+        manager = VoiceTranscriptionBatchManager(service_getter=lambda: service)
+        voices = {1: b"voice:2", 2: b"voice:4", 3: b"voice:11", 4: b"broken"}
+
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            service,
+            "ensure_available",
+            return_value={"available": True},
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.list_voice_server_ids",
+            return_value=sorted(voices),
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.list_native_voice_transcripts",
+            return_value={},
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.load_voice_data",
+            side_effect=lambda _account_dir, sid: voices[sid],
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.decode_voice_pcm",
+            side_effect=_fake_decode,
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription.create_voice_decode_executor",
+            return_value=None,
+        ), patch(
+            "wechat_decrypt_tool.voice_transcription._convert_silk_to_browser_audio",
+            return_value=(b"", "silk", "audio/silk"),
+        ):
+            job = manager.start(account="wxid_demo", account_dir=Path(tmp))
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                job = manager.get(job["jobId"])
+                if job["status"] not in {"queued", "running"}:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["completed"], 4)
+        self.assertEqual(job["success"], 3)
+        self.assertEqual(job["failed"], 1)
+        self.assertEqual(job["concurrency"], 1)
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import chat_realtime_reader, wcdb_realtime
+
+
+class _FakeNative:
+    """Stands in for native-core: hands out handles and records which handle ran each query."""
+
+    def __init__(self, *, first_handle: int = 101, fail_open: bool = False) -> None:
+        self._next = first_handle
+        self.fail_open = fail_open
+        self.alive: set[int] = set()
+        self.closed: list[int] = []
+        self.queries: list[int] = []
+        self._mu = threading.Lock()
+
+    def open(self) -> int:
+        if self.fail_open:
+            raise RuntimeError("no more handles")
+        with self._mu:
+            handle = self._next
+            self._next += 1
+            self.alive.add(handle)
+            return handle
+
+    def close(self, handle: int) -> None:
+        self.alive.discard(handle)
+        self.closed.append(handle)
+
+    def is_alive(self, handle: int) -> bool:
+        return handle in self.alive
+
+    def exec_query(self, handle: int, *, kind: str, path: str, sql: str):
+        self.queries.append(int(handle))
+        if "sqlite_master" in sql:
+            return [{"name": "Msg_fixture"}]
+        return []
+
+
+def _connection(native: _FakeNative, *, max_handles: int = 2) -> wcdb_realtime.WCDBRealtimeConnection:
+    pool = wcdb_realtime.WCDBReadHandlePool(
+        native.open,
+        max_handles=max_handles,
+        closer=native.close,
+        is_alive=native.is_alive,
+    )
+    return wcdb_realtime.WCDBRealtimeConnection(
+        account="wxid_me",
+        native_wxid="wxid_me",
+        handle=1,
+        db_storage_dir=Path("."),
+        session_db_path=Path("session.db"),
+        connected_at=time.time(),
+        lock=threading.Lock(),
+        readers=pool,
+    )
+
+
+class TestWCDBReadHandlePool(unittest.TestCase):
+    def test_interactive_read_does_not_wait_for_the_sync_lane(self):
+        native = _FakeNative()
+        conn = _connection(native)
+        got: list[int] = []
+
+        def read():
+            with wcdb_realtime.read_handle(conn) as handle:
+                got.append(handle)
+
+        with conn.lock:  # a bulk sync holds the writer/sync lane
+            worker = threading.Thread(target=read)
+            worker.start()
+            worker.join(timeout=2.0)
+            self.assertFalse(worker.is_alive())
+
+        self.assertEqual(got, [101])
+        self.assertEqual(conn.readers.stats()["idle"], 1)
+
+    def test_handles_are_reused_bounded_and_served_in_arrival_order(self):
+        native = _FakeNative()
+        conn = _connection(native, max_handles=1)
+        order: list[str] = []
+
+        with conn.readers.lease() as first:
+            self.assertEqual(first, 101)
+            threads = []
+            for name in ("a", "b"):
+                def wait_turn(name=name):
+                    with conn.readers.lease(timeout=5.0) as handle:
+                        order.append(f"{name}:{handle}")
+
+                t = threading.Thread(target=wait_turn)
+                t.start()
+                threads.append(t)
+                # Make sure each waiter has queued before the next one arrives.
+                deadline = time.monotonic() + 2.0
+                while conn.readers.stats()["waiting"] < len(threads) and time.monotonic() < deadline:
+                    time.sleep(0.005)
+
+        for t in threads:
+            t.join(timeout=2.0)
+
+        self.assertEqual(order, ["a:101", "b:101"])
+        self.assertEqual(conn.readers.stats()["opened"], 1)
+
+    def test_dead_handle_is_replaced_on_checkout(self):
+        native = _FakeNative()
+        conn = _connection(native)
+        with conn.readers.lease() as handle:
+            self.assertEqual(handle, 101)
+        native.alive.discard(101)
+
+        with conn.readers.lease() as handle:
+            self.assertEqual(handle, 102)
+        self.assertIn(101, native.closed)
+
+        conn.readers.close()
+        self.assertIn(102, native.closed)
+
+    def test_open_failure_falls_back_to_the_sync_lane(self):
+        native = _FakeNative(fail_open=True)
+        conn = _connection(native)
+        with wcdb_realtime.read_handle(conn, timeout=0.1) as handle:
+            self.assertEqual(handle, conn.handle)
+            self.assertTrue(conn.lock.locked())
+
+    def test_reader_routes_interactive_and_bulk_reads_to_separate_lanes(self):
+        native = _FakeNative()
+        conn = _connection(native)
+        chat_realtime_reader._clear_realtime_reader_caches()
+        with TemporaryDirectory() as td:
+            storage = Path(td)
+            (storage / "message").mkdir()
+            (storage / "message" / "message_0.db").write_bytes(b"")
+            kwargs = dict(
+                account_dir=Path("wxid_me"),
+                username="wxid_friend",
+                db_storage_dir=storage,
+                exec_query=native.exec_query,
+            )
+            try:
+                done = threading.Event()
+
+                def interactive():
+                    chat_realtime_reader.fetch_rows_via_exec(rt_conn=conn, take=10, normalize_item=dict, **kwargs)
+                    done.set()
+
+                with conn.lock:
+                    threading.Thread(target=interactive).start()
+                    self.assertTrue(done.wait(timeout=2.0))
+                self.assertTrue(native.queries)
+                self.assertEqual(set(native.queries), {101})
+
+                native.queries.clear()
+                chat_realtime_reader._clear_realtime_reader_caches()
+                with chat_realtime_reader.realtime_bulk_reads():
+                    chat_realtime_reader.count_realtime_message_rows_via_exec(rt_conn=conn, **kwargs)
+                self.assertEqual(set(native.queries), {1})
+            finally:
+                chat_realtime_reader._clear_realtime_reader_caches()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -148,3 +148,21 @@ def test_decrypt_database_keeps_page_when_non_first_hmac_mismatch(monkeypatch):
         assert dst.read_bytes() == page1 + page2
         assert decryptor.last_result["failed_pages"] == 0
         assert decryptor.last_result["hmac_warning_pages"] == 1
+
+
+def test_rejected_output_is_recorded_as_failed_throughput(monkeypatch):
+    raw_key = bytes.fromhex("00112233445566778899aabbccddeefffedcba98765432100123456789abcdef")
+    salt = bytes.fromhex("60f4090ef6897e146f94109f13743e34")
+    encrypted_db = _encrypt_page(raw_key, _build_plain_page(0x61, first_page=True), 1, salt, bytes(range(16)))
+    recorded = []
+    monkeypatch.setattr(wechat_decrypt, "record_throughput", lambda *args, **kwargs: recorded.append(kwargs["success"]))
+    monkeypatch.setattr(wechat_decrypt, "collect_sqlite_diagnostics", lambda *args, **kwargs: {"quick_check_ok": False})
+    monkeypatch.setattr(wechat_decrypt, "sqlite_diagnostics_status", lambda diagnostics: "error")
+    monkeypatch.setattr(wechat_decrypt, "_build_decrypt_failure_message", lambda result: "输出校验失败")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "source.db"
+        src.write_bytes(encrypted_db)
+        assert not WeChatDatabaseDecryptor(raw_key.hex()).decrypt_database(str(src), str(Path(tmpdir) / "out.db"))
+
+    assert recorded == [False]
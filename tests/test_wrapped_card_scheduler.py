@@ -0,0 +1,225 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unittest
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# Ensure "src/" is importable when running tests from repo root.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+
+_FRIEND_TABLE = f"Msg_{hashlib.md5(b'wxid_friend').hexdigest()}"
+
+
+def _ts(m: int, d: int, hh: int) -> int:
+    return int(datetime(2025, m, d, hh).timestamp())
+
+
+def _seed_account(root: Path) -> Path:
+    account_dir = root / "wxid_me"
+    account_dir.mkdir(parents=True)
+    conn = sqlite3.connect(str(account_dir / "message_0.db"))
+    try:
+        conn.execute("CREATE TABLE Name2Id (user_name TEXT)")
+        conn.executemany("INSERT INTO Name2Id(user_name) VALUES (?)", [("wxid_me",), ("wxid_friend",)])
+        conn.execute(
+            f"CREATE TABLE {_FRIEND_TABLE} ("
+            "local_id INTEGER PRIMARY KEY, create_time INTEGER, local_type INTEGER, "
+            "real_sender_id INTEGER, message_content TEXT, compress_content BLOB)"
+        )
+        conn.executemany(
+            f"INSERT INTO {_FRIEND_TABLE}(create_time, local_type, real_sender_id, message_content) VALUES (?, ?, ?, ?)",
+            [(_ts(3, 1, 9), 1, 1, "早"), (_ts(3, 1, 10), 1, 2, "好")],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return account_dir
+
+
+def _add_sticker(account_dir: Path) -> None:
+    db_path = account_dir / "message_0.db"
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute(
+            f"INSERT INTO {_FRIEND_TABLE}(create_time, local_type, real_sender_id, message_content) VALUES (?, ?, ?, ?)",
+            (_ts(4, 2, 20), 47, 1, "<emoji/>"),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    future_ns = time.time_ns() + 5_000_000_000
+    os.utime(db_path, ns=(future_ns, future_ns))
+
+
+class TestWrappedCardScheduler(unittest.TestCase):
+    def _patch_builders(self, calls: Counter):
+        import wechat_decrypt_tool.wrapped.service as wrapped_service
+
+        def fake(card_id: int):
+            def build(**_kwargs):
+                calls[card_id] += 1
+                return {"id": card_id, "status": "ok", "data": {"n": calls[card_id]}}
+
+            return build
+
+        def fake_bento(**kwargs):
+            calls[7] += 1
+            return {"id": 7, "status": "ok", "data": {"sources": sorted(k for k in kwargs if k != "year")}}
+
+        names = {
+            "build_card_00_global_overview": 0,
+            "build_card_01_cyber_schedule": 1,
+            "build_card_02_message_chars": 2,
+            "build_card_03_reply_speed": 3,
+            "build_card_04_monthly_best_friends_wall": 4,
+            "build_card_04_emoji_universe": 5,
+            "build_card_05_keywords_wordcloud": 6,
+        }
+        patches = [patch.object(wrapped_service, name, side_effect=fake(cid)) for name, cid in names.items()]
+        patches.append(patch.object(wrapped_service, "build_card_07_bento_summary_from_sources", side_effect=fake_bento))
+        return patches
+
+    def _run_with_patches(self, account_dir: Path, calls: Counter, fn):
+        import wechat_decrypt_tool.wrapped.service as wrapped_service
+
+        patches = self._patch_builders(calls)
+        patches.append(patch.object(wrapped_service, "_resolve_account_dir", return_value=account_dir))
+        for p in patches:
+            p.start()
+        try:
+            return fn(wrapped_service)
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+    def test_full_response_builds_each_card_once_in_manifest_order(self):
+        calls: Counter = Counter()
+        with TemporaryDirectory() as td:
+            account_dir = _seed_account(Path(td))
+            result = self._run_with_patches(
+                account_dir,
+                calls,
+                lambda svc: svc.build_wrapped_annual_response(account="wxid_me", year=2025),
+            )
+
+        self.assertEqual([c["id"] for c in result["cards"]], [0, 1, 2, 6, 3, 4, 5, 7])
+        self.assertEqual(set(calls.values()), {1})
+        self.assertEqual(result["cards"][-1]["data"]["sources"][0], "emoji")
+
+    def test_new_sticker_only_invalidates_cards_that_read_stickers(self):
+        calls: Counter = Counter()
+        with TemporaryDirectory() as td:
+            account_dir = _seed_account(Path(td))
+
+            def build(svc, card_ids):
+                return [svc.build_wrapped_annual_card(account="wxid_me", year=2025, card_id=cid) for cid in card_ids]
+
+            self._run_with_patches(account_dir, calls, lambda svc: build(svc, [2, 5]))
+            _add_sticker(account_dir)
+            self._run_with_patches(account_dir, calls, lambda svc: build(svc, [2, 5]))
+
+        self.assertEqual(calls[2], 1)
+        self.assertEqual(calls[5], 2)
+
+    def test_cards_that_do_not_read_the_cube_never_build_it(self):
+        calls: Counter = Counter()
+        with TemporaryDirectory() as td:
+            account_dir = _seed_account(Path(td))
+
+            def run(svc):
+                with patch.object(svc, "build_year_cube") as build:
+                    for cid in (3, 4, 5, 6):
+                        svc.build_wrapped_annual_card(account="wxid_me", year=2025, card_id=cid)
+                    svc.build_wrapped_annual_card(account="wxid_me", year=2025, card_id=5)
+                    return build.call_count
+
+            self.assertEqual(self._run_with_patches(account_dir, calls, run), 0)
+
+        self.assertEqual(calls[5], 1)
+
+    def test_concurrent_refreshes_share_one_build(self):
+        from wechat_decrypt_tool.wrapped import year_cube
+
+        calls: Counter = Counter()
+        with TemporaryDirectory() as td:
+            account_dir = _seed_account(Path(td))
+
+            def run(svc):
+                entered = threading.Event()
+                release = threading.Event()
+
+                def slow_build(**kwargs):
+                    entered.set()
+                    release.wait(5)
+                    return year_cube.build_year_cube(**kwargs)
+
+                with patch.object(svc, "build_year_cube", side_effect=slow_build) as build:
+                    results = []
+
+                    def refresh_card():
+                        results.append(
+                            svc.build_wrapped_annual_card(account="wxid_me", year=2025, card_id=2, refresh=True)
+                        )
+
+                    threads = [threading.Thread(target=refresh_card) for _ in range(2)]
+                    threads[0].start()
+                    entered.wait(5)
+                    threads[1].start()
+                    time.sleep(0.05)
+                    release.set()
+                    for t in threads:
+                        t.join(5)
+                    return build.call_count, results
+
+            builds, results = self._run_with_patches(account_dir, calls, run)
+
+        self.assertEqual(builds, 1)
+        self.assertEqual(calls[2], 1)
+        self.assertEqual(results[0], results[1])
+
+    def test_fresh_results_are_pruned_after_the_hand_off_window(self):
+        import wechat_decrypt_tool.wrapped.service as wrapped_service
+
+        with patch.dict(wrapped_service._FRESH_RESULTS, clear=True):
+            started_ns = time.monotonic_ns()
+            wrapped_service._remember_result("old", {"id": 0})
+            self.assertEqual(wrapped_service._fresh_result("old", started_ns), {"id": 0})
+
+            with patch.object(wrapped_service, "_FRESH_RESULT_TTL_NS", -1):
+                wrapped_service._remember_result("new", {"id": 1})
+
+            self.assertEqual(list(wrapped_service._FRESH_RESULTS), ["new"])
+
+    def test_stream_yields_error_card_without_aborting_the_deck(self):
+        import wechat_decrypt_tool.wrapped.service as wrapped_service
+
+        calls: Counter = Counter()
+        with TemporaryDirectory() as td:
+            account_dir = _seed_account(Path(td))
+
+            def run(svc):
+                with patch.object(svc, "build_card_03_reply_speed", side_effect=RuntimeError("boom")):
+                    meta, cards = svc.stream_wrapped_annual_cards(account="wxid_me", year=2025)
+                    return meta, list(cards)
+
+            meta, cards = self._run_with_patches(account_dir, calls, run)
+
+        by_id = {c["id"]: c for c in cards}
+        self.assertEqual(meta["year"], 2025)
+        self.assertEqual(sorted(by_id), sorted(c["id"] for c in wrapped_service._WRAPPED_CARD_MANIFEST))
+        self.assertEqual(by_id[3]["status"], "error")
+        self.assertEqual(by_id[7]["status"], "error")
+        self.assertEqual(by_id[5]["status"], "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
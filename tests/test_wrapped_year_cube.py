@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+# Ensure "src/" is importable when running tests from repo root.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+
+class TestWrappedYearCube(unittest.TestCase):
+    def _ts(self, y: int, m: int, d: int, hh: int, mm: int = 0) -> int:
+        return int(datetime(y, m, d, hh, mm).timestamp())
+
+    def _seed_message_db(self, path: Path, *, me: str, rows_by_user: dict[str, list[tuple]]) -> None:
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.execute("CREATE TABLE Name2Id (user_name TEXT)")
+            conn.execute("INSERT INTO Name2Id(user_name) VALUES (?)", (me,))
+            for username, rows in rows_by_user.items():
+                conn.execute("INSERT INTO Name2Id(user_name) VALUES (?)", (username,))
+                table = f"Msg_{hashlib.md5(username.encode('utf-8')).hexdigest()}"
+                conn.execute(
+                    f"CREATE TABLE {table} ("
+                    "local_id INTEGER PRIMARY KEY, create_time INTEGER, local_type INTEGER, "
+                    "real_sender_id INTEGER, message_content TEXT, compress_content BLOB)"
+                )
+                conn.executemany(
+                    f"INSERT INTO {table}(create_time, local_type, real_sender_id, message_content) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _seed_account(self, root: Path) -> Path:
+        account_dir = root / "wxid_me"
+        account_dir.mkdir(parents=True)
+        me_id, friend_id, group_id, official_id = 1, 2, 3, 4
+        self._seed_message_db(
+            account_dir / "message_0.db",
+            me="wxid_me",
+            rows_by_user={
+                "wxid_friend": [
+                    (self._ts(2025, 3, 1, 9), 1, me_id, "早上 好"),
+                    (self._ts(2025, 3, 1, 9, 30), 1, friend_id, "你好呀"),
+                    (self._ts(2025, 3, 2, 23), 3, me_id, "<img/>"),
+                    (self._ts(2024, 12, 31, 23), 1, me_id, "去年"),
+                ],
+                "123@chatroom": [
+                    (self._ts(2025, 7, 4, 12), 1, group_id, "group text"),
+                    (self._ts(2025, 7, 4, 12, 5), 1, me_id, "ok"),
+                ],
+                "gh_news": [
+                    (self._ts(2025, 7, 5, 8), 49, official_id, "<appmsg/>"),
+                ],
+            },
+        )
+        return account_dir
+
+    def test_single_pass_cube_matches_per_card_scans(self):
+        from wechat_decrypt_tool.wrapped.cards.card_00_global_overview import compute_annual_daily_counts
+        from wechat_decrypt_tool.wrapped.cards.card_01_cyber_schedule import compute_weekday_hour_heatmap
+        from wechat_decrypt_tool.wrapped.cards.card_02_message_chars import compute_text_message_char_counts
+        from wechat_decrypt_tool.wrapped.year_cube import build_year_cube
+
+        with TemporaryDirectory() as td:
+            account_dir = self._seed_account(Path(td))
+            cube = build_year_cube(account_dir=account_dir, year=2025)
+
+            self.assertEqual(cube.source, "shards")
+            self.assertEqual(cube.total_messages, 6)
+            self.assertEqual(cube.latest_ts, self._ts(2025, 7, 5, 8))
+            self.assertEqual(cube.latest_sent_ts, self._ts(2025, 7, 4, 12, 5))
+            self.assertEqual(
+                compute_weekday_hour_heatmap(account_dir=account_dir, year=2025, sender_username="wxid_me", cube=cube),
+                compute_weekday_hour_heatmap(account_dir=account_dir, year=2025, sender_username="wxid_me"),
+            )
+            self.assertEqual(
+                compute_annual_daily_counts(account_dir=account_dir, year=2025, cube=cube),
+                compute_annual_daily_counts(account_dir=account_dir, year=2025),
+            )
+            self.assertEqual(
+                compute_text_message_char_counts(account_dir=account_dir, year=2025, cube=cube),
+                compute_text_message_char_counts(account_dir=account_dir, year=2025),
+            )
+            self.assertEqual(cube.text_chars(), (5, 12))
+
+    def test_cube_is_persisted_and_reused_until_refresh(self):
+        import wechat_decrypt_tool.wrapped.service as wrapped_service
+        from wechat_decrypt_tool.wrapped import year_cube
+
+        with TemporaryDirectory() as td:
+            account_dir = self._seed_account(Path(td))
+            with patch.object(wrapped_service, "build_year_cube", wraps=year_cube.build_year_cube) as build:
+                first = wrapped_service._get_or_build_year_cube(
+                    account_dir=account_dir, scope="global", year=2025, refresh=False
+                )
+                second = wrapped_service._get_or_build_year_cube(
+                    account_dir=account_dir, scope="global", year=2025, refresh=False
+                )
+                self.assertEqual(build.call_count, 1)
+                wrapped_service._get_or_build_year_cube(
+                    account_dir=account_dir, scope="global", year=2025, refresh=True
+                )
+                self.assertEqual(build.call_count, 2)
+
+            cube_path = wrapped_service._wrapped_year_cube_cache_path(
+                account_dir=account_dir, scope="global", year=2025
+            )
+            self.assertTrue(cube_path.exists())
+            self.assertEqual(first, second)
+            self.assertIsNone(year_cube.load_year_cube(cube_path, year=2024))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from wechat_decrypt_tool import native_core_client as core
+
+# Same shape as a realtime message page: ids, timestamps, XML text and compressed blobs.
+_COLUMNS = (
+    "local_id",
+    "server_id",
+    "local_type",
+    "sort_seq",
+    "real_sender_id",
+    "create_time",
+    "message_content",
+    "compress_content",
+    "packed_info_data",
+    "sender_username",
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark WQR1 query page decoding on synthetic pages.")
+    parser.add_argument("--rows", type=int, default=4096, help="rows per page (max 4096)")
+    parser.add_argument("--text-bytes", type=int, default=96, help="average message_content size")
+    parser.add_argument("--blob-bytes", type=int, default=48, help="average compress_content size")
+    parser.add_argument("--repeat", type=int, default=20, help="timed iterations per decoder")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def build_page(rows: int, *, text_bytes: int, blob_bytes: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    values = []
+    for i in range(rows):
+        text = "消息" * max(1, rng.randint(text_bytes // 2, text_bytes) // 6)
+        values.append(
+            (
+                i + 1,
+                rng.getrandbits(62),
+                rng.choice((1, 3, 34, 47, 49, 10000)),
+                (1_700_000_000 + i) * 1000,
+                rng.randint(1, 500),
+                1_700_000_000 + i,
+                text if i % 3 else None,
+                rng.randbytes(rng.randint(blob_bytes // 2, blob_bytes)) if i % 3 == 0 else None,
+                rng.randbytes(16) if i % 5 == 0 else None,
+                f"wxid_{rng.randint(1, 500):04d}",
+            )
+        )
+    while True:
+        payload = core.encode_native_query_page(_COLUMNS, values)
+        if len(payload) <= 768 * 1024:
+            return payload
+        values = values[: int(len(values) * 0.9)]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main() -> int:
+    args = _parse_args()
+    payload = build_page(min(4096, max(1, args.rows)), text_bytes=args.text_bytes, blob_bytes=args.blob_bytes, seed=args.seed)
+
+    # Sanity check: every decoder must agree with the encoder's input.
+    page = core.parse_native_query_page(payload, has_more=False)
+    columnar = core.parse_native_query_page_columnar(payload, has_more=False)
+    if columnar.rows != page.rows:
+        print("decoders disagree", file=sys.stderr)
+        return 1
+
+    cases = {
+        "page_records": lambda: core.parse_native_query_page(payload, has_more=False).records(),
+        "columnar_index": lambda: core.parse_native_query_page_columnar(payload, has_more=False),
+        "columnar_one_column": lambda: core.parse_native_query_page_columnar(payload, has_more=False).column("local_id"),
+        "columnar_rows": lambda: list(core.parse_native_query_page_columnar(payload, has_more=False).iter_rows()),
+        "columnar_records": lambda: core.parse_native_query_page_columnar(payload, has_more=False).records(),
+    }
+    results = {name: round(_time(fn, args.repeat), 3) for name, fn in cases.items()}
+    print(
+        json.dumps(
+            {"rows": len(page.rows), "bytes": len(payload), "best_ms": results},
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+"""Offline benchmark suite for the decrypt / index / read / export / media hot paths.
+
+Runs against a deterministic synthetic account (tools/synthetic_account.py), so
+no WeChat install, key or network is needed:
+
+    python tools/bench_suite.py --scale small --save-baseline bench-baseline.json
+    python tools/bench_suite.py --scale small --baseline bench-baseline.json
+
+With ``--baseline`` the exit code is 1 when any case's p50 latency regresses
+by more than ``--threshold`` (default 25%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Callable
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from synthetic_account import SyntheticAccount, SyntheticAccountSpec, generate_synthetic_account
+
+SCALES: dict[str, SyntheticAccountSpec] = {
+    "small": SyntheticAccountSpec(),
+    "medium": SyntheticAccountSpec(
+        contacts=600, chats=80, messages_per_chat=2000, message_shards=4, media_files=64, min_db_pages=2048
+    ),
+    "large": SyntheticAccountSpec(
+        contacts=3000, chats=240, messages_per_chat=5000, message_shards=8, media_files=256, min_db_pages=16384
+    ),
+}
+CASES = (
+    "decrypt_database",
+    "search_index_build",
+    "collect_chat_messages",
+    "export_json_writer",
+    "media_decrypt_v3",
+    "media_decrypt_v4",
+    "image_key_memory_scan",
+)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark hot paths on a synthetic WeChat account.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--workdir", default="", help="reuse/keep the synthetic account here (default: temp dir)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed iterations per case")
+    parser.add_argument("--only", action="append", choices=CASES, help="run only these cases (repeatable)")
+    parser.add_argument("--baseline", default="", help="compare against a saved result JSON")
+    parser.add_argument("--save-baseline", default="", help="write this run's results as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown vs baseline")
+    return parser.parse_args()
+
+
+def _measure(fn: Callable[[], int], repeat: int) -> dict[str, Any]:
+    """Run ``fn`` (which returns units processed) once to warm up, then ``repeat`` timed times."""
+    fn()
+    samples: list[float] = []
+    units = 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        units += int(fn() or 0)
+        samples.append(time.perf_counter() - t0)
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    total = sum(samples)
+    return {
+        "samples": len(samples),
+        "bestMs": round(ordered[0] * 1000.0, 3),
+        "p50Ms": round(statistics.median(samples) * 1000.0, 3),
+        "p95Ms": round(p95 * 1000.0, 3),
+        "unitsPerSecond": round(units / total, 1) if total > 0 else None,
+    }
+
+
+def _case_decrypt_database(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+    from wechat_decrypt_tool.wechat_decrypt import WeChatDatabaseDecryptor
+
+    decryptor = WeChatDatabaseDecryptor(account.spec.key_hex)
+    out_dir = workdir / "bench_decrypt_out"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def run() -> int:
+        processed = 0
+        for db in account.encrypted_dbs:
+            if not decryptor.decrypt_database(str(db), str(out_dir / db.name)):
+                raise RuntimeError(f"decrypt failed: {db.name}: {decryptor.last_result.get('error')}")
+            processed += db.stat().st_size
+        return processed
+
+    return "bytes", run
+
+
+def _case_search_index_build(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+    from wechat_decrypt_tool import chat_search_index as idx
+
+    def run() -> int:
+        idx._build_worker(account.account_dir, True, "decrypted")
+        status = idx.get_chat_search_index_status(account.account_dir)
+        if not (status.get("index") or {}).get("ready"):
+            raise RuntimeError(f"search index build failed: {status}")
+        return account.message_count
+
+    return "messages", run
+
+
+def _case_collect_chat_messages(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+    from wechat_decrypt_tool.chat_helpers import _iter_message_db_paths
+    from wechat_decrypt_tool.routers import chat as chat_router
+
+    db_paths = _iter_message_db_paths(account.account_dir)
+    usernames = account.chat_usernames[:20]
+
+    def run() -> int:
+        fetched = 0
+        for username in usernames:
+            merged, *_rest = chat_router._collect_chat_messages(
+                username=username,
+                account_dir=account.account_dir,
+                db_paths=db_paths,
+                resource_conn=None,
+                resource_chat_id=None,
+                take=50,
+                want_types=None,
+            )
+            fetched += len(merged)
+        return fetched
+
+    return "messages", run
+
+
+def _case_export_json_writer(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+    from wechat_decrypt_tool import chat_export_service as svc
+
+    username = account.chat_usernames[-1]
+    zip_path = workdir / "bench_export.zip"
+
+    def run() -> int:
+        job = svc.ExportJob(export_id="bench", account=account.spec.account, status="running")
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            return svc._write_conversation_json(
+                zf=zf,
+                conv_dir="conversations/bench",
+                account_dir=account.account_dir,
+                conv_username=username,
+                conv_name=username,
+                conv_avatar_path="",
+                conv_is_group=username.endswith("@chatroom"),
+                start_time=None,
+                end_time=None,
+                want_types=None,
+                local_types=None,
+                resource_conn=None,
+                resource_chat_id=None,
+                head_image_conn=None,
+                resolve_display_name=lambda value: value,
+                privacy_mode=False,
+                include_media=False,
+                media_kinds=[],
+                media_written={},
+                avatar_written={},
+                report={"errors": [], "missingMedia": []},
+                allow_process_key_extract=False,
+                media_db_path=account.account_dir / "media_0.db",
+                media_index=None,
+                job=job,
+                lock=threading.Lock(),
+            )
+
+    return "messages", run
+
+
+def _case_media_decrypt(version: int) -> Callable[[SyntheticAccount, Path], tuple[str, Callable[[], int]]]:
+    def factory(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+        from wechat_decrypt_tool.media_helpers import _decrypt_wechat_dat_v3, _decrypt_wechat_dat_v4
+
+        files = [p.read_bytes() for p in (account.media_v3 if version == 3 else account.media_v4)]
+
+        def run() -> int:
+            processed = 0
+            for data in files:
+                if version == 3:
+                    out = _decrypt_wechat_dat_v3(data, account.image_xor_key)
+                else:
+                    out = _decrypt_wechat_dat_v4(data, account.image_xor_key, account.image_aes_key)
+                processed += len(out)
+            return processed
+
+        return "bytes", run
+
+    return factory
+
+
+class _SyntheticMemoryApi:
+    """In-memory stand-in for the Win32 process API used by image_key_memory_scan."""
+
+    def __init__(self, regions: list[Any], memory: dict[int, bytes]) -> None:
+        self._regions = regions
+        self._memory = memory
+
+    def open_process(self, pid: int) -> object:
+        return object()
+
+    def query_region(self, handle: object, address: int) -> Any:
+        for region in self._regions:
+            if region.base_address >= address:
+                return region
+        return None
+
+    def read_memory(self, handle: object, address: int, size: int) -> bytes:
+        for base, data in self._memory.items():
+            if base <= address < base + len(data):
+                return data[address - base : address - base + size]
+        return b""
+
+    def close_handle(self, handle: object) -> None:
+        pass
+
+
+def _case_image_key_memory_scan(account: SyntheticAccount, workdir: Path) -> tuple[str, Callable[[], int]]:
+    import random
+    import string
+
+    from Crypto.Cipher import AES
+
+    from wechat_decrypt_tool import image_key_memory_scan as memory_scan
+    from wechat_decrypt_tool.image_key_resolver import TemplateScanResult, V2Template
+
+    # The synthetic account's media key is not alphanumeric, so use a scan-shaped one here.
+    aes_key = "Bench0123456789a"
+    block = AES.new(aes_key.encode("ascii"), AES.MODE_ECB).encrypt(b"\xff\xd8\xff" + b"\x00" * 13)
+    template_scan = TemplateScanResult(
+        templates=(V2Template(path=workdir / "bench_t.dat", ciphertext=block, mtime_ns=1, tail_xor_key=0x8A),),
+        inferred_xor_key=0x8A,
+        used_fallback=False,
+        files_scanned=1,
+    )
+
+    rng = random.Random(48)
+    region_size = 4 * 1024 * 1024
+    regions: list[Any] = []
+    memory: dict[int, bytes] = {}
+    decoys = ["".join(rng.choices(string.ascii_letters + string.digits, k=32)).encode("ascii") for _ in range(2000)]
+    # Mostly-zero pages with a noisy head and scattered 32-char decoys, roughly like heap memory.
+    for index in range(16):
+        data = bytearray(region_size)
+        data[: region_size // 8] = rng.randbytes(region_size // 8)
+        for offset in range(4096, region_size - 64, 8192):
+            decoy = rng.choice(decoys)
+            data[offset - 1] = 0x21
+            data[offset : offset + 32] = decoy
+            data[offset + 32] = 0x21
+        if index == 15:
+            tail = b"!" + (aes_key + "0123456789ABCDEF").encode("ascii") + b"!"
+            data[-len(tail) - 16 : -16] = tail
+        base = 0x1000_0000 * (index + 1)
+        memory[base] = bytes(data)
+        regions.append(memory_scan.MemoryRegion(base, region_size, memory_scan.MEM_COMMIT, memory_scan.PAGE_READWRITE))
+
+    def run() -> int:
+        match = memory_scan.scan_process_for_image_key(
+            1, template_scan, memory_api=_SyntheticMemoryApi(regions, memory)
+        )
+        if match is None or match.aes_key != aes_key:
+            raise RuntimeError("memory scan did not recover the synthetic key")
+        return len(regions) * region_size
+
+    return "bytes", run
+
+
+_FACTORIES = {
+    "decrypt_database": _case_decrypt_database,
+    "search_index_build": _case_search_index_build,
+    "collect_chat_messages": _case_collect_chat_messages,
+    "export_json_writer": _case_export_json_writer,
+    "media_decrypt_v3": _case_media_decrypt(3),
+    "media_decrypt_v4": _case_media_decrypt(4),
+    "image_key_memory_scan": _case_image_key_memory_scan,
+}
+
+
+def run_suite(account: SyntheticAccount, workdir: Path, *, cases: tuple[str, ...] = CASES, repeat: int = 5) -> dict:
+    results: dict[str, Any] = {}
+    for name in cases:
+        try:
+            unit, fn = _FACTORIES[name](account, workdir)
+            results[name] = {"unit": unit, **_measure(fn, repeat)}
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, *, threshold: float) -> list[dict[str, Any]]:
+    """Return the cases whose p50 is more than ``threshold`` slower than the baseline."""
+    regressions = []
+    for name, current in results.items():
+        before = (baseline.get(name) or {}).get("p50Ms")
+        now = current.get("p50Ms")
+        if not before or now is None:
+            continue
+        ratio = float(now) / float(before)
+        current["baselineP50Ms"] = before
+        current["ratio"] = round(ratio, 3)
+        if ratio > 1.0 + threshold:
+            regressions.append({"case": name, "baselineP50Ms": before, "p50Ms": now, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main() -> int:
+    args = _parse_args()
+    temp_dir = None
+    if args.workdir:
+        workdir = Path(args.workdir).resolve()
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="wcda-bench-")
+        workdir = Path(temp_dir)
+    # Keep logs and any runtime output inside the bench workdir, and off the console.
+    os.environ.setdefault("WECHAT_TOOL_DATA_DIR", str(workdir / "data"))
+    os.environ.setdefault("WECHAT_TOOL_ENABLE_CONSOLE_LOG", "0")
+    os.environ.setdefault("WECHAT_TOOL_LOG_LEVEL", "WARNING")
+
+    try:
+        t0 = time.perf_counter()
+        account = generate_synthetic_account(workdir / "account", SCALES[args.scale])
+        generate_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        results = run_suite(account, workdir, cases=tuple(args.only or CASES), repeat=args.repeat)
+
+        report: dict[str, Any] = {
+            "scale": args.scale,
+            "generateMs": generate_ms,
+            "account": account.summary(),
+            "results": results,
+        }
+        regressions: list[dict[str, Any]] = []
+        if args.baseline:
+            baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+            regressions = compare_to_baseline(results, baseline.get("results") or {}, threshold=args.threshold)
+            report["regressions"] = regressions
+        if args.save_baseline:
+            Path(args.save_baseline).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        failed = any("error" in item for item in results.values())
+        return 1 if (regressions or failed) else 0
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
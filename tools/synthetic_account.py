@@ -0,0 +1,456 @@
+"""Deterministic synthetic WeChat 4.x account for offline benchmarks.
+
+Layout under ``root``::
+
+    xwechat_files/<account>/db_storage/{contact,session,message}/*.db   SQLCipher 4 (WCDB) encrypted
+    xwechat_files/<account>/msg/attach/<md5(chat)>/<YYYY-MM>/Img/*.dat  V3 (XOR) / V4 (AES+XOR) media
+    output/databases/<account>/*.db                                     plain copies, i.e. a decrypted account
+
+The same ``SyntheticAccountSpec`` always produces byte-identical files, so
+benchmark numbers from different runs measure the code, not the fixture.
+
+    python tools/synthetic_account.py --out /tmp/wcda-synth --chats 80 --messages-per-chat 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import sqlite3
+import struct
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from wechat_decrypt_tool.wechat_decrypt import (
+    IV_SIZE,
+    PAGE_SIZE,
+    RESERVE_SIZE,
+    SALT_SIZE,
+    _derive_mac_key,
+    _derive_sqlcipher_enc_key,
+)
+
+try:
+    import zstandard as zstd  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    zstd = None
+
+
+DEFAULT_KEY_HEX = "00112233445566778899aabbccddeefffedcba98765432100123456789abcdef"
+DEFAULT_IMAGE_XOR_KEY = 0x5A
+DEFAULT_IMAGE_AES_KEY = b"synthbench-aes16"
+_DAT_V4_SIGNATURE = b"\x07\x08V2\x08\x07"
+_DAT_V4_AES_SIZE = 1024
+_BASE_TIME = 1_704_038_400  # 2024-01-01 00:00:00 +08:00
+
+_WORDS = (
+    "今天", "明天", "晚上", "开会", "吃饭", "项目", "文件", "周末", "电影", "好的",
+    "收到", "哈哈", "谢谢", "辛苦", "地铁", "咖啡", "报告", "截图", "上线", "周报",
+    "hello", "ok", "deadline", "review", "merge", "deploy", "ticket", "sync", "lunch", "meeting",
+)
+
+
+@dataclass(frozen=True)
+class SyntheticAccountSpec:
+    account: str = "wxid_synthbench"
+    contacts: int = 120
+    chats: int = 24
+    group_ratio: float = 0.25
+    messages_per_chat: int = 400
+    message_shards: int = 2
+    # Share of text/appmsg rows whose message_content is a zstd frame, like WCDB-compressed rows.
+    compressed_ratio: float = 0.3
+    # Pad every message shard up to at least this many 4 KiB pages (0 = no padding).
+    min_db_pages: int = 0
+    media_files: int = 16
+    media_bytes: int = 64 * 1024
+    seed: int = 7
+    key_hex: str = DEFAULT_KEY_HEX
+    # False: key_hex is the raw per-DB enc key; True: a SQLCipher passphrase (PBKDF2 per DB).
+    passphrase: bool = False
+
+
+@dataclass
+class SyntheticAccount:
+    spec: SyntheticAccountSpec
+    root: Path
+    wxid_dir: Path
+    db_storage_dir: Path
+    account_dir: Path
+    encrypted_dbs: list[Path] = field(default_factory=list)
+    plain_dbs: list[Path] = field(default_factory=list)
+    chat_usernames: list[str] = field(default_factory=list)
+    media_v3: list[Path] = field(default_factory=list)
+    media_v4: list[Path] = field(default_factory=list)
+    message_count: int = 0
+    image_xor_key: int = DEFAULT_IMAGE_XOR_KEY
+    image_aes_key: bytes = DEFAULT_IMAGE_AES_KEY
+
+    def summary(self) -> dict:
+        return {
+            "spec": asdict(self.spec),
+            "root": str(self.root),
+            "accountDir": str(self.account_dir),
+            "dbStorageDir": str(self.db_storage_dir),
+            "encryptedDbs": len(self.encrypted_dbs),
+            "encryptedBytes": sum(p.stat().st_size for p in self.encrypted_dbs),
+            "chats": len(self.chat_usernames),
+            "messages": self.message_count,
+            "mediaV3": len(self.media_v3),
+            "mediaV4": len(self.media_v4),
+        }
+
+
+def msg_table_name(username: str) -> str:
+    return f"Msg_{hashlib.md5(username.encode('utf-8')).hexdigest()}"
+
+
+def create_reserved_sqlite(path: Path) -> sqlite3.Connection:
+    """Create an empty 4 KiB-page SQLite file that keeps the WCDB IV+HMAC reserve on every page.
+
+    sqlite3 cannot set reserve bytes directly, but SQLite honours the header
+    field of an existing file, so patch it on the one-page empty database.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    conn = sqlite3.connect(str(path))
+    conn.execute(f"PRAGMA page_size={PAGE_SIZE}")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("VACUUM")
+    conn.close()
+
+    header = bytearray(path.read_bytes())
+    header[20] = RESERVE_SIZE
+    header[105:107] = (PAGE_SIZE - RESERVE_SIZE).to_bytes(2, "big")  # page-1 cell content start
+    path.write_bytes(bytes(header))
+    return sqlite3.connect(str(path))
+
+
+def encrypt_sqlite_file(
+    plain_path: Path,
+    out_path: Path,
+    key_material: bytes,
+    *,
+    passphrase: bool,
+    rng: random.Random,
+) -> None:
+    """Encrypt a reserved-page SQLite file the way WeChat 4.x writes it (AES-256-CBC + HMAC-SHA512)."""
+    data = plain_path.read_bytes()
+    if len(data) % PAGE_SIZE or data[20] != RESERVE_SIZE:
+        raise ValueError(f"{plain_path} is not a {PAGE_SIZE}-byte page database with {RESERVE_SIZE} reserve bytes")
+
+    salt = rng.randbytes(SALT_SIZE)
+    enc_key = _derive_sqlcipher_enc_key(key_material, salt) if passphrase else key_material
+    mac_key = _derive_mac_key(enc_key, salt)
+
+    out = bytearray()
+    for index in range(len(data) // PAGE_SIZE):
+        page_num = index + 1
+        page = data[index * PAGE_SIZE: (index + 1) * PAGE_SIZE]
+        offset = SALT_SIZE if page_num == 1 else 0
+        iv = rng.randbytes(IV_SIZE)
+        encryptor = Cipher(algorithms.AES(enc_key), modes.CBC(iv), backend=default_backend()).encryptor()
+        body = encryptor.update(page[offset: PAGE_SIZE - RESERVE_SIZE]) + encryptor.finalize()
+        head = (salt if page_num == 1 else b"") + body + iv
+        mac = hmac.new(mac_key, digestmod=hashlib.sha512)
+        mac.update(head[offset:])
+        mac.update(page_num.to_bytes(4, "little"))
+        out += head + mac.digest()
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(bytes(out))
+
+
+def encode_dat_v3(payload: bytes, xor_key: int) -> bytes:
+    return bytes(b ^ xor_key for b in payload)
+
+
+def encode_dat_v4(payload: bytes, xor_key: int, aes_key: bytes, *, aes_size: int = _DAT_V4_AES_SIZE) -> bytes:
+    """Inverse of media_helpers._decrypt_wechat_dat_v4: AES-ECB head, raw middle, XOR tail."""
+    from Crypto.Cipher import AES
+    from Crypto.Util import Padding
+
+    aes_size = min(aes_size, len(payload))
+    xor_size = (len(payload) - aes_size) // 2
+    head = payload[:aes_size]
+    middle = payload[aes_size: len(payload) - xor_size]
+    tail = payload[len(payload) - xor_size:] if xor_size else b""
+
+    encrypted = AES.new(aes_key[:16], AES.MODE_ECB).encrypt(Padding.pad(head, AES.block_size))
+    header = _DAT_V4_SIGNATURE + struct.pack("<LL", aes_size, xor_size) + b"\x00"
+    return header + encrypted + middle + encode_dat_v3(tail, xor_key)
+
+
+def _fake_jpeg(rng: random.Random, size: int) -> bytes:
+    head = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    return head + rng.randbytes(max(0, size - len(head) - 2)) + b"\xff\xd9"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(max(1, words)))
+
+
+def _appmsg_xml(rng: random.Random, index: int) -> str:
+    title = _sentence(rng, rng.randint(3, 8))
+    des = _sentence(rng, rng.randint(8, 30))
+    return (
+        "<msg><appmsg appid=\"\" sdkver=\"0\">"
+        f"<title>{title}</title><des>{des}</des><type>5</type>"
+        f"<url>https://example.invalid/article/{index}</url>"
+        "<thumburl>https://example.invalid/cover.jpg</thumburl>"
+        "</appmsg><fromusername></fromusername></msg>"
+    )
+
+
+def _image_xml(file_md5: str, size: int) -> str:
+    return f'<msg><img md5="{file_md5}" length="{size}" hdlength="0" cdnthumburl="" /></msg>'
+
+
+def _build_contact_db(path: Path, account: str, usernames: list[str], rng: random.Random) -> None:
+    conn = create_reserved_sqlite(path)
+    try:
+        conn.execute(
+            "CREATE TABLE contact (username TEXT PRIMARY KEY, remark TEXT, nick_name TEXT, alias TEXT, "
+            "local_type INTEGER, verify_flag INTEGER, big_head_url TEXT, small_head_url TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE stranger (username TEXT PRIMARY KEY, remark TEXT, nick_name TEXT, alias TEXT, "
+            "local_type INTEGER, verify_flag INTEGER, big_head_url TEXT, small_head_url TEXT)"
+        )
+        rows = [(account, "", "Synthetic Me", "", 1, 0, "", "")]
+        for i, username in enumerate(usernames):
+            official = username.startswith("gh_")
+            rows.append(
+                (
+                    username,
+                    _sentence(rng, 2) if i % 4 == 0 else "",
+                    f"{_sentence(rng, 2)}{i}",
+                    f"alias_{i}" if i % 3 == 0 else "",
+                    2 if username.endswith("@chatroom") else 1,
+                    24 if official else 0,
+                    f"https://example.invalid/head/{i}/0",
+                    f"https://example.invalid/head/{i}/132",
+                )
+            )
+        conn.executemany("INSERT INTO contact VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _build_session_db(path: Path, sessions: list[tuple[str, int, str]]) -> None:
+    conn = create_reserved_sqlite(path)
+    try:
+        conn.execute(
+            "CREATE TABLE SessionTable (username TEXT PRIMARY KEY, unread_count INTEGER, is_hidden INTEGER, "
+            "summary TEXT, draft TEXT, last_timestamp INTEGER, sort_timestamp INTEGER, last_msg_type INTEGER, "
+            "last_msg_sub_type INTEGER, last_msg_sender TEXT, last_sender_display_name TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO SessionTable VALUES (?, 0, 0, ?, '', ?, ?, 1, 0, '', '')",
+            [(username, summary, ts, ts) for username, ts, summary in sessions],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _pad_to_pages(conn: sqlite3.Connection, min_pages: int, rng: random.Random) -> None:
+    if min_pages <= 0:
+        return
+    conn.execute("CREATE TABLE IF NOT EXISTS bench_padding (id INTEGER PRIMARY KEY, payload BLOB)")
+    while int(conn.execute("PRAGMA page_count").fetchone()[0]) < min_pages:
+        conn.executemany("INSERT INTO bench_padding(payload) VALUES (?)", [(rng.randbytes(3000),) for _ in range(64)])
+        conn.commit()
+
+
+def generate_synthetic_account(root: Path, spec: Optional[SyntheticAccountSpec] = None) -> SyntheticAccount:
+    spec = spec or SyntheticAccountSpec()
+    rng = random.Random(spec.seed)
+    root = Path(root)
+    wxid_dir = root / "xwechat_files" / spec.account
+    db_storage = wxid_dir / "db_storage"
+    account_dir = root / "output" / "databases" / spec.account
+    account_dir.mkdir(parents=True, exist_ok=True)
+    result = SyntheticAccount(
+        spec=spec,
+        root=root,
+        wxid_dir=wxid_dir,
+        db_storage_dir=db_storage,
+        account_dir=account_dir,
+    )
+
+    contacts = [f"wxid_synth{i:05d}" for i in range(max(1, spec.contacts))]
+    group_count = int(round(max(0, spec.chats) * spec.group_ratio))
+    groups = [f"{4_000_000_000 + i}@chatroom" for i in range(group_count)]
+    friends = contacts[: max(0, spec.chats - group_count)]
+    chats = groups + friends
+    result.chat_usernames = list(chats)
+    name2id = [spec.account, *contacts, *groups]
+    rowid_of = {username: i + 1 for i, username in enumerate(name2id)}
+
+    compressor = zstd.ZstdCompressor(level=3) if zstd is not None else None
+    shards = max(1, spec.message_shards)
+    shard_conns = [create_reserved_sqlite(account_dir / f"message_{i}.db") for i in range(shards)]
+    media_targets: list[tuple[str, str, int]] = []
+    sessions: list[tuple[str, int, str]] = []
+    try:
+        for conn in shard_conns:
+            conn.execute("CREATE TABLE Name2Id (rowid INTEGER PRIMARY KEY, user_name TEXT UNIQUE, is_session INTEGER)")
+            conn.executemany(
+                "INSERT INTO Name2Id VALUES (?, ?, 1)", [(rowid_of[u], u) for u in name2id]
+            )
+
+        span = 365 * 86400
+        for chat_index, username in enumerate(chats):
+            is_group = username.endswith("@chatroom")
+            members = rng.sample(contacts, k=min(len(contacts), 12)) if is_group else [username]
+            table = msg_table_name(username)
+            created: set[int] = set()
+            rows_by_shard: list[list[tuple]] = [[] for _ in range(shards)]
+            last = (0, "")
+            for i in range(max(0, spec.messages_per_chat)):
+                create_time = _BASE_TIME + (span * i) // max(1, spec.messages_per_chat) + rng.randint(0, 59)
+                shard = min(shards - 1, (i * shards) // max(1, spec.messages_per_chat))
+                is_sent = rng.random() < 0.4
+                sender = spec.account if is_sent else rng.choice(members)
+                kind = rng.random()
+                if kind < 0.7:
+                    local_type, text = 1, _sentence(rng, rng.randint(2, 24))
+                elif kind < 0.82:
+                    local_type, text = 49, _appmsg_xml(rng, i)
+                elif kind < 0.97:
+                    file_md5 = hashlib.md5(f"{username}:{i}".encode("utf-8")).hexdigest()
+                    local_type, text = 3, _image_xml(file_md5, spec.media_bytes)
+                    if len(media_targets) < spec.media_files:
+                        media_targets.append((username, file_md5, create_time))
+                else:
+                    local_type, text = 10000, f"\"{_sentence(rng, 2)}\" 撤回了一条消息"
+                if is_group and not is_sent and local_type != 10000:
+                    text = f"{sender}:\n{text}"
+                content: object = text
+                if compressor is not None and local_type in (1, 49) and rng.random() < spec.compressed_ratio:
+                    content = compressor.compress(text.encode("utf-8"))
+                created.add(shard)
+                rows_by_shard[shard].append(
+                    (
+                        i + 1,
+                        rng.getrandbits(62),
+                        local_type,
+                        create_time * 1000 + i % 1000,
+                        rowid_of[sender],
+                        create_time,
+                        2 if is_sent else 3,
+                        "",
+                        content,
+                        None,
+                    )
+                )
+                last = (create_time, text if local_type == 1 else "[消息]")
+            for shard in sorted(created):
+                conn = shard_conns[shard]
+                conn.execute(
+                    f'CREATE TABLE "{table}" (local_id INTEGER PRIMARY KEY AUTOINCREMENT, server_id INTEGER, '
+                    "local_type INTEGER, sort_seq INTEGER, real_sender_id INTEGER, create_time INTEGER, "
+                    "status INTEGER, source TEXT, message_content TEXT, compress_content TEXT)"
+                )
+                conn.executemany(f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows_by_shard[shard])
+                conn.execute(f'CREATE INDEX "{table}_SENDERID" ON "{table}"(real_sender_id)')
+                conn.execute(f'CREATE INDEX "{table}_SORTSEQ" ON "{table}"(sort_seq)')
+                result.message_count += len(rows_by_shard[shard])
+            if last[0]:
+                sessions.append((username, last[0], last[1][:64]))
+            if chat_index % 8 == 7:
+                for conn in shard_conns:
+                    conn.commit()
+
+        for conn in shard_conns:
+            conn.commit()
+            _pad_to_pages(conn, spec.min_db_pages, rng)
+    finally:
+        for conn in shard_conns:
+            conn.close()
+
+    _build_contact_db(account_dir / "contact.db", spec.account, [*contacts, *groups], rng)
+    _build_session_db(account_dir / "session.db", sessions)
+
+    key_material = bytes.fromhex(spec.key_hex)
+    plain_to_storage = [
+        (account_dir / "contact.db", db_storage / "contact" / "contact.db"),
+        (account_dir / "session.db", db_storage / "session" / "session.db"),
+        *[(account_dir / f"message_{i}.db", db_storage / "message" / f"message_{i}.db") for i in range(shards)],
+    ]
+    for plain, encrypted in plain_to_storage:
+        encrypt_sqlite_file(plain, encrypted, key_material, passphrase=spec.passphrase, rng=rng)
+        result.plain_dbs.append(plain)
+        result.encrypted_dbs.append(encrypted)
+
+    for index, (username, file_md5, create_time) in enumerate(media_targets):
+        month = f"2024-{1 + (create_time - _BASE_TIME) * 12 // (366 * 86400):02d}"
+        img_dir = wxid_dir / "msg" / "attach" / hashlib.md5(username.encode("utf-8")).hexdigest() / month / "Img"
+        img_dir.mkdir(parents=True, exist_ok=True)
+        payload = _fake_jpeg(rng, spec.media_bytes)
+        dat = img_dir / f"{file_md5}.dat"
+        if index % 2:
+            dat.write_bytes(encode_dat_v4(payload, result.image_xor_key, result.image_aes_key))
+            result.media_v4.append(dat)
+        else:
+            dat.write_bytes(encode_dat_v3(payload, result.image_xor_key))
+            result.media_v3.append(dat)
+
+    return result
+
+
+def _parse_args() -> argparse.Namespace:
+    defaults = SyntheticAccountSpec()
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic WeChat 4.x account.")
+    parser.add_argument("--out", required=True, help="output root directory")
+    parser.add_argument("--account", default=defaults.account)
+    parser.add_argument("--contacts", type=int, default=defaults.contacts)
+    parser.add_argument("--chats", type=int, default=defaults.chats)
+    parser.add_argument("--messages-per-chat", type=int, default=defaults.messages_per_chat)
+    parser.add_argument("--shards", type=int, default=defaults.message_shards)
+    parser.add_argument("--compressed-ratio", type=float, default=defaults.compressed_ratio)
+    parser.add_argument("--min-db-pages", type=int, default=defaults.min_db_pages)
+    parser.add_argument("--media-files", type=int, default=defaults.media_files)
+    parser.add_argument("--media-bytes", type=int, default=defaults.media_bytes)
+    parser.add_argument("--passphrase", action="store_true", help="treat the key as a SQLCipher passphrase")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    spec = SyntheticAccountSpec(
+        account=args.account,
+        contacts=args.contacts,
+        chats=args.chats,
+        messages_per_chat=args.messages_per_chat,
+        message_shards=args.shards,
+        compressed_ratio=args.compressed_ratio,
+        min_db_pages=args.min_db_pages,
+        media_files=args.media_files,
+        media_bytes=args.media_bytes,
+        seed=args.seed,
+        passphrase=bool(args.passphrase),
+    )
+    account = generate_synthetic_account(Path(args.out), spec)
+    print(json.dumps(account.summary(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())